@@ -17,11 +17,13 @@ from ._client import (
     RequestOptions,
 )
 from ._models import BaseModel
+from ._hedging import HedgePolicy
 from ._version import __title__, __version__
 from ._response import APIResponse as APIResponse, AsyncAPIResponse as AsyncAPIResponse
 from ._constants import DEFAULT_TIMEOUT, DEFAULT_MAX_RETRIES, DEFAULT_CONNECTION_LIMITS
 from ._exceptions import (
     APIError,
+    ActionError,
     ConflictError,
     GradientError,
     NotFoundError,
@@ -30,11 +32,13 @@ from ._exceptions import (
     APITimeoutError,
     BadRequestError,
     IndexingJobError,
+    ActionTimeoutError,
     APIConnectionError,
     AuthenticationError,
     InternalServerError,
     AgentDeploymentError,
     PermissionDeniedError,
+    PollingCancelledError,
     IndexingJobTimeoutError,
     UnprocessableEntityError,
     APIResponseValidationError,
@@ -75,6 +79,9 @@ __all__ = [
     "IndexingJobTimeoutError",
     "AgentDeploymentError",
     "AgentDeploymentTimeoutError",
+    "PollingCancelledError",
+    "ActionError",
+    "ActionTimeoutError",
     "Timeout",
     "RequestOptions",
     "Client",
@@ -91,6 +98,7 @@ __all__ = [
     "DefaultHttpxClient",
     "DefaultAsyncHttpxClient",
     "DefaultAioHttpClient",
+    "HedgePolicy",
 ]
 
 if not _t.TYPE_CHECKING:
@@ -61,6 +61,7 @@ from ._types import (
 from ._utils import is_dict, is_list, asyncify, is_given, lru_cache, is_mapping
 from ._compat import PYDANTIC_V1, model_copy, model_dump
 from ._models import GenericModel, FinalRequestOptions, validate_type, construct_type
+from ._hedging import HedgePolicy, send_hedged
 from ._response import (
     APIResponse,
     BaseAPIResponse,
@@ -1390,6 +1391,7 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
         custom_query: Mapping[str, object] | None = None,
         user_agent_package: str | None = None,
         user_agent_version: str | None = None,
+        hedge_policy: HedgePolicy | None = None,
     ) -> None:
         if not is_given(timeout):
             # if the user passed in a custom http client with a non-default
@@ -1426,6 +1428,7 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
             # cast to a valid type because mypy doesn't understand our type narrowing
             timeout=cast(Timeout, timeout),
         )
+        self._hedge_policy = hedge_policy
 
     def is_closed(self) -> bool:
         return self._client.is_closed
@@ -1541,11 +1544,11 @@ class AsyncAPIClient(BaseClient[httpx.AsyncClient, AsyncStream[Any]]):
 
             response = None
             try:
-                response = await self._client.send(
-                    request,
-                    stream=stream or self._should_stream_response_body(request=request),
-                    **kwargs,
-                )
+                should_stream = stream or self._should_stream_response_body(request=request)
+                if self._hedge_policy is not None and not should_stream:
+                    response = await send_hedged(self._client, request, self._hedge_policy, **kwargs)
+                else:
+                    response = await self._client.send(request, stream=should_stream, **kwargs)
             except httpx.TimeoutException as err:
                 log.debug("Encountered httpx.TimeoutException", exc_info=True)
 
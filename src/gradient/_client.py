@@ -22,6 +22,7 @@ from ._types import (
 )
 from ._utils import is_given, get_async_library
 from ._compat import cached_property
+from ._hedging import HedgePolicy
 from ._version import __version__
 from ._streaming import Stream as Stream, AsyncStream as AsyncStream
 from ._exceptions import APIStatusError
@@ -480,6 +481,8 @@ class AsyncGradient(AsyncAPIClient):
         # User agent tracking parameters
         user_agent_package: str | None = None,
         user_agent_version: str | None = None,
+        # Hedge slow idempotent requests, see `HedgePolicy`.
+        hedge_policy: HedgePolicy | None = None,
     ) -> None:
         """Construct a new async AsyncGradient client instance.
 
@@ -532,6 +535,7 @@ class AsyncGradient(AsyncAPIClient):
             _strict_response_validation=_strict_response_validation,
             user_agent_package=user_agent_package,
             user_agent_version=user_agent_version,
+            hedge_policy=hedge_policy,
         )
 
         self._default_stream_cls = AsyncStream
@@ -713,6 +717,7 @@ class AsyncGradient(AsyncAPIClient):
         set_default_query: Mapping[str, object] | None = None,
         user_agent_package: str | None = None,
         user_agent_version: str | None = None,
+        hedge_policy: HedgePolicy | None | NotGiven = not_given,
         _extra_kwargs: Mapping[str, Any] = {},
     ) -> Self:
         """
@@ -756,6 +761,7 @@ class AsyncGradient(AsyncAPIClient):
             default_query=params,
             user_agent_package=user_agent_package or self._user_agent_package,
             user_agent_version=user_agent_version or self._user_agent_version,
+            hedge_policy=hedge_policy if is_given(hedge_policy) else self._hedge_policy,
             **_extra_kwargs,
         )
         client._base_url_overridden = self._base_url_overridden or base_url is not None
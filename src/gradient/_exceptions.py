@@ -19,6 +19,9 @@ __all__ = [
     "IndexingJobTimeoutError",
     "AgentDeploymentError",
     "AgentDeploymentTimeoutError",
+    "PollingCancelledError",
+    "ActionError",
+    "ActionTimeoutError",
 ]
 
 
@@ -152,3 +155,33 @@ class AgentDeploymentTimeoutError(GradientError):
     def __init__(self, message: str, agent_id: str) -> None:
         super().__init__(message)
         self.agent_id = agent_id
+
+
+class PollingCancelledError(GradientError):
+    """Raised when waiting for a resource is cancelled through its `cancel_event`."""
+
+
+class ActionError(GradientError):
+    """Raised when a Droplet, volume, floating IP or image action ends in the `errored` state."""
+
+    action_id: int
+    status: str
+
+    def __init__(self, message: str, *, action_id: int, status: str) -> None:
+        super().__init__(message)
+        self.action_id = action_id
+        self.status = status
+
+
+class ActionTimeoutError(GradientError):
+    """Raised when waiting for an action times out."""
+
+    action_id: int
+    status: str
+    timeout: float
+
+    def __init__(self, message: str, *, action_id: int, status: str, timeout: float) -> None:
+        super().__init__(message)
+        self.action_id = action_id
+        self.status = status
+        self.timeout = timeout
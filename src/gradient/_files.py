@@ -3,8 +3,8 @@ from __future__ import annotations
 import io
 import os
 import pathlib
-from typing import overload
-from typing_extensions import TypeGuard
+from typing import Optional, overload
+from typing_extensions import TypeGuard, override
 
 import anyio
 
@@ -20,6 +20,78 @@ from ._types import (
 from ._utils import is_tuple_t, is_mapping_t, is_sequence_t
 
 
+class LazyFile(io.RawIOBase):
+    """A file on disk that is only opened once it is read.
+
+    Used for `PathLike` file inputs so that httpx streams them in chunks instead of
+    the whole file being read into memory up front. httpx rewinds file objects
+    before sending them, so the same instance can be sent again when a request is
+    retried; the underlying file is closed whenever the end is reached and
+    reopened if it is read again.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        super().__init__()
+        self.name = os.fspath(path)
+        self._file: Optional[io.BufferedReader] = None
+        self._position = 0
+
+    @override
+    def readable(self) -> bool:
+        return True
+
+    @override
+    def seekable(self) -> bool:
+        return True
+
+    @override
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        if self._file is None:
+            self._file = open(self.name, "rb")
+            self._file.seek(self._position)
+        count = self._file.readinto(buffer)
+        self._position += count
+        if count == 0:
+            self._release()
+        return count
+
+    @override
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            position = offset
+        elif whence == os.SEEK_CUR:
+            position = self._position + offset
+        elif whence == os.SEEK_END:
+            position = os.stat(self.name).st_size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+
+        self._position = position
+        if self._file is not None:
+            self._file.seek(position)
+        return position
+
+    @override
+    def tell(self) -> int:
+        return self._position
+
+    @override
+    def close(self) -> None:
+        self._release()
+        super().close()
+
+    def _release(self) -> None:
+        file, self._file = self._file, None
+        if file is not None:
+            file.close()
+
+    @override
+    def __repr__(self) -> str:
+        return f"LazyFile({self.name!r})"
+
+
 def is_base64_file_input(obj: object) -> TypeGuard[Base64FileInput]:
     return isinstance(obj, io.IOBase) or isinstance(obj, os.PathLike)
 
@@ -64,7 +136,7 @@ def _transform_file(file: FileTypes) -> HttpxFileTypes:
     if is_file_content(file):
         if isinstance(file, os.PathLike):
             path = pathlib.Path(file)
-            return (path.name, path.read_bytes())
+            return (path.name, LazyFile(path))
 
         return file
 
@@ -76,7 +148,7 @@ def _transform_file(file: FileTypes) -> HttpxFileTypes:
 
 def read_file_content(file: FileContent) -> HttpxFileContent:
     if isinstance(file, os.PathLike):
-        return pathlib.Path(file).read_bytes()
+        return LazyFile(file)
     return file
 
 
@@ -105,8 +177,8 @@ async def async_to_httpx_files(files: RequestFiles | None) -> HttpxRequestFiles
 async def _async_transform_file(file: FileTypes) -> HttpxFileTypes:
     if is_file_content(file):
         if isinstance(file, os.PathLike):
-            path = anyio.Path(file)
-            return (path.name, await path.read_bytes())
+            # httpx reads the file in small chunks while sending, like any other file object
+            return (anyio.Path(file).name, LazyFile(file))
 
         return file
 
@@ -118,6 +190,6 @@ async def _async_transform_file(file: FileTypes) -> HttpxFileTypes:
 
 async def async_read_file_content(file: FileContent) -> HttpxFileContent:
     if isinstance(file, os.PathLike):
-        return await anyio.Path(file).read_bytes()
+        return LazyFile(file)
 
     return file
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import re
+import math
+import time
+from typing import Any, Dict, Tuple, Pattern, Optional, Sequence
+from collections import deque
+
+import anyio
+import httpx
+
+__all__ = ["HedgePolicy"]
+
+# path segments that identify a single resource, e.g. UUIDs and numeric IDs
+_ID_SEGMENT = re.compile(r"^(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+)$")
+
+
+def _endpoint(request: httpx.Request) -> str:
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in request.url.path.split("/")]
+    return f"{request.method} {request.url.host}{'/'.join(segments)}"
+
+
+class HedgePolicy:
+    """Configures request hedging for `AsyncGradient`.
+
+    When a request that is safe to repeat has not been answered within the
+    observed latency percentile of its endpoint, a second identical request is
+    sent and whichever response arrives first is used; the slower request is
+    cancelled. Hedging applies to `GET` requests and to `POST` requests whose
+    path matches one of `idempotent_paths`, and never to streaming responses.
+
+    ```py
+    client = AsyncGradient(hedge_policy=HedgePolicy(percentile=0.95, budget=0.05))
+    ```
+    """
+
+    percentile: float
+    min_samples: int
+    min_delay: float
+    budget: float
+
+    hedges_sent: int
+    """The number of hedge requests sent so far."""
+
+    hedges_won: int
+    """The number of hedge requests that answered before the original request."""
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        window: int = 200,
+        min_delay: float = 0.0,
+        budget: float = 0.05,
+        max_burst: float = 10.0,
+        idempotent_paths: Sequence[str] = (r"/retrieve$",),
+    ) -> None:
+        """
+        Args:
+          percentile: The latency percentile of an endpoint after which a request to it is hedged.
+
+          min_samples: The number of latencies that must be observed for an endpoint before
+              its requests are hedged.
+
+          window: The number of most recent latencies kept per endpoint.
+
+          min_delay: The minimum number of seconds to wait before hedging a request.
+
+          budget: The maximum number of hedge requests as a fraction of all requests, e.g.
+              `0.05` allows at most one hedge for every 20 requests on average.
+
+          max_burst: The maximum number of hedge requests that can be sent in a row after a
+              quiet period.
+
+          idempotent_paths: Regular expressions for the paths of `POST` endpoints that only
+              read data and may be hedged, by default the knowledge base retrieval endpoint.
+        """
+        if not 0 < percentile < 1:
+            raise ValueError(f"Expected `percentile` to be between 0 and 1 but received {percentile}")
+        if budget < 0:
+            raise ValueError(f"Expected `budget` to be at least 0 but received {budget}")
+
+        self.percentile = percentile
+        self.min_samples = max(min_samples, 1)
+        self.min_delay = min_delay
+        self.budget = budget
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+        self._window = window
+        self._max_burst = max_burst
+        self._tokens = max_burst
+        self._paths: Tuple[Pattern[str], ...] = tuple(re.compile(path) for path in idempotent_paths)
+        self._latencies: Dict[str, deque[float]] = {}
+
+    def is_hedgeable(self, request: httpx.Request) -> bool:
+        if request.method == "GET":
+            return True
+        return request.method == "POST" and any(path.search(request.url.path) for path in self._paths)
+
+    def hedge_delay(self, request: httpx.Request) -> Optional[float]:
+        """The number of seconds after which `request` should be hedged, or `None` if it should not be hedged."""
+        if not self.is_hedgeable(request):
+            return None
+
+        latencies = self._latencies.get(_endpoint(request))
+        if latencies is None or len(latencies) < self.min_samples:
+            return None
+
+        ordered = sorted(latencies)
+        index = min(len(ordered) - 1, math.ceil(self.percentile * len(ordered)) - 1)
+        return max(ordered[index], self.min_delay)
+
+    def record(self, request: httpx.Request, latency: float) -> None:
+        endpoint = _endpoint(request)
+        latencies = self._latencies.get(endpoint)
+        if latencies is None:
+            latencies = self._latencies[endpoint] = deque(maxlen=self._window)
+        latencies.append(latency)
+
+    def _earn(self) -> None:
+        self._tokens = min(self._max_burst, self._tokens + self.budget)
+
+    def _spend(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        self.hedges_sent += 1
+        return True
+
+
+async def send_hedged(
+    client: httpx.AsyncClient,
+    request: httpx.Request,
+    policy: HedgePolicy,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send a non-streaming request, hedging it according to `policy`.
+
+    Errors are only raised if neither attempt produced a response, in which case
+    the error of the original request takes precedence.
+    """
+    if not policy.is_hedgeable(request):
+        return await client.send(request, stream=False, **kwargs)
+
+    policy._earn()
+    delay = policy.hedge_delay(request)
+    if delay is None:
+        started = time.monotonic()
+        response = await client.send(request, stream=False, **kwargs)
+        policy.record(request, time.monotonic() - started)
+        return response
+
+    responses: list[Tuple[httpx.Response, bool]] = []
+    errors: list[Exception] = []
+    primary_done = anyio.Event()
+
+    async def attempt(hedge: bool) -> None:
+        try:
+            response = await client.send(request, stream=False, **kwargs)
+        except Exception as exc:
+            if hedge:
+                errors.append(exc)
+            else:
+                errors.insert(0, exc)
+            return
+        finally:
+            if not hedge:
+                primary_done.set()
+
+        if responses:
+            # both attempts finished in the same tick
+            await response.aclose()
+            return
+
+        responses.append((response, hedge))
+        task_group.cancel_scope.cancel()
+
+    started = time.monotonic()
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(attempt, False)
+        with anyio.move_on_after(delay):
+            await primary_done.wait()
+        if not primary_done.is_set() and policy._spend():
+            task_group.start_soon(attempt, True)
+
+    if not responses:
+        raise errors[0]
+
+    # only the original request's latency is recorded, otherwise every won hedge would lower the
+    # percentile; if the hedge won, the original request took at least this long
+    policy.record(request, time.monotonic() - started)
+    response, hedge = responses[0]
+    if hedge:
+        policy.hedges_won += 1
+    return response
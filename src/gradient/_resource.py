@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 import time
-from typing import TYPE_CHECKING
+import threading
+from typing import TYPE_CHECKING, Optional
 
 import anyio
 
@@ -23,8 +24,12 @@ class SyncAPIResource:
         self._delete = client.delete
         self._get_api_list = client.get_api_list
 
-    def _sleep(self, seconds: float) -> None:
-        time.sleep(seconds)
+    def _sleep(self, seconds: float, cancel_event: Optional[threading.Event] = None) -> None:
+        if cancel_event is not None:
+            # returns early once the event is set
+            cancel_event.wait(seconds)
+        else:
+            time.sleep(seconds)
 
 
 class AsyncAPIResource:
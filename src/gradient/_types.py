@@ -34,6 +34,7 @@ import pydantic
 from httpx import URL, Proxy, Timeout, Response, BaseTransport, AsyncBaseTransport
 
 if TYPE_CHECKING:
+    from ._files import LazyFile
     from ._models import BaseModel
     from ._response import APIResponse, AsyncAPIResponse
 
@@ -52,7 +53,7 @@ ProxiesDict = Dict["str | URL", Union[None, str, URL, Proxy]]
 ProxiesTypes = Union[str, Proxy, ProxiesDict]
 if TYPE_CHECKING:
     Base64FileInput = Union[IO[bytes], PathLike[str]]
-    FileContent = Union[IO[bytes], bytes, PathLike[str]]
+    FileContent = Union[IO[bytes], bytes, PathLike[str], LazyFile]
 else:
     Base64FileInput = Union[IO[bytes], PathLike]
     FileContent = Union[IO[bytes], bytes, PathLike]  # PathLike is not subscriptable in Python 3.8.
@@ -68,8 +69,12 @@ FileTypes = Union[
 ]
 RequestFiles = Union[Mapping[str, FileTypes], Sequence[Tuple[str, FileTypes]]]
 
-# duplicate of the above but without our custom file support
-HttpxFileContent = Union[IO[bytes], bytes]
+# duplicate of the above but without our custom file support,
+# apart from the `LazyFile` that `PathLike` inputs are sent as
+if TYPE_CHECKING:
+    HttpxFileContent = Union[IO[bytes], bytes, LazyFile]
+else:
+    HttpxFileContent = Union[IO[bytes], bytes]
 HttpxFileTypes = Union[
     # file (or bytes)
     HttpxFileContent,
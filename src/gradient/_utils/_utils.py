@@ -15,7 +15,6 @@ from typing import (
     cast,
     overload,
 )
-from pathlib import Path
 from datetime import date, datetime
 from typing_extensions import TypeGuard
 
@@ -364,9 +363,10 @@ def removesuffix(string: str, suffix: str) -> str:
 
 
 def file_from_path(path: str) -> FileTypes:
-    contents = Path(path).read_bytes()
+    from .._files import LazyFile
+
     file_name = os.path.basename(path)
-    return (file_name, contents)
+    return (file_name, LazyFile(path))
 
 
 def get_required_header(headers: HeadersLike, header: str) -> str:
@@ -0,0 +1,57 @@
+from .batch import AsyncBatch as AsyncBatch, BatchResult as BatchResult
+from .fleet import (
+    WaitResult as WaitResult,
+    FleetWaiter as FleetWaiter,
+    AsyncFleetWaiter as AsyncFleetWaiter,
+    AsyncFleetResults as AsyncFleetResults,
+)
+from .tools import ToolRunStep as ToolRunStep, ToolRunResult as ToolRunResult, ToolCallResult as ToolCallResult
+from .usage import UsageColumns as UsageColumns, daily_windows as daily_windows
+from .images import ImageSink as ImageSink, ImageFileSink as ImageFileSink, ImageBufferSink as ImageBufferSink
+from .kb_sync import DirectorySyncReport as DirectorySyncReport
+from .polling import PollPolicy as PollPolicy
+from .routing import (
+    ModelStats as ModelStats,
+    ModelRouter as ModelRouter,
+    RoutedCompletions as RoutedCompletions,
+    AsyncRoutedCompletions as AsyncRoutedCompletions,
+)
+from .uploads import FileUploadReport as FileUploadReport, FileUploadResult as FileUploadResult
+from .droplets import DropletChunk as DropletChunk, BulkCreateResult as BulkCreateResult
+from .reconcile import (
+    AgentConfig as AgentConfig,
+    RouteConfig as RouteConfig,
+    ConfigChange as ConfigChange,
+    ReconcilePlan as ReconcilePlan,
+)
+from .retrieval import FanoutResult as FanoutResult, RetrievedDocument as RetrievedDocument
+from .streaming import (
+    MergedStream as MergedStream,
+    MergedStreamChunk as MergedStreamChunk,
+    merge_streams as merge_streams,
+)
+from .deployment import (
+    AgentSpec as AgentSpec,
+    RouteSpec as RouteSpec,
+    StepResult as StepResult,
+    StepTiming as StepTiming,
+    FunctionSpec as FunctionSpec,
+    FleetDeployment as FleetDeployment,
+)
+from .conversation import Conversation as Conversation, AsyncConversation as AsyncConversation
+from .action_tracker import ActionTracker as ActionTracker, AsyncActionTracker as AsyncActionTracker
+from .retrieval_cache import (
+    CachedRetrieve as CachedRetrieve,
+    RetrievalCache as RetrievalCache,
+    AsyncCachedRetrieve as AsyncCachedRetrieve,
+)
+from .completion_cache import (
+    CacheBackend as CacheBackend,
+    CompletionCache as CompletionCache,
+    CachedCompletions as CachedCompletions,
+    SqliteCacheBackend as SqliteCacheBackend,
+    InMemoryCacheBackend as InMemoryCacheBackend,
+    AsyncCachedCompletions as AsyncCachedCompletions,
+)
+from .evaluation_export import EvaluationColumns as EvaluationColumns
+from .indexing_progress import IndexingJobProgress as IndexingJobProgress
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Union
+
+from .._types import Headers
+from ..types.chat.completion_create_params import MessageChatCompletionRequestAssistantMessage
+from ..types.chat.completion_create_response import ChoiceMessage
+from ..types.agents.chat.completion_create_response import ChoiceMessage as AgentChoiceMessage
+
+if TYPE_CHECKING:
+    from .._client import Gradient, AsyncGradient
+
+
+def chat_completions_path(client: Gradient | AsyncGradient) -> str:
+    """The URL that `chat.completions.create()` sends requests to."""
+    if client._base_url_overridden:
+        return "/chat/completions"
+    return f"{client.inference_endpoint}/v1/chat/completions"
+
+
+def model_access_headers(client: Gradient | AsyncGradient, extra_headers: Headers | None) -> Headers:
+    """The headers `chat.completions.create()` authenticates with."""
+    if not client.model_access_key:
+        raise TypeError(
+            "Could not resolve authentication method. Expected model_access_key to be set for chat completions."
+        )
+    return {"Authorization": f"Bearer {client.model_access_key}", **(extra_headers or {})}
+
+
+def assistant_message(
+    message: Union[ChoiceMessage, AgentChoiceMessage],
+) -> MessageChatCompletionRequestAssistantMessage:
+    """Convert a message from a `CompletionCreateResponse` into one that can be sent back in `messages`."""
+    param: MessageChatCompletionRequestAssistantMessage = {"role": "assistant", "content": message.content}
+    if message.tool_calls:
+        param["tool_calls"] = [
+            {
+                "id": tool_call.id,
+                "type": tool_call.type,
+                "function": {"name": tool_call.function.name, "arguments": tool_call.function.arguments},
+            }
+            for tool_call in message.tool_calls
+        ]
+    return param
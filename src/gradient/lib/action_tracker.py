@@ -0,0 +1,244 @@
+"""Track the actions of many Droplets, volumes, floating IPs and images at once.
+
+`ActionTracker` takes what the action endpoints return, e.g. the responses of
+`gpu_droplets.actions.bulk_initiate()`, `volumes.actions.initiate_by_id()`,
+`floating_ips.actions.create()`, `images.actions.create()` or
+`gpu_droplets.create()`, and polls every
+action through `FleetWaiter.add_action()`, so all of them share one scheduler,
+one backoff policy and one concurrency cap. Actions that are already completed
+or errored when they are tracked are reported without being polled.
+"""
+
+from __future__ import annotations
+
+import itertools
+from typing import TYPE_CHECKING, Any, Set, List, Union, Iterator, Optional, AsyncIterator
+from typing_extensions import TypeAlias, override
+
+from .fleet import WaitResult, FleetWaiter, AsyncFleetWaiter, AsyncFleetResults, _Fleet, _ClientT, _BaseFleetWaiter
+from .actions import is_action_complete
+from ..types.shared.action import Action
+from ..types.shared.action_link import ActionLink
+from ..types.gpu_droplet_create_response import SingleDropletResponse, MultipleDropletResponse
+from ..types.gpu_droplets.action_list_response import ActionListResponse
+from ..types.gpu_droplets.action_initiate_response import ActionInitiateResponse
+from ..types.gpu_droplets.action_retrieve_response import ActionRetrieveResponse
+from ..types.gpu_droplets.action_bulk_initiate_response import ActionBulkInitiateResponse
+from ..types.gpu_droplets.floating_ips.action_create_response import (
+    ActionCreateResponse as FloatingIPActionCreateResponse,
+)
+from ..types.gpu_droplets.volumes.action_initiate_by_id_response import ActionInitiateByIDResponse
+from ..types.gpu_droplets.volumes.action_initiate_by_name_response import ActionInitiateByNameResponse
+
+if TYPE_CHECKING:
+    from .._client import Gradient, AsyncGradient
+
+__all__ = ["ActionTracker", "AsyncActionTracker"]
+
+_SingleActionResponse = (
+    ActionInitiateResponse,
+    FloatingIPActionCreateResponse,
+    ActionInitiateByIDResponse,
+    ActionInitiateByNameResponse,
+)
+_MultipleActionsResponse = (ActionBulkInitiateResponse, ActionListResponse)
+_DropletResponse = (SingleDropletResponse, MultipleDropletResponse)
+
+TrackedAction: TypeAlias = Union[
+    int,
+    Action,
+    ActionLink,
+    ActionInitiateResponse,
+    FloatingIPActionCreateResponse,
+    ActionInitiateByIDResponse,
+    ActionInitiateByNameResponse,
+    ActionBulkInitiateResponse,
+    ActionListResponse,
+    SingleDropletResponse,
+    MultipleDropletResponse,
+]
+"""An action id, an action, an action link, or the response of an endpoint that starts or lists actions."""
+
+
+def _actions(value: TrackedAction) -> List[Union[int, Action]]:
+    if isinstance(value, bool):
+        raise TypeError(f"Expected an action or an action id but received {value!r}")
+    if isinstance(value, (int, Action)):
+        return [value]
+    if isinstance(value, ActionLink):
+        return [value.id] if value.id is not None else []
+    if isinstance(value, _SingleActionResponse):
+        return [value.action] if value.action is not None else []
+    if isinstance(value, _MultipleActionsResponse):
+        return list(value.actions or [])
+    # the types are not enforced at runtime, so anything else is still rejected
+    if isinstance(value, _DropletResponse):  # pyright: ignore[reportUnnecessaryIsInstance]
+        return [link.id for link in value.links.actions or [] if link.id is not None]
+    raise TypeError(f"Expected an action, an action id or a response with actions but received {type(value)}")
+
+
+def _settled_result(action: Action) -> Optional[WaitResult[Any]]:
+    """The result of an action that is already in a final state, without polling it."""
+    assert action.id is not None
+    response = ActionRetrieveResponse(action=action)
+    try:
+        if not is_action_complete(action.id, response):
+            return None
+    except Exception as exc:
+        return WaitResult("action", str(action.id), response=response, error=exc, polls=0, elapsed=0.0)
+    return WaitResult("action", str(action.id), response=response, error=None, polls=0, elapsed=0.0)
+
+
+def _check(result: WaitResult[Any], raise_on_error: bool) -> WaitResult[Any]:
+    if raise_on_error and result.error is not None:
+        raise result.error
+    return result
+
+
+class _BaseActionTracker(_BaseFleetWaiter[_ClientT]):
+    _tracked: Set[int]
+    _settled: List[WaitResult[Any]]
+
+    @override
+    def __len__(self) -> int:
+        return super().__len__() + len(self._settled)
+
+    def track(self, *actions: TrackedAction) -> None:
+        """Track every action of the given actions, action ids, action links or responses.
+
+        An action that is tracked twice is only polled once.
+        """
+        for value in actions:
+            for action in _actions(value):
+                action_id = action if isinstance(action, int) else action.id
+                if action_id is None or action_id in self._tracked:
+                    continue
+                self._tracked.add(action_id)
+
+                result = _settled_result(action) if isinstance(action, Action) else None
+                if result is not None:
+                    self._settled.append(result)
+                else:
+                    self.add_action(action_id)
+
+
+class ActionTracker(_BaseActionTracker["Gradient"], FleetWaiter):
+    """Polls the actions of many resources with one scheduler and a shared request rate.
+
+    ```py
+    tracker = ActionTracker(client, max_requests_per_second=10, timeout=600)
+    tracker.track(client.gpu_droplets.actions.bulk_initiate(tag_name="web", type="power_off"))
+    tracker.track(client.gpu_droplets.volumes.actions.initiate_by_id(volume_id, type="attach", droplet_id=1))
+    for result in tracker.as_completed():
+        print(result.id, "completed" if result.ok else result.error)
+    ```
+
+    Args:
+      max_requests_per_second: The maximum rate of polls across all actions, `None` for no limit.
+
+      concurrency: The maximum number of polls in flight at once.
+
+      poll_interval: The longest time between two polls of the same action; polls start out
+          more frequent and back off with jitter up to this interval.
+
+      timeout: The maximum time to wait for each action, counted from the start of the wait.
+    """
+
+    def __init__(
+        self,
+        client: Gradient,
+        *,
+        max_requests_per_second: Optional[float] = 5.0,
+        concurrency: int = 8,
+        poll_interval: float = 5.0,
+        timeout: Optional[float] = None,
+    ) -> None:
+        super().__init__(
+            client,
+            max_requests_per_second=max_requests_per_second,
+            concurrency=concurrency,
+            poll_interval=poll_interval,
+            timeout=timeout,
+        )
+        self._tracked = set()
+        self._settled = []
+
+    @override
+    def as_completed(self, *, raise_on_error: bool = False) -> Iterator[WaitResult[Any]]:
+        """Yield every tracked action as soon as it is completed or errored.
+
+        An errored action is yielded with an `ActionError`, or raised if `raise_on_error`
+        is set, which stops polling the other actions.
+        """
+        for result in itertools.chain(self._settled, super().as_completed()):
+            yield _check(result, raise_on_error)
+
+
+class _AsyncActionResults(AsyncFleetResults):
+    def __init__(
+        self, fleet: _Fleet, concurrency: int, *, settled: List[WaitResult[Any]], raise_on_error: bool
+    ) -> None:
+        super().__init__(fleet, concurrency)
+        self._settled = settled
+        self._raise_on_error = raise_on_error
+
+    @override
+    async def __aiter__(self) -> AsyncIterator[WaitResult[Any]]:
+        for result in self._settled:
+            yield _check(result, self._raise_on_error)
+        async for result in super().__aiter__():
+            yield _check(result, self._raise_on_error)
+
+
+class AsyncActionTracker(_BaseActionTracker["AsyncGradient"], AsyncFleetWaiter):
+    """Polls the actions of many resources with one scheduler and a shared request rate.
+
+    ```py
+    tracker = AsyncActionTracker(client, max_requests_per_second=10, timeout=600)
+    tracker.track(await client.gpu_droplets.floating_ips.actions.create(ip, type="unassign"))
+    tracker.track(await client.gpu_droplets.images.actions.create(image_id, type="convert"))
+    async with tracker.as_completed() as results:
+        async for result in results:
+            print(result.id, "completed" if result.ok else result.error)
+    ```
+
+    Args:
+      max_requests_per_second: The maximum rate of polls across all actions, `None` for no limit.
+
+      concurrency: The maximum number of polls in flight at once.
+
+      poll_interval: The longest time between two polls of the same action; polls start out
+          more frequent and back off with jitter up to this interval.
+
+      timeout: The maximum time to wait for each action, counted from the start of the wait.
+    """
+
+    def __init__(
+        self,
+        client: AsyncGradient,
+        *,
+        max_requests_per_second: Optional[float] = 5.0,
+        concurrency: int = 8,
+        poll_interval: float = 5.0,
+        timeout: Optional[float] = None,
+    ) -> None:
+        super().__init__(
+            client,
+            max_requests_per_second=max_requests_per_second,
+            concurrency=concurrency,
+            poll_interval=poll_interval,
+            timeout=timeout,
+        )
+        self._tracked = set()
+        self._settled = []
+
+    @override
+    def as_completed(self, *, raise_on_error: bool = False) -> AsyncFleetResults:
+        """Yield every tracked action as soon as it is completed or errored.
+
+        An errored action is yielded with an `ActionError`, or raised if `raise_on_error`
+        is set, which stops polling the other actions once the `async with` block is left.
+        """
+        return _AsyncActionResults(
+            self._fleet(), self.concurrency, settled=list(self._settled), raise_on_error=raise_on_error
+        )
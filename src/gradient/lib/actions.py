@@ -0,0 +1,50 @@
+"""Helpers for waiting on Droplet, volume, floating IP and image actions.
+
+Every action, whatever its resource, can be retrieved from `/v2/actions/{id}`,
+so actions are polled by id alone. Used by `FleetWaiter.add_action()`,
+`ActionTracker` and `gpu_droplets.bulk_create()`.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+from .._exceptions import ActionError, ActionTimeoutError
+from ..types.gpu_droplets.action_retrieve_response import ActionRetrieveResponse
+
+if TYPE_CHECKING:
+    from .._client import Gradient, AsyncGradient
+
+
+def _action_path(client: Gradient | AsyncGradient, action_id: int) -> str:
+    if client._base_url_overridden:
+        return f"/v2/actions/{action_id}"
+    return f"https://api.digitalocean.com/v2/actions/{action_id}"
+
+
+def retrieve_action(client: Gradient, action_id: int) -> ActionRetrieveResponse:
+    return client.get(_action_path(client, action_id), cast_to=ActionRetrieveResponse)
+
+
+async def async_retrieve_action(client: AsyncGradient, action_id: int) -> ActionRetrieveResponse:
+    return await client.get(_action_path(client, action_id), cast_to=ActionRetrieveResponse)
+
+
+def is_action_complete(action_id: int, response: ActionRetrieveResponse) -> bool:
+    status = response.action.status if response.action is not None else None
+    if status == "completed":
+        return True
+    if status == "errored":
+        action_type = response.action.type if response.action is not None and response.action.type else "action"
+        raise ActionError(f"Action {action_id} ({action_type}) errored", action_id=action_id, status=status)
+    return False
+
+
+def action_timeout_error(action_id: int, timeout: float, response: Optional[ActionRetrieveResponse]) -> Exception:
+    status = response.action.status if response and response.action and response.action.status else "unknown"
+    return ActionTimeoutError(
+        f"Action {action_id} did not complete within {timeout} seconds. Current status: {status}",
+        action_id=action_id,
+        status=status,
+        timeout=timeout,
+    )
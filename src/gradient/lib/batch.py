@@ -0,0 +1,355 @@
+"""Run many requests against the same endpoint under a concurrency limit.
+
+Used by `chat.completions.batch_create()`. Every request goes through the regular
+client method, so the client's retry policy and timeouts apply to each item.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import hashlib
+from types import TracebackType
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Union,
+    Generic,
+    Mapping,
+    TypeVar,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Awaitable,
+    AsyncIterable,
+    AsyncIterator,
+)
+from pathlib import Path
+from collections import deque
+from typing_extensions import Self, override
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import anyio
+from anyio.abc import TaskGroup
+from anyio.streams.memory import MemoryObjectSendStream, MemoryObjectReceiveStream
+
+from .._utils import is_dict
+from .._models import BaseModel
+from .streaming import _memory_stream
+
+__all__ = ["BatchResult", "AsyncBatch"]
+
+_T = TypeVar("_T")
+
+CheckpointPath = Union[str, "os.PathLike[str]"]
+
+
+class BatchResult(Generic[_T]):
+    """The outcome of a single request in a batch."""
+
+    __slots__ = ("index", "request", "response", "error")
+
+    index: int
+    """The position of the request in the input."""
+
+    request: Mapping[str, Any]
+    """The keyword arguments the request was made with."""
+
+    response: Optional[_T]
+    """The response, if the request succeeded."""
+
+    error: Optional[Exception]
+    """The exception raised by the request, if it failed after all retries."""
+
+    def __init__(
+        self,
+        index: int,
+        request: Mapping[str, Any],
+        *,
+        response: Optional[_T] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        self.index = index
+        self.request = request
+        self.response = response
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @override
+    def __repr__(self) -> str:
+        outcome = f"error={self.error!r}" if self.error is not None else f"response={self.response!r}"
+        return f"BatchResult(index={self.index}, {outcome})"
+
+
+def _request_hash(request: Mapping[str, Any]) -> str:
+    encoded = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class _Checkpoint:
+    """An append-only JSONL file recording every request that completed successfully.
+
+    Each line holds the request's index, a hash of its parameters and the response
+    body. A truncated last line, e.g. from a crash mid-write, is ignored.
+    """
+
+    def __init__(self, path: CheckpointPath) -> None:
+        self._path = Path(path)
+        self._done: Dict[int, str] = {}
+        self._file: Optional[IO[str]] = None
+
+        if self._path.exists():
+            with self._path.open("r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    # a line without the expected keys is skipped like a corrupt one
+                    if not is_dict(record):
+                        continue
+                    index, request_hash = record.get("index"), record.get("request_hash")
+                    if isinstance(index, int) and isinstance(request_hash, str):
+                        self._done[index] = request_hash
+
+    def is_done(self, index: int, request: Mapping[str, Any]) -> bool:
+        recorded = self._done.get(index)
+        if recorded is None:
+            return False
+        if recorded != _request_hash(request):
+            raise ValueError(
+                f"Request {index} does not match the request recorded in the checkpoint file {self._path}; "
+                "the checkpoint can only be used to resume a batch with the same inputs"
+            )
+        return True
+
+    def record(self, result: BatchResult[Any]) -> None:
+        if not result.ok:
+            return
+
+        if self._file is None:
+            self._file = self._path.open("a", encoding="utf-8")
+
+        response = result.response.to_dict(mode="json") if isinstance(result.response, BaseModel) else result.response
+        request_hash = _request_hash(result.request)
+        record = {"index": result.index, "request_hash": request_hash, "response": response}
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._done[result.index] = request_hash
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _validate(concurrency: int) -> None:
+    if concurrency < 1:
+        raise ValueError(f"Expected `concurrency` to be at least 1 but received {concurrency}")
+
+
+def _drain(ready: Dict[int, BatchResult[_T]], order: deque[int], *, ordered: bool) -> Iterator[BatchResult[_T]]:
+    if not ordered:
+        while ready:
+            yield ready.pop(next(iter(ready)))
+        return
+
+    while order and order[0] in ready:
+        yield ready.pop(order.popleft())
+
+
+def run_batch(
+    call: Callable[..., _T],
+    requests: Iterable[Mapping[str, Any]],
+    *,
+    concurrency: int,
+    ordered: bool,
+    checkpoint: Optional[CheckpointPath],
+) -> Iterator[BatchResult[_T]]:
+    """Call `call(**request)` for every request on a thread pool, yielding results as they complete.
+
+    Requests are pulled from `requests` lazily; at most `concurrency` are in flight and
+    at most `2 * concurrency` results are held back waiting to be yielded in order.
+    """
+    _validate(concurrency)
+    window = concurrency * 2
+    progress = _Checkpoint(checkpoint) if checkpoint is not None else None
+    source = enumerate(requests)
+    exhausted = False
+
+    pending: Dict[Future[_T], BatchResult[_T]] = {}
+    ready: Dict[int, BatchResult[_T]] = {}
+    order: deque[int] = deque()
+
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="gradient-batch")
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency and len(pending) + len(ready) < window:
+                try:
+                    index, request = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                if progress is not None and progress.is_done(index, request):
+                    continue
+
+                pending[pool.submit(call, **request)] = BatchResult(index, request)
+                if ordered:
+                    order.append(index)
+
+            if not pending and not ready:
+                break
+
+            if pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = pending.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        result.response = future.result()
+                    elif isinstance(error, Exception):
+                        result.error = error
+                    else:
+                        raise error
+                    ready[result.index] = result
+
+            for result in _drain(ready, order, ordered=ordered):
+                if progress is not None:
+                    progress.record(result)
+                yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+        if progress is not None:
+            progress.close()
+
+
+class AsyncBatch(Generic[_T]):
+    """Runs `call(**request)` for every request concurrently, see `chat.completions.batch_create()`.
+
+    Must be used as an async context manager so that outstanding requests are
+    cancelled if iteration stops early:
+
+    ```py
+    async with client.chat.completions.batch_create(requests, concurrency=16) as results:
+        async for result in results:
+            ...
+    ```
+    """
+
+    def __init__(
+        self,
+        call: Callable[..., Awaitable[_T]],
+        requests: Union[Iterable[Mapping[str, Any]], AsyncIterable[Mapping[str, Any]]],
+        *,
+        concurrency: int,
+        ordered: bool,
+        checkpoint: Optional[CheckpointPath],
+    ) -> None:
+        _validate(concurrency)
+        self._call = call
+        self._requests = requests
+        self._concurrency = concurrency
+        self._ordered = ordered
+        self._checkpoint_path = checkpoint
+        self._progress: Optional[_Checkpoint] = None
+        self._task_group: Optional[TaskGroup] = None
+        self._receive: Optional[MemoryObjectReceiveStream[BatchResult[_T]]] = None
+        self._window: Optional[anyio.Semaphore] = None
+        self._order: deque[int] = deque()
+        self._error: Optional[Exception] = None
+
+    async def _iter_requests(self) -> AsyncIterator[Mapping[str, Any]]:
+        if isinstance(self._requests, AsyncIterable):
+            async for request in self._requests:
+                yield request
+        else:
+            for request in self._requests:
+                yield request
+
+    async def _run(self, result: BatchResult[_T], limiter: anyio.Semaphore, send: MemoryObjectSendStream[Any]) -> None:
+        async with send:
+            try:
+                result.response = await self._call(**result.request)
+            except Exception as exc:
+                result.error = exc
+            finally:
+                limiter.release()
+            await send.send(result)
+
+    async def _produce(self, send: MemoryObjectSendStream[Any]) -> None:
+        assert self._task_group is not None and self._window is not None
+        limiter = anyio.Semaphore(self._concurrency)
+        async with send:
+            index = -1
+            try:
+                async for request in self._iter_requests():
+                    index += 1
+                    if self._progress is not None and self._progress.is_done(index, request):
+                        continue
+
+                    await self._window.acquire()
+                    await limiter.acquire()
+                    if self._ordered:
+                        self._order.append(index)
+                    self._task_group.start_soon(self._run, BatchResult[_T](index, request), limiter, send.clone())
+            except Exception as exc:
+                # surfaced to the consumer once the requests that were already started have been yielded
+                self._error = exc
+
+    async def __aenter__(self) -> Self:
+        if self._checkpoint_path is not None:
+            self._progress = _Checkpoint(self._checkpoint_path)
+
+        self._window = anyio.Semaphore(self._concurrency * 2)
+        send, receive = _memory_stream(self._concurrency * 2)
+        self._receive = receive
+
+        self._task_group = anyio.create_task_group()
+        await self._task_group.__aenter__()
+        self._task_group.start_soon(self._produce, send)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Cancel all outstanding requests."""
+        task_group, self._task_group = self._task_group, None
+        try:
+            if task_group is not None:
+                task_group.cancel_scope.cancel()
+                await task_group.__aexit__(None, None, None)
+        finally:
+            if self._receive is not None:
+                await self._receive.aclose()
+            if self._progress is not None:
+                self._progress.close()
+
+    async def __aiter__(self) -> AsyncIterator[BatchResult[_T]]:
+        if self._receive is None or self._window is None:
+            raise RuntimeError("AsyncBatch must be entered with `async with` before iterating over it")
+
+        ready: Dict[int, BatchResult[_T]] = {}
+        async for result in self._receive:
+            ready[result.index] = result
+            for item in _drain(ready, self._order, ordered=self._ordered):
+                self._window.release()
+                if self._progress is not None:
+                    self._progress.record(item)
+                yield item
+
+        if self._error is not None:
+            raise self._error
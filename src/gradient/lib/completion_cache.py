@@ -0,0 +1,428 @@
+"""An opt-in response cache for chat completions.
+
+Entries are keyed on a SHA-256 hash of the transformed request body together with
+the endpoint URL and any `extra_query` / `extra_body` values, and store the raw
+response body. Non-streaming hits are parsed into a `CompletionCreateResponse`;
+streaming hits are replayed through a regular `Stream` built on top of the cached
+server-sent events. Neither makes a network request.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, List, Tuple, Union, Mapping, Iterator, Optional, AsyncIterator, cast, overload
+from collections import OrderedDict
+from typing_extensions import Literal, override
+
+import httpx
+
+from ._chat import chat_completions_path
+from .._types import Omit, omit
+from .._utils import is_given, maybe_transform, async_maybe_transform
+from .._streaming import Stream, AsyncStream, ServerSentEvent
+from ..types.chat import completion_create_params
+from ..types.shared.chat_completion_chunk import ChatCompletionChunk
+from ..types.chat.completion_create_response import CompletionCreateResponse
+
+if TYPE_CHECKING:
+    from .._client import Gradient, AsyncGradient
+    from .._response import APIResponse, AsyncAPIResponse
+    from ..resources.chat.completions import CompletionsResource, AsyncCompletionsResource
+
+__all__ = [
+    "CacheBackend",
+    "InMemoryCacheBackend",
+    "SqliteCacheBackend",
+    "CompletionCache",
+    "CachedCompletions",
+    "AsyncCachedCompletions",
+]
+
+
+class CacheBackend(ABC):
+    """Storage for cached response bodies."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value stored for `key`, or `None` if it is missing or expired."""
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, *, ttl: Optional[float]) -> None:
+        """Store `value` for `key`, expiring after `ttl` seconds if given."""
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """A thread-safe LRU cache held in process memory.
+
+    Args:
+      max_entries: The maximum number of entries to keep.
+
+      max_bytes: The maximum total size of the stored values, if any.
+    """
+
+    def __init__(self, *, max_entries: int = 1024, max_bytes: Optional[int] = None) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._entries: OrderedDict[str, Tuple[bytes, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @override
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    @override
+    def set(self, key: str, value: bytes, *, ttl: Optional[float]) -> None:
+        if self._max_bytes is not None and len(value) > self._max_bytes:
+            return
+
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, expires_at)
+            self._size += len(value)
+
+            while len(self._entries) > self._max_entries or (
+                self._max_bytes is not None and self._size > self._max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    @override
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    @override
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[0])
+
+
+class SqliteCacheBackend(CacheBackend):
+    """A cache persisted to a local SQLite database, shared between processes.
+
+    Least recently used entries are evicted once there are more than `max_entries`.
+
+    Args:
+      path: The database file, created if it doesn't exist.
+
+      max_entries: The maximum number of entries to keep.
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"], *, max_entries: int = 100_000) -> None:
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.fspath(path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS completions_accessed_at ON completions (accessed_at)")
+
+    @override
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM completions WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._connection.execute("DELETE FROM completions WHERE key = ?", (key,))
+                return None
+
+            self._connection.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+            return cast(bytes, value)
+
+    @override
+    def set(self, key: str, value: bytes, *, ttl: Optional[float]) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO completions (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            self._connection.execute(
+                "DELETE FROM completions WHERE key IN ("
+                "SELECT key FROM completions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self._max_entries,),
+            )
+
+    @override
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM completions WHERE key = ?", (key,))
+
+    @override
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM completions")
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class CompletionCache:
+    """Configuration for `chat.completions.with_cache()`.
+
+    Args:
+      backend: Where to store responses, defaults to an `InMemoryCacheBackend`.
+
+      ttl: How long entries stay valid, in seconds. `None` keeps them until evicted.
+
+      deterministic_only: Only cache requests made with `temperature=0`, whose
+          responses are expected to be reproducible.
+    """
+
+    backend: CacheBackend
+    ttl: Optional[float]
+    deterministic_only: bool
+
+    hits: int
+    misses: int
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        *,
+        ttl: Optional[float] = None,
+        deterministic_only: bool = True,
+    ) -> None:
+        self.backend = backend if backend is not None else InMemoryCacheBackend()
+        self.ttl = ttl
+        self.deterministic_only = deterministic_only
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def is_cacheable(self, params: Mapping[str, Any]) -> bool:
+        return not self.deterministic_only or params.get("temperature") == 0
+
+    def _lookup(self, key: str) -> Optional[bytes]:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def _store(self, key: str, value: bytes) -> None:
+        self.backend.set(key, value, ttl=self.ttl)
+
+
+def _cache_key(url: str, body: object, extra_query: object, extra_body: object) -> str:
+    encoded = json.dumps(
+        {"url": url, "body": body, "extra_query": extra_query, "extra_body": extra_body},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _url(client: Gradient | AsyncGradient) -> str:
+    return str(client._prepare_url(chat_completions_path(client)))
+
+
+def _params_type(params: Mapping[str, Any]) -> type:
+    if params.get("stream"):
+        return completion_create_params.CompletionCreateParamsStreaming
+    return completion_create_params.CompletionCreateParamsNonStreaming
+
+
+def _encode_events(events: List[Tuple[Optional[str], str]]) -> bytes:
+    lines: List[str] = []
+    for event, data in events:
+        if event is not None:
+            lines.append(f"event: {event}\n")
+        lines.extend(f"data: {line}\n" for line in data.split("\n"))
+        lines.append("\n")
+    return "".join(lines).encode()
+
+
+def _replay_response(url: str, content: bytes) -> httpx.Response:
+    return httpx.Response(200, content=content, request=httpx.Request("POST", url))
+
+
+class _RecordingStream(Stream[ChatCompletionChunk]):
+    """A `Stream` that stores the events it receives once the server has sent all of them."""
+
+    _cache: CompletionCache
+    _key: str
+    _events: List[Tuple[Optional[str], str]]
+
+    def _record(self, cache: CompletionCache, key: str) -> None:
+        self._cache = cache
+        self._key = key
+        self._events = []
+
+    @override
+    def _iter_events(self) -> Iterator[ServerSentEvent]:
+        for sse in super()._iter_events():
+            self._events.append((sse.event, sse.data))
+            if sse.data.startswith("[DONE]"):
+                self._cache._store(self._key, _encode_events(self._events))
+            yield sse
+
+
+class _AsyncRecordingStream(AsyncStream[ChatCompletionChunk]):
+    """An `AsyncStream` that stores the events it receives once the server has sent all of them."""
+
+    _cache: CompletionCache
+    _key: str
+    _events: List[Tuple[Optional[str], str]]
+
+    def _record(self, cache: CompletionCache, key: str) -> None:
+        self._cache = cache
+        self._key = key
+        self._events = []
+
+    @override
+    async def _iter_events(self) -> AsyncIterator[ServerSentEvent]:
+        async for sse in super()._iter_events():
+            self._events.append((sse.event, sse.data))
+            if sse.data.startswith("[DONE]"):
+                self._cache._store(self._key, _encode_events(self._events))
+            yield sse
+
+
+class CachedCompletions:
+    """`chat.completions` with responses served from a `CompletionCache` where possible."""
+
+    def __init__(self, completions: CompletionsResource, cache: CompletionCache) -> None:
+        self._completions = completions
+        self._client = completions._client
+        self.cache = cache
+
+    @overload
+    def create(self, *, stream: Literal[True], **params: Any) -> Stream[ChatCompletionChunk]: ...
+
+    @overload
+    def create(self, *, stream: Literal[False] | Omit = omit, **params: Any) -> CompletionCreateResponse: ...
+
+    def create(
+        self, *, stream: bool | Omit = omit, **params: Any
+    ) -> CompletionCreateResponse | Stream[ChatCompletionChunk]:
+        """Same as `chat.completions.create()`, answering repeated requests from the cache."""
+        if is_given(stream):
+            params["stream"] = stream
+        if not self.cache.is_cacheable(params):
+            return cast("CompletionCreateResponse | Stream[ChatCompletionChunk]", self._completions.create(**params))
+
+        url = _url(self._client)
+        body = {k: v for k, v in params.items() if not k.startswith("extra_") and k != "timeout"}
+        key = _cache_key(
+            url, maybe_transform(body, _params_type(params)), params.get("extra_query"), params.get("extra_body")
+        )
+
+        cached = self.cache._lookup(key)
+        if cached is not None:
+            response = _replay_response(url, cached)
+            if params.get("stream"):
+                return Stream(cast_to=ChatCompletionChunk, response=response, client=self._client)
+            return self._client._process_response_data(
+                data=json.loads(cached), cast_to=CompletionCreateResponse, response=response
+            )
+
+        raw = cast("APIResponse[Any]", self._completions.with_raw_response.create(**params))
+        if params.get("stream"):
+            recording = _RecordingStream(cast_to=ChatCompletionChunk, response=raw.http_response, client=self._client)
+            recording._record(self.cache, key)
+            return recording
+
+        parsed = cast(CompletionCreateResponse, raw.parse())
+        self.cache._store(key, raw.http_response.content)
+        return parsed
+
+
+class AsyncCachedCompletions:
+    """`chat.completions` with responses served from a `CompletionCache` where possible."""
+
+    def __init__(self, completions: AsyncCompletionsResource, cache: CompletionCache) -> None:
+        self._completions = completions
+        self._client = completions._client
+        self.cache = cache
+
+    @overload
+    async def create(self, *, stream: Literal[True], **params: Any) -> AsyncStream[ChatCompletionChunk]: ...
+
+    @overload
+    async def create(self, *, stream: Literal[False] | Omit = omit, **params: Any) -> CompletionCreateResponse: ...
+
+    async def create(
+        self, *, stream: bool | Omit = omit, **params: Any
+    ) -> CompletionCreateResponse | AsyncStream[ChatCompletionChunk]:
+        """Same as `chat.completions.create()`, answering repeated requests from the cache."""
+        if is_given(stream):
+            params["stream"] = stream
+        if not self.cache.is_cacheable(params):
+            return cast(
+                "CompletionCreateResponse | AsyncStream[ChatCompletionChunk]", await self._completions.create(**params)
+            )
+
+        url = _url(self._client)
+        body = {k: v for k, v in params.items() if not k.startswith("extra_") and k != "timeout"}
+        transformed = await async_maybe_transform(body, _params_type(params))
+        key = _cache_key(url, transformed, params.get("extra_query"), params.get("extra_body"))
+
+        cached = self.cache._lookup(key)
+        if cached is not None:
+            response = _replay_response(url, cached)
+            if params.get("stream"):
+                return AsyncStream(cast_to=ChatCompletionChunk, response=response, client=self._client)
+            return self._client._process_response_data(
+                data=json.loads(cached), cast_to=CompletionCreateResponse, response=response
+            )
+
+        raw = cast("AsyncAPIResponse[Any]", await self._completions.with_raw_response.create(**params))
+        if params.get("stream"):
+            recording = _AsyncRecordingStream(
+                cast_to=ChatCompletionChunk, response=raw.http_response, client=self._client
+            )
+            recording._record(self.cache, key)
+            return recording
+
+        parsed = cast(CompletionCreateResponse, await raw.parse())
+        self.cache._store(key, raw.http_response.content)
+        return parsed
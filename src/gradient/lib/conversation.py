@@ -0,0 +1,254 @@
+"""Multi-turn chat conversations whose request bodies are built incrementally.
+
+Sending the full `messages` history through `chat.completions.create()` on every
+turn transforms and JSON-encodes every earlier message again, so the client-side
+cost of a turn grows with the length of the conversation. A `Conversation`
+transforms and encodes each message exactly once when it is appended and splices
+the cached bytes into the request body, leaving only the (small) non-message
+parameters to be encoded per request.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any, List, Union, Iterable, Optional, Sequence, cast, overload
+from typing_extensions import Literal
+
+import httpx
+
+from ._chat import assistant_message, model_access_headers, chat_completions_path
+from .._types import Body, Query, Headers, NotGiven, not_given
+from .._utils import is_mapping, maybe_transform
+from .._streaming import Stream, AsyncStream
+from .._base_client import make_request_options
+from ..types.shared.chat_completion_chunk import ChatCompletionChunk
+from ..types.chat.completion_create_params import (
+    Message,
+    CompletionCreateParamsStreaming,
+    CompletionCreateParamsNonStreaming,
+)
+from ..types.chat.completion_create_response import CompletionCreateResponse
+
+if TYPE_CHECKING:
+    from ..resources.chat.completions import CompletionsResource, AsyncCompletionsResource
+
+__all__ = ["Conversation", "AsyncConversation"]
+
+
+def _encode(data: object) -> bytes:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+class _BaseConversation:
+    model: str
+    """The model every request in this conversation is sent to."""
+
+    def __init__(self, *, model: str, messages: Iterable[Message] = (), **params: Any) -> None:
+        self.model = model
+        self._params = params
+        self._messages: List[Message] = []
+        self._encoded_messages = bytearray()
+        self.extend(messages)
+
+    @property
+    def messages(self) -> Sequence[Message]:
+        """The messages sent so far, including the replies that were appended."""
+        return tuple(self._messages)
+
+    def append(self, message: Message) -> None:
+        """Add a message to the end of the conversation."""
+        encoded = _encode(maybe_transform(message, cast(Any, Message)))
+        if self._encoded_messages:
+            self._encoded_messages += b","
+        self._encoded_messages += encoded
+        self._messages.append(message)
+
+    def extend(self, messages: Iterable[Message]) -> None:
+        """Add several messages to the end of the conversation."""
+        for message in messages:
+            self.append(message)
+
+    def _build_body(self, params: dict[str, Any], *, stream: bool, extra_body: Optional[Body]) -> bytes:
+        if "messages" in params:
+            raise TypeError("Messages must be added with `append()` or `extend()` rather than passed to `create()`")
+
+        options: dict[str, Any] = {"model": self.model, **self._params, **params}
+        if stream:
+            options["stream"] = True
+        transformed = maybe_transform(
+            options, CompletionCreateParamsStreaming if stream else CompletionCreateParamsNonStreaming
+        )
+        # `maybe_transform()` only returns `None` for a `None` input
+        assert transformed is not None
+        options = cast("dict[str, Any]", transformed)
+        if is_mapping(extra_body):
+            options.update(extra_body)
+
+        # `options` always has at least the model, so it can be appended after the messages
+        return b'{"messages":[' + self._encoded_messages + b"]," + _encode(options)[1:]
+
+
+class Conversation(_BaseConversation):
+    """A chat conversation that appends turns without re-encoding its history.
+
+    ```py
+    conversation = client.chat.completions.conversation(model="llama3-8b-instruct")
+    conversation.append({"role": "user", "content": "Hi!"})
+    completion = conversation.create()
+    ```
+    """
+
+    def __init__(
+        self,
+        completions: CompletionsResource,
+        *,
+        model: str,
+        messages: Iterable[Message] = (),
+        **params: Any,
+    ) -> None:
+        super().__init__(model=model, messages=messages, **params)
+        self._client = completions._client
+
+    @overload
+    def create(
+        self,
+        *,
+        stream: Literal[False] = False,
+        append_reply: bool = True,
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        timeout: float | httpx.Timeout | None | NotGiven = not_given,
+        **params: Any,
+    ) -> CompletionCreateResponse: ...
+
+    @overload
+    def create(
+        self,
+        *,
+        stream: Literal[True],
+        append_reply: bool = True,
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        timeout: float | httpx.Timeout | None | NotGiven = not_given,
+        **params: Any,
+    ) -> Stream[ChatCompletionChunk]: ...
+
+    def create(
+        self,
+        *,
+        stream: bool = False,
+        append_reply: bool = True,
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        timeout: float | httpx.Timeout | None | NotGiven = not_given,
+        **params: Any,
+    ) -> Union[CompletionCreateResponse, Stream[ChatCompletionChunk]]:
+        """Send the conversation to `chat.completions.create()`.
+
+        Keyword arguments are the same as for `create()`, except for `messages`, and
+        override the ones given when the conversation was started. Unless
+        `append_reply` is false, the first choice of a non-streaming response is
+        appended to the conversation; streamed replies have to be appended by the
+        caller.
+        """
+        response = self._client.post(
+            chat_completions_path(self._client),
+            body=self._build_body(params, stream=stream, extra_body=extra_body),
+            options=make_request_options(
+                extra_headers=model_access_headers(self._client, extra_headers),
+                extra_query=extra_query,
+                timeout=timeout,
+            ),
+            cast_to=CompletionCreateResponse,
+            stream=stream,
+            stream_cls=Stream[ChatCompletionChunk],
+        )
+        if isinstance(response, CompletionCreateResponse) and append_reply and response.choices:
+            self.append(assistant_message(response.choices[0].message))
+        return response
+
+
+class AsyncConversation(_BaseConversation):
+    """A chat conversation that appends turns without re-encoding its history.
+
+    ```py
+    conversation = client.chat.completions.conversation(model="llama3-8b-instruct")
+    conversation.append({"role": "user", "content": "Hi!"})
+    completion = await conversation.create()
+    ```
+    """
+
+    def __init__(
+        self,
+        completions: AsyncCompletionsResource,
+        *,
+        model: str,
+        messages: Iterable[Message] = (),
+        **params: Any,
+    ) -> None:
+        super().__init__(model=model, messages=messages, **params)
+        self._client = completions._client
+
+    @overload
+    async def create(
+        self,
+        *,
+        stream: Literal[False] = False,
+        append_reply: bool = True,
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        timeout: float | httpx.Timeout | None | NotGiven = not_given,
+        **params: Any,
+    ) -> CompletionCreateResponse: ...
+
+    @overload
+    async def create(
+        self,
+        *,
+        stream: Literal[True],
+        append_reply: bool = True,
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        timeout: float | httpx.Timeout | None | NotGiven = not_given,
+        **params: Any,
+    ) -> AsyncStream[ChatCompletionChunk]: ...
+
+    async def create(
+        self,
+        *,
+        stream: bool = False,
+        append_reply: bool = True,
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        timeout: float | httpx.Timeout | None | NotGiven = not_given,
+        **params: Any,
+    ) -> Union[CompletionCreateResponse, AsyncStream[ChatCompletionChunk]]:
+        """Send the conversation to `chat.completions.create()`.
+
+        Keyword arguments are the same as for `create()`, except for `messages`, and
+        override the ones given when the conversation was started. Unless
+        `append_reply` is false, the first choice of a non-streaming response is
+        appended to the conversation; streamed replies have to be appended by the
+        caller.
+        """
+        response = await self._client.post(
+            chat_completions_path(self._client),
+            body=self._build_body(params, stream=stream, extra_body=extra_body),
+            options=make_request_options(
+                extra_headers=model_access_headers(self._client, extra_headers),
+                extra_query=extra_query,
+                timeout=timeout,
+            ),
+            cast_to=CompletionCreateResponse,
+            stream=stream,
+            stream_cls=AsyncStream[ChatCompletionChunk],
+        )
+        if isinstance(response, CompletionCreateResponse) and append_reply and response.choices:
+            self.append(assistant_message(response.choices[0].message))
+        return response
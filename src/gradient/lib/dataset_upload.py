@@ -0,0 +1,188 @@
+"""Upload a local file as an evaluation dataset.
+
+Used by `agents.evaluation_datasets.upload()`. The file is streamed to its
+presigned URL in `chunk_size` pieces, read either through regular file reads or
+from a read-only memory map, so memory use stays bounded for files of any size.
+A presigned URL accepts a single `PUT` of the whole object, so a failed transfer
+is retried from the start of the file, with the same backoff as
+`knowledge_bases.data_sources.upload_files()`. The dataset is created once the
+file is stored.
+"""
+
+from __future__ import annotations
+
+import os
+import mmap
+from typing import TYPE_CHECKING, Union, Callable, Iterator, Optional, Generator, AsyncIterator
+from pathlib import Path
+
+from .._types import Omit
+from .._utils import asyncify
+from .uploads import _retry_delay, _should_retry, _raise_for_status
+from ..types.agents.evaluation_dataset_create_response import EvaluationDatasetCreateResponse
+from ..types.knowledge_bases.api_file_upload_data_source_param import APIFileUploadDataSourceParam
+from ..types.agents.evaluation_dataset_create_file_upload_presigned_urls_response import (
+    Upload,
+    EvaluationDatasetCreateFileUploadPresignedURLsResponse,
+)
+
+if TYPE_CHECKING:
+    from ..resources.agents.evaluation_datasets import EvaluationDatasetsResource, AsyncEvaluationDatasetsResource
+
+FilePath = Union[str, "os.PathLike[str]"]
+
+ProgressCallback = Callable[[int, int], None]
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def _validate(path: Path, chunk_size: int, max_retries: int) -> int:
+    if chunk_size < 1:
+        raise ValueError(f"Expected `chunk_size` to be at least 1 but received {chunk_size}")
+    if max_retries < 0:
+        raise ValueError(f"Expected `max_retries` to be at least 0 but received {max_retries}")
+    return path.stat().st_size
+
+
+def _upload(response: EvaluationDatasetCreateFileUploadPresignedURLsResponse) -> Upload:
+    uploads = response.uploads or []
+    if len(uploads) != 1:
+        raise ValueError(f"Requested 1 presigned URL but received {len(uploads)}")
+    if not uploads[0].presigned_url:
+        raise ValueError(f"Expected a presigned URL for {uploads[0].original_file_name!r} but received none")
+    return uploads[0]
+
+
+def _dataset(path: Path, size: int, upload: Upload) -> APIFileUploadDataSourceParam:
+    return {
+        "original_file_name": upload.original_file_name or path.name,
+        "size_in_bytes": str(size),
+        "stored_object_key": upload.object_key or "",
+    }
+
+
+def _iter_chunks(path: Path, chunk_size: int, use_mmap: bool) -> Generator[bytes, None, None]:
+    with path.open("rb") as file:
+        if use_mmap and os.fstat(file.fileno()).st_size > 0:
+            # slices are copied out of the page cache one chunk at a time, without a read() per chunk
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for start in range(0, len(mapped), chunk_size):
+                    yield mapped[start : start + chunk_size]
+            return
+        while chunk := file.read(chunk_size):
+            yield chunk
+
+
+async def _aiter_chunks(path: Path, chunk_size: int, use_mmap: bool) -> AsyncIterator[bytes]:
+    # memory mapped pages may have to be read from disk, so both variants read on a worker thread
+    chunks = _iter_chunks(path, chunk_size, use_mmap)
+    try:
+        while True:
+            chunk = await asyncify(_next_chunk)(chunks)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        chunks.close()
+
+
+def _next_chunk(chunks: Generator[bytes, None, None]) -> Optional[bytes]:
+    return next(chunks, None)
+
+
+def _track(chunks: Iterator[bytes], total: int, on_progress: Optional[ProgressCallback]) -> Iterator[bytes]:
+    sent = 0
+    if on_progress is not None:
+        on_progress(sent, total)
+    for chunk in chunks:
+        yield chunk
+        sent += len(chunk)
+        if on_progress is not None:
+            on_progress(sent, total)
+
+
+async def _atrack(
+    chunks: AsyncIterator[bytes], total: int, on_progress: Optional[ProgressCallback]
+) -> AsyncIterator[bytes]:
+    sent = 0
+    if on_progress is not None:
+        on_progress(sent, total)
+    async for chunk in chunks:
+        yield chunk
+        sent += len(chunk)
+        if on_progress is not None:
+            on_progress(sent, total)
+
+
+def upload_dataset(
+    datasets: EvaluationDatasetsResource,
+    file: FilePath,
+    *,
+    name: str | Omit,
+    chunk_size: int,
+    use_mmap: bool,
+    max_retries: int,
+    on_progress: Optional[ProgressCallback],
+) -> EvaluationDatasetCreateResponse:
+    path = Path(file)
+    size = _validate(path, chunk_size, max_retries)
+    client = datasets._client
+    upload = _upload(
+        datasets.create_file_upload_presigned_urls(files=[{"file_name": path.name, "file_size": str(size)}])
+    )
+    assert upload.presigned_url is not None
+
+    attempt = 0
+    while True:
+        try:
+            response = client._client.put(
+                upload.presigned_url,
+                content=_track(_iter_chunks(path, chunk_size, use_mmap), size, on_progress),
+                headers={"Content-Length": str(size)},
+            )
+            _raise_for_status(client, response)
+            break
+        except Exception as exc:
+            if attempt >= max_retries or not _should_retry(client, exc):
+                raise
+            datasets._sleep(_retry_delay(attempt))
+            attempt += 1
+
+    return datasets.create(name=name, file_upload_dataset=_dataset(path, size, upload))
+
+
+async def async_upload_dataset(
+    datasets: AsyncEvaluationDatasetsResource,
+    file: FilePath,
+    *,
+    name: str | Omit,
+    chunk_size: int,
+    use_mmap: bool,
+    max_retries: int,
+    on_progress: Optional[ProgressCallback],
+) -> EvaluationDatasetCreateResponse:
+    path = Path(file)
+    size = _validate(path, chunk_size, max_retries)
+    client = datasets._client
+    upload = _upload(
+        await datasets.create_file_upload_presigned_urls(files=[{"file_name": path.name, "file_size": str(size)}])
+    )
+    assert upload.presigned_url is not None
+
+    attempt = 0
+    while True:
+        try:
+            response = await client._client.put(
+                upload.presigned_url,
+                content=_atrack(_aiter_chunks(path, chunk_size, use_mmap), size, on_progress),
+                headers={"Content-Length": str(size)},
+            )
+            _raise_for_status(client, response)
+            break
+        except Exception as exc:
+            if attempt >= max_retries or not _should_retry(client, exc):
+                raise
+            await datasets._sleep(_retry_delay(attempt))
+            attempt += 1
+
+    return await datasets.create(name=name, file_upload_dataset=_dataset(path, size, upload))
@@ -0,0 +1,844 @@
+"""Deploy a fleet of agents from a declarative spec.
+
+Used by `agents.deploy_fleet()`. Every agent in the spec is broken down into
+steps: `create`, then one `attach_knowledge_base`, `create_function`,
+`create_api_key` or `add_route` step per item, then `update_status` and finally
+`wait_until_ready`. The steps form a dependency graph: a step starts as soon as
+the steps it depends on have succeeded, so the independent steps of all agents
+run side by side, at most `concurrency` at a time and no faster than
+`max_requests_per_second` across the whole fleet. A route waits for both the
+parent and the child agent to be created.
+
+The client's own retries are turned off for the steps. Instead, a step that
+fails with a transient error is retried with backoff, and a step that creates
+something first checks whether the failed attempt went through, so a retry never
+creates a second agent, function or API key. Agents that already exist under
+their spec's name are reused the same way, which makes it safe to run an
+interrupted deployment again.
+"""
+
+from __future__ import annotations
+
+import time
+import heapq
+import itertools
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    AsyncIterator,
+)
+from functools import partial
+from typing_extensions import Literal, Required, TypedDict, override
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import anyio
+from anyio.streams.memory import MemoryObjectSendStream
+
+from .fleet import _RateLimiter
+from .._types import SequenceNotStr
+from .polling import PollPolicy, _Schedule, retry_after
+from .uploads import _retry_delay, _should_retry
+from .streaming import _memory_stream
+from ..types.api_agent import APIAgent
+from ..types.agent_list_response import AgentListResponse
+from ..types.agent_create_response import AgentCreateResponse
+from ..types.agent_retrieve_response import AgentRetrieveResponse
+from ..types.api_deployment_visibility import APIDeploymentVisibility
+
+if TYPE_CHECKING:
+    from .._client import Gradient, AsyncGradient
+    from ..resources.agents.agents import AgentsResource, AsyncAgentsResource
+
+__all__ = ["AgentSpec", "FunctionSpec", "RouteSpec", "StepResult", "StepTiming", "FleetDeployment"]
+
+StepName = Literal[
+    "create",
+    "attach_knowledge_base",
+    "create_function",
+    "create_api_key",
+    "add_route",
+    "update_status",
+    "wait_until_ready",
+]
+
+_LIST_PAGE_SIZE = 100
+
+
+class FunctionSpec(TypedDict, total=False):
+    function_name: Required[str]
+    """The name of the function; an agent has at most one function with a given name."""
+
+    description: str
+
+    faas_name: str
+
+    faas_namespace: str
+
+    input_schema: object
+
+    output_schema: object
+
+
+class RouteSpec(TypedDict, total=False):
+    child: Required[str]
+    """The `name` of the agent in the same fleet that requests are routed to."""
+
+    route_name: str
+
+    if_case: str
+
+
+class AgentSpec(TypedDict, total=False):
+    name: Required[str]
+    """Identifies the agent, both within the fleet and when looking for an existing agent to reuse."""
+
+    instruction: str
+
+    model_uuid: str
+
+    region: str
+
+    project_id: str
+
+    description: str
+
+    tags: SequenceNotStr[str]
+
+    workspace_uuid: str
+
+    anthropic_key_uuid: str
+
+    openai_key_uuid: str
+
+    model_provider_key_uuid: str
+
+    knowledge_bases: SequenceNotStr[str]
+    """The ids of the knowledge bases to attach."""
+
+    functions: Iterable[FunctionSpec]
+
+    api_keys: SequenceNotStr[str]
+    """The names of the API keys to create."""
+
+    routes: Iterable[RouteSpec]
+
+    visibility: APIDeploymentVisibility
+    """Set with `update_status()` once everything else is in place."""
+
+
+_SPEC_KEYS = {"knowledge_bases", "functions", "api_keys", "routes", "visibility"}
+
+
+class StepResult:
+    """The outcome of a single step of a deployment."""
+
+    __slots__ = ("agent", "step", "target", "response", "error", "skipped", "reused", "attempts", "started", "duration")
+
+    agent: str
+    """The name of the agent the step belongs to."""
+
+    step: StepName
+
+    target: Optional[str]
+    """The knowledge base id, function name, API key name or child agent name the step is about."""
+
+    response: Any
+    """The last response of the step, e.g. the `APIKeyCreateResponse` holding a new key."""
+
+    error: Optional[Exception]
+    """The error the step failed with after all retries."""
+
+    skipped: bool
+    """Whether the step never ran because a step it depends on failed."""
+
+    reused: bool
+    """Whether the step found its work already done, e.g. by an earlier run, and made no changes."""
+
+    attempts: int
+    """The number of attempts, or of polls for `wait_until_ready`."""
+
+    started: float
+    """Seconds from the start of the deployment until the first attempt."""
+
+    duration: float
+    """Seconds from the first attempt until the step finished, including retries."""
+
+    def __init__(
+        self,
+        agent: str,
+        step: StepName,
+        target: Optional[str],
+        *,
+        response: Any = None,
+        error: Optional[Exception] = None,
+        skipped: bool = False,
+        reused: bool = False,
+        attempts: int = 0,
+        started: float = 0.0,
+        duration: float = 0.0,
+    ) -> None:
+        self.agent = agent
+        self.step = step
+        self.target = target
+        self.response = response
+        self.error = error
+        self.skipped = skipped
+        self.reused = reused
+        self.attempts = attempts
+        self.started = started
+        self.duration = duration
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.skipped
+
+    @override
+    def __repr__(self) -> str:
+        target = f", target={self.target!r}" if self.target is not None else ""
+        if self.skipped:
+            outcome = "skipped"
+        elif self.error is not None:
+            outcome = f"error={self.error!r}"
+        else:
+            outcome = "reused" if self.reused else "ok"
+        return f"StepResult(agent={self.agent!r}, step={self.step!r}{target}, {outcome}, duration={self.duration:.3f})"
+
+
+class StepTiming:
+    """How long the steps of one kind took across the fleet."""
+
+    __slots__ = ("step", "count", "total", "max")
+
+    step: StepName
+
+    count: int
+    """The number of steps of this kind that ran."""
+
+    total: float
+    """The sum of their durations in seconds."""
+
+    max: float
+    """The longest duration in seconds."""
+
+    def __init__(self, step: StepName) -> None:
+        self.step = step
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @override
+    def __repr__(self) -> str:
+        return f"StepTiming(step={self.step!r}, count={self.count}, mean={self.mean:.3f}, max={self.max:.3f})"
+
+
+class FleetDeployment:
+    """The report of a fleet deployment."""
+
+    agents: Dict[str, str]
+    """The id of every agent that was created or reused, by name."""
+
+    steps: List[StepResult]
+    """Every step of the deployment: the `create` steps first, then the other steps agent by agent."""
+
+    elapsed: float
+    """Seconds the whole deployment took."""
+
+    def __init__(self, agents: Dict[str, str], steps: List[StepResult], elapsed: float) -> None:
+        self.agents = agents
+        self.steps = steps
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.steps)
+
+    @property
+    def failed(self) -> List[StepResult]:
+        """The steps that failed, not counting the steps skipped because of them."""
+        return [result for result in self.steps if result.error is not None]
+
+    def timings(self) -> Dict[StepName, StepTiming]:
+        """The duration of every kind of step, over the steps that ran."""
+        timings: Dict[StepName, StepTiming] = {}
+        for result in self.steps:
+            if result.skipped:
+                continue
+            timing = timings.get(result.step)
+            if timing is None:
+                timing = timings[result.step] = StepTiming(result.step)
+            timing.count += 1
+            timing.total += result.duration
+            timing.max = max(timing.max, result.duration)
+        return timings
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"FleetDeployment(agents={len(self.agents)}, steps={len(self.steps)}, "
+            f"failed={len(self.failed)}, elapsed={self.elapsed:.3f})"
+        )
+
+
+class _Agent:
+    __slots__ = ("name", "uuid", "snapshot")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.uuid: Optional[str] = None
+        # the agent as last retrieved, to tell which steps an earlier attempt or run already did
+        self.snapshot: Optional[APIAgent] = None
+
+
+class _Step:
+    __slots__ = (
+        "index",
+        "agent",
+        "name",
+        "target",
+        "call",
+        "exists",
+        "dependents",
+        "waiting",
+        "verify",
+        "attempts",
+        "retries",
+        "first_attempt",
+        "schedule",
+    )
+
+    index: int
+    agent: _Agent
+    name: StepName
+    target: Optional[str]
+    call: Callable[[Any], Any]
+    exists: Optional[Callable[[APIAgent], bool]]
+    dependents: List[_Step]
+    waiting: int
+    verify: bool
+    attempts: int
+    retries: int
+    first_attempt: Optional[float]
+    schedule: Optional[_Schedule]
+
+    def __init__(
+        self,
+        index: int,
+        agent: _Agent,
+        name: StepName,
+        target: Optional[str],
+        call: Callable[[Any], Any],
+        exists: Optional[Callable[[APIAgent], bool]] = None,
+    ) -> None:
+        self.index = index
+        self.agent = agent
+        self.name = name
+        self.target = target
+        # takes the (sync or async) agents resource and makes the step's request
+        self.call = call
+        self.exists = exists
+        self.dependents = []
+        self.waiting = 0
+        # set once an attempt failed in a way that may still have changed something
+        self.verify = False
+        self.attempts = 0
+        self.retries = 0
+        self.first_attempt = None
+        self.schedule = None
+
+    def depends_on(self, *steps: _Step) -> None:
+        for step in steps:
+            step.dependents.append(self)
+            self.waiting += 1
+
+
+def _create(params: Dict[str, Any], agents: Any) -> Any:
+    return agents.create(**params)
+
+
+def _attach_knowledge_base(agent: _Agent, knowledge_base_uuid: str, agents: Any) -> Any:
+    return agents.knowledge_bases.attach_single(knowledge_base_uuid, agent_uuid=agent.uuid)
+
+
+def _create_function(agent: _Agent, function: FunctionSpec, agents: Any) -> Any:
+    return agents.functions.create(agent.uuid, body_agent_uuid=agent.uuid, **function)
+
+
+def _create_api_key(agent: _Agent, name: str, agents: Any) -> Any:
+    return agents.api_keys.create(agent.uuid, body_agent_uuid=agent.uuid, name=name)
+
+
+def _add_route(parent: _Agent, child: _Agent, route: RouteSpec, agents: Any) -> Any:
+    options = {key: value for key, value in route.items() if key != "child"}
+    return agents.routes.add(
+        child.uuid,
+        path_parent_agent_uuid=parent.uuid,
+        body_child_agent_uuid=child.uuid,
+        body_parent_agent_uuid=parent.uuid,
+        **options,
+    )
+
+
+def _update_status(agent: _Agent, visibility: APIDeploymentVisibility, agents: Any) -> Any:
+    return agents.update_status(agent.uuid, body_uuid=agent.uuid, visibility=visibility)
+
+
+def _retrieve(agent: _Agent, agents: Any) -> Any:
+    return agents.retrieve(agent.uuid)
+
+
+def _has_knowledge_base(knowledge_base_uuid: str, agent: APIAgent) -> bool:
+    return any(knowledge_base.uuid == knowledge_base_uuid for knowledge_base in agent.knowledge_bases or [])
+
+
+def _has_function(function_name: str, agent: APIAgent) -> bool:
+    return any(function.name == function_name for function in agent.functions or [])
+
+
+def _has_api_key(name: str, agent: APIAgent) -> bool:
+    return any(key.name == name and key.deleted_at is None for key in agent.api_key_infos or [])
+
+
+def _has_route(child: _Agent, agent: APIAgent) -> bool:
+    return any(routed.uuid == child.uuid for routed in agent.child_agents or [])
+
+
+def _created_uuid(response: Union[AgentCreateResponse, AgentRetrieveResponse]) -> str:
+    if response.agent is None or not response.agent.uuid:
+        raise ValueError("Expected the response to `agents.create()` to include the id of the new agent")
+    return response.agent.uuid
+
+
+def _is_ready(response: Any) -> bool:
+    from ..resources.agents.agents import _is_agent_ready
+
+    return _is_agent_ready(response)
+
+
+def _timeout_error(agent: _Agent, timeout: float, response: Any) -> Exception:
+    from ..resources.agents.agents import _agent_timeout_error
+
+    return _agent_timeout_error(agent.uuid or agent.name, timeout, response)
+
+
+def _build(specs: Iterable[AgentSpec], *, wait: bool) -> Tuple[Dict[str, _Agent], List[_Step]]:
+    specs = list(specs)
+    agents: Dict[str, _Agent] = {}
+    for spec in specs:
+        name = spec.get("name")
+        if not name:
+            raise ValueError(f"Expected every agent spec to have a non-empty `name` but received {name!r}")
+        if name in agents:
+            raise ValueError(f"Expected agent names to be unique but {name!r} appears more than once")
+        agents[name] = _Agent(name)
+
+    steps: List[_Step] = []
+
+    def step(agent: _Agent, name: StepName, target: Optional[str], call: Callable[[Any], Any], **kwargs: Any) -> _Step:
+        step = _Step(len(steps), agent, name, target, call, **kwargs)
+        steps.append(step)
+        return step
+
+    creates: Dict[str, _Step] = {}
+    for spec in specs:
+        agent = agents[spec["name"]]
+        params = {key: value for key, value in spec.items() if key not in _SPEC_KEYS}
+        creates[agent.name] = step(agent, "create", None, partial(_create, params))
+
+    for spec in specs:
+        agent = agents[spec["name"]]
+        create = creates[agent.name]
+        items: List[_Step] = []
+
+        for knowledge_base_uuid in spec.get("knowledge_bases", ()):
+            items.append(
+                step(
+                    agent,
+                    "attach_knowledge_base",
+                    knowledge_base_uuid,
+                    partial(_attach_knowledge_base, agent, knowledge_base_uuid),
+                    exists=partial(_has_knowledge_base, knowledge_base_uuid),
+                )
+            )
+        for function in spec.get("functions", ()):
+            function_name = function.get("function_name")
+            if not function_name:
+                raise ValueError(f"Expected every function of {agent.name!r} to have a non-empty `function_name`")
+            items.append(
+                step(
+                    agent,
+                    "create_function",
+                    function_name,
+                    partial(_create_function, agent, function),
+                    exists=partial(_has_function, function_name),
+                )
+            )
+        for key_name in spec.get("api_keys", ()):
+            items.append(
+                step(
+                    agent,
+                    "create_api_key",
+                    key_name,
+                    partial(_create_api_key, agent, key_name),
+                    exists=partial(_has_api_key, key_name),
+                )
+            )
+        for item in items:
+            item.depends_on(create)
+
+        for route in spec.get("routes", ()):
+            child = agents.get(route.get("child", ""))
+            if child is None:
+                raise ValueError(
+                    f"Expected the routes of {agent.name!r} to name agents in the fleet but received {route.get('child')!r}"
+                )
+            add = step(
+                agent,
+                "add_route",
+                child.name,
+                partial(_add_route, agent, child, route),
+                exists=partial(_has_route, child),
+            )
+            add.depends_on(create, creates[child.name])
+            items.append(add)
+
+        last = items or [create]
+        if "visibility" in spec:
+            update = step(agent, "update_status", None, partial(_update_status, agent, spec["visibility"]))
+            update.depends_on(*last)
+            last = [update]
+        if wait:
+            step(agent, "wait_until_ready", None, partial(_retrieve, agent)).depends_on(*last)
+
+    return agents, steps
+
+
+# (response, error, reused, done); `done` is only false for a poll that has to be repeated
+_Outcome = Tuple[Any, Optional[Exception], bool, bool]
+
+
+class _Deployment:
+    """The scheduling shared by the sync and async deployments."""
+
+    def __init__(
+        self,
+        client: Gradient | AsyncGradient,
+        specs: Iterable[AgentSpec],
+        *,
+        concurrency: int,
+        max_requests_per_second: Optional[float],
+        max_retries: int,
+        wait: bool,
+        poll_interval: float,
+        timeout: float,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError(f"Expected `concurrency` to be at least 1 but received {concurrency}")
+        if max_requests_per_second is not None and max_requests_per_second <= 0:
+            raise ValueError(
+                f"Expected `max_requests_per_second` to be positive but received {max_requests_per_second}"
+            )
+        if max_retries < 0:
+            raise ValueError(f"Expected `max_retries` to be at least 0 but received {max_retries}")
+
+        self._client = client
+        self._concurrency = concurrency
+        self._max_retries = max_retries
+        self._timeout = timeout
+        self._policy = PollPolicy.up_to(poll_interval)
+        self._limiter = _RateLimiter(max_requests_per_second)
+        self._agents, self._steps = _build(specs, wait=wait)
+        self._results: Dict[int, StepResult] = {}
+        self._order = itertools.count()
+        self._queue: List[Tuple[float, int, _Step]] = []
+        self._running = 0
+        self._started = time.monotonic()
+        for step in self._steps:
+            if step.waiting == 0:
+                self._push(step, self._started)
+
+    def adopt(self, existing: Dict[str, str]) -> None:
+        """Reuse the agents that already exist under the names in the spec."""
+        for agent in self._agents.values():
+            agent.uuid = existing.get(agent.name)
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._queue) or self._running > 0
+
+    def due(self) -> List[Tuple[_Step, float]]:
+        """The steps that may start now, each with the time it may send its request at."""
+        now = time.monotonic()
+        due: List[Tuple[_Step, float]] = []
+        while self._queue and self._queue[0][0] <= now and self._running < self._concurrency:
+            _, _, step = heapq.heappop(self._queue)
+            if step.first_attempt is None:
+                step.first_attempt = now
+                if step.name == "wait_until_ready":
+                    # the timeout counts from the first poll
+                    step.schedule = _Schedule(self._policy, self._timeout)
+            self._running += 1
+            due.append((step, self._limiter.reserve(now)))
+        return due
+
+    def idle_time(self) -> Optional[float]:
+        """Seconds until another step may start, or `None` if that depends on a running step finishing."""
+        if not self._queue or self._running >= self._concurrency:
+            return None
+        return max(self._queue[0][0] - time.monotonic(), 0.0)
+
+    def finish(self, step: _Step, outcome: _Outcome) -> None:
+        response, error, reused, done = outcome
+        self._running -= 1
+        step.attempts += 1
+
+        if error is None:
+            if done:
+                self._succeed(step, response, reused)
+                return
+            assert step.schedule is not None
+            if step.schedule.expired():
+                self._fail(step, _timeout_error(step.agent, self._timeout, response), response)
+                return
+            self._push(step, time.monotonic() + step.schedule.next_delay())
+            return
+
+        if step.name == "wait_until_ready":
+            # like `wait_until_ready()`, transient errors are polled through until the deadline
+            requested = retry_after(self._client, error)
+            assert step.schedule is not None
+            if requested is None or step.schedule.expired():
+                self._fail(step, error, None)
+                return
+            self._push(step, time.monotonic() + step.schedule.next_delay(requested))
+            return
+
+        if step.retries >= self._max_retries or not _should_retry(self._client, error):
+            self._fail(step, error, None)
+            return
+        delay = max(_retry_delay(step.retries), retry_after(self._client, error) or 0.0)
+        step.retries += 1
+        step.verify = True
+        self._push(step, time.monotonic() + delay)
+
+    def report(self) -> FleetDeployment:
+        agents = {agent.name: agent.uuid for agent in self._agents.values() if agent.uuid is not None}
+        steps = [self._results[step.index] for step in self._steps]
+        return FleetDeployment(agents, steps, time.monotonic() - self._started)
+
+    def _push(self, step: _Step, due: float) -> None:
+        heapq.heappush(self._queue, (due, next(self._order), step))
+
+    def _result(self, step: _Step, **kwargs: Any) -> None:
+        first_attempt = step.first_attempt if step.first_attempt is not None else time.monotonic()
+        self._results[step.index] = StepResult(
+            step.agent.name,
+            step.name,
+            step.target,
+            attempts=step.attempts,
+            started=first_attempt - self._started,
+            duration=time.monotonic() - first_attempt,
+            **kwargs,
+        )
+
+    def _succeed(self, step: _Step, response: Any, reused: bool) -> None:
+        self._result(step, response=response, reused=reused)
+        now = time.monotonic()
+        for dependent in step.dependents:
+            dependent.waiting -= 1
+            if dependent.waiting == 0:
+                self._push(dependent, now)
+
+    def _fail(self, step: _Step, error: Exception, response: Any) -> None:
+        self._result(step, response=response, error=error)
+        pending = list(step.dependents)
+        while pending:
+            dependent = pending.pop()
+            if dependent.index in self._results:
+                continue
+            self._results[dependent.index] = StepResult(
+                dependent.agent.name, dependent.name, dependent.target, skipped=True
+            )
+            pending.extend(dependent.dependents)
+
+
+def _has_more(response: AgentListResponse, page: int) -> bool:
+    if response.meta is not None and response.meta.pages is not None:
+        return page < response.meta.pages
+    return len(response.agents or []) >= _LIST_PAGE_SIZE
+
+
+def _list_agents(agents: AgentsResource) -> Iterator[Tuple[str, str]]:
+    page = 1
+    while True:
+        response = agents.list(page=page, per_page=_LIST_PAGE_SIZE)
+        for agent in response.agents or []:
+            if agent.name and agent.uuid:
+                yield agent.name, agent.uuid
+        if not _has_more(response, page):
+            return
+        page += 1
+
+
+async def _async_list_agents(agents: AsyncAgentsResource) -> AsyncIterator[Tuple[str, str]]:
+    page = 1
+    while True:
+        response = await agents.list(page=page, per_page=_LIST_PAGE_SIZE)
+        for agent in response.agents or []:
+            if agent.name and agent.uuid:
+                yield agent.name, agent.uuid
+        if not _has_more(response, page):
+            return
+        page += 1
+
+
+def _find_agent(agents: AgentsResource, name: str) -> Optional[str]:
+    return next((uuid for agent_name, uuid in _list_agents(agents) if agent_name == name), None)
+
+
+async def _async_find_agent(agents: AsyncAgentsResource, name: str) -> Optional[str]:
+    async for agent_name, uuid in _async_list_agents(agents):
+        if agent_name == name:
+            return uuid
+    return None
+
+
+def _run(agents: AgentsResource, step: _Step) -> Tuple[Any, bool, bool]:
+    """Make the step's requests; returns the response and whether the step was reused and is done."""
+    agent = step.agent
+    if step.name == "create":
+        if agent.uuid is None and step.verify:
+            agent.uuid = _find_agent(agents, agent.name)
+        if agent.uuid is not None:
+            response = agents.retrieve(agent.uuid)
+            agent.snapshot = response.agent
+            return response, True, True
+        response = step.call(agents)
+        agent.uuid = _created_uuid(response)
+        return response, False, True
+
+    if step.exists is not None:
+        if step.verify:
+            agent.snapshot = agents.retrieve(str(agent.uuid)).agent
+        if agent.snapshot is not None and step.exists(agent.snapshot):
+            return None, True, True
+
+    response = step.call(agents)
+    return response, False, step.name != "wait_until_ready" or _is_ready(response)
+
+
+async def _async_run(agents: AsyncAgentsResource, step: _Step) -> Tuple[Any, bool, bool]:
+    agent = step.agent
+    if step.name == "create":
+        if agent.uuid is None and step.verify:
+            agent.uuid = await _async_find_agent(agents, agent.name)
+        if agent.uuid is not None:
+            response = await agents.retrieve(agent.uuid)
+            agent.snapshot = response.agent
+            return response, True, True
+        response = await step.call(agents)
+        agent.uuid = _created_uuid(response)
+        return response, False, True
+
+    if step.exists is not None:
+        if step.verify:
+            agent.snapshot = (await agents.retrieve(str(agent.uuid))).agent
+        if agent.snapshot is not None and step.exists(agent.snapshot):
+            return None, True, True
+
+    response = await step.call(agents)
+    return response, False, step.name != "wait_until_ready" or _is_ready(response)
+
+
+def _attempt(agents: AgentsResource, step: _Step, start: float) -> _Outcome:
+    delay = start - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+    try:
+        response, reused, done = _run(agents, step)
+    except Exception as exc:
+        return None, exc, False, True
+    return response, None, reused, done
+
+
+async def _async_attempt(
+    agents: AsyncAgentsResource, step: _Step, start: float, send: MemoryObjectSendStream[Tuple[_Step, _Outcome]]
+) -> None:
+    delay = start - time.monotonic()
+    if delay > 0:
+        await anyio.sleep(delay)
+    outcome: _Outcome
+    try:
+        response, reused, done = await _async_run(agents, step)
+        outcome = (response, None, reused, done)
+    except Exception as exc:
+        outcome = (None, exc, False, True)
+    await send.send((step, outcome))
+
+
+def deploy_fleet(
+    agents: AgentsResource,
+    specs: Iterable[AgentSpec],
+    *,
+    adopt_existing: bool,
+    **options: Any,
+) -> FleetDeployment:
+    # retries are made by the deployment, which checks for side effects of the failed attempt first
+    agents = agents._client.with_options(max_retries=0).agents
+    deployment = _Deployment(agents._client, specs, **options)
+    if adopt_existing:
+        deployment.adopt(dict(_list_agents(agents)))
+
+    pool = ThreadPoolExecutor(max_workers=deployment._concurrency, thread_name_prefix="gradient-deploy")
+    running: Dict[Future[_Outcome], _Step] = {}
+    try:
+        while deployment.pending:
+            for step, start in deployment.due():
+                running[pool.submit(_attempt, agents, step, start)] = step
+
+            idle = deployment.idle_time()
+            if not running:
+                time.sleep(idle or 0.0)
+                continue
+            finished, _ = wait(running, timeout=idle, return_when=FIRST_COMPLETED)
+            for future in finished:
+                deployment.finish(running.pop(future), future.result())
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return deployment.report()
+
+
+async def async_deploy_fleet(
+    agents: AsyncAgentsResource,
+    specs: Iterable[AgentSpec],
+    *,
+    adopt_existing: bool,
+    **options: Any,
+) -> FleetDeployment:
+    agents = agents._client.with_options(max_retries=0).agents
+    deployment = _Deployment(agents._client, specs, **options)
+    if adopt_existing:
+        deployment.adopt({name: uuid async for name, uuid in _async_list_agents(agents)})
+
+    # at most `concurrency` attempts run at once, so sending an outcome never blocks
+    send, receive = _memory_stream(deployment._concurrency)
+    async with send, receive, anyio.create_task_group() as task_group:
+        while deployment.pending:
+            for step, start in deployment.due():
+                task_group.start_soon(_async_attempt, agents, step, start, send)
+
+            with anyio.move_on_after(deployment.idle_time()):
+                step, outcome = await receive.receive()
+                deployment.finish(step, outcome)
+    return deployment.report()
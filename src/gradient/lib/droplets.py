@@ -0,0 +1,436 @@
+"""Create more Droplets than fit in a single request.
+
+Used by `gpu_droplets.bulk_create()`. The API creates at most ten Droplets per
+request, so the names are split into chunks that are created through
+`run_batch()`, with up to `concurrency` requests in flight and no more than
+`max_requests_per_second` started per second.
+
+A chunk whose request fails with a transient error is retried on its own. The
+failed request may still have created some of the chunk's Droplets, so after it
+the chunk's names are looked up, and only the ones that were not created are
+sent again; this also happens after the last attempt, so that the Droplets it
+created are still reported. Once every chunk is in, the create actions of all of them are
+waited on by a single `FleetWaiter`.
+"""
+
+from __future__ import annotations
+
+import time
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Iterable, Optional, Sequence
+from datetime import datetime, timezone, timedelta
+from collections import Counter
+from typing_extensions import override
+
+import anyio
+
+from .batch import AsyncBatch, run_batch
+from .fleet import WaitResult, FleetWaiter, AsyncFleetWaiter, _RateLimiter
+from .polling import retry_after
+from .uploads import _retry_delay, _should_retry
+from ..types.shared.droplet import Droplet
+from ..types.gpu_droplet_create_response import MultipleDropletResponse
+from ..types.gpu_droplets.action_list_response import ActionListResponse
+
+if TYPE_CHECKING:
+    from .._client import Gradient, AsyncGradient
+    from ..resources.gpu_droplets.gpu_droplets import GPUDropletsResource, AsyncGPUDropletsResource
+
+__all__ = ["DropletChunk", "BulkCreateResult"]
+
+MAX_NAMES_PER_REQUEST = 10
+
+# Droplets found by name after a failed request only count as created by it if they
+# are no older than the chunk's first attempt, give or take this much clock skew.
+_CLOCK_SKEW = timedelta(minutes=1)
+
+_LIST_PAGE_SIZE = 200
+
+
+class DropletChunk:
+    """The Droplets of one create request, and of its retries."""
+
+    __slots__ = ("index", "names", "droplets", "action_ids", "attempts", "error")
+
+    index: int
+    """The position of the chunk, counting from `0`."""
+
+    names: List[str]
+
+    droplets: List[Droplet]
+    """The Droplets created for the chunk, including any found after a failed attempt."""
+
+    action_ids: List[int]
+    """The ids of the create actions of `droplets`."""
+
+    attempts: int
+
+    error: Optional[Exception]
+    """The error of the chunk's last attempt if it did not succeed; some of its Droplets may still have been created."""
+
+    def __init__(self, index: int, names: Sequence[str]) -> None:
+        self.index = index
+        self.names = list(names)
+        self.droplets = []
+        self.action_ids = []
+        self.attempts = 0
+        self.error = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def missing(self) -> List[str]:
+        """The names no Droplet has been created for yet."""
+        remaining = Counter(self.names) - Counter(droplet.name for droplet in self.droplets)
+        return list(remaining.elements())
+
+    def _add(self, droplet: Droplet, action_id: Optional[int]) -> None:
+        self.droplets.append(droplet)
+        if action_id is not None:
+            self.action_ids.append(action_id)
+
+    def _add_response(self, response: MultipleDropletResponse) -> None:
+        self.droplets.extend(response.droplets)
+        self.action_ids.extend(link.id for link in response.links.actions or [] if link.id is not None)
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"DropletChunk(index={self.index}, names={len(self.names)}, created={len(self.droplets)}, "
+            f"attempts={self.attempts}, error={self.error!r})"
+        )
+
+
+class BulkCreateResult:
+    """The outcome of `gpu_droplets.bulk_create()`."""
+
+    chunks: List[DropletChunk]
+    """Every chunk, in the order of the names."""
+
+    actions: List[WaitResult[Any]]
+    """The outcome of waiting on every create action, in the order they completed; empty if `wait=False`."""
+
+    elapsed: float
+
+    def __init__(self, chunks: List[DropletChunk], actions: List[WaitResult[Any]], elapsed: float) -> None:
+        self.chunks = chunks
+        self.actions = actions
+        self.elapsed = elapsed
+
+    @property
+    def droplets(self) -> List[Droplet]:
+        return [droplet for chunk in self.chunks for droplet in chunk.droplets]
+
+    @property
+    def droplet_ids(self) -> List[int]:
+        return [droplet.id for droplet in self.droplets]
+
+    @property
+    def action_ids(self) -> List[int]:
+        return [action_id for chunk in self.chunks for action_id in chunk.action_ids]
+
+    @property
+    def failed(self) -> List[DropletChunk]:
+        return [chunk for chunk in self.chunks if not chunk.ok]
+
+    @property
+    def failed_names(self) -> List[str]:
+        """The names of the failed chunks that no Droplet was created for."""
+        return [name for chunk in self.failed for name in chunk.missing]
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed and all(result.ok for result in self.actions)
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"BulkCreateResult(droplets={len(self.droplet_ids)}, chunks={len(self.chunks)}, "
+            f"failed={len(self.failed)}, actions={len(self.actions)}, elapsed={self.elapsed:.1f})"
+        )
+
+
+class _Throttle:
+    """A `_RateLimiter` shared by the threads of a batch."""
+
+    def __init__(self, rate: Optional[float]) -> None:
+        self._limiter = _RateLimiter(rate)
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        """How long to wait before starting the next request."""
+        with self._lock:
+            now = time.monotonic()
+            return self._limiter.reserve(now) - now
+
+
+def _chunk(names: Iterable[str], chunk_size: int) -> List[Dict[str, Any]]:
+    if not 1 <= chunk_size <= MAX_NAMES_PER_REQUEST:
+        raise ValueError(f"Expected `chunk_size` to be between 1 and {MAX_NAMES_PER_REQUEST} but received {chunk_size}")
+    names = list(names)
+    for name in names:
+        if not name:
+            raise ValueError(f"Expected every Droplet name to be non-empty but received {name!r}")
+    return [
+        {"index": index, "names": names[start : start + chunk_size]}
+        for index, start in enumerate(range(0, len(names), chunk_size))
+    ]
+
+
+def _validate(concurrency: int, max_retries: int) -> None:
+    if concurrency < 1:
+        raise ValueError(f"Expected `concurrency` to be at least 1 but received {concurrency}")
+    if max_retries < 0:
+        raise ValueError(f"Expected `max_retries` to be at least 0 but received {max_retries}")
+
+
+def _created_at(droplet: Droplet) -> datetime:
+    created_at = droplet.created_at
+    return created_at if created_at.tzinfo is not None else created_at.replace(tzinfo=timezone.utc)
+
+
+def _is_new(droplet: Droplet, names: Counter[str], since: datetime, seen: set[int]) -> bool:
+    if names[droplet.name] < 1 or droplet.id in seen or _created_at(droplet) < since:
+        return False
+    names[droplet.name] -= 1
+    seen.add(droplet.id)
+    return True
+
+
+def _create_action_id(actions: ActionListResponse) -> Optional[int]:
+    return next((action.id for action in actions.actions or [] if action.type == "create"), None)
+
+
+def _backoff(client: Gradient | AsyncGradient, chunk: DropletChunk, error: Exception) -> float:
+    return max(_retry_delay(chunk.attempts - 1), retry_after(client, error) or 0.0)
+
+
+class _BaseChunker:
+    """Creates one chunk, retrying it with only the names that were not created yet."""
+
+    def __init__(
+        self,
+        params: Dict[str, Any],
+        *,
+        max_requests_per_second: Optional[float],
+        max_retries: int,
+    ) -> None:
+        self.params = params
+        self.max_retries = max_retries
+        self._throttle = _Throttle(max_requests_per_second)
+
+    def _exhausted(self, chunk: DropletChunk) -> bool:
+        return chunk.attempts > self.max_retries
+
+
+class _Chunker(_BaseChunker):
+    def __init__(
+        self,
+        gpu_droplets: GPUDropletsResource,
+        params: Dict[str, Any],
+        *,
+        max_requests_per_second: Optional[float],
+        max_retries: int,
+    ) -> None:
+        super().__init__(params, max_requests_per_second=max_requests_per_second, max_retries=max_retries)
+        self.gpu_droplets = gpu_droplets
+
+    def create(self, index: int, names: List[str]) -> DropletChunk:
+        chunk = DropletChunk(index, names)
+        client = self.gpu_droplets._client
+        since = datetime.now(timezone.utc) - _CLOCK_SKEW
+        while True:
+            self._wait()
+            chunk.attempts += 1
+            try:
+                raw = self.gpu_droplets.with_raw_response.create(names=chunk.missing, **self.params)
+                # the response to a request with `names` always lists `droplets`
+                chunk._add_response(raw.parse(to=MultipleDropletResponse))
+                return chunk
+            except Exception as exc:
+                error = exc
+            if not _should_retry(client, error):
+                chunk.error = error
+                return chunk
+
+            time.sleep(_backoff(client, chunk, error))
+            try:
+                self._recover(chunk, since)
+            except Exception as exc:
+                # without knowing what the failed attempt created, a retry could create duplicates
+                chunk.error = exc
+                return chunk
+            if not chunk.missing:
+                return chunk
+            if self._exhausted(chunk):
+                chunk.error = error
+                return chunk
+
+    def _recover(self, chunk: DropletChunk, since: datetime) -> None:
+        names = Counter(chunk.missing)
+        seen = {droplet.id for droplet in chunk.droplets}
+        for name in list(names):
+            self._wait()
+            response = self.gpu_droplets.list(name=name, per_page=_LIST_PAGE_SIZE)
+            for droplet in response.droplets or []:
+                if _is_new(droplet, names, since, seen):
+                    self._wait()
+                    chunk._add(droplet, _create_action_id(self.gpu_droplets.actions.list(droplet.id)))
+
+    def _wait(self) -> None:
+        delay = self._throttle.delay()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _AsyncChunker(_BaseChunker):
+    def __init__(
+        self,
+        gpu_droplets: AsyncGPUDropletsResource,
+        params: Dict[str, Any],
+        *,
+        max_requests_per_second: Optional[float],
+        max_retries: int,
+    ) -> None:
+        super().__init__(params, max_requests_per_second=max_requests_per_second, max_retries=max_retries)
+        self.gpu_droplets = gpu_droplets
+
+    async def create(self, index: int, names: List[str]) -> DropletChunk:
+        chunk = DropletChunk(index, names)
+        client = self.gpu_droplets._client
+        since = datetime.now(timezone.utc) - _CLOCK_SKEW
+        while True:
+            await self._wait()
+            chunk.attempts += 1
+            try:
+                raw = await self.gpu_droplets.with_raw_response.create(names=chunk.missing, **self.params)
+                chunk._add_response(await raw.parse(to=MultipleDropletResponse))
+                return chunk
+            except Exception as exc:
+                error = exc
+            if not _should_retry(client, error):
+                chunk.error = error
+                return chunk
+
+            await anyio.sleep(_backoff(client, chunk, error))
+            try:
+                await self._recover(chunk, since)
+            except Exception as exc:
+                chunk.error = exc
+                return chunk
+            if not chunk.missing:
+                return chunk
+            if self._exhausted(chunk):
+                chunk.error = error
+                return chunk
+
+    async def _recover(self, chunk: DropletChunk, since: datetime) -> None:
+        names = Counter(chunk.missing)
+        seen = {droplet.id for droplet in chunk.droplets}
+        for name in list(names):
+            await self._wait()
+            response = await self.gpu_droplets.list(name=name, per_page=_LIST_PAGE_SIZE)
+            for droplet in response.droplets or []:
+                if _is_new(droplet, names, since, seen):
+                    await self._wait()
+                    chunk._add(droplet, _create_action_id(await self.gpu_droplets.actions.list(droplet.id)))
+
+    async def _wait(self) -> None:
+        delay = self._throttle.delay()
+        if delay > 0:
+            await anyio.sleep(delay)
+
+
+def bulk_create(
+    gpu_droplets: GPUDropletsResource,
+    names: Iterable[str],
+    params: Dict[str, Any],
+    *,
+    chunk_size: int,
+    concurrency: int,
+    max_requests_per_second: Optional[float],
+    max_retries: int,
+    wait: bool,
+    poll_interval: float,
+    timeout: Optional[float],
+) -> BulkCreateResult:
+    _validate(concurrency, max_retries)
+    requests = _chunk(names, chunk_size)
+    started = time.monotonic()
+
+    # retries are made per chunk, which checks for the Droplets of the failed attempt first
+    chunker = _Chunker(
+        gpu_droplets._client.with_options(max_retries=0).gpu_droplets,
+        params,
+        max_requests_per_second=max_requests_per_second,
+        max_retries=max_retries,
+    )
+    chunks: List[DropletChunk] = []
+    for result in run_batch(chunker.create, requests, concurrency=concurrency, ordered=True, checkpoint=None):
+        assert result.response is not None
+        chunks.append(result.response)
+
+    actions: List[WaitResult[Any]] = []
+    if wait:
+        # polls are retried by the caller's client, only the creates are retried per chunk
+        waiter = FleetWaiter(
+            gpu_droplets._client,
+            max_requests_per_second=max_requests_per_second,
+            concurrency=concurrency,
+            poll_interval=poll_interval,
+            timeout=timeout,
+        )
+        for chunk in chunks:
+            for action_id in chunk.action_ids:
+                waiter.add_action(action_id)
+        actions = list(waiter.as_completed())
+    return BulkCreateResult(chunks, actions, time.monotonic() - started)
+
+
+async def async_bulk_create(
+    gpu_droplets: AsyncGPUDropletsResource,
+    names: Iterable[str],
+    params: Dict[str, Any],
+    *,
+    chunk_size: int,
+    concurrency: int,
+    max_requests_per_second: Optional[float],
+    max_retries: int,
+    wait: bool,
+    poll_interval: float,
+    timeout: Optional[float],
+) -> BulkCreateResult:
+    _validate(concurrency, max_retries)
+    requests = _chunk(names, chunk_size)
+    started = time.monotonic()
+
+    chunker = _AsyncChunker(
+        gpu_droplets._client.with_options(max_retries=0).gpu_droplets,
+        params,
+        max_requests_per_second=max_requests_per_second,
+        max_retries=max_retries,
+    )
+    chunks: List[DropletChunk] = []
+    async with AsyncBatch(chunker.create, requests, concurrency=concurrency, ordered=True, checkpoint=None) as results:
+        async for result in results:
+            assert result.response is not None
+            chunks.append(result.response)
+
+    actions: List[WaitResult[Any]] = []
+    if wait:
+        # polls are retried by the caller's client, only the creates are retried per chunk
+        waiter = AsyncFleetWaiter(
+            gpu_droplets._client,
+            max_requests_per_second=max_requests_per_second,
+            concurrency=concurrency,
+            poll_interval=poll_interval,
+            timeout=timeout,
+        )
+        for chunk in chunks:
+            for action_id in chunk.action_ids:
+                waiter.add_action(action_id)
+        async with waiter.as_completed() as waited:
+            actions = [result async for result in waited]
+    return BulkCreateResult(chunks, actions, time.monotonic() - started)
@@ -0,0 +1,381 @@
+"""Export the results of an evaluation run.
+
+Used by `agents.evaluation_runs.export_results()` and `results_columns()`. The
+pages of `list_results()` are fetched ahead of time, `prefetch` at a time, and,
+when `detailed` is set, every prompt on a page is fetched again through
+`retrieve_results()` with up to `concurrency` requests in flight. Prompts are
+handed to the sink one at a time in their original order and dropped afterwards,
+so at most a few pages are held in memory however large the run is.
+"""
+
+from __future__ import annotations
+
+import os
+import csv
+import json
+import math
+from array import array
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Union,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Generator,
+    AsyncIterator,
+    AsyncGenerator,
+)
+from pathlib import Path
+from functools import partial
+from typing_extensions import Literal, override
+
+from .batch import AsyncBatch, run_batch
+from ..types.agents.api_evaluation_prompt import APIEvaluationPrompt
+from ..types.agents.evaluation_run_list_results_response import EvaluationRunListResultsResponse
+
+if TYPE_CHECKING:
+    from ..resources.agents.evaluation_runs import EvaluationRunsResource, AsyncEvaluationRunsResource
+
+__all__ = ["EvaluationColumns", "ExportFormat"]
+
+ExportFormat = Literal["auto", "jsonl", "csv"]
+
+FilePath = Union[str, "os.PathLike[str]"]
+
+_PROMPT_COLUMNS = ["prompt_id", "input", "output", "ground_truth", "input_tokens", "output_tokens"]
+
+
+def _tokens(value: Optional[str]) -> int:
+    # the API reports token counts as strings
+    try:
+        return int(value) if value else 0
+    except ValueError:
+        return 0
+
+
+def _metric_values(prompt: APIEvaluationPrompt) -> Iterator[tuple[str, Union[float, str, None]]]:
+    for metric in prompt.prompt_level_metric_results or []:
+        if metric.metric_name:
+            value = metric.number_value if metric.number_value is not None else metric.string_value
+            yield metric.metric_name, value
+
+
+class EvaluationColumns:
+    """The results of an evaluation run as one array per column.
+
+    Row `i` of every array belongs to the same prompt. Only metrics with numeric
+    values get a column; rows without a value for a metric are `nan`.
+    """
+
+    prompt_ids: array[int]
+    input_tokens: array[int]
+    output_tokens: array[int]
+
+    metrics: Dict[str, array[float]]
+    """The numeric value of every metric, by metric name."""
+
+    def __init__(self) -> None:
+        self.prompt_ids = array("q")
+        self.input_tokens = array("q")
+        self.output_tokens = array("q")
+        self.metrics = {}
+
+    def __len__(self) -> int:
+        return len(self.prompt_ids)
+
+    def _append(self, prompt: APIEvaluationPrompt) -> None:
+        row = len(self.prompt_ids)
+        self.prompt_ids.append(prompt.prompt_id if prompt.prompt_id is not None else -1)
+        self.input_tokens.append(_tokens(prompt.input_tokens))
+        self.output_tokens.append(_tokens(prompt.output_tokens))
+
+        for name, value in _metric_values(prompt):
+            if not isinstance(value, float):
+                continue
+            column = self.metrics.get(name)
+            if column is None:
+                # metrics first seen part way through are backfilled for the earlier rows
+                column = self.metrics[name] = array("d", [math.nan]) * row
+            if len(column) == row:
+                column.append(value)
+        for column in self.metrics.values():
+            if len(column) == row:
+                column.append(math.nan)
+
+    @override
+    def __repr__(self) -> str:
+        return f"EvaluationColumns(rows={len(self)}, metrics={sorted(self.metrics)!r})"
+
+
+class _JsonlSink:
+    def __init__(self, file: IO[str]) -> None:
+        self._file = file
+
+    def __call__(self, prompt: APIEvaluationPrompt) -> None:
+        self._file.write(json.dumps(prompt.to_dict(mode="json"), ensure_ascii=False) + "\n")
+
+
+class _CsvSink:
+    """Writes one row per prompt with one column per metric.
+
+    The metric columns are `metrics` if given, otherwise the metrics of the first
+    prompt; the header has to be written before the other prompts are seen.
+    """
+
+    def __init__(self, file: IO[str], metrics: Optional[Sequence[str]]) -> None:
+        self._writer = csv.writer(file)
+        self._metrics: Optional[List[str]] = list(metrics) if metrics is not None else None
+        self._header_written = False
+
+    def __call__(self, prompt: APIEvaluationPrompt) -> None:
+        values = dict(_metric_values(prompt))
+        if self._metrics is None:
+            self._metrics = list(values)
+        if not self._header_written:
+            self._writer.writerow(_PROMPT_COLUMNS + self._metrics)
+            self._header_written = True
+
+        self._writer.writerow(
+            [
+                prompt.prompt_id,
+                prompt.input,
+                prompt.output,
+                prompt.ground_truth,
+                prompt.input_tokens,
+                prompt.output_tokens,
+                *(values.get(name) for name in self._metrics),
+            ]
+        )
+
+
+def _format_of(destination: Path, format: ExportFormat) -> Literal["jsonl", "csv"]:
+    if format != "auto":
+        return format
+    suffix = destination.suffix.lower()
+    if suffix in {".jsonl", ".ndjson"}:
+        return "jsonl"
+    if suffix == ".csv":
+        return "csv"
+    raise ValueError(
+        f"Cannot tell the export format from {destination.name!r}; pass `format='jsonl'` or `format='csv'`"
+    )
+
+
+def _validate(page_size: int, prefetch: int, concurrency: int) -> None:
+    if page_size < 1:
+        raise ValueError(f"Expected `page_size` to be at least 1 but received {page_size}")
+    if prefetch < 1:
+        raise ValueError(f"Expected `prefetch` to be at least 1 but received {prefetch}")
+    if concurrency < 1:
+        raise ValueError(f"Expected `concurrency` to be at least 1 but received {concurrency}")
+
+
+def _page_count(first: EvaluationRunListResultsResponse) -> Optional[int]:
+    return first.meta.pages if first.meta is not None and first.meta.pages is not None else None
+
+
+def _has_next(page: EvaluationRunListResultsResponse, page_size: int) -> bool:
+    # without `meta.pages`, follow the links, or keep going while pages are full
+    links = page.links.pages if page.links is not None else None
+    if links is not None and (links.next or links.last):
+        return bool(links.next)
+    return len(page.prompts or []) >= page_size
+
+
+def _detail(prompt: APIEvaluationPrompt, response_prompt: Optional[APIEvaluationPrompt]) -> APIEvaluationPrompt:
+    return response_prompt if response_prompt is not None else prompt
+
+
+def _pages(
+    runs: EvaluationRunsResource, uuid: str, *, page_size: int, prefetch: int
+) -> Generator[EvaluationRunListResultsResponse, None, None]:
+    list_page = partial(runs.list_results, uuid, per_page=page_size)
+    page = list_page(page=1)
+    yield page
+
+    pages = _page_count(page)
+    if pages is None:
+        number = 1
+        while _has_next(page, page_size):
+            number += 1
+            page = list_page(page=number)
+            yield page
+        return
+
+    requests = ({"page": number} for number in range(2, pages + 1))
+    for result in run_batch(list_page, requests, concurrency=prefetch, ordered=True, checkpoint=None):
+        if result.error is not None:
+            raise result.error
+        assert result.response is not None
+        yield result.response
+
+
+def for_each_prompt(
+    runs: EvaluationRunsResource,
+    uuid: str,
+    visit: Callable[[APIEvaluationPrompt], None],
+    *,
+    page_size: int,
+    prefetch: int,
+    detailed: bool,
+    concurrency: int,
+) -> int:
+    _validate(page_size, prefetch, concurrency)
+
+    def retrieve(prompt: APIEvaluationPrompt) -> APIEvaluationPrompt:
+        if prompt.prompt_id is None:
+            return prompt
+        return _detail(prompt, runs.retrieve_results(prompt.prompt_id, evaluation_run_uuid=uuid).prompt)
+
+    count = 0
+    pages = _pages(runs, uuid, page_size=page_size, prefetch=prefetch)
+    try:
+        for page in pages:
+            prompts: Iterable[APIEvaluationPrompt] = page.prompts or []
+            if detailed:
+                requests = [{"prompt": prompt} for prompt in prompts]
+                prompts = list(
+                    _unwrap(run_batch(retrieve, requests, concurrency=concurrency, ordered=True, checkpoint=None))
+                )
+            for prompt in prompts:
+                visit(prompt)
+                count += 1
+    finally:
+        # stops prefetching if the sink failed
+        pages.close()
+    return count
+
+
+def _unwrap(results: Iterable[Any]) -> Iterator[APIEvaluationPrompt]:
+    for result in results:
+        if result.error is not None:
+            raise result.error
+        yield result.response
+
+
+async def _async_pages(
+    runs: AsyncEvaluationRunsResource, uuid: str, *, page_size: int, prefetch: int
+) -> AsyncGenerator[EvaluationRunListResultsResponse, None]:
+    list_page = partial(runs.list_results, uuid, per_page=page_size)
+    page = await list_page(page=1)
+    yield page
+
+    pages = _page_count(page)
+    if pages is None:
+        number = 1
+        while _has_next(page, page_size):
+            number += 1
+            page = await list_page(page=number)
+            yield page
+        return
+
+    requests = ({"page": number} for number in range(2, pages + 1))
+    async with AsyncBatch(list_page, requests, concurrency=prefetch, ordered=True, checkpoint=None) as results:
+        async for result in results:
+            if result.error is not None:
+                raise result.error
+            assert result.response is not None
+            yield result.response
+
+
+async def async_for_each_prompt(
+    runs: AsyncEvaluationRunsResource,
+    uuid: str,
+    visit: Callable[[APIEvaluationPrompt], None],
+    *,
+    page_size: int,
+    prefetch: int,
+    detailed: bool,
+    concurrency: int,
+) -> int:
+    _validate(page_size, prefetch, concurrency)
+
+    async def retrieve(prompt: APIEvaluationPrompt) -> APIEvaluationPrompt:
+        if prompt.prompt_id is None:
+            return prompt
+        response = await runs.retrieve_results(prompt.prompt_id, evaluation_run_uuid=uuid)
+        return _detail(prompt, response.prompt)
+
+    count = 0
+    pages = _async_pages(runs, uuid, page_size=page_size, prefetch=prefetch)
+    try:
+        async for page in pages:
+            prompts = page.prompts or []
+            if detailed:
+                requests = [{"prompt": prompt} for prompt in prompts]
+                async with AsyncBatch(
+                    retrieve, requests, concurrency=concurrency, ordered=True, checkpoint=None
+                ) as results:
+                    prompts = [prompt async for prompt in _async_unwrap(results)]
+            for prompt in prompts:
+                visit(prompt)
+                count += 1
+    finally:
+        await pages.aclose()
+    return count
+
+
+async def _async_unwrap(results: AsyncBatch[APIEvaluationPrompt]) -> AsyncIterator[APIEvaluationPrompt]:
+    async for result in results:
+        if result.error is not None:
+            raise result.error
+        assert result.response is not None
+        yield result.response
+
+
+def _open(
+    destination: FilePath, format: ExportFormat, metrics: Optional[Sequence[str]]
+) -> tuple[Any, Callable[[APIEvaluationPrompt], None]]:
+    path = Path(destination)
+    if _format_of(path, format) == "csv":
+        file = path.open("w", encoding="utf-8", newline="")
+        return file, _CsvSink(file, metrics)
+    file = path.open("w", encoding="utf-8")
+    return file, _JsonlSink(file)
+
+
+def export_results(
+    runs: EvaluationRunsResource,
+    uuid: str,
+    destination: FilePath,
+    *,
+    format: ExportFormat,
+    metrics: Optional[Sequence[str]],
+    **options: Any,
+) -> int:
+    file, sink = _open(destination, format, metrics)
+    with file:
+        return for_each_prompt(runs, uuid, sink, **options)
+
+
+async def async_export_results(
+    runs: AsyncEvaluationRunsResource,
+    uuid: str,
+    destination: FilePath,
+    *,
+    format: ExportFormat,
+    metrics: Optional[Sequence[str]],
+    **options: Any,
+) -> int:
+    # rows are small and written to a buffered file, so writing from the event loop does not block for long
+    file, sink = _open(destination, format, metrics)
+    with file:
+        return await async_for_each_prompt(runs, uuid, sink, **options)
+
+
+def results_columns(runs: EvaluationRunsResource, uuid: str, **options: Any) -> EvaluationColumns:
+    columns = EvaluationColumns()
+    for_each_prompt(runs, uuid, columns._append, **options)
+    return columns
+
+
+async def async_results_columns(runs: AsyncEvaluationRunsResource, uuid: str, **options: Any) -> EvaluationColumns:
+    columns = EvaluationColumns()
+    await async_for_each_prompt(runs, uuid, columns._append, **options)
+    return columns
@@ -0,0 +1,546 @@
+"""Wait for many agents, knowledge bases, indexing jobs and actions at once.
+
+Every resource gets its own backoff schedule from a `PollPolicy`, but all polls
+go through a single scheduler: each poll is sent as soon as it is due, at most
+`concurrency` at a time, and spaced out so that the whole fleet never exceeds
+`max_requests_per_second`. Resources are yielded as soon as they reach a
+terminal state, in the style of `concurrent.futures.as_completed()`.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+import heapq
+import itertools
+from abc import ABC, abstractmethod
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Generic, TypeVar, Callable, Iterator, Optional, AsyncIterator
+from functools import partial
+from typing_extensions import Self, Literal, override
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import anyio
+from anyio.abc import TaskGroup
+from anyio.streams.memory import MemoryObjectSendStream, MemoryObjectReceiveStream
+
+from .actions import retrieve_action, is_action_complete, action_timeout_error, async_retrieve_action
+from .polling import PollPolicy, _Schedule, retry_after
+from .streaming import _memory_stream
+
+if TYPE_CHECKING:
+    from .._client import Gradient, AsyncGradient
+
+__all__ = ["WaitResult", "FleetWaiter", "AsyncFleetWaiter", "AsyncFleetResults"]
+
+_T = TypeVar("_T")
+_ClientT = TypeVar("_ClientT", bound="Gradient | AsyncGradient")
+
+ResourceKind = Literal["agent", "knowledge_base", "indexing_job", "action"]
+
+
+class WaitResult(Generic[_T]):
+    """The outcome of waiting for a single resource."""
+
+    __slots__ = ("kind", "id", "response", "error", "polls", "elapsed")
+
+    kind: ResourceKind
+    id: str
+
+    response: Optional[_T]
+    """The last response, in its terminal state if the wait succeeded."""
+
+    error: Optional[Exception]
+    """The error the wait ended with: a failed state, a timeout or an API error."""
+
+    polls: int
+    """The number of times the resource was polled."""
+
+    elapsed: float
+    """Seconds from the start of the wait until the resource reached its final state."""
+
+    def __init__(
+        self,
+        kind: ResourceKind,
+        id: str,
+        *,
+        response: Optional[_T],
+        error: Optional[Exception],
+        polls: int,
+        elapsed: float,
+    ) -> None:
+        self.kind = kind
+        self.id = id
+        self.response = response
+        self.error = error
+        self.polls = polls
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @override
+    def __repr__(self) -> str:
+        outcome = f"error={self.error!r}" if self.error is not None else "ok"
+        return f"WaitResult(kind={self.kind!r}, id={self.id!r}, {outcome}, polls={self.polls})"
+
+
+class _Target:
+    __slots__ = ("kind", "id", "fetch", "is_done", "on_timeout")
+
+    kind: ResourceKind
+    id: str
+    fetch: Callable[[], Any]
+    is_done: Callable[[Any], bool]
+    on_timeout: Callable[[float, Any], Exception]
+    """Builds the error for a resource that is still not done after `timeout` seconds."""
+
+    def __init__(
+        self,
+        kind: ResourceKind,
+        id: str,
+        fetch: Callable[[], Any],
+        is_done: Callable[[Any], bool],
+        on_timeout: Callable[[float, Any], Exception],
+    ) -> None:
+        self.kind = kind
+        self.id = id
+        self.fetch = fetch
+        self.is_done = is_done
+        self.on_timeout = on_timeout
+
+
+class _State:
+    __slots__ = ("target", "schedule", "polls", "last")
+
+    target: _Target
+    schedule: _Schedule
+    polls: int
+    last: Any
+
+    def __init__(self, target: _Target, schedule: _Schedule) -> None:
+        self.target = target
+        self.schedule = schedule
+        self.polls = 0
+        self.last = None
+
+
+_PollOutcome = Tuple[_State, Any, Optional[Exception]]
+
+
+class _RateLimiter:
+    """Spaces requests out evenly so that no more than `rate` are started per second."""
+
+    def __init__(self, rate: Optional[float]) -> None:
+        self._interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+
+    def reserve(self, now: float) -> float:
+        """The time at which the next request may start."""
+        start = max(now, self._next)
+        self._next = start + self._interval
+        return start
+
+
+class _Fleet:
+    """The scheduling shared by the sync and async waiters."""
+
+    def __init__(
+        self,
+        client: Gradient | AsyncGradient,
+        targets: List[_Target],
+        *,
+        policy: PollPolicy,
+        timeout: Optional[float],
+        max_requests_per_second: Optional[float],
+        concurrency: int,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError(f"Expected `concurrency` to be at least 1 but received {concurrency}")
+        if max_requests_per_second is not None and max_requests_per_second <= 0:
+            raise ValueError(
+                f"Expected `max_requests_per_second` to be positive but received {max_requests_per_second}"
+            )
+
+        self._client = client
+        self._timeout = timeout
+        self._concurrency = concurrency
+        self._running = 0
+        self._limiter = _RateLimiter(max_requests_per_second)
+        self._started = time.monotonic()
+        self._order = itertools.count()
+        # every resource is polled right away, subject to the rate limit
+        self._queue: List[Tuple[float, int, _State]] = [
+            (self._started, next(self._order), _State(target, _Schedule(policy, timeout))) for target in targets
+        ]
+        heapq.heapify(self._queue)
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._queue) or self._running > 0
+
+    def due(self) -> List[Tuple[_State, float]]:
+        """The polls that may start now, each with the time it may send its request at."""
+        now = time.monotonic()
+        due: List[Tuple[_State, float]] = []
+        while self._queue and self._queue[0][0] <= now and self._running < self._concurrency:
+            _, _, state = heapq.heappop(self._queue)
+            self._running += 1
+            due.append((state, self._limiter.reserve(now)))
+        return due
+
+    def idle_time(self) -> Optional[float]:
+        """Seconds until another poll may start, or `None` if that depends on a running poll finishing."""
+        if not self._queue or self._running >= self._concurrency:
+            return None
+        return max(self._queue[0][0] - time.monotonic(), 0.0)
+
+    def finish(self, state: _State, response: Any, error: Optional[Exception]) -> Optional[WaitResult[Any]]:
+        """Record the outcome of a poll; returns a result if the resource is done."""
+        target = state.target
+        self._running -= 1
+        state.polls += 1
+        requested: Optional[float] = None
+        if error is None:
+            state.last = response
+            try:
+                if target.is_done(response):
+                    return self._result(state, None)
+            except Exception as exc:
+                return self._result(state, exc)
+        else:
+            requested = retry_after(self._client, error)
+            if requested is None:
+                return self._result(state, error)
+
+        if self._timeout is not None and state.schedule.expired():
+            return self._result(state, error if error is not None else target.on_timeout(self._timeout, state.last))
+
+        due = time.monotonic() + state.schedule.next_delay(requested)
+        heapq.heappush(self._queue, (due, next(self._order), state))
+        return None
+
+    def _result(self, state: _State, error: Optional[Exception]) -> WaitResult[Any]:
+        return WaitResult(
+            state.target.kind,
+            state.target.id,
+            response=state.last,
+            error=error,
+            polls=state.polls,
+            elapsed=time.monotonic() - self._started,
+        )
+
+
+def _agent_target(agents: Any, uuid: str) -> _Target:
+    from ..resources.agents.agents import _is_agent_ready, _agent_timeout_error
+
+    return _Target("agent", uuid, partial(agents.retrieve, uuid), _is_agent_ready, partial(_agent_timeout_error, uuid))
+
+
+def _knowledge_base_target(knowledge_bases: Any, uuid: str) -> _Target:
+    from ..resources.knowledge_bases.knowledge_bases import _is_database_online, _database_timeout_error
+
+    return _Target(
+        "knowledge_base", uuid, partial(knowledge_bases.retrieve, uuid), _is_database_online, _database_timeout_error
+    )
+
+
+def _indexing_job_target(indexing_jobs: Any, uuid: str) -> _Target:
+    from ..resources.knowledge_bases.indexing_jobs import _is_job_complete, _job_timeout_error
+
+    return _Target(
+        "indexing_job",
+        uuid,
+        partial(indexing_jobs.retrieve, uuid),
+        partial(_is_job_complete, uuid),
+        partial(_job_timeout_error, uuid),
+    )
+
+
+def _action_target(fetch: Callable[[], Any], action_id: int) -> _Target:
+    return _Target(
+        "action",
+        str(action_id),
+        fetch,
+        partial(is_action_complete, action_id),
+        partial(action_timeout_error, action_id),
+    )
+
+
+class _BaseFleetWaiter(ABC, Generic[_ClientT]):
+    _client: _ClientT
+
+    def __init__(
+        self,
+        *,
+        max_requests_per_second: Optional[float],
+        concurrency: int,
+        poll_interval: float,
+        timeout: Optional[float],
+    ) -> None:
+        self.max_requests_per_second = max_requests_per_second
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._policy = PollPolicy.up_to(poll_interval)
+        self._targets: List[_Target] = []
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def add_agent(self, uuid: str) -> None:
+        """Wait for the agent's deployment to reach `STATUS_RUNNING`, like `agents.wait_until_ready()`."""
+        self._targets.append(_agent_target(self._client.agents, _check_uuid(uuid)))
+
+    def add_knowledge_base(self, uuid: str) -> None:
+        """Wait for the knowledge base's database to come online, like `knowledge_bases.wait_for_database()`."""
+        self._targets.append(_knowledge_base_target(self._client.knowledge_bases, _check_uuid(uuid)))
+
+    def add_indexing_job(self, uuid: str) -> None:
+        """Wait for the indexing job to succeed, like `knowledge_bases.indexing_jobs.wait_for_completion()`."""
+        self._targets.append(_indexing_job_target(self._client.knowledge_bases.indexing_jobs, _check_uuid(uuid)))
+
+    def add_action(self, action_id: int) -> None:
+        """Wait for a Droplet, volume, floating IP or image action to reach the `completed` status."""
+        self._targets.append(_action_target(self._action_fetcher(action_id), action_id))
+
+    @abstractmethod
+    def _action_fetcher(self, action_id: int) -> Callable[[], Any]:
+        """Return a function that retrieves the action with the waiter's client."""
+        ...
+
+    def _fleet(self) -> _Fleet:
+        return _Fleet(
+            self._client,
+            list(self._targets),
+            policy=self._policy,
+            timeout=self.timeout,
+            max_requests_per_second=self.max_requests_per_second,
+            concurrency=self.concurrency,
+        )
+
+
+def _check_uuid(uuid: str) -> str:
+    if not uuid:
+        raise ValueError(f"Expected a non-empty value for `uuid` but received {uuid!r}")
+    return uuid
+
+
+class FleetWaiter(_BaseFleetWaiter["Gradient"]):
+    """Waits for many resources with one scheduler and a shared request rate.
+
+    ```py
+    waiter = FleetWaiter(client, max_requests_per_second=10, timeout=900)
+    for uuid in agent_uuids:
+        waiter.add_agent(uuid)
+    for result in waiter.as_completed():
+        print(result.id, "ready" if result.ok else result.error)
+    ```
+
+    Args:
+      max_requests_per_second: The maximum rate of polls across all resources, `None` for no limit.
+
+      concurrency: The maximum number of polls in flight at once.
+
+      poll_interval: The longest time between two polls of the same resource; polls start out
+          more frequent and back off with jitter up to this interval.
+
+      timeout: The maximum time to wait for each resource, counted from the start of the wait.
+    """
+
+    def __init__(
+        self,
+        client: Gradient,
+        *,
+        max_requests_per_second: Optional[float] = 5.0,
+        concurrency: int = 8,
+        poll_interval: float = 5.0,
+        timeout: Optional[float] = None,
+    ) -> None:
+        super().__init__(
+            max_requests_per_second=max_requests_per_second,
+            concurrency=concurrency,
+            poll_interval=poll_interval,
+            timeout=timeout,
+        )
+        self._client = client
+
+    @override
+    def _action_fetcher(self, action_id: int) -> Callable[[], Any]:
+        return partial(retrieve_action, self._client, action_id)
+
+    def __iter__(self) -> Iterator[WaitResult[Any]]:
+        return self.as_completed()
+
+    def as_completed(self) -> Iterator[WaitResult[Any]]:
+        """Poll every resource that was added, yielding each one as soon as it reaches a final state.
+
+        A resource that fails, times out or cannot be polled because of a non-transient
+        API error is yielded with `WaitResult.error` set instead of raising.
+        """
+        fleet = self._fleet()
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="gradient-fleet")
+        running: Dict[Future[Tuple[Any, Optional[Exception]]], _State] = {}
+        try:
+            while fleet.pending:
+                for state, start in fleet.due():
+                    running[pool.submit(_poll, state.target.fetch, start)] = state
+
+                idle = fleet.idle_time()
+                if not running:
+                    time.sleep(idle or 0.0)
+                    continue
+                finished, _ = wait(running, timeout=idle, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    response, error = future.result()
+                    result = fleet.finish(running.pop(future), response, error)
+                    if result is not None:
+                        yield result
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _poll(fetch: Callable[[], Any], start: float) -> Tuple[Any, Optional[Exception]]:
+    delay = start - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+    try:
+        return fetch(), None
+    except Exception as exc:
+        return None, exc
+
+
+class AsyncFleetWaiter(_BaseFleetWaiter["AsyncGradient"]):
+    """Waits for many resources with one scheduler and a shared request rate.
+
+    ```py
+    waiter = AsyncFleetWaiter(client, max_requests_per_second=10, timeout=900)
+    for uuid in job_uuids:
+        waiter.add_indexing_job(uuid)
+    async with waiter.as_completed() as results:
+        async for result in results:
+            print(result.id, "done" if result.ok else result.error)
+    ```
+
+    Args:
+      max_requests_per_second: The maximum rate of polls across all resources, `None` for no limit.
+
+      concurrency: The maximum number of polls in flight at once.
+
+      poll_interval: The longest time between two polls of the same resource; polls start out
+          more frequent and back off with jitter up to this interval.
+
+      timeout: The maximum time to wait for each resource, counted from the start of the wait.
+    """
+
+    def __init__(
+        self,
+        client: AsyncGradient,
+        *,
+        max_requests_per_second: Optional[float] = 5.0,
+        concurrency: int = 8,
+        poll_interval: float = 5.0,
+        timeout: Optional[float] = None,
+    ) -> None:
+        super().__init__(
+            max_requests_per_second=max_requests_per_second,
+            concurrency=concurrency,
+            poll_interval=poll_interval,
+            timeout=timeout,
+        )
+        self._client = client
+
+    @override
+    def _action_fetcher(self, action_id: int) -> Callable[[], Any]:
+        return partial(async_retrieve_action, self._client, action_id)
+
+    def as_completed(self) -> AsyncFleetResults:
+        """Poll every resource that was added, yielding each one as soon as it reaches a final state.
+
+        A resource that fails, times out or cannot be polled because of a non-transient
+        API error is yielded with `WaitResult.error` set instead of raising.
+        """
+        return AsyncFleetResults(self._fleet(), self.concurrency)
+
+
+class AsyncFleetResults:
+    """The results of `AsyncFleetWaiter.as_completed()`, in the order the resources reach a final state.
+
+    Must be used as an async context manager so that the polls that are still
+    running when the iteration stops are cancelled:
+
+    ```py
+    async with waiter.as_completed() as results:
+        async for result in results:
+            print(result.id, result.ok)
+    ```
+    """
+
+    def __init__(self, fleet: _Fleet, concurrency: int) -> None:
+        self._fleet = fleet
+        self._concurrency = concurrency
+        self._task_group: TaskGroup | None = None
+        self._send: MemoryObjectSendStream[_PollOutcome] | None = None
+        self._receive: MemoryObjectReceiveStream[_PollOutcome] | None = None
+
+    async def __aenter__(self) -> Self:
+        # at most `concurrency` polls run at once, so sending an outcome never blocks
+        self._send, self._receive = _memory_stream(self._concurrency)
+
+        self._task_group = anyio.create_task_group()
+        await self._task_group.__aenter__()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop waiting and cancel the polls that are still running."""
+        task_group, self._task_group = self._task_group, None
+        try:
+            if task_group is not None:
+                task_group.cancel_scope.cancel()
+                await task_group.__aexit__(None, None, None)
+        finally:
+            if self._send is not None:
+                await self._send.aclose()
+            if self._receive is not None:
+                await self._receive.aclose()
+
+    async def __aiter__(self) -> AsyncIterator[WaitResult[Any]]:
+        task_group, send, receive = self._task_group, self._send, self._receive
+        if task_group is None or send is None or receive is None:
+            raise RuntimeError("AsyncFleetResults must be entered with `async with` before iterating over it")
+
+        fleet = self._fleet
+        while fleet.pending:
+            for state, start in fleet.due():
+                task_group.start_soon(_async_poll, state, start, send)
+
+            idle = fleet.idle_time()
+            outcome: Optional[_PollOutcome] = None
+            with anyio.move_on_after(math.inf if idle is None else idle):
+                outcome = await receive.receive()
+            if outcome is None:
+                continue
+
+            # yielded outside of any cancel scope, so that the caller can stop iterating at any time
+            result = fleet.finish(*outcome)
+            if result is not None:
+                yield result
+
+
+async def _async_poll(state: _State, start: float, send: MemoryObjectSendStream[_PollOutcome]) -> None:
+    delay = start - time.monotonic()
+    if delay > 0:
+        await anyio.sleep(delay)
+    try:
+        outcome: _PollOutcome = (state, await state.target.fetch(), None)
+    except Exception as exc:
+        outcome = (state, None, exc)
+    await send.send(outcome)
@@ -0,0 +1,434 @@
+"""Helpers for writing generated images to disk or memory without buffering base64 strings.
+
+`images.generate()` returns every image as a base64 string inside a pydantic model,
+so a single image is held in memory as the raw response body, the parsed string and
+the decoded bytes. The helpers in this module instead scan the raw response bytes,
+decode every `b64_json` value incrementally as it arrives and hand the decoded bytes
+to an `ImageSink`. Only the small remainder of the payload is parsed into models, with
+`b64_json` set to an empty string.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import json
+import binascii
+import tempfile
+from abc import ABC, abstractmethod
+from typing import IO, TYPE_CHECKING, Any, Dict, List, Union, Iterable, Iterator, Optional, AsyncIterator, cast
+from pathlib import Path
+from collections import deque
+from typing_extensions import Literal, override
+
+from .._utils import is_mapping
+from .._streaming import SSEDecoder, ServerSentEvent
+from .._exceptions import APIError
+from ..types.image_generate_response import ImageGenerateResponse
+from ..types.shared.image_gen_stream_event import ImageGenStreamEvent
+
+if TYPE_CHECKING:
+    from .._response import APIResponse, AsyncAPIResponse
+    from .._base_client import SyncAPIClient, AsyncAPIClient
+
+__all__ = ["ImageSink", "ImageFileSink", "ImageBufferSink"]
+
+PartialsMode = Literal["latest", "all", "none"]
+
+_KEY = b'"b64_json"'
+_WHITESPACE = b" \t\r\n"
+
+_SEARCH = 0
+_AFTER_KEY = 1
+_AFTER_COLON = 2
+_VALUE = 3
+
+
+class ImageSink(ABC):
+    """Receives the decoded images produced by `images.generate_to_sink()`.
+
+    `begin()` is called as soon as a `b64_json` value starts; the decoded bytes are
+    written to the returned file as they arrive. Once the surrounding event or
+    response has been parsed, the file is handed to `commit()` together with its
+    position, or to `discard()` if the request failed.
+    """
+
+    @abstractmethod
+    def begin(self) -> IO[bytes]:
+        """Return a writable binary file for the next image."""
+        ...
+
+    @abstractmethod
+    def commit(self, file: IO[bytes], *, index: int, partial: bool) -> None:
+        """Called once an image has been fully written to `file`.
+
+        `index` is the image's position in `data` for regular responses, or the
+        `partial_image_index` for partial images.
+        """
+        ...
+
+    def discard(self, file: IO[bytes]) -> None:
+        """Called for images that will not be committed, e.g. because the stream errored."""
+        file.close()
+
+
+class ImageFileSink(ImageSink):
+    """Writes generated images to disk.
+
+    The first image is written to `path`, subsequent images of a multi-image response
+    to `{stem}-{index}{suffix}` next to it. Images are written to a temporary file in
+    the same directory first and then moved into place, so readers never observe a
+    partially written image.
+
+    Args:
+      path: Where to write the final image.
+
+      partials: What to do with partial images received while streaming. `"latest"`
+          keeps only the most recent one at `{stem}.partial{suffix}`, `"all"` keeps
+          every one at `{stem}.partial-{index}{suffix}` and `"none"` drops them.
+    """
+
+    paths: List[Path]
+    """The paths of all of the final images written so far."""
+
+    partial_paths: List[Path]
+    """The paths of the partial images currently on disk."""
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"], *, partials: PartialsMode = "latest") -> None:
+        self._path = Path(path)
+        self._partials = partials
+        self.paths = []
+        self.partial_paths = []
+
+    def _destination(self, *, index: int, partial: bool) -> Path:
+        path = self._path
+        if partial:
+            if self._partials == "latest":
+                return path.with_name(f"{path.stem}.partial{path.suffix}")
+            return path.with_name(f"{path.stem}.partial-{index}{path.suffix}")
+
+        if index == 0:
+            return path
+        return path.with_name(f"{path.stem}-{index}{path.suffix}")
+
+    @override
+    def begin(self) -> IO[bytes]:
+        return tempfile.NamedTemporaryFile(dir=self._path.parent, prefix=f".{self._path.name}.", delete=False)
+
+    @override
+    def commit(self, file: IO[bytes], *, index: int, partial: bool) -> None:
+        if partial and self._partials == "none":
+            self.discard(file)
+            return
+
+        file.close()
+        destination = self._destination(index=index, partial=partial)
+        os.replace(file.name, destination)
+
+        paths = self.partial_paths if partial else self.paths
+        if destination not in paths:
+            paths.append(destination)
+
+    @override
+    def discard(self, file: IO[bytes]) -> None:
+        file.close()
+        try:
+            os.unlink(file.name)
+        except FileNotFoundError:
+            pass
+
+
+class ImageBufferSink(ImageSink):
+    """Keeps generated images in memory as decoded bytes.
+
+    Args:
+      partials: Which partial images to keep, see `ImageFileSink`. With `"latest"`,
+          `partial_images` only ever holds the most recent one.
+    """
+
+    images: Dict[int, bytes]
+    """Final images by their index in the response."""
+
+    partial_images: Dict[int, bytes]
+    """Partial images by their `partial_image_index`."""
+
+    def __init__(self, *, partials: PartialsMode = "latest") -> None:
+        self._partials = partials
+        self.images = {}
+        self.partial_images = {}
+
+    @property
+    def latest_partial(self) -> Optional[bytes]:
+        """The most recently received partial image, if any."""
+        if not self.partial_images:
+            return None
+        return self.partial_images[max(self.partial_images)]
+
+    @override
+    def begin(self) -> IO[bytes]:
+        return io.BytesIO()
+
+    @override
+    def commit(self, file: IO[bytes], *, index: int, partial: bool) -> None:
+        data = cast(io.BytesIO, file).getvalue()
+        file.close()
+
+        if not partial:
+            self.images[index] = data
+        elif self._partials == "latest":
+            self.partial_images = {index: data}
+        elif self._partials == "all":
+            self.partial_images[index] = data
+
+
+class _Base64Decoder:
+    """Decodes base64 that arrives in arbitrarily sized pieces."""
+
+    def __init__(self) -> None:
+        self._pending = b""
+
+    def decode(self, data: bytes) -> bytes:
+        if self._pending:
+            data = self._pending + data
+
+        end = len(data) - len(data) % 4
+        self._pending = data[end:]
+        if not end:
+            return b""
+        return binascii.a2b_base64(data[:end])
+
+    def flush(self) -> bytes:
+        pending, self._pending = self._pending, b""
+        if not pending:
+            return b""
+        return binascii.a2b_base64(pending + b"=" * (-len(pending) % 4))
+
+
+class _B64JsonExtractor:
+    """Splits a JSON or SSE byte stream into its `b64_json` payloads and everything else.
+
+    `feed()` returns the input with every `b64_json` string value replaced by `""`,
+    which is small enough to be parsed as usual. The decoded payloads are written to
+    files from the sink and queued in `completed` in the order they were seen.
+    """
+
+    def __init__(self, sink: ImageSink) -> None:
+        self._sink = sink
+        self._state = _SEARCH
+        self._carry = b""
+        self._file: Optional[IO[bytes]] = None
+        self._decoder = _Base64Decoder()
+        self.completed: deque[IO[bytes]] = deque()
+
+    def feed(self, chunk: bytes) -> bytes:
+        data = self._carry + chunk if self._carry else chunk
+        self._carry = b""
+
+        out: List[bytes] = []
+        pos = 0
+        size = len(data)
+        while pos < size:
+            if self._state == _SEARCH:
+                idx = data.find(_KEY, pos)
+                if idx == -1:
+                    # the end of this chunk could be the beginning of the key
+                    quote = data.find(b'"', max(pos, size - len(_KEY) + 1))
+                    end = size if quote == -1 else quote
+                    out.append(data[pos:end])
+                    self._carry = data[end:]
+                    break
+
+                end = idx + len(_KEY)
+                out.append(data[pos:end])
+                pos = end
+                self._state = _AFTER_KEY
+            elif self._state == _AFTER_KEY or self._state == _AFTER_COLON:
+                byte = data[pos : pos + 1]
+                if byte in _WHITESPACE:
+                    pos += 1
+                elif self._state == _AFTER_KEY and byte == b":":
+                    out.append(byte)
+                    pos += 1
+                    self._state = _AFTER_COLON
+                elif self._state == _AFTER_COLON and byte == b'"':
+                    out.append(b'""')
+                    pos += 1
+                    self._file = self._sink.begin()
+                    self._state = _VALUE
+                else:
+                    # not a string value, e.g. `null`
+                    self._state = _SEARCH
+            else:
+                assert self._file is not None
+                quote = data.find(b'"', pos)
+                end = size if quote == -1 else quote
+                if quote == -1 and data.endswith(b"\\"):
+                    end -= 1
+                    self._carry = b"\\"
+
+                segment = data[pos:end]
+                if b"\\" in segment:
+                    # JSON encoders may escape the `/` of the base64 alphabet
+                    segment = segment.replace(b"\\/", b"/").replace(b"\\n", b"")
+                self._file.write(self._decoder.decode(segment))
+
+                if quote == -1:
+                    break
+
+                self._file.write(self._decoder.flush())
+                self.completed.append(self._file)
+                self._file = None
+                pos = quote + 1
+                self._state = _SEARCH
+
+        return b"".join(out)
+
+    def finish(self) -> bytes:
+        if self._state == _VALUE:
+            raise ValueError("Response ended in the middle of a `b64_json` value")
+        carry, self._carry = self._carry, b""
+        return carry
+
+    def discard_all(self) -> None:
+        if self._file is not None:
+            self._sink.discard(self._file)
+            self._file = None
+        while self.completed:
+            self._sink.discard(self.completed.popleft())
+
+
+def _skeleton(extractor: _B64JsonExtractor, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    for chunk in chunks:
+        skeleton = extractor.feed(chunk)
+        if skeleton:
+            yield skeleton
+    yield extractor.finish()
+
+
+async def _async_skeleton(extractor: _B64JsonExtractor, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        skeleton = extractor.feed(chunk)
+        if skeleton:
+            yield skeleton
+    yield extractor.finish()
+
+
+def _commit_response(
+    extractor: _B64JsonExtractor,
+    sink: ImageSink,
+    client: SyncAPIClient | AsyncAPIClient,
+    response: APIResponse[Any] | AsyncAPIResponse[Any],
+    body: bytes,
+) -> ImageGenerateResponse:
+    data = json.loads(body)
+    parsed = client._process_response_data(data=data, cast_to=ImageGenerateResponse, response=response.http_response)
+    images = cast(List[Any], data.get("data") or []) if is_mapping(data) else []
+    for index, image in enumerate(images):
+        # the extractor skips images whose `b64_json` is not a string, e.g. `null`
+        if is_mapping(image) and isinstance(image.get("b64_json"), str) and extractor.completed:
+            sink.commit(extractor.completed.popleft(), index=index, partial=False)
+    return parsed
+
+
+class _EventCommitter:
+    def __init__(
+        self,
+        extractor: _B64JsonExtractor,
+        sink: ImageSink,
+        client: SyncAPIClient | AsyncAPIClient,
+        response: APIResponse[Any] | AsyncAPIResponse[Any],
+    ) -> None:
+        self._extractor = extractor
+        self._sink = sink
+        self._client = client
+        self._response = response
+        self._completed_count = 0
+        self.done = False
+
+    def __call__(self, sse: ServerSentEvent) -> Optional[ImageGenStreamEvent]:
+        if sse.data.startswith("[DONE]"):
+            self.done = True
+            return None
+
+        data = sse.json()
+        if is_mapping(data) and data.get("error"):
+            error = data.get("error")
+            message = error.get("message") if is_mapping(error) else None
+            if not message or not isinstance(message, str):
+                message = "An error occurred during streaming"
+            raise APIError(message=message, request=self._response.http_response.request, body=data["error"])
+
+        event = cast(
+            ImageGenStreamEvent,
+            self._client._process_response_data(
+                data=data,
+                cast_to=cast(Any, ImageGenStreamEvent),
+                response=self._response.http_response,
+            ),
+        )
+        if self._extractor.completed:
+            file = self._extractor.completed.popleft()
+            if event.type == "image_generation.partial_image":
+                self._sink.commit(file, index=event.partial_image_index, partial=True)
+            else:
+                self._sink.commit(file, index=self._completed_count, partial=False)
+                self._completed_count += 1
+        return event
+
+
+def write_image_response(
+    sink: ImageSink, response: APIResponse[Any], client: SyncAPIClient, *, chunk_size: Optional[int] = None
+) -> ImageGenerateResponse:
+    """Decode the images of a non-streaming response into `sink` and return the remaining metadata."""
+    extractor = _B64JsonExtractor(sink)
+    try:
+        body = b"".join(_skeleton(extractor, response.iter_bytes(chunk_size)))
+        return _commit_response(extractor, sink, client, response, body)
+    finally:
+        extractor.discard_all()
+
+
+async def async_write_image_response(
+    sink: ImageSink, response: AsyncAPIResponse[Any], client: AsyncAPIClient, *, chunk_size: Optional[int] = None
+) -> ImageGenerateResponse:
+    """Decode the images of a non-streaming response into `sink` and return the remaining metadata."""
+    extractor = _B64JsonExtractor(sink)
+    try:
+        body = b"".join([chunk async for chunk in _async_skeleton(extractor, response.iter_bytes(chunk_size))])
+        return _commit_response(extractor, sink, client, response, body)
+    finally:
+        extractor.discard_all()
+
+
+def iter_image_events(
+    sink: ImageSink, response: APIResponse[Any], client: SyncAPIClient, *, chunk_size: Optional[int] = None
+) -> Iterator[ImageGenStreamEvent]:
+    """Decode the images of a streaming response into `sink`, yielding each event without its `b64_json`."""
+    extractor = _B64JsonExtractor(sink)
+    committer = _EventCommitter(extractor, sink, client, response)
+    try:
+        for sse in SSEDecoder().iter_bytes(_skeleton(extractor, response.iter_bytes(chunk_size))):
+            event = committer(sse)
+            if committer.done:
+                break
+            if event is not None:
+                yield event
+    finally:
+        extractor.discard_all()
+
+
+async def async_iter_image_events(
+    sink: ImageSink, response: AsyncAPIResponse[Any], client: AsyncAPIClient, *, chunk_size: Optional[int] = None
+) -> AsyncIterator[ImageGenStreamEvent]:
+    """Decode the images of a streaming response into `sink`, yielding each event without its `b64_json`."""
+    extractor = _B64JsonExtractor(sink)
+    committer = _EventCommitter(extractor, sink, client, response)
+    try:
+        async for sse in SSEDecoder().aiter_bytes(_async_skeleton(extractor, response.iter_bytes(chunk_size))):
+            event = committer(sse)
+            if committer.done:
+                break
+            if event is not None:
+                yield event
+    finally:
+        extractor.discard_all()
@@ -0,0 +1,251 @@
+"""Follow an indexing job as it progresses.
+
+Used by `knowledge_bases.indexing_jobs.watch_progress()`. The job is polled
+with the same backoff as `wait_for_completion()`, but a snapshot is yielded
+every time something visible changes: the phase, the status of a data source or
+one of the counters. The data sources are only fetched again when the job itself
+reports a change, and the polling interval starts over from the shortest one
+after every change, so active jobs are followed closely while idle ones cost few
+requests.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any, List, Tuple, Callable, Iterator, Optional, Awaitable, AsyncIterator
+from typing_extensions import override
+
+from .polling import PollPolicy, _Sleep, _Schedule, retry_after
+from .._exceptions import PollingCancelledError
+from ..types.knowledge_bases.api_indexing_job import APIIndexingJob
+from ..types.knowledge_bases.api_indexed_data_source import APIIndexedDataSource
+from ..types.knowledge_bases.indexing_job_retrieve_response import IndexingJobRetrieveResponse
+
+if TYPE_CHECKING:
+    from ..resources.knowledge_bases.indexing_jobs import IndexingJobsResource, AsyncIndexingJobsResource
+
+__all__ = ["IndexingJobProgress"]
+
+_TERMINAL_PHASES = frozenset(
+    {"BATCH_JOB_PHASE_SUCCEEDED", "BATCH_JOB_PHASE_FAILED", "BATCH_JOB_PHASE_ERROR", "BATCH_JOB_PHASE_CANCELLED"}
+)
+
+
+def _count(value: Optional[str]) -> int:
+    # the API reports counters as strings
+    try:
+        return int(value) if value else 0
+    except ValueError:
+        return 0
+
+
+class IndexingJobProgress:
+    """A snapshot of an indexing job and its data sources."""
+
+    __slots__ = ("job", "data_sources")
+
+    job: APIIndexingJob
+
+    data_sources: List[APIIndexedDataSource]
+    """The per data source status, from `retrieve_data_sources()` unless the job included it."""
+
+    def __init__(self, job: APIIndexingJob, data_sources: List[APIIndexedDataSource]) -> None:
+        self.job = job
+        self.data_sources = data_sources
+
+    @property
+    def phase(self) -> Optional[str]:
+        return self.job.phase
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has reached a terminal phase, successful or not."""
+        return self.job.phase in _TERMINAL_PHASES
+
+    @property
+    def succeeded(self) -> bool:
+        return self.job.phase == "BATCH_JOB_PHASE_SUCCEEDED"
+
+    @property
+    def total_tokens(self) -> int:
+        return _count(self.job.total_tokens)
+
+    @property
+    def completed_data_sources(self) -> int:
+        return self.job.completed_datasources or 0
+
+    @property
+    def total_data_sources(self) -> int:
+        return self.job.total_datasources or len(self.data_sources)
+
+    @property
+    def indexed_files(self) -> int:
+        return sum(_count(source.indexed_file_count) for source in self.data_sources)
+
+    @property
+    def failed_files(self) -> int:
+        return sum(_count(source.failed_item_count) for source in self.data_sources)
+
+    @property
+    def total_files(self) -> int:
+        return sum(_count(source.total_file_count) for source in self.data_sources)
+
+    def _fingerprint(self) -> Tuple[Any, ...]:
+        job = self.job
+        return (
+            job.phase,
+            job.status,
+            job.completed_datasources,
+            job.total_datasources,
+            job.total_tokens,
+            tuple(
+                (
+                    source.data_source_uuid,
+                    source.status,
+                    source.indexed_file_count,
+                    source.indexed_item_count,
+                    source.failed_item_count,
+                    source.skipped_item_count,
+                    source.removed_item_count,
+                    source.total_file_count,
+                    source.total_bytes_indexed,
+                    source.error_msg,
+                )
+                for source in self.data_sources
+            ),
+        )
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"IndexingJobProgress(phase={self.phase!r}, data_sources={self.completed_data_sources}/"
+            f"{self.total_data_sources}, files={self.indexed_files}/{self.total_files}, tokens={self.total_tokens})"
+        )
+
+
+def _job_changed(previous: Optional[APIIndexingJob], job: APIIndexingJob) -> bool:
+    if previous is None:
+        return True
+    return (
+        previous.phase,
+        previous.status,
+        previous.completed_datasources,
+        previous.total_tokens,
+        previous.updated_at,
+    ) != (
+        job.phase,
+        job.status,
+        job.completed_datasources,
+        job.total_tokens,
+        job.updated_at,
+    )
+
+
+class _Tracker:
+    """The change detection and polling schedule shared by the sync and async iterators."""
+
+    def __init__(self, policy: PollPolicy, timeout: Optional[float]) -> None:
+        self.schedule = _Schedule(policy, timeout)
+        self.response: Optional[IndexingJobRetrieveResponse] = None
+        self.data_sources: List[APIIndexedDataSource] = []
+        self._fingerprint: Optional[Tuple[Any, ...]] = None
+
+    def needs_data_sources(self, response: IndexingJobRetrieveResponse) -> bool:
+        job = response.job or APIIndexingJob()
+        previous = self.response.job if self.response is not None else None
+        if job.data_source_jobs:
+            self.data_sources = job.data_source_jobs
+            return False
+        return _job_changed(previous, job)
+
+    def update(self, response: IndexingJobRetrieveResponse) -> Optional[IndexingJobProgress]:
+        """The new snapshot, or `None` if nothing changed since the last one."""
+        # only recorded once the data sources were fetched, so a failed fetch is retried on the next poll
+        self.response = response
+        progress = IndexingJobProgress(self.response.job or APIIndexingJob(), self.data_sources)
+        fingerprint = progress._fingerprint()
+        if fingerprint == self._fingerprint:
+            return None
+        self._fingerprint = fingerprint
+        # poll closely again while the job is making progress
+        self.schedule.interval = None
+        return progress
+
+
+def watch_progress(
+    indexing_jobs: IndexingJobsResource,
+    uuid: str,
+    *,
+    policy: PollPolicy,
+    timeout: Optional[float],
+    on_timeout: Callable[[Optional[IndexingJobRetrieveResponse]], Exception],
+    request_options: Any,
+    sleep: _Sleep,
+    cancel_event: Optional[threading.Event] = None,
+) -> Iterator[IndexingJobProgress]:
+    tracker = _Tracker(policy, timeout)
+    while True:
+        if cancel_event is not None and cancel_event.is_set():
+            raise PollingCancelledError("Polling was cancelled")
+
+        requested: Optional[float] = None
+        try:
+            response = indexing_jobs.retrieve(uuid, **request_options)
+            if tracker.needs_data_sources(response):
+                sources = indexing_jobs.retrieve_data_sources(uuid, **request_options)
+                tracker.data_sources = sources.indexed_data_sources or []
+        except Exception as exc:
+            requested = retry_after(indexing_jobs._client, exc)
+            if requested is None or tracker.schedule.expired():
+                raise
+        else:
+            progress = tracker.update(response)
+            if progress is not None:
+                yield progress
+                if progress.done:
+                    return
+
+        if tracker.schedule.expired():
+            raise on_timeout(tracker.response)
+
+        delay = tracker.schedule.next_delay(requested)
+        if delay > 0:
+            # a cancellation during the sleep is raised at the top of the loop
+            sleep(delay, cancel_event)
+
+
+async def async_watch_progress(
+    indexing_jobs: AsyncIndexingJobsResource,
+    uuid: str,
+    *,
+    policy: PollPolicy,
+    timeout: Optional[float],
+    on_timeout: Callable[[Optional[IndexingJobRetrieveResponse]], Exception],
+    request_options: Any,
+    sleep: Callable[[float], Awaitable[None]],
+) -> AsyncIterator[IndexingJobProgress]:
+    tracker = _Tracker(policy, timeout)
+    while True:
+        requested: Optional[float] = None
+        try:
+            response = await indexing_jobs.retrieve(uuid, **request_options)
+            if tracker.needs_data_sources(response):
+                sources = await indexing_jobs.retrieve_data_sources(uuid, **request_options)
+                tracker.data_sources = sources.indexed_data_sources or []
+        except Exception as exc:
+            requested = retry_after(indexing_jobs._client, exc)
+            if requested is None or tracker.schedule.expired():
+                raise
+        else:
+            progress = tracker.update(response)
+            if progress is not None:
+                yield progress
+                if progress.done:
+                    return
+
+        if tracker.schedule.expired():
+            raise on_timeout(tracker.response)
+
+        delay = tracker.schedule.next_delay(requested)
+        if delay > 0:
+            await sleep(delay)
@@ -0,0 +1,196 @@
+"""Stream and parse indexing job detail reports.
+
+Used by `knowledge_bases.indexing_jobs.iter_report()`. The report behind the
+job's signed URL is downloaded through the client's HTTP transport in chunks and
+parsed as it arrives, so memory use is bounded by the chunk size plus one record
+no matter how large the report is. JSON Lines and CSV reports are supported,
+optionally gzip compressed; the downloaded report can be spooled to a file as
+it is parsed, e.g. to keep a copy without downloading it twice.
+"""
+
+from __future__ import annotations
+
+import os
+import csv
+import json
+import zlib
+import codecs
+from typing import TYPE_CHECKING, Any, Dict, List, Union, Iterator, Optional, AsyncIterator
+from pathlib import PurePosixPath
+from collections import deque
+from typing_extensions import Literal
+
+import anyio
+import httpx
+
+if TYPE_CHECKING:
+    from .._client import Gradient, AsyncGradient
+
+__all__ = ["ReportFormat"]
+
+ReportFormat = Literal["auto", "jsonl", "csv"]
+
+FilePath = Union[str, "os.PathLike[str]"]
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+_SUFFIXES: Dict[str, ReportFormat] = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}
+
+
+def _format_from_url(url: str) -> ReportFormat:
+    suffixes = PurePosixPath(httpx.URL(url).path).suffixes
+    if suffixes and suffixes[-1] == ".gz":
+        suffixes = suffixes[:-1]
+    return _SUFFIXES.get(suffixes[-1].lower(), "auto") if suffixes else "auto"
+
+
+class _Lines:
+    """An iterator over buffered lines, only advanced when a complete record is buffered."""
+
+    def __init__(self) -> None:
+        self.lines: deque[str] = deque()
+
+    def __iter__(self) -> _Lines:
+        return self
+
+    def __next__(self) -> str:
+        return self.lines.popleft()
+
+
+class _ReportParser:
+    """Turns the chunks of a report into records as they arrive."""
+
+    def __init__(self, format: ReportFormat) -> None:
+        self._format = format
+        self._started = False
+        self._decompressor: Any = None
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._partial = ""
+        # CSV records may span lines when quoted fields contain newlines; a record
+        # is complete once the number of quotes seen in it is even
+        self._quotes = 0
+        self._csv_lines = _Lines()
+        self._csv_reader = csv.reader(self._csv_lines)
+        self._fieldnames: Optional[List[str]] = None
+
+    def feed(self, data: bytes) -> List[Dict[str, Any]]:
+        if not self._started:
+            self._started = True
+            if data.startswith(_GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._decompressor is not None:
+            data = self._decompressor.decompress(data)
+        return self._parse(self._decoder.decode(data), final=False)
+
+    def close(self) -> List[Dict[str, Any]]:
+        data = self._decompressor.flush() if self._decompressor is not None else b""
+        records = self._parse(self._decoder.decode(data, final=True), final=True)
+        if self._format == "csv" and self._quotes % 2:
+            raise ValueError("The report ended inside a quoted CSV field")
+        return records
+
+    def _parse(self, text: str, *, final: bool) -> List[Dict[str, Any]]:
+        # only split on "\n": JSON strings may contain other line separators such as U+2028
+        *complete, self._partial = (self._partial + text).split("\n")
+        lines = [line + "\n" for line in complete]
+        if final and self._partial:
+            lines.append(self._partial)
+            self._partial = ""
+
+        records: List[Dict[str, Any]] = []
+        for line in lines:
+            if self._format == "auto":
+                if not line.strip():
+                    continue
+                self._format = "jsonl" if line.lstrip().startswith("{") else "csv"
+
+            if self._format == "jsonl":
+                if line.strip():
+                    records.append(json.loads(line))
+                continue
+
+            self._csv_lines.lines.append(line)
+            self._quotes += line.count('"')
+            if self._quotes % 2 == 0:
+                self._quotes = 0
+                record = self._csv_record(next(self._csv_reader))
+                if record is not None:
+                    records.append(record)
+        return records
+
+    def _csv_record(self, row: List[str]) -> Optional[Dict[str, Any]]:
+        if not row:
+            return None
+        if self._fieldnames is None:
+            self._fieldnames = row
+            return None
+        return dict(zip(self._fieldnames, row))
+
+
+def _signed_url(uuid: str, signed_url: Optional[str]) -> str:
+    if not signed_url:
+        raise ValueError(f"Indexing job {uuid} has no details report")
+    return signed_url
+
+
+def _raise_for_status(client: Gradient | AsyncGradient, response: httpx.Response) -> None:
+    if response.is_success:
+        return
+    response.read()
+    raise client._make_status_error_from_response(response)
+
+
+def iter_report(
+    client: Gradient,
+    uuid: str,
+    signed_url: Optional[str],
+    *,
+    format: ReportFormat,
+    chunk_size: int,
+    spool_to: Optional[FilePath],
+) -> Iterator[Dict[str, Any]]:
+    url = _signed_url(uuid, signed_url)
+    parser = _ReportParser(_format_from_url(url) if format == "auto" else format)
+    spool = open(spool_to, "wb") if spool_to is not None else None
+    try:
+        with client._client.stream("GET", url) as response:
+            _raise_for_status(client, response)
+            for chunk in response.iter_bytes(chunk_size):
+                if spool is not None:
+                    spool.write(chunk)
+                yield from parser.feed(chunk)
+        yield from parser.close()
+    finally:
+        if spool is not None:
+            spool.close()
+
+
+async def async_iter_report(
+    client: AsyncGradient,
+    uuid: str,
+    signed_url: Optional[str],
+    *,
+    format: ReportFormat,
+    chunk_size: int,
+    spool_to: Optional[FilePath],
+) -> AsyncIterator[Dict[str, Any]]:
+    url = _signed_url(uuid, signed_url)
+    parser = _ReportParser(_format_from_url(url) if format == "auto" else format)
+    spool = await anyio.open_file(spool_to, "wb") if spool_to is not None else None
+    try:
+        async with client._client.stream("GET", url) as response:
+            if not response.is_success:
+                await response.aread()
+                raise client._make_status_error_from_response(response)
+            async for chunk in response.aiter_bytes(chunk_size):
+                if spool is not None:
+                    await spool.write(chunk)
+                for record in parser.feed(chunk):
+                    yield record
+        for record in parser.close():
+            yield record
+    finally:
+        if spool is not None:
+            await spool.aclose()
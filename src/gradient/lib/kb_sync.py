@@ -0,0 +1,339 @@
+"""Keep a knowledge base in sync with a local directory.
+
+Used by `knowledge_bases.sync_directory()`. A JSON manifest stored next to the
+documents remembers, for every file, its size, modification time, SHA-256
+content hash and the data source it was uploaded as. On the next sync only files
+whose size or modification time changed are hashed again, on a process pool,
+only content that is not in the knowledge base yet is uploaded, data sources
+whose content disappeared are deleted, and one indexing job is started for the
+new data sources. Data sources that could not be deleted or indexed yet are
+kept in the manifest and retried on the next sync.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import hashlib
+import tempfile
+from typing import TYPE_CHECKING, Any, Set, Dict, List, Tuple, Optional
+from pathlib import Path
+from typing_extensions import override
+from concurrent.futures import ProcessPoolExecutor
+
+from .batch import AsyncBatch, BatchResult, run_batch
+from .._utils import asyncify
+from .uploads import FilePath, FileUploadResult
+from ..types.knowledge_bases.indexing_job_create_response import IndexingJobCreateResponse
+
+if TYPE_CHECKING:
+    from ..resources.knowledge_bases.knowledge_bases import KnowledgeBasesResource, AsyncKnowledgeBasesResource
+
+__all__ = ["DirectorySyncReport"]
+
+MANIFEST_NAME = ".gradient-sync.json"
+MANIFEST_VERSION = 1
+
+# below this many files the cost of starting worker processes outweighs hashing in parallel
+_MIN_FILES_FOR_POOL = 32
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+ManifestEntry = Dict[str, Any]
+
+
+class DirectorySyncReport:
+    """What `knowledge_bases.sync_directory()` changed."""
+
+    uploaded: List[str]
+    """Relative paths of the files with new content; files with identical content share one upload."""
+
+    unchanged: List[str]
+    """Relative paths of the files whose content was already in the knowledge base."""
+
+    removed: List[str]
+    """Relative paths of the files that were deleted locally since the last sync."""
+
+    deleted_data_sources: List[str]
+    """UUIDs of the data sources that were deleted because no file has their content anymore."""
+
+    failed_deletes: Dict[str, Exception]
+    """The errors of the data sources that could not be deleted, by UUID; they are retried on the next sync."""
+
+    failed: List[FileUploadResult]
+    """Files that could not be uploaded; they are retried on the next sync."""
+
+    hashed: int
+    """The number of files that had to be hashed because they were new or modified."""
+
+    indexing_job: Optional[IndexingJobCreateResponse]
+    """The indexing job started for the uploaded data sources, if any."""
+
+    def __init__(self) -> None:
+        self.uploaded = []
+        self.unchanged = []
+        self.removed = []
+        self.deleted_data_sources = []
+        self.failed_deletes = {}
+        self.failed = []
+        self.hashed = 0
+        self.indexing_job = None
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"DirectorySyncReport(uploaded={len(self.uploaded)}, unchanged={len(self.unchanged)}, "
+            f"removed={len(self.removed)}, deleted_data_sources={len(self.deleted_data_sources)}, "
+            f"failed_deletes={len(self.failed_deletes)}, failed={len(self.failed)})"
+        )
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _Manifest:
+    def __init__(self, path: Path, knowledge_base_uuid: str) -> None:
+        self.path = path
+        self.files: Dict[str, ManifestEntry] = {}
+        # data sources that are no longer needed but could not be deleted yet
+        self.pending_deletes: List[str] = []
+        # data sources that were uploaded but no indexing job was started for yet
+        self.pending_indexing: List[str] = []
+
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("knowledge_base_uuid") != knowledge_base_uuid:
+                raise ValueError(
+                    f"The manifest {path} belongs to knowledge base {data.get('knowledge_base_uuid')!r}, "
+                    f"not {knowledge_base_uuid!r}"
+                )
+            self.files = data["files"]
+            self.pending_deletes = data.get("pending_deletes", [])
+            self.pending_indexing = data.get("pending_indexing", [])
+        self.knowledge_base_uuid = knowledge_base_uuid
+
+    def save(self) -> None:
+        data = {
+            "version": MANIFEST_VERSION,
+            "knowledge_base_uuid": self.knowledge_base_uuid,
+            "files": self.files,
+            "pending_deletes": self.pending_deletes,
+            "pending_indexing": self.pending_indexing,
+        }
+        # write to a temporary file first so that a crash never leaves a truncated manifest behind
+        fd, temp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(data, file, indent=1, sort_keys=True)
+            os.replace(temp, self.path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+
+class _Plan:
+    """The files found in the directory, compared with the manifest."""
+
+    def __init__(self, directory: Path, manifest: _Manifest, *, pattern: str, hash_workers: Optional[int]) -> None:
+        self.directory = directory
+        self.manifest = manifest
+        self.current: Dict[str, ManifestEntry] = {}
+        self.hashed = 0
+        self.uploaded_data_sources: Set[str] = set()
+
+        to_hash: List[Tuple[str, Path]] = []
+        for path in sorted(directory.glob(pattern)):
+            # skips the manifest as well as temporary files left behind by an interrupted save
+            if not path.is_file() or path.name.startswith(manifest.path.name):
+                continue
+            relative = path.relative_to(directory).as_posix()
+            stat = path.stat()
+            entry: ManifestEntry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            previous = manifest.files.get(relative)
+            if previous is not None and previous["size"] == entry["size"] and previous["mtime_ns"] == entry["mtime_ns"]:
+                entry["sha256"] = previous["sha256"]
+            else:
+                to_hash.append((relative, path))
+            self.current[relative] = entry
+
+        self.hashed = len(to_hash)
+        if len(to_hash) >= _MIN_FILES_FOR_POOL and hash_workers != 1:
+            with ProcessPoolExecutor(max_workers=hash_workers) as pool:
+                digests = list(pool.map(_hash_file, [str(path) for _, path in to_hash], chunksize=8))
+        else:
+            digests = [_hash_file(str(path)) for _, path in to_hash]
+        for (relative, _), digest in zip(to_hash, digests):
+            self.current[relative]["sha256"] = digest
+
+        # content that is already stored as a data source, by hash
+        self.stored: Dict[str, ManifestEntry] = {}
+        for entry in manifest.files.values():
+            self.stored.setdefault(entry["sha256"], entry)
+
+        self.removed = sorted(set(manifest.files) - set(self.current))
+        self.unchanged: List[str] = []
+        # one file per content hash that has to be uploaded
+        self.to_upload: Dict[str, str] = {}
+        for relative, entry in self.current.items():
+            stored = self.stored.get(entry["sha256"])
+            if stored is not None:
+                entry["object_key"] = stored["object_key"]
+                entry["data_source_uuid"] = stored["data_source_uuid"]
+                self.unchanged.append(relative)
+            else:
+                self.to_upload.setdefault(entry["sha256"], relative)
+
+    def record_upload(self, result: FileUploadResult, report: DirectorySyncReport) -> None:
+        relative = result.path.relative_to(self.directory).as_posix()
+        digest = self.current[relative]["sha256"]
+        data_source = result.data_source.knowledge_base_data_source if result.data_source else None
+        if not result.ok or data_source is None or data_source.uuid is None:
+            report.failed.append(result)
+            return
+
+        self.uploaded_data_sources.add(data_source.uuid)
+        for path, entry in self.current.items():
+            if entry["sha256"] == digest:
+                entry["object_key"] = result.object_key
+                entry["data_source_uuid"] = data_source.uuid
+                report.uploaded.append(path)
+
+    def finish(self) -> List[str]:
+        """Update the manifest and return the UUIDs of the data sources that are no longer needed.
+
+        They stay pending in the manifest until they are deleted, as do the needed data sources
+        until an indexing job is started for them.
+        """
+        files: Dict[str, ManifestEntry] = {}
+        for relative, entry in self.current.items():
+            if "data_source_uuid" in entry:
+                files[relative] = entry
+            elif relative in self.manifest.files:
+                # the new content failed to upload, so keep the old data source around
+                files[relative] = self.manifest.files[relative]
+
+        needed = {entry["data_source_uuid"] for entry in files.values()}
+        previous = {entry["data_source_uuid"] for entry in self.manifest.files.values()}
+        previous.update(self.manifest.pending_deletes)
+        self.manifest.files = files
+        self.manifest.pending_deletes = sorted(previous - needed)
+        self.manifest.pending_indexing = sorted(
+            (set(self.manifest.pending_indexing) | self.uploaded_data_sources) & needed
+        )
+        return list(self.manifest.pending_deletes)
+
+    def upload_paths(self) -> List[Path]:
+        return [self.directory / relative for relative in self.to_upload.values()]
+
+
+def _paths(directory: FilePath, manifest_path: Optional[FilePath]) -> Tuple[Path, Path]:
+    root = Path(directory)
+    if not root.is_dir():
+        raise ValueError(f"Expected {str(root)!r} to be a directory")
+    return root, Path(manifest_path) if manifest_path is not None else root / MANIFEST_NAME
+
+
+def _record_delete(manifest: _Manifest, report: DirectorySyncReport, item: BatchResult[Any]) -> None:
+    uuid: str = item.request["data_source_uuid"]
+    if item.error is not None:
+        # the data source stays pending in the manifest so that the next sync tries to delete it again
+        report.failed_deletes[uuid] = item.error
+    else:
+        manifest.pending_deletes.remove(uuid)
+        report.deleted_data_sources.append(uuid)
+
+
+def sync_directory(
+    knowledge_bases: KnowledgeBasesResource,
+    knowledge_base_uuid: str,
+    directory: FilePath,
+    *,
+    manifest_path: Optional[FilePath],
+    pattern: str,
+    hash_workers: Optional[int],
+    concurrency: int,
+    delete_removed: bool,
+    start_indexing_job: bool,
+) -> DirectorySyncReport:
+    root, manifest_file = _paths(directory, manifest_path)
+    manifest = _Manifest(manifest_file, knowledge_base_uuid)
+    plan = _Plan(root, manifest, pattern=pattern, hash_workers=hash_workers)
+    report = DirectorySyncReport()
+    report.hashed = plan.hashed
+    report.removed = plan.removed
+
+    uploads = knowledge_bases.data_sources.upload_files(
+        knowledge_base_uuid, plan.upload_paths(), concurrency=concurrency
+    )
+    for result in uploads.results:
+        plan.record_upload(result, report)
+    report.unchanged.extend(plan.unchanged)
+
+    unused = plan.finish()
+    if delete_removed and unused:
+        requests = [{"data_source_uuid": uuid, "knowledge_base_uuid": knowledge_base_uuid} for uuid in unused]
+        for item in run_batch(
+            knowledge_bases.data_sources.delete, requests, concurrency=concurrency, ordered=True, checkpoint=None
+        ):
+            _record_delete(manifest, report, item)
+    # saved before the indexing job is started, which is retried on the next sync if it fails
+    manifest.save()
+
+    if start_indexing_job and manifest.pending_indexing:
+        report.indexing_job = knowledge_bases.indexing_jobs.create(
+            knowledge_base_uuid=knowledge_base_uuid, data_source_uuids=manifest.pending_indexing
+        )
+        manifest.pending_indexing = []
+        manifest.save()
+    return report
+
+
+async def async_sync_directory(
+    knowledge_bases: AsyncKnowledgeBasesResource,
+    knowledge_base_uuid: str,
+    directory: FilePath,
+    *,
+    manifest_path: Optional[FilePath],
+    pattern: str,
+    hash_workers: Optional[int],
+    concurrency: int,
+    delete_removed: bool,
+    start_indexing_job: bool,
+) -> DirectorySyncReport:
+    root, manifest_file = _paths(directory, manifest_path)
+    manifest = await asyncify(_Manifest)(manifest_file, knowledge_base_uuid)
+    # scanning and hashing block, so they run in a worker thread that drives the process pool
+    plan = await asyncify(_Plan)(root, manifest, pattern=pattern, hash_workers=hash_workers)
+    report = DirectorySyncReport()
+    report.hashed = plan.hashed
+    report.removed = plan.removed
+
+    uploads = await knowledge_bases.data_sources.upload_files(
+        knowledge_base_uuid, plan.upload_paths(), concurrency=concurrency
+    )
+    for result in uploads.results:
+        plan.record_upload(result, report)
+    report.unchanged.extend(plan.unchanged)
+
+    unused = plan.finish()
+    if delete_removed and unused:
+        requests = [{"data_source_uuid": uuid, "knowledge_base_uuid": knowledge_base_uuid} for uuid in unused]
+        async with AsyncBatch(
+            knowledge_bases.data_sources.delete, requests, concurrency=concurrency, ordered=True, checkpoint=None
+        ) as results:
+            async for item in results:
+                _record_delete(manifest, report, item)
+    # saved before the indexing job is started, which is retried on the next sync if it fails
+    await asyncify(manifest.save)()
+
+    if start_indexing_job and manifest.pending_indexing:
+        report.indexing_job = await knowledge_bases.indexing_jobs.create(
+            knowledge_base_uuid=knowledge_base_uuid, data_source_uuids=manifest.pending_indexing
+        )
+        manifest.pending_indexing = []
+        await asyncify(manifest.save)()
+    return report
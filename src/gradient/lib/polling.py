@@ -0,0 +1,193 @@
+"""Poll a resource until it reaches a terminal state.
+
+Used by `agents.wait_until_ready()`, `knowledge_bases.wait_for_database()` and
+`knowledge_bases.indexing_jobs.wait_for_completion()`. The first poll is
+repeated after a short interval that grows with decorrelated jitter up to a
+maximum, so quick transitions are detected early while slow ones cost few
+requests, and concurrent waiters do not poll in lockstep. Responses that ask
+the client to back off, e.g. `429` with a `Retry-After` header, delay the next
+poll instead of ending the wait.
+"""
+
+from __future__ import annotations
+
+import time
+import random
+import threading
+from typing import TYPE_CHECKING, TypeVar, Callable, Optional, Awaitable
+from typing_extensions import Protocol, override
+
+from .._exceptions import APIStatusError, PollingCancelledError
+
+if TYPE_CHECKING:
+    from .._client import Gradient, AsyncGradient
+
+__all__ = ["PollPolicy"]
+
+_T = TypeVar("_T")
+
+
+class _Sleep(Protocol):
+    """Sleeps for `seconds`, or until `cancel_event` is set, see `SyncAPIResource._sleep()`."""
+
+    def __call__(self, seconds: float, cancel_event: Optional[threading.Event] = None) -> None: ...
+
+
+class PollPolicy:
+    """How often to poll a resource.
+
+    The interval after the first poll is `initial_interval`; every following interval
+    is drawn uniformly between `initial_interval` and `growth` times the previous
+    interval ("decorrelated jitter"), capped at `max_interval`.
+
+    Args:
+      initial_interval: The interval after the first poll, in seconds.
+
+      max_interval: The longest interval between two polls, in seconds.
+
+      growth: How much the interval may grow from one poll to the next.
+    """
+
+    __slots__ = ("initial_interval", "max_interval", "growth")
+
+    initial_interval: float
+    max_interval: float
+    growth: float
+
+    def __init__(self, *, initial_interval: float = 0.5, max_interval: float = 5.0, growth: float = 3.0) -> None:
+        if initial_interval < 0:
+            raise ValueError(f"Expected `initial_interval` to be at least 0 but received {initial_interval}")
+        if growth < 1:
+            raise ValueError(f"Expected `growth` to be at least 1 but received {growth}")
+
+        self.max_interval = max(max_interval, 0.0)
+        self.initial_interval = min(initial_interval, self.max_interval)
+        self.growth = growth
+
+    @classmethod
+    def up_to(cls, max_interval: float) -> PollPolicy:
+        """The default policy with intervals capped at `max_interval`, e.g. a waiter's `poll_interval`."""
+        return cls(max_interval=max_interval)
+
+    def next_interval(self, previous: Optional[float]) -> float:
+        """The interval to wait after a poll, given the interval waited before it, if any."""
+        if previous is None:
+            return self.initial_interval
+        upper = max(previous * self.growth, self.initial_interval)
+        return min(self.max_interval, random.uniform(self.initial_interval, upper))
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"PollPolicy(initial_interval={self.initial_interval}, max_interval={self.max_interval}, "
+            f"growth={self.growth})"
+        )
+
+
+def retry_after(client: Gradient | AsyncGradient, error: Exception) -> Optional[float]:
+    """The number of seconds to back off for if `error` is a transient API error, or `None` if it is not transient.
+
+    Returns `0.0` if the response did not say how long to wait.
+    """
+    if not isinstance(error, APIStatusError) or not client._should_retry(error.response):
+        return None
+    delay = client._parse_retry_after_header(error.response.headers)
+    return max(delay, 0.0) if delay is not None else 0.0
+
+
+class _Schedule:
+    """The deadline and the interval state of a single wait."""
+
+    def __init__(self, policy: PollPolicy, timeout: Optional[float]) -> None:
+        self.policy = policy
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.interval: Optional[float] = None
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def next_delay(self, requested: Optional[float] = None) -> float:
+        self.interval = self.policy.next_interval(self.interval)
+        delay = max(self.interval, requested or 0.0)
+        if self.deadline is not None:
+            # poll one last time right at the deadline rather than sleeping past it
+            delay = min(delay, max(self.deadline - time.monotonic(), 0.0))
+        return delay
+
+
+def poll_until(
+    fetch: Callable[[], _T],
+    is_done: Callable[[_T], bool],
+    *,
+    client: Gradient,
+    policy: PollPolicy,
+    timeout: Optional[float],
+    on_timeout: Callable[[Optional[_T]], Exception],
+    sleep: _Sleep,
+    cancel_event: Optional[threading.Event] = None,
+) -> _T:
+    """Call `fetch()` until `is_done()` returns `True` for its result and return that result.
+
+    `is_done()` should raise if the result is a failed terminal state. Once `timeout`
+    seconds have passed, the exception returned by `on_timeout()` for the latest
+    result is raised. Setting `cancel_event` interrupts the wait with a
+    `PollingCancelledError`; it is passed on to `sleep()`, which returns early once
+    the event is set.
+    """
+    schedule = _Schedule(policy, timeout)
+    last: Optional[_T] = None
+    while True:
+        if cancel_event is not None and cancel_event.is_set():
+            raise PollingCancelledError("Polling was cancelled")
+
+        requested: Optional[float] = None
+        try:
+            last = fetch()
+        except Exception as exc:
+            requested = retry_after(client, exc)
+            if requested is None or schedule.expired():
+                raise
+        else:
+            if is_done(last):
+                return last
+
+        if schedule.expired():
+            raise on_timeout(last)
+
+        delay = schedule.next_delay(requested)
+        if delay > 0:
+            # a cancellation during the sleep is raised at the top of the loop
+            sleep(delay, cancel_event)
+
+
+async def async_poll_until(
+    fetch: Callable[[], Awaitable[_T]],
+    is_done: Callable[[_T], bool],
+    *,
+    client: AsyncGradient,
+    policy: PollPolicy,
+    timeout: Optional[float],
+    on_timeout: Callable[[Optional[_T]], Exception],
+    sleep: Callable[[float], Awaitable[None]],
+) -> _T:
+    """Same as `poll_until()`; the wait is cancelled by cancelling the surrounding task."""
+    schedule = _Schedule(policy, timeout)
+    last: Optional[_T] = None
+    while True:
+        requested: Optional[float] = None
+        try:
+            last = await fetch()
+        except Exception as exc:
+            requested = retry_after(client, exc)
+            if requested is None or schedule.expired():
+                raise
+        else:
+            if is_done(last):
+                return last
+
+        if schedule.expired():
+            raise on_timeout(last)
+
+        delay = schedule.next_delay(requested)
+        if delay > 0:
+            await sleep(delay)
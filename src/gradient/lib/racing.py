@@ -0,0 +1,140 @@
+"""Race a chat completion against a hedged copy of itself.
+
+Used by `AsyncGradient.chat.completions.race()`. The primary request is sent
+right away; if it has not succeeded after `hedge_delay` seconds (or fails
+before that), the same prompt is sent to the hedge model. Whichever request
+succeeds first wins and the other one is cancelled, closing its connection.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Union, Optional, AsyncIterator, cast
+from functools import partial
+
+import anyio
+from anyio.abc import TaskGroup
+
+from .._streaming import AsyncStream
+from ..types.shared.chat_completion_chunk import ChatCompletionChunk
+from ..types.chat.completion_create_response import CompletionCreateResponse
+
+if TYPE_CHECKING:
+    from ..resources.chat.completions import AsyncCompletionsResource
+
+__all__ = ["race_completions"]
+
+_EMPTY = object()
+
+
+class _PrefetchedStream(AsyncStream[ChatCompletionChunk]):
+    """An `AsyncStream` that has already received its first chunk, which is yielded again on iteration."""
+
+    async def _prefetch(self) -> None:
+        iterator = self._iterator
+        try:
+            first: object = await iterator.__anext__()
+        except StopAsyncIteration:
+            first = _EMPTY
+        self._iterator = self._resume(first, iterator)
+
+    async def _resume(
+        self, first: object, iterator: AsyncIterator[ChatCompletionChunk]
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        if first is _EMPTY:
+            return
+        yield cast(ChatCompletionChunk, first)
+        async for chunk in iterator:
+            yield chunk
+
+
+class _Race:
+    def __init__(self, completions: AsyncCompletionsResource, *, stream: bool, params: dict[str, Any]) -> None:
+        self._completions = completions
+        self._stream = stream
+        self._params = params
+        self.winner: Union[CompletionCreateResponse, _PrefetchedStream, None] = None
+        self.primary_error: Optional[Exception] = None
+
+    async def _request(self, model: str) -> Union[CompletionCreateResponse, _PrefetchedStream]:
+        if not self._stream:
+            return cast(CompletionCreateResponse, await self._completions.create(model=model, **self._params))
+
+        raw = await self._completions.with_raw_response.create(model=model, stream=True, **self._params)
+        stream = _PrefetchedStream(
+            cast_to=ChatCompletionChunk, response=raw.http_response, client=self._completions._client
+        )
+        try:
+            await stream._prefetch()
+        except BaseException:
+            with anyio.CancelScope(shield=True):
+                await stream.close()
+            raise
+        return stream
+
+    async def attempt(
+        self,
+        model: str,
+        task_group: TaskGroup,
+        *,
+        start: Optional[anyio.Event],
+        hedge_delay: float,
+        failed: anyio.Event,
+    ) -> None:
+        if start is not None:
+            # the hedge is sent once the delay has passed or as soon as the primary request fails
+            with anyio.move_on_after(hedge_delay):
+                await start.wait()
+
+        try:
+            result = await self._request(model)
+        except Exception as exc:
+            if start is None:
+                self.primary_error = exc
+            failed.set()
+            return
+
+        if self.winner is not None:
+            # both requests finished in the same tick; the first one to get here wins
+            if isinstance(result, _PrefetchedStream):
+                with anyio.CancelScope(shield=True):
+                    await result.close()
+            return
+
+        self.winner = result
+        task_group.cancel_scope.cancel()
+
+
+async def race_completions(
+    completions: AsyncCompletionsResource,
+    *,
+    model: str,
+    hedge_model: str,
+    hedge_delay: float,
+    stream: bool,
+    params: dict[str, Any],
+) -> Union[CompletionCreateResponse, AsyncStream[ChatCompletionChunk]]:
+    if hedge_delay < 0:
+        raise ValueError(f"Expected `hedge_delay` to be at least 0 but received {hedge_delay}")
+
+    race = _Race(completions, stream=stream, params=params)
+    primary_failed = anyio.Event()
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(
+            partial(race.attempt, model, task_group, start=None, hedge_delay=hedge_delay, failed=primary_failed)
+        )
+        task_group.start_soon(
+            partial(
+                race.attempt,
+                hedge_model,
+                task_group,
+                start=primary_failed,
+                hedge_delay=hedge_delay,
+                failed=anyio.Event(),
+            )
+        )
+
+    if race.winner is None:
+        # both requests failed
+        assert race.primary_error is not None
+        raise race.primary_error
+    return race.winner
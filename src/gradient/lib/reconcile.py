@@ -0,0 +1,544 @@
+"""Bring an existing agent in line with a declarative config.
+
+Used by `agents.reconcile()`. The agent and, if the config has `routes`, its
+routes are fetched side by side, the config is compared with them locally, and
+only what differs is sent: one `update()` with just the changed fields, and one
+request per function, route or knowledge base that has to be created, changed or
+removed. Re-applying an unchanged config costs the two reads and nothing else.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Callable,
+    Iterable,
+    Optional,
+)
+from functools import partial
+from typing_extensions import Literal, Required, TypedDict, override
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+
+from .batch import AsyncBatch, run_batch
+from .._types import SequenceNotStr
+from .deployment import FunctionSpec
+from ..types.api_agent import APIAgent
+from ..types.api_retrieval_method import APIRetrievalMethod
+from ..types.api_deployment_visibility import APIDeploymentVisibility
+
+if TYPE_CHECKING:
+    from ..resources.agents.agents import AgentsResource, AsyncAgentsResource
+
+__all__ = ["AgentConfig", "RouteConfig", "ConfigChange", "ReconcilePlan"]
+
+ChangeKind = Literal["agent", "knowledge_base", "function", "route", "visibility"]
+
+ChangeAction = Literal["create", "update", "delete"]
+
+
+class RouteConfig(TypedDict, total=False):
+    child_agent_uuid: Required[str]
+
+    route_name: str
+
+    if_case: str
+
+
+class AgentConfig(TypedDict, total=False):
+    name: str
+
+    description: str
+
+    instruction: str
+
+    model_uuid: str
+
+    anthropic_key_uuid: str
+
+    openai_key_uuid: str
+
+    model_provider_key_uuid: str
+
+    project_id: str
+
+    tags: SequenceNotStr[str]
+
+    temperature: float
+
+    top_p: float
+
+    max_tokens: int
+
+    k: int
+
+    retrieval_method: APIRetrievalMethod
+
+    provide_citations: bool
+
+    conversation_logs_enabled: bool
+
+    agent_log_insights_enabled: bool
+
+    allowed_domains: SequenceNotStr[str]
+
+    knowledge_bases: SequenceNotStr[str]
+    """The ids of every knowledge base the agent should have attached."""
+
+    functions: Iterable[FunctionSpec]
+    """Every function the agent should have, identified by `function_name`."""
+
+    routes: Iterable[RouteConfig]
+    """Every agent the agent should route to, identified by `child_agent_uuid`."""
+
+    visibility: APIDeploymentVisibility
+
+
+def _model_uuid(agent: APIAgent) -> Optional[str]:
+    return agent.model.uuid if agent.model is not None else None
+
+
+def _anthropic_key_uuid(agent: APIAgent) -> Optional[str]:
+    return agent.anthropic_api_key.uuid if agent.anthropic_api_key is not None else None
+
+
+def _openai_key_uuid(agent: APIAgent) -> Optional[str]:
+    return agent.openai_api_key.uuid if agent.openai_api_key is not None else None
+
+
+def _model_provider_key_uuid(agent: APIAgent) -> Optional[str]:
+    return agent.api_model_provider_key.api_key_uuid if agent.api_model_provider_key is not None else None
+
+
+def _insights_enabled(agent: APIAgent) -> Optional[bool]:
+    return agent.logging_config.insights_enabled if agent.logging_config is not None else None
+
+
+def _allowed_domains(agent: APIAgent) -> Optional[List[str]]:
+    return agent.chatbot.allowed_domains if agent.chatbot is not None else None
+
+
+# how to read the current value of every `agents.update()` parameter from the retrieved agent
+_AGENT_FIELDS: Dict[str, Callable[[APIAgent], Any]] = {
+    "name": lambda agent: agent.name,
+    "description": lambda agent: agent.description,
+    "instruction": lambda agent: agent.instruction,
+    "model_uuid": _model_uuid,
+    "anthropic_key_uuid": _anthropic_key_uuid,
+    "openai_key_uuid": _openai_key_uuid,
+    "model_provider_key_uuid": _model_provider_key_uuid,
+    "project_id": lambda agent: agent.project_id,
+    "tags": lambda agent: agent.tags,
+    "temperature": lambda agent: agent.temperature,
+    "top_p": lambda agent: agent.top_p,
+    "max_tokens": lambda agent: agent.max_tokens,
+    "k": lambda agent: agent.k,
+    "retrieval_method": lambda agent: agent.retrieval_method,
+    "provide_citations": lambda agent: agent.provide_citations,
+    "conversation_logs_enabled": lambda agent: agent.conversation_logs_enabled,
+    "agent_log_insights_enabled": _insights_enabled,
+    "allowed_domains": _allowed_domains,
+}
+
+# order does not matter for these, e.g. tags that come back sorted are not a change
+_UNORDERED_FIELDS = {"tags", "allowed_domains"}
+
+_FUNCTION_FIELDS = ("description", "faas_name", "faas_namespace", "input_schema", "output_schema")
+
+_ROUTE_FIELDS = ("route_name", "if_case")
+
+
+def _same(field: str, current: Any, desired: Any) -> bool:
+    if isinstance(current, float) or isinstance(desired, float):
+        return current is not None and desired is not None and math.isclose(current, desired, rel_tol=1e-9)
+    if field in _UNORDERED_FIELDS and current is not None and desired is not None:
+        return sorted(current) == sorted(desired)
+    return bool(current == desired)
+
+
+def _changed_fields(
+    fields: Iterable[str], current: Callable[[str], Any], desired: Dict[str, Any]
+) -> Dict[str, Tuple[Any, Any]]:
+    return {
+        field: (current(field), desired[field])
+        for field in fields
+        if field in desired and not _same(field, current(field), desired[field])
+    }
+
+
+class ConfigChange:
+    """A single request a reconcile makes, or would make on a dry run."""
+
+    __slots__ = ("kind", "action", "target", "fields", "applied", "response", "error", "_call")
+
+    kind: ChangeKind
+
+    action: ChangeAction
+
+    target: Optional[str]
+    """The knowledge base id, function name or child agent id the change is about."""
+
+    fields: Dict[str, Tuple[Any, Any]]
+    """The current and the desired value of every field an update changes."""
+
+    applied: bool
+    """Whether the request was made and succeeded."""
+
+    response: Any
+
+    error: Optional[Exception]
+
+    def __init__(
+        self,
+        kind: ChangeKind,
+        action: ChangeAction,
+        target: Optional[str],
+        call: Callable[[Any], Any],
+        fields: Optional[Dict[str, Tuple[Any, Any]]] = None,
+    ) -> None:
+        self.kind = kind
+        self.action = action
+        self.target = target
+        self.fields = fields or {}
+        self.applied = False
+        self.response = None
+        self.error = None
+        # takes the (sync or async) agents resource and makes the request
+        self._call = call
+
+    @override
+    def __str__(self) -> str:
+        symbol = {"create": "+", "update": "~", "delete": "-"}[self.action]
+        line = f"{symbol} {self.kind.replace('_', ' ')}"
+        if self.target is not None:
+            line += f" {self.target}"
+        if self.fields:
+            line += ": " + ", ".join(f"{field} {old!r} -> {new!r}" for field, (old, new) in self.fields.items())
+        return line
+
+    @override
+    def __repr__(self) -> str:
+        return f"ConfigChange({str(self)!r}, applied={self.applied})"
+
+
+class ReconcilePlan:
+    """The changes that bring an agent in line with its config, and their outcome once applied."""
+
+    agent_uuid: str
+
+    changes: List[ConfigChange]
+
+    applied: bool
+    """Whether the changes were made, i.e. this was not a dry run."""
+
+    def __init__(self, agent_uuid: str, changes: List[ConfigChange], *, applied: bool = False) -> None:
+        self.agent_uuid = agent_uuid
+        self.changes = changes
+        self.applied = applied
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    @property
+    def ok(self) -> bool:
+        return all(change.error is None for change in self.changes)
+
+    @property
+    def failed(self) -> List[ConfigChange]:
+        return [change for change in self.changes if change.error is not None]
+
+    @override
+    def __str__(self) -> str:
+        if not self.changes:
+            return f"agent {self.agent_uuid}: no changes"
+        return "\n".join([f"agent {self.agent_uuid}: {len(self.changes)} change(s)"] + [f"  {c}" for c in self.changes])
+
+    @override
+    def __repr__(self) -> str:
+        return f"ReconcilePlan(agent_uuid={self.agent_uuid!r}, changes={len(self.changes)}, applied={self.applied})"
+
+
+def _update_agent(uuid: str, params: Dict[str, Any], agents: Any) -> Any:
+    return agents.update(uuid, body_uuid=uuid, **params)
+
+
+def _update_status(uuid: str, visibility: APIDeploymentVisibility, agents: Any) -> Any:
+    return agents.update_status(uuid, body_uuid=uuid, visibility=visibility)
+
+
+def _attach(uuid: str, knowledge_base_uuid: str, agents: Any) -> Any:
+    return agents.knowledge_bases.attach_single(knowledge_base_uuid, agent_uuid=uuid)
+
+
+def _detach(uuid: str, knowledge_base_uuid: str, agents: Any) -> Any:
+    return agents.knowledge_bases.detach(knowledge_base_uuid, agent_uuid=uuid)
+
+
+def _create_function(uuid: str, function: FunctionSpec, agents: Any) -> Any:
+    return agents.functions.create(uuid, body_agent_uuid=uuid, **function)
+
+
+def _update_function(uuid: str, function_uuid: str, function: FunctionSpec, agents: Any) -> Any:
+    # only the keys given in the config's `FunctionSpec` are sent, the others keep their current values
+    return agents.functions.update(
+        function_uuid, path_agent_uuid=uuid, body_agent_uuid=uuid, body_function_uuid=function_uuid, **function
+    )
+
+
+def _delete_function(uuid: str, function_uuid: str, agents: Any) -> Any:
+    return agents.functions.delete(function_uuid, agent_uuid=uuid)
+
+
+def _route_options(route: RouteConfig) -> Dict[str, Any]:
+    return {key: value for key, value in route.items() if key != "child_agent_uuid"}
+
+
+def _add_route(uuid: str, route: RouteConfig, agents: Any) -> Any:
+    child = route["child_agent_uuid"]
+    return agents.routes.add(
+        child,
+        path_parent_agent_uuid=uuid,
+        body_child_agent_uuid=child,
+        body_parent_agent_uuid=uuid,
+        **_route_options(route),
+    )
+
+
+def _update_route(uuid: str, route_uuid: Optional[str], route: RouteConfig, agents: Any) -> Any:
+    child = route["child_agent_uuid"]
+    options = _route_options(route)
+    if route_uuid is not None:
+        options["uuid"] = route_uuid
+    return agents.routes.update(
+        child, path_parent_agent_uuid=uuid, body_child_agent_uuid=child, body_parent_agent_uuid=uuid, **options
+    )
+
+
+def _delete_route(uuid: str, child_agent_uuid: str, agents: Any) -> Any:
+    return agents.routes.delete(child_agent_uuid, parent_agent_uuid=uuid)
+
+
+def _plan(
+    uuid: str, config: AgentConfig, agent: APIAgent, children: Optional[List[APIAgent]], *, prune: bool
+) -> List[ConfigChange]:
+    desired: Dict[str, Any] = dict(config)
+    changes: List[ConfigChange] = []
+
+    fields = _changed_fields(_AGENT_FIELDS, lambda field: _AGENT_FIELDS[field](agent), desired)
+    if fields:
+        params = {field: new for field, (_, new) in fields.items()}
+        changes.append(ConfigChange("agent", "update", None, partial(_update_agent, uuid, params), fields))
+
+    if "knowledge_bases" in config:
+        attached = [knowledge_base.uuid for knowledge_base in agent.knowledge_bases or [] if knowledge_base.uuid]
+        wanted = list(dict.fromkeys(config["knowledge_bases"]))
+        for knowledge_base_uuid in wanted:
+            if knowledge_base_uuid not in attached:
+                changes.append(
+                    ConfigChange(
+                        "knowledge_base", "create", knowledge_base_uuid, partial(_attach, uuid, knowledge_base_uuid)
+                    )
+                )
+        if prune:
+            for knowledge_base_uuid in attached:
+                if knowledge_base_uuid not in wanted:
+                    changes.append(
+                        ConfigChange(
+                            "knowledge_base", "delete", knowledge_base_uuid, partial(_detach, uuid, knowledge_base_uuid)
+                        )
+                    )
+
+    if "functions" in config:
+        current = {function.name: function for function in reversed(agent.functions or []) if function.name}
+        wanted_functions: Dict[str, FunctionSpec] = {}
+        for function in config["functions"]:
+            function_name = function.get("function_name")
+            if not function_name:
+                raise ValueError("Expected every function in the config to have a non-empty `function_name`")
+            wanted_functions[function_name] = function
+
+        for function_name, function in wanted_functions.items():
+            existing = current.get(function_name)
+            if existing is None or existing.uuid is None:
+                changes.append(
+                    ConfigChange("function", "create", function_name, partial(_create_function, uuid, function))
+                )
+                continue
+            fields = _changed_fields(_FUNCTION_FIELDS, partial(getattr, existing), dict(function))
+            if fields:
+                changes.append(
+                    ConfigChange(
+                        "function",
+                        "update",
+                        function_name,
+                        partial(_update_function, uuid, existing.uuid, function),
+                        fields,
+                    )
+                )
+        if prune:
+            for existing_function in agent.functions or []:
+                if not existing_function.uuid:
+                    continue
+                # duplicates of a wanted function are removed as well, keeping the one compared above
+                name = existing_function.name
+                kept = name in wanted_functions and current.get(name) is existing_function
+                if not kept:
+                    changes.append(
+                        ConfigChange(
+                            "function", "delete", name, partial(_delete_function, uuid, existing_function.uuid)
+                        )
+                    )
+
+    if "routes" in config:
+        assert children is not None
+        routed = {child.uuid: child for child in children if child.uuid}
+        wanted_routes: Dict[str, RouteConfig] = {}
+        for route in config["routes"]:
+            child_agent_uuid = route.get("child_agent_uuid")
+            if not child_agent_uuid:
+                raise ValueError("Expected every route in the config to have a non-empty `child_agent_uuid`")
+            wanted_routes[child_agent_uuid] = route
+
+        for child_agent_uuid, route in wanted_routes.items():
+            child = routed.get(child_agent_uuid)
+            if child is None:
+                changes.append(ConfigChange("route", "create", child_agent_uuid, partial(_add_route, uuid, route)))
+                continue
+            fields = _changed_fields(_ROUTE_FIELDS, partial(getattr, child), dict(route))
+            if fields:
+                changes.append(
+                    ConfigChange(
+                        "route",
+                        "update",
+                        child_agent_uuid,
+                        partial(_update_route, uuid, child.route_uuid, route),
+                        fields,
+                    )
+                )
+        if prune:
+            for child_agent_uuid in routed:
+                if child_agent_uuid not in wanted_routes:
+                    changes.append(
+                        ConfigChange(
+                            "route", "delete", child_agent_uuid, partial(_delete_route, uuid, child_agent_uuid)
+                        )
+                    )
+
+    if "visibility" in config:
+        current_visibility = agent.deployment.visibility if agent.deployment is not None else None
+        if current_visibility != config["visibility"]:
+            changes.append(
+                ConfigChange(
+                    "visibility",
+                    "update",
+                    None,
+                    partial(_update_status, uuid, config["visibility"]),
+                    {"visibility": (current_visibility, config["visibility"])},
+                )
+            )
+
+    return changes
+
+
+def _validate(uuid: str, concurrency: int) -> None:
+    if not uuid:
+        raise ValueError(f"Expected a non-empty value for `uuid` but received {uuid!r}")
+    if concurrency < 1:
+        raise ValueError(f"Expected `concurrency` to be at least 1 but received {concurrency}")
+
+
+def _apply_change(agents: Any, change: ConfigChange) -> Any:
+    return change._call(agents)
+
+
+def _record(change: ConfigChange, response: Any, error: Optional[Exception]) -> None:
+    change.response = response
+    change.error = error
+    change.applied = error is None
+
+
+def _agent_of(response: Any) -> APIAgent:
+    return response.agent if response.agent is not None else APIAgent()
+
+
+def reconcile(
+    agents: AgentsResource,
+    uuid: str,
+    config: AgentConfig,
+    *,
+    prune: bool,
+    dry_run: bool,
+    concurrency: int,
+) -> ReconcilePlan:
+    _validate(uuid, concurrency)
+
+    children: Optional[List[APIAgent]] = None
+    if "routes" in config:
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="gradient-reconcile") as pool:
+            agent_future = pool.submit(agents.retrieve, uuid)
+            routes_future = pool.submit(agents.routes.view, uuid)
+            agent = _agent_of(agent_future.result())
+            children = routes_future.result().children or []
+    else:
+        agent = _agent_of(agents.retrieve(uuid))
+
+    plan = ReconcilePlan(uuid, _plan(uuid, config, agent, children, prune=prune))
+    if dry_run or not plan:
+        return plan
+
+    requests = [{"change": change} for change in plan.changes]
+    call = partial(_apply_change, agents)
+    for result in run_batch(call, requests, concurrency=concurrency, ordered=True, checkpoint=None):
+        _record(plan.changes[result.index], result.response, result.error)
+    plan.applied = True
+    return plan
+
+
+async def async_reconcile(
+    agents: AsyncAgentsResource,
+    uuid: str,
+    config: AgentConfig,
+    *,
+    prune: bool,
+    dry_run: bool,
+    concurrency: int,
+) -> ReconcilePlan:
+    _validate(uuid, concurrency)
+
+    fetched: Dict[str, Any] = {}
+
+    async def fetch(key: str, request: Callable[[str], Any]) -> None:
+        fetched[key] = await request(uuid)
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(fetch, "agent", agents.retrieve)
+        if "routes" in config:
+            task_group.start_soon(fetch, "routes", agents.routes.view)
+
+    agent = _agent_of(fetched["agent"])
+    children: Optional[List[APIAgent]] = fetched["routes"].children or [] if "routes" in fetched else None
+
+    plan = ReconcilePlan(uuid, _plan(uuid, config, agent, children, prune=prune))
+    if dry_run or not plan:
+        return plan
+
+    requests = [{"change": change} for change in plan.changes]
+    call = partial(_async_apply_change, agents)
+    async with AsyncBatch(call, requests, concurrency=concurrency, ordered=True, checkpoint=None) as results:
+        async for result in results:
+            _record(plan.changes[result.index], result.response, result.error)
+    plan.applied = True
+    return plan
+
+
+async def _async_apply_change(agents: Any, change: ConfigChange) -> Any:
+    return await change._call(agents)
@@ -0,0 +1,240 @@
+"""Run many knowledge base retrievals at once.
+
+Used by `retrieve.documents_batch()` and `retrieve.documents_fanout()`. Identical
+queries are only sent once, the distinct ones run concurrently under a limit, and
+the results are returned in input order. A fan-out sends one query to several
+knowledge bases and merges their results into a single ranking.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Mapping, Iterable, Optional, Sequence
+from typing_extensions import override
+
+from .batch import AsyncBatch, BatchResult, run_batch, _request_hash
+from ..types.retrieve_documents_response import Result, RetrieveDocumentsResponse
+
+if TYPE_CHECKING:
+    from ..resources.retrieve import RetrieveResource, AsyncRetrieveResource
+
+__all__ = ["RetrievedDocument", "FanoutResult"]
+
+# the constant of reciprocal rank fusion, which keeps the top ranks of different lists from dominating
+_RRF_K = 60
+
+
+class RetrievedDocument:
+    """A document chunk in a merged ranking."""
+
+    __slots__ = ("knowledge_base_id", "rank", "score", "result")
+
+    knowledge_base_id: str
+    """The knowledge base the chunk was retrieved from."""
+
+    rank: int
+    """The position of the chunk in the results of its own knowledge base, starting at 0."""
+
+    score: float
+    """The score the ranking is sorted by, higher is better."""
+
+    result: Result
+
+    def __init__(self, knowledge_base_id: str, rank: int, score: float, result: Result) -> None:
+        self.knowledge_base_id = knowledge_base_id
+        self.rank = rank
+        self.score = score
+        self.result = result
+
+    @property
+    def text_content(self) -> str:
+        return self.result.text_content
+
+    @property
+    def metadata(self) -> Dict[str, object]:
+        return self.result.metadata
+
+    @override
+    def __repr__(self) -> str:
+        return f"RetrievedDocument(knowledge_base_id={self.knowledge_base_id!r}, rank={self.rank}, score={self.score})"
+
+
+class FanoutResult:
+    """The merged results of a query sent to several knowledge bases."""
+
+    documents: List[RetrievedDocument]
+    """The best `num_results` chunks across all knowledge bases, best first."""
+
+    responses: Dict[str, RetrieveDocumentsResponse]
+    """The response of every knowledge base that answered."""
+
+    errors: Dict[str, Exception]
+    """The exception of every knowledge base that failed after all retries."""
+
+    def __init__(
+        self,
+        documents: List[RetrievedDocument],
+        responses: Dict[str, RetrieveDocumentsResponse],
+        errors: Dict[str, Exception],
+    ) -> None:
+        self.documents = documents
+        self.responses = responses
+        self.errors = errors
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @override
+    def __repr__(self) -> str:
+        return f"FanoutResult(documents={len(self.documents)}, errors={sorted(self.errors)})"
+
+
+def _dedupe(queries: Iterable[Mapping[str, Any]]) -> Tuple[List[Mapping[str, Any]], List[Mapping[str, Any]], List[int]]:
+    """Returns the queries, the distinct queries and, for every query, the index of its distinct query."""
+    queries = list(queries)
+    distinct: List[Mapping[str, Any]] = []
+    positions: Dict[str, int] = {}
+    mapping: List[int] = []
+    for query in queries:
+        key = _request_hash(query)
+        if key not in positions:
+            positions[key] = len(distinct)
+            distinct.append(query)
+        mapping.append(positions[key])
+    return queries, distinct, mapping
+
+
+def _align(
+    queries: List[Mapping[str, Any]],
+    mapping: List[int],
+    results: Dict[int, BatchResult[RetrieveDocumentsResponse]],
+) -> List[BatchResult[RetrieveDocumentsResponse]]:
+    aligned: List[BatchResult[RetrieveDocumentsResponse]] = []
+    for index, (query, position) in enumerate(zip(queries, mapping)):
+        result = results[position]
+        aligned.append(BatchResult(index, query, response=result.response, error=result.error))
+    return aligned
+
+
+def documents_batch(
+    retrieve: RetrieveResource, queries: Iterable[Mapping[str, Any]], *, concurrency: int
+) -> List[BatchResult[RetrieveDocumentsResponse]]:
+    queries, distinct, mapping = _dedupe(queries)
+    results = {
+        result.index: result
+        for result in run_batch(retrieve.documents, distinct, concurrency=concurrency, ordered=False, checkpoint=None)
+    }
+    return _align(queries, mapping, results)
+
+
+async def async_documents_batch(
+    retrieve: AsyncRetrieveResource, queries: Iterable[Mapping[str, Any]], *, concurrency: int
+) -> List[BatchResult[RetrieveDocumentsResponse]]:
+    queries, distinct, mapping = _dedupe(queries)
+    results: Dict[int, BatchResult[RetrieveDocumentsResponse]] = {}
+    async with AsyncBatch(
+        retrieve.documents, distinct, concurrency=concurrency, ordered=False, checkpoint=None
+    ) as batch:
+        async for result in batch:
+            results[result.index] = result
+    return _align(queries, mapping, results)
+
+
+def _fanout_queries(knowledge_base_ids: Sequence[str], params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if not knowledge_base_ids:
+        raise ValueError("Expected at least one knowledge base")
+    return [
+        {"knowledge_base_id": knowledge_base_id, **params} for knowledge_base_id in dict.fromkeys(knowledge_base_ids)
+    ]
+
+
+def _score(result: Result, score_key: str) -> Optional[float]:
+    score = result.metadata.get(score_key)
+    if isinstance(score, (int, float)) and not isinstance(score, bool):
+        return float(score)
+    return None
+
+
+def merge_results(
+    responses: Mapping[str, RetrieveDocumentsResponse], *, num_results: int, score_key: str
+) -> List[RetrievedDocument]:
+    """Merge the results of several knowledge bases into one ranking.
+
+    When every result carries a numeric score in `metadata[score_key]` the results
+    are sorted by it; otherwise, since scores are not comparable, the ranks of the
+    results in their own knowledge base are combined with reciprocal rank fusion.
+    Chunks with identical text are only kept once, at their best position.
+    """
+    scored = [
+        (knowledge_base_id, rank, result)
+        for knowledge_base_id, response in responses.items()
+        for rank, result in enumerate(response.results)
+    ]
+    scores = [_score(result, score_key) for _, _, result in scored]
+    use_scores = all(score is not None for score in scores)
+
+    documents = [
+        RetrievedDocument(
+            knowledge_base_id,
+            rank,
+            score if use_scores and score is not None else 1.0 / (_RRF_K + rank + 1),
+            result,
+        )
+        for (knowledge_base_id, rank, result), score in zip(scored, scores)
+    ]
+    documents.sort(key=lambda document: document.score, reverse=True)
+
+    merged: List[RetrievedDocument] = []
+    seen: set[str] = set()
+    for document in documents:
+        if document.text_content in seen:
+            continue
+        seen.add(document.text_content)
+        merged.append(document)
+        if len(merged) == num_results:
+            break
+    return merged
+
+
+def _fanout_result(
+    results: List[BatchResult[RetrieveDocumentsResponse]], *, num_results: int, score_key: str
+) -> FanoutResult:
+    responses: Dict[str, RetrieveDocumentsResponse] = {}
+    errors: Dict[str, Exception] = {}
+    for result in results:
+        knowledge_base_id = result.request["knowledge_base_id"]
+        if result.error is not None:
+            errors[knowledge_base_id] = result.error
+        else:
+            assert result.response is not None
+            responses[knowledge_base_id] = result.response
+
+    if not responses:
+        raise next(iter(errors.values()))
+    return FanoutResult(merge_results(responses, num_results=num_results, score_key=score_key), responses, errors)
+
+
+def documents_fanout(
+    retrieve: RetrieveResource,
+    knowledge_base_ids: Sequence[str],
+    *,
+    params: Dict[str, Any],
+    concurrency: int,
+    score_key: str,
+) -> FanoutResult:
+    results = documents_batch(retrieve, _fanout_queries(knowledge_base_ids, params), concurrency=concurrency)
+    return _fanout_result(results, num_results=params["num_results"], score_key=score_key)
+
+
+async def async_documents_fanout(
+    retrieve: AsyncRetrieveResource,
+    knowledge_base_ids: Sequence[str],
+    *,
+    params: Dict[str, Any],
+    concurrency: int,
+    score_key: str,
+) -> FanoutResult:
+    results = await async_documents_batch(
+        retrieve, _fanout_queries(knowledge_base_ids, params), concurrency=concurrency
+    )
+    return _fanout_result(results, num_results=params["num_results"], score_key=score_key)
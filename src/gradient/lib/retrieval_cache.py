@@ -0,0 +1,284 @@
+"""An LRU + TTL cache for knowledge base retrievals.
+
+Used by `retrieve.with_cache()`. Entries are keyed on the knowledge base, the
+query, `alpha`, `num_results` and the filters, normalized so that the order of
+conditions does not matter. Every cache is invalidated for a knowledge base as
+soon as the client observes a newly succeeded indexing job for it, through
+`knowledge_bases.indexing_jobs.retrieve()` or `wait_for_completion()`, so
+entries can be kept for a long time without serving results from before a
+reindex.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import weakref
+import threading
+from typing import TYPE_CHECKING, Set, Dict, Tuple, Optional
+from collections import OrderedDict
+
+import httpx
+
+from .._types import Body, Omit, Query, Headers, NotGiven, omit, not_given
+from .._utils import is_dict, is_list, is_tuple
+from ..types.retrieve_documents_params import Filters
+from ..types.retrieve_documents_response import RetrieveDocumentsResponse
+from ..types.knowledge_bases.api_indexing_job import APIIndexingJob
+
+if TYPE_CHECKING:
+    from ..resources.retrieve import RetrieveResource, AsyncRetrieveResource
+
+__all__ = ["RetrievalCache", "CachedRetrieve", "AsyncCachedRetrieve"]
+
+_SUCCEEDED = "BATCH_JOB_PHASE_SUCCEEDED"
+
+# the number of succeeded indexing jobs remembered per cache, so that polling a job again does not invalidate again
+_SEEN_JOBS = 1024
+
+_caches: weakref.WeakSet[RetrievalCache] = weakref.WeakSet()
+_caches_lock = threading.Lock()
+
+
+class RetrievalCache:
+    """Configuration and storage for `retrieve.with_cache()`.
+
+    Cached responses are shared between callers and must not be modified.
+
+    Args:
+      max_entries: The maximum number of responses to keep; the least recently used are evicted first.
+
+      ttl: How long entries stay valid, in seconds. `None` keeps them until evicted or invalidated.
+    """
+
+    max_entries: int
+    ttl: Optional[float]
+
+    hits: int
+    misses: int
+
+    def __init__(self, *, max_entries: int = 4096, ttl: Optional[float] = 3600.0) -> None:
+        if max_entries < 1:
+            raise ValueError(f"Expected `max_entries` to be at least 1 but received {max_entries}")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Tuple[str, RetrieveDocumentsResponse, Optional[float]]] = OrderedDict()
+        self._keys: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self._seen_jobs: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+
+        with _caches_lock:
+            _caches.add(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self, knowledge_base_id: str) -> None:
+        """Drop every entry of a knowledge base."""
+        with self._lock:
+            self._generations[knowledge_base_id] = self._generations.get(knowledge_base_id, 0) + 1
+            for key in self._keys.pop(knowledge_base_id, ()):
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            for knowledge_base_id in self._keys:
+                self._generations[knowledge_base_id] = self._generations.get(knowledge_base_id, 0) + 1
+            self._entries.clear()
+            self._keys.clear()
+
+    def _lookup(self, key: str) -> Tuple[Optional[RetrieveDocumentsResponse], int]:
+        """Returns the cached response, if any, and the generation to pass to `_store()` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                _, response, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return response, 0
+                self._remove(key)
+
+            self.misses += 1
+            return None, self._generations.get(_knowledge_base_of(key), 0)
+
+    def _store(self, key: str, response: RetrieveDocumentsResponse, generation: int) -> None:
+        knowledge_base_id = _knowledge_base_of(key)
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if self._generations.get(knowledge_base_id, 0) != generation:
+                # the knowledge base was invalidated while the request was in flight
+                return
+
+            self._remove(key)
+            self._entries[key] = (knowledge_base_id, response, expires_at)
+            self._keys.setdefault(knowledge_base_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys.get(entry[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys[entry[0]]
+
+    def _job_succeeded(self, knowledge_base_id: str, job_uuid: str) -> None:
+        with self._lock:
+            if job_uuid in self._seen_jobs:
+                return
+            self._seen_jobs[job_uuid] = None
+            if len(self._seen_jobs) > _SEEN_JOBS:
+                self._seen_jobs.popitem(last=False)
+        self.invalidate(knowledge_base_id)
+
+
+def observe_indexing_job(job: Optional[APIIndexingJob]) -> None:
+    """Invalidate the knowledge base of `job` in every cache if the job succeeded and had not been seen before."""
+    if job is None or job.phase != _SUCCEEDED or not job.knowledge_base_uuid or not job.uuid:
+        return
+    with _caches_lock:
+        caches = list(_caches)
+    for cache in caches:
+        cache._job_succeeded(job.knowledge_base_uuid, job.uuid)
+
+
+def _normalize(value: object) -> object:
+    if is_dict(value):
+        return {key: _normalize(item) for key, item in value.items()}
+    if is_list(value) or is_tuple(value):
+        # conditions and `in` / `not_in` values are sets, so their order must not change the key
+        items = [_normalize(item) for item in value]
+        return sorted(items, key=lambda item: json.dumps(item, sort_keys=True, default=str))
+    return value
+
+
+def _cache_key(
+    knowledge_base_id: str,
+    *,
+    num_results: int,
+    query: str,
+    alpha: float | Omit,
+    filters: Filters | Omit,
+    extra_query: Query | None,
+    extra_body: Body | None,
+) -> str:
+    params = {
+        "num_results": num_results,
+        "query": query,
+        "alpha": None if isinstance(alpha, Omit) else alpha,
+        "filters": None if isinstance(filters, Omit) else _normalize(filters),
+        "extra_query": extra_query,
+        "extra_body": extra_body,
+    }
+    # the knowledge base comes first so that it can be read back from the key
+    return f"{knowledge_base_id}\n{json.dumps(params, sort_keys=True, separators=(',', ':'), default=str)}"
+
+
+def _knowledge_base_of(key: str) -> str:
+    return key.partition("\n")[0]
+
+
+class CachedRetrieve:
+    """`retrieve` with responses served from a `RetrievalCache` where possible."""
+
+    def __init__(self, retrieve: RetrieveResource, cache: RetrievalCache) -> None:
+        self._retrieve = retrieve
+        self.cache = cache
+
+    def documents(
+        self,
+        knowledge_base_id: str,
+        *,
+        num_results: int,
+        query: str,
+        alpha: float | Omit = omit,
+        filters: Filters | Omit = omit,
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        timeout: float | httpx.Timeout | None | NotGiven = not_given,
+    ) -> RetrieveDocumentsResponse:
+        """Same as `retrieve.documents()`, answering repeated queries from the cache."""
+        key = _cache_key(
+            knowledge_base_id,
+            num_results=num_results,
+            query=query,
+            alpha=alpha,
+            filters=filters,
+            extra_query=extra_query,
+            extra_body=extra_body,
+        )
+        cached, generation = self.cache._lookup(key)
+        if cached is not None:
+            return cached
+
+        response = self._retrieve.documents(
+            knowledge_base_id,
+            num_results=num_results,
+            query=query,
+            alpha=alpha,
+            filters=filters,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout,
+        )
+        self.cache._store(key, response, generation)
+        return response
+
+
+class AsyncCachedRetrieve:
+    """`retrieve` with responses served from a `RetrievalCache` where possible."""
+
+    def __init__(self, retrieve: AsyncRetrieveResource, cache: RetrievalCache) -> None:
+        self._retrieve = retrieve
+        self.cache = cache
+
+    async def documents(
+        self,
+        knowledge_base_id: str,
+        *,
+        num_results: int,
+        query: str,
+        alpha: float | Omit = omit,
+        filters: Filters | Omit = omit,
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        timeout: float | httpx.Timeout | None | NotGiven = not_given,
+    ) -> RetrieveDocumentsResponse:
+        """Same as `retrieve.documents()`, answering repeated queries from the cache."""
+        key = _cache_key(
+            knowledge_base_id,
+            num_results=num_results,
+            query=query,
+            alpha=alpha,
+            filters=filters,
+            extra_query=extra_query,
+            extra_body=extra_body,
+        )
+        cached, generation = self.cache._lookup(key)
+        if cached is not None:
+            return cached
+
+        response = await self._retrieve.documents(
+            knowledge_base_id,
+            num_results=num_results,
+            query=query,
+            alpha=alpha,
+            filters=filters,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout,
+        )
+        self.cache._store(key, response, generation)
+        return response
@@ -0,0 +1,317 @@
+"""Route chat completions to the fastest healthy model out of a set of candidates.
+
+Used by `chat.completions.with_router()`. The router keeps an exponentially
+weighted moving average (EWMA) of the latency and error rate of every model and
+tries the candidates from fastest to slowest, skipping models whose error rate
+is too high until they have had time to recover. When a model fails with a
+server error, a timeout or a connection error the next candidate is tried right
+away instead of waiting for the client's retries against the failing model.
+"""
+
+from __future__ import annotations
+
+import time
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Union, Iterable, Optional, Sequence, cast, overload
+from typing_extensions import Literal, override
+
+from .._streaming import Stream, AsyncStream
+from .._exceptions import APIStatusError, APIConnectionError
+from ..types.shared.chat_completion_chunk import ChatCompletionChunk
+from ..types.chat.completion_create_response import CompletionCreateResponse
+
+if TYPE_CHECKING:
+    from ..resources.chat.completions import CompletionsResource, AsyncCompletionsResource
+
+__all__ = ["ModelStats", "ModelRouter", "RoutedCompletions", "AsyncRoutedCompletions"]
+
+
+class ModelStats:
+    """A snapshot of the routing statistics of a single model."""
+
+    __slots__ = ("model", "latency", "error_rate", "requests", "failures", "healthy")
+
+    model: str
+
+    latency: Optional[float]
+    """The moving average of the latency of successful requests in seconds, `None` until one succeeded.
+
+    For streaming requests this is the time until the response headers arrived.
+    """
+
+    error_rate: float
+    """The moving average of the fraction of requests that failed, between 0 and 1."""
+
+    requests: int
+    failures: int
+
+    healthy: bool
+    """Whether the model is currently considered healthy enough to be preferred."""
+
+    def __init__(
+        self,
+        model: str,
+        *,
+        latency: Optional[float],
+        error_rate: float,
+        requests: int,
+        failures: int,
+        healthy: bool,
+    ) -> None:
+        self.model = model
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = requests
+        self.failures = failures
+        self.healthy = healthy
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @override
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"ModelStats({fields})"
+
+
+class _ModelState:
+    __slots__ = ("latency", "error_rate", "requests", "failures", "last_failure")
+
+    def __init__(self) -> None:
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.last_failure: Optional[float] = None
+
+
+class ModelRouter:
+    """Tracks per-model latency and error rates and decides which model to try first.
+
+    A router can be shared between threads and between sync and async clients.
+
+    ```py
+    router = ModelRouter(["llama3.3-70b-instruct", "llama3-8b-instruct"])
+    completions = client.chat.completions.with_router(router)
+    completion = completions.create(messages=[{"role": "user", "content": "Hi!"}])
+    print(completion.model, router.stats())
+    ```
+    """
+
+    def __init__(
+        self,
+        models: Sequence[str],
+        *,
+        alpha: float = 0.2,
+        max_error_rate: float = 0.5,
+        cooldown: float = 30.0,
+    ) -> None:
+        """
+        Args:
+          models: The candidate models. Models that were never tried are tried before the
+              models whose latency is known.
+
+          alpha: The weight of the newest observation in the moving averages.
+
+          max_error_rate: Models whose error rate reaches this value are unhealthy and only
+              tried after all healthy models.
+
+          cooldown: Seconds after its last failure until an unhealthy model is tried first
+              again if it is the fastest.
+        """
+        if not models:
+            raise ValueError("Expected at least one model")
+        if not 0 < alpha <= 1:
+            raise ValueError(f"Expected `alpha` to be in (0, 1] but received {alpha}")
+
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self._models = list(dict.fromkeys(models))
+        self._states = {model: _ModelState() for model in self._models}
+        self._lock = threading.Lock()
+
+    @property
+    def models(self) -> List[str]:
+        return list(self._models)
+
+    def _is_healthy(self, state: _ModelState, now: float) -> bool:
+        if state.error_rate < self.max_error_rate:
+            return True
+        return state.last_failure is not None and now - state.last_failure >= self.cooldown
+
+    def candidates(self) -> List[str]:
+        """The models in the order they should be tried in: healthy models from fastest to slowest first."""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [model for model in self._models if self._is_healthy(self._states[model], now)]
+            unhealthy = [model for model in self._models if model not in healthy]
+            healthy.sort(key=lambda model: _expected_latency(self._states[model]))
+            unhealthy.sort(key=lambda model: self._states[model].last_failure or 0.0)
+        return healthy + unhealthy
+
+    def record_success(self, model: str, latency: float) -> None:
+        with self._lock:
+            state = self._states[model]
+            state.requests += 1
+            state.latency = latency if state.latency is None else _ewma(state.latency, latency, self.alpha)
+            state.error_rate = _ewma(state.error_rate, 0.0, self.alpha)
+
+    def record_failure(self, model: str) -> None:
+        with self._lock:
+            state = self._states[model]
+            state.requests += 1
+            state.failures += 1
+            state.error_rate = _ewma(state.error_rate, 1.0, self.alpha)
+            state.last_failure = time.monotonic()
+
+    def stats(self) -> List[ModelStats]:
+        """A snapshot of the statistics of every model, in the order they would currently be tried."""
+        order = self.candidates()
+        now = time.monotonic()
+        with self._lock:
+            return [
+                ModelStats(
+                    model,
+                    latency=state.latency,
+                    error_rate=state.error_rate,
+                    requests=state.requests,
+                    failures=state.failures,
+                    healthy=self._is_healthy(state, now),
+                )
+                for model, state in ((model, self._states[model]) for model in order)
+            ]
+
+
+def _expected_latency(state: _ModelState) -> float:
+    if state.latency is None:
+        # models that were never tried are explored first, models that only ever failed go last
+        return 0.0 if state.requests == 0 else float("inf")
+    return state.latency
+
+
+def _ewma(average: float, value: float, alpha: float) -> float:
+    return alpha * value + (1 - alpha) * average
+
+
+def _should_fall_back(error: Exception) -> bool:
+    if isinstance(error, APIStatusError):
+        return error.status_code >= 500
+    return isinstance(error, APIConnectionError)
+
+
+def _check_params(params: Dict[str, Any]) -> None:
+    if "model" in params:
+        raise TypeError("The model is chosen by the router and must not be passed to `create()`")
+
+
+class RoutedCompletions:
+    """A view of `chat.completions` whose `create()` picks the model, see `chat.completions.with_router()`."""
+
+    def __init__(self, completions: CompletionsResource, router: ModelRouter) -> None:
+        self.router = router
+        self._completions = completions
+        # fall back to the next model instead of retrying the failing one; only the last candidate is retried
+        self._no_retries = completions._client.with_options(max_retries=0).chat.completions
+
+    @overload
+    def create(
+        self, *, messages: Iterable[Any], stream: Literal[False] = ..., **params: Any
+    ) -> CompletionCreateResponse: ...
+
+    @overload
+    def create(
+        self, *, messages: Iterable[Any], stream: Literal[True], **params: Any
+    ) -> Stream[ChatCompletionChunk]: ...
+
+    @overload
+    def create(
+        self, *, messages: Iterable[Any], stream: bool, **params: Any
+    ) -> Union[CompletionCreateResponse, Stream[ChatCompletionChunk]]: ...
+
+    def create(
+        self, *, messages: Iterable[Any], **params: Any
+    ) -> Union[CompletionCreateResponse, Stream[ChatCompletionChunk]]:
+        """Call `chat.completions.create()` with the first model that does not fail with a server error.
+
+        Accepts the same arguments as `create()` except for `model`; the model that
+        served the request is available as the response's `model`.
+        """
+        _check_params(params)
+        messages = list(messages)
+        candidates = self.router.candidates()
+        for index, model in enumerate(candidates):
+            completions = self._completions if index == len(candidates) - 1 else self._no_retries
+            started = time.monotonic()
+            try:
+                response = cast(
+                    "CompletionCreateResponse | Stream[ChatCompletionChunk]",
+                    completions.create(messages=messages, model=model, **params),
+                )
+            except Exception as exc:
+                if not _should_fall_back(exc):
+                    raise
+                self.router.record_failure(model)
+                if index == len(candidates) - 1:
+                    raise
+                continue
+            self.router.record_success(model, time.monotonic() - started)
+            return response
+
+        raise AssertionError("unreachable")
+
+
+class AsyncRoutedCompletions:
+    """A view of `chat.completions` whose `create()` picks the model, see `chat.completions.with_router()`."""
+
+    def __init__(self, completions: AsyncCompletionsResource, router: ModelRouter) -> None:
+        self.router = router
+        self._completions = completions
+        # fall back to the next model instead of retrying the failing one; only the last candidate is retried
+        self._no_retries = completions._client.with_options(max_retries=0).chat.completions
+
+    @overload
+    async def create(
+        self, *, messages: Iterable[Any], stream: Literal[False] = ..., **params: Any
+    ) -> CompletionCreateResponse: ...
+
+    @overload
+    async def create(
+        self, *, messages: Iterable[Any], stream: Literal[True], **params: Any
+    ) -> AsyncStream[ChatCompletionChunk]: ...
+
+    @overload
+    async def create(
+        self, *, messages: Iterable[Any], stream: bool, **params: Any
+    ) -> Union[CompletionCreateResponse, AsyncStream[ChatCompletionChunk]]: ...
+
+    async def create(
+        self, *, messages: Iterable[Any], **params: Any
+    ) -> Union[CompletionCreateResponse, AsyncStream[ChatCompletionChunk]]:
+        """Call `chat.completions.create()` with the first model that does not fail with a server error.
+
+        Accepts the same arguments as `create()` except for `model`; the model that
+        served the request is available as the response's `model`.
+        """
+        _check_params(params)
+        messages = list(messages)
+        candidates = self.router.candidates()
+        for index, model in enumerate(candidates):
+            completions = self._completions if index == len(candidates) - 1 else self._no_retries
+            started = time.monotonic()
+            try:
+                response = cast(
+                    "CompletionCreateResponse | AsyncStream[ChatCompletionChunk]",
+                    await completions.create(messages=messages, model=model, **params),
+                )
+            except Exception as exc:
+                if not _should_fall_back(exc):
+                    raise
+                self.router.record_failure(model)
+                if index == len(candidates) - 1:
+                    raise
+                continue
+            self.router.record_success(model, time.monotonic() - started)
+            return response
+
+        raise AssertionError("unreachable")
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from types import TracebackType
+from typing import Any, Dict, Generic, Mapping, TypeVar, Iterable, Sequence, AsyncIterator, cast, overload
+from typing_extensions import Self, override
+
+import anyio
+from anyio.abc import TaskGroup
+from anyio.streams.memory import MemoryObjectSendStream, MemoryObjectReceiveStream
+
+from .._streaming import AsyncStream
+
+__all__ = ["MergedStream", "MergedStreamChunk", "merge_streams"]
+
+_K = TypeVar("_K")
+_T = TypeVar("_T")
+
+
+def _memory_stream(max_buffer_size: float) -> tuple[MemoryObjectSendStream[Any], MemoryObjectReceiveStream[Any]]:
+    # `create_memory_object_stream` only became subscriptable in anyio 4
+    return anyio.create_memory_object_stream(max_buffer_size)
+
+
+class MergedStreamChunk(Generic[_K, _T]):
+    """A chunk produced by one of the streams passed to `merge_streams()`."""
+
+    __slots__ = ("source", "chunk")
+
+    source: _K
+    chunk: _T
+
+    def __init__(self, source: _K, chunk: _T) -> None:
+        self.source = source
+        self.chunk = chunk
+
+    @override
+    def __repr__(self) -> str:
+        return f"MergedStreamChunk(source={self.source!r}, chunk={self.chunk!r})"
+
+
+class _SourceFailure:
+    __slots__ = ("source", "exc")
+
+    def __init__(self, source: object, exc: BaseException) -> None:
+        self.source = source
+        self.exc = exc
+
+
+class MergedStream(Generic[_K, _T]):
+    """Multiplexes several `AsyncStream`s into a single feed of `MergedStreamChunk`s.
+
+    Chunks are yielded in the order they arrive. Every source runs in its own
+    task; a source can be cancelled at any time with `cancel()`, which closes its
+    HTTP response and releases the connection back to the pool.
+
+    Must be used as an async context manager so that all of the underlying
+    responses are guaranteed to be closed:
+
+    ```py
+    async with merge_streams({"a": stream_a, "b": stream_b}) as merged:
+        async for item in merged:
+            print(item.source, item.chunk)
+    ```
+    """
+
+    def __init__(self, streams: Mapping[_K, AsyncStream[_T]], *, stop_after_first: bool = False) -> None:
+        self._streams: Dict[_K, AsyncStream[_T]] = dict(streams)
+        self._stop_after_first = stop_after_first
+        self._scopes: Dict[_K, anyio.CancelScope] = {}
+        self._finished: Dict[_K, bool] = {}
+        self._task_group: TaskGroup | None = None
+        self._receive: MemoryObjectReceiveStream[Any] | None = None
+
+    @property
+    def sources(self) -> Sequence[_K]:
+        """The keys of all of the streams being merged."""
+        return list(self._streams)
+
+    @property
+    def completed(self) -> Sequence[_K]:
+        """Sources whose stream was read to the end."""
+        return [source for source, completed in self._finished.items() if completed]
+
+    @property
+    def cancelled(self) -> Sequence[_K]:
+        """Sources that were cancelled before their stream was read to the end."""
+        return [source for source, completed in self._finished.items() if not completed]
+
+    def cancel(self, *sources: _K) -> None:
+        """Stop reading from the given sources and close their responses.
+
+        Chunks that have already been received from these sources are discarded.
+        """
+        for source in sources:
+            if source not in self._streams:
+                raise KeyError(source)
+
+            scope = self._scopes.get(source)
+            if scope is None:
+                scope = self._scopes[source] = anyio.CancelScope()
+            scope.cancel()
+
+    def cancel_others(self, source: _K) -> None:
+        """Cancel every source except the given one."""
+        self.cancel(*(other for other in self._streams if other != source))
+
+    async def _pump(self, source: _K, stream: AsyncStream[_T], send: MemoryObjectSendStream[Any]) -> None:
+        scope = self._scopes.setdefault(source, anyio.CancelScope())
+        async with send:
+            completed = False
+            try:
+                with scope:
+                    async for chunk in stream:
+                        await send.send(MergedStreamChunk(source, chunk))
+                    completed = True
+            except Exception as exc:
+                await send.send(_SourceFailure(source, exc))
+            finally:
+                self._finished[source] = completed
+                with anyio.CancelScope(shield=True):
+                    await stream.close()
+
+        if completed and self._stop_after_first:
+            self.cancel_others(source)
+
+    async def __aenter__(self) -> Self:
+        send, receive = _memory_stream(0)
+        self._receive = receive
+
+        self._task_group = anyio.create_task_group()
+        await self._task_group.__aenter__()
+
+        async with send:
+            for source, stream in self._streams.items():
+                self._task_group.start_soon(self._pump, source, stream, send.clone())
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Cancel all remaining sources and close every underlying response."""
+        self.cancel(*self._streams)
+
+        task_group, self._task_group = self._task_group, None
+        try:
+            if task_group is not None:
+                task_group.cancel_scope.cancel()
+                await task_group.__aexit__(None, None, None)
+        finally:
+            if self._receive is not None:
+                await self._receive.aclose()
+
+            # streams whose task never got a chance to start still need to be closed
+            with anyio.CancelScope(shield=True):
+                for stream in self._streams.values():
+                    await stream.close()
+
+    async def __aiter__(self) -> AsyncIterator[MergedStreamChunk[_K, _T]]:
+        if self._receive is None:
+            raise RuntimeError("MergedStream must be entered with `async with` before iterating over it")
+
+        async for item in self._receive:
+            if isinstance(item, _SourceFailure):
+                raise item.exc
+
+            if self._scopes[cast(_K, item.source)].cancel_called:
+                continue
+
+            yield item
+
+
+@overload
+def merge_streams(streams: Iterable[AsyncStream[_T]], *, stop_after_first: bool = False) -> MergedStream[int, _T]: ...
+
+
+@overload
+def merge_streams(streams: Mapping[_K, AsyncStream[_T]], *, stop_after_first: bool = False) -> MergedStream[_K, _T]: ...
+
+
+def merge_streams(
+    streams: Mapping[Any, AsyncStream[_T]] | Iterable[AsyncStream[_T]], *, stop_after_first: bool = False
+) -> MergedStream[Any, _T]:
+    """Consume several `AsyncStream`s concurrently as a single feed.
+
+    Args:
+      streams: The streams to merge. When a mapping is given, each chunk is tagged
+          with the stream's key, otherwise with the stream's index.
+
+      stop_after_first: Cancel all other sources as soon as one stream is read to
+          the end, e.g. to keep only the fastest of several candidate completions.
+    """
+    if not isinstance(streams, Mapping):
+        streams = dict(enumerate(streams))
+
+    return MergedStream(cast("Mapping[Any, AsyncStream[_T]]", streams), stop_after_first=stop_after_first)
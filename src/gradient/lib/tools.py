@@ -0,0 +1,368 @@
+"""Run the tool-calling loop of a chat completion.
+
+Used by `chat.completions.run_tools()` and `agents.chat.completions.run_tools()`.
+Whenever the model answers with `finish_reason="tool_calls"`, every requested
+tool is executed concurrently, the results are appended as `tool` messages and
+the conversation is sent again, until the model produces a final answer.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import asyncio
+import inspect
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Generic,
+    Mapping,
+    TypeVar,
+    Callable,
+    Iterable,
+    Optional,
+    Awaitable,
+    cast,
+)
+from typing_extensions import override
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError, ThreadPoolExecutor
+
+import anyio
+import pydantic
+
+from ._chat import assistant_message
+from .._utils import is_dict, asyncify
+from .._compat import model_json
+from ..types.chat.completion_create_response import ChoiceMessageToolCall, CompletionCreateResponse
+from ..types.agents.chat.completion_create_response import (
+    ChoiceMessageToolCall as AgentChoiceMessageToolCall,
+    CompletionCreateResponse as AgentCompletionCreateResponse,
+)
+
+__all__ = ["ToolCallResult", "ToolRunStep", "ToolRunResult"]
+
+_CompletionT = TypeVar("_CompletionT", CompletionCreateResponse, AgentCompletionCreateResponse)
+
+ToolFunction = Callable[..., Any]
+"""A sync or async callable that is called with the tool call's parsed arguments as keyword arguments."""
+
+ToolTimeout = Union[float, Mapping[str, float], None]
+
+
+class ToolCallResult:
+    """The outcome of a single tool call."""
+
+    __slots__ = ("tool_call_id", "name", "arguments", "content", "error", "latency")
+
+    tool_call_id: str
+    name: str
+
+    arguments: str
+    """The JSON-encoded arguments the model called the tool with."""
+
+    content: str
+    """The `content` of the `tool` message that was sent back to the model."""
+
+    error: Optional[Exception]
+    """The exception raised by the tool, if it failed or timed out."""
+
+    latency: float
+    """How long the tool took to run, in seconds, or how long it was waited for if it timed out."""
+
+    def __init__(self, tool_call: Union[ChoiceMessageToolCall, AgentChoiceMessageToolCall]) -> None:
+        self.tool_call_id = tool_call.id
+        self.name = tool_call.function.name
+        self.arguments = tool_call.function.arguments
+        self.content = ""
+        self.error = None
+        self.latency = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_message(self) -> Dict[str, Any]:
+        return {"role": "tool", "tool_call_id": self.tool_call_id, "content": self.content}
+
+    @override
+    def __repr__(self) -> str:
+        outcome = f"error={self.error!r}" if self.error is not None else f"content={self.content!r}"
+        return f"ToolCallResult(name={self.name!r}, {outcome}, latency={self.latency:.3f})"
+
+
+class ToolRunStep(Generic[_CompletionT]):
+    """One round trip of the loop: a completion request and the tool calls it asked for."""
+
+    __slots__ = ("completion", "request_latency", "tool_calls", "tools_latency")
+
+    completion: _CompletionT
+
+    request_latency: float
+    """How long the completion request took, in seconds."""
+
+    tool_calls: List[ToolCallResult]
+
+    tools_latency: float
+    """How long it took to run all of the step's tool calls concurrently, in seconds."""
+
+    def __init__(self, completion: _CompletionT, request_latency: float) -> None:
+        self.completion = completion
+        self.request_latency = request_latency
+        self.tool_calls = []
+        self.tools_latency = 0.0
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"ToolRunStep(request_latency={self.request_latency:.3f}, "
+            f"tools_latency={self.tools_latency:.3f}, tool_calls={self.tool_calls!r})"
+        )
+
+
+class ToolRunResult(Generic[_CompletionT]):
+    """The result of `chat.completions.run_tools()`."""
+
+    __slots__ = ("messages", "steps")
+
+    messages: List[Dict[str, Any]]
+    """The full conversation, including the assistant and `tool` messages added by the loop."""
+
+    steps: List[ToolRunStep[_CompletionT]]
+
+    def __init__(self, messages: List[Dict[str, Any]]) -> None:
+        self.messages = messages
+        self.steps = []
+
+    @property
+    def completion(self) -> _CompletionT:
+        """The last completion.
+
+        Its `finish_reason` is only `"tool_calls"` if the loop stopped because it
+        reached `max_steps`.
+        """
+        return self.steps[-1].completion
+
+    @property
+    def request_latency(self) -> float:
+        return sum(step.request_latency for step in self.steps)
+
+    @property
+    def tools_latency(self) -> float:
+        return sum(step.tools_latency for step in self.steps)
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"ToolRunResult(steps={len(self.steps)}, request_latency={self.request_latency:.3f}, "
+            f"tools_latency={self.tools_latency:.3f})"
+        )
+
+
+def _validate(functions: Mapping[str, ToolFunction], max_steps: int, max_concurrency: Optional[int]) -> None:
+    if not functions:
+        raise ValueError("Expected at least one function in `functions`")
+    if max_steps < 1:
+        raise ValueError(f"Expected `max_steps` to be at least 1 but received {max_steps}")
+    if max_concurrency is not None and max_concurrency < 1:
+        raise ValueError(f"Expected `max_concurrency` to be at least 1 but received {max_concurrency}")
+
+
+def _timeout_for(timeout: ToolTimeout, name: str) -> Optional[float]:
+    if timeout is None or isinstance(timeout, (int, float)):
+        return timeout
+    return timeout.get(name)
+
+
+def _pending_tool_calls(
+    step: ToolRunStep[_CompletionT],
+) -> List[Union[ChoiceMessageToolCall, AgentChoiceMessageToolCall]]:
+    choice = step.completion.choices[0] if step.completion.choices else None
+    if choice is None or choice.finish_reason != "tool_calls" or not choice.message.tool_calls:
+        return []
+    return list(choice.message.tool_calls)
+
+
+def _resolve(functions: Mapping[str, ToolFunction], result: ToolCallResult) -> tuple[ToolFunction, Dict[str, Any]]:
+    function = functions.get(result.name)
+    if function is None:
+        raise LookupError(f"Unknown tool {result.name!r}")
+
+    arguments: object = json.loads(result.arguments) if result.arguments.strip() else {}
+    if not is_dict(arguments):
+        raise TypeError(f"Expected the arguments for tool {result.name!r} to be a JSON object")
+    return function, cast(Dict[str, Any], arguments)
+
+
+def _serialize(output: object) -> str:
+    if isinstance(output, str):
+        return output
+    if isinstance(output, pydantic.BaseModel):
+        return model_json(output)
+    return json.dumps(output, default=str)
+
+
+def _fail(result: ToolCallResult, error: Exception, *, timeout: Optional[float] = None) -> None:
+    result.error = error
+    if timeout is not None:
+        result.content = f"Error: tool {result.name!r} did not finish within {timeout} seconds"
+    else:
+        result.content = f"Error: {error}"
+
+
+def _call_blocking(result: ToolCallResult, function: ToolFunction, arguments: Dict[str, Any]) -> Any:
+    started = time.perf_counter()
+    try:
+        output = function(**arguments)
+        if inspect.isawaitable(output):
+            # async tools used from the sync client get their own event loop on the worker thread
+            return asyncio.run(_await(output))
+        return output
+    finally:
+        # a tool that timed out already has the time it was waited for as its latency
+        if result.error is None:
+            result.latency = time.perf_counter() - started
+
+
+async def _await(awaitable: Awaitable[Any]) -> Any:
+    return await awaitable
+
+
+def run_tool_loop(
+    create: Callable[..., _CompletionT],
+    *,
+    messages: Iterable[Mapping[str, Any]],
+    functions: Mapping[str, ToolFunction],
+    tool_timeout: ToolTimeout,
+    max_steps: int,
+    max_concurrency: Optional[int],
+    params: Mapping[str, Any],
+) -> ToolRunResult[_CompletionT]:
+    """Run the tool-calling loop, executing each step's tool calls on a thread pool.
+
+    A tool that exceeds its timeout is reported to the model as failed; its thread
+    cannot be interrupted and keeps running in the background until it returns.
+    """
+    _validate(functions, max_steps, max_concurrency)
+    run: ToolRunResult[_CompletionT] = ToolRunResult([dict(message) for message in messages])
+
+    for _ in range(max_steps):
+        started = time.perf_counter()
+        step = ToolRunStep(create(messages=run.messages, **params), time.perf_counter() - started)
+        run.steps.append(step)
+
+        tool_calls = _pending_tool_calls(step)
+        if step.completion.choices:
+            run.messages.append(cast(Dict[str, Any], assistant_message(step.completion.choices[0].message)))
+        if not tool_calls:
+            break
+
+        # without `max_concurrency`, every tool call of the step gets a thread
+        pool = ThreadPoolExecutor(max_workers=max_concurrency or len(tool_calls), thread_name_prefix="gradient-tools")
+        try:
+            started = time.perf_counter()
+            submitted: List[Tuple[ToolCallResult, Future[Any]]] = []
+            for tool_call in tool_calls:
+                result = ToolCallResult(tool_call)
+                step.tool_calls.append(result)
+                try:
+                    function, arguments = _resolve(functions, result)
+                except Exception as exc:
+                    _fail(result, exc)
+                    continue
+                submitted.append((result, pool.submit(_call_blocking, result, function, arguments)))
+
+            # every tool was submitted at `started`, so each timeout is measured from there
+            for result, future in submitted:
+                timeout = _timeout_for(tool_timeout, result.name)
+                try:
+                    remaining = None if timeout is None else max(0.0, started + timeout - time.perf_counter())
+                    result.content = _serialize(future.result(timeout=remaining))
+                except FutureTimeoutError as exc:
+                    future.cancel()
+                    _fail(result, exc, timeout=timeout)
+                    result.latency = time.perf_counter() - started
+                except Exception as exc:
+                    _fail(result, exc)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        step.tools_latency = time.perf_counter() - started
+        run.messages.extend(result.to_message() for result in step.tool_calls)
+
+    return run
+
+
+async def async_run_tool_loop(
+    create: Callable[..., Awaitable[_CompletionT]],
+    *,
+    messages: Iterable[Mapping[str, Any]],
+    functions: Mapping[str, ToolFunction],
+    tool_timeout: ToolTimeout,
+    max_steps: int,
+    max_concurrency: Optional[int],
+    params: Mapping[str, Any],
+) -> ToolRunResult[_CompletionT]:
+    """Run the tool-calling loop, executing each step's tool calls as concurrent tasks.
+
+    Async tools run on the event loop; sync tools run in worker threads.
+    """
+    _validate(functions, max_steps, max_concurrency)
+    run: ToolRunResult[_CompletionT] = ToolRunResult([dict(message) for message in messages])
+    limiter = anyio.Semaphore(max_concurrency) if max_concurrency is not None else None
+
+    async def call(result: ToolCallResult, function: ToolFunction, arguments: Dict[str, Any]) -> None:
+        timeout = _timeout_for(tool_timeout, result.name)
+        output: Any = None
+        # the timeout only covers running the tool, not waiting for a free slot
+        if limiter is not None:
+            await limiter.acquire()
+        started = time.perf_counter()
+        try:
+            with anyio.move_on_after(timeout) as scope:
+                if inspect.iscoroutinefunction(function):
+                    output = await function(**arguments)
+                else:
+                    output = await asyncify(function)(**arguments)
+                    if inspect.isawaitable(output):
+                        output = await output
+            if scope.cancelled_caught:
+                _fail(result, TimeoutError(), timeout=timeout)
+            else:
+                result.content = _serialize(output)
+        except Exception as exc:
+            _fail(result, exc)
+        finally:
+            if limiter is not None:
+                limiter.release()
+        result.latency = time.perf_counter() - started
+
+    for _ in range(max_steps):
+        started = time.perf_counter()
+        step = ToolRunStep(await create(messages=run.messages, **params), time.perf_counter() - started)
+        run.steps.append(step)
+
+        tool_calls = _pending_tool_calls(step)
+        if step.completion.choices:
+            run.messages.append(cast(Dict[str, Any], assistant_message(step.completion.choices[0].message)))
+        if not tool_calls:
+            break
+
+        started = time.perf_counter()
+        async with anyio.create_task_group() as task_group:
+            for tool_call in tool_calls:
+                result = ToolCallResult(tool_call)
+                step.tool_calls.append(result)
+                try:
+                    function, arguments = _resolve(functions, result)
+                except Exception as exc:
+                    _fail(result, exc)
+                    continue
+                task_group.start_soon(call, result, function, arguments)
+
+        step.tools_latency = time.perf_counter() - started
+        run.messages.extend(result.to_message() for result in step.tool_calls)
+
+    return run
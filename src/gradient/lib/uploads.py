@@ -0,0 +1,379 @@
+"""Upload local files through presigned URLs.
+
+Used by `knowledge_bases.data_sources.upload_files()`. Files are streamed from
+disk in fixed-size chunks, so memory use is bounded by `chunk_size` times the
+number of concurrent uploads regardless of the file sizes, and every file is
+retried on its own with exponential backoff.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import random
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Union,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    AsyncIterator,
+)
+from pathlib import Path
+from typing_extensions import override
+
+import anyio
+import httpx
+
+from .batch import AsyncBatch, BatchResult, run_batch
+from .._constants import MAX_RETRY_DELAY, INITIAL_RETRY_DELAY
+from .._exceptions import APIStatusError, APIConnectionError
+from ..types.knowledge_bases.data_source_create_response import DataSourceCreateResponse
+from ..types.knowledge_bases.data_source_create_presigned_urls_params import File
+from ..types.knowledge_bases.data_source_create_presigned_urls_response import Upload
+
+if TYPE_CHECKING:
+    from .._client import Gradient, AsyncGradient
+    from ..resources.knowledge_bases.data_sources import DataSourcesResource, AsyncDataSourcesResource
+
+__all__ = ["FileUploadResult", "FileUploadReport"]
+
+FilePath = Union[str, "os.PathLike[str]"]
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class FileUploadResult:
+    """The outcome of uploading a single file."""
+
+    __slots__ = ("path", "size", "object_key", "attempts", "uploaded", "data_source", "error")
+
+    path: Path
+    size: int
+
+    object_key: Optional[str]
+    """The key the file was stored as, once a presigned URL was issued for it."""
+
+    attempts: int
+    """The number of times the upload was attempted."""
+
+    uploaded: bool
+    """Whether the file was stored; `error` may still be set if creating its data source failed."""
+
+    data_source: Optional[DataSourceCreateResponse]
+    """The data source created for the file, if requested."""
+
+    error: Optional[Exception]
+    """The exception that made the upload or the data source creation fail after all retries."""
+
+    def __init__(self, path: Path, size: int) -> None:
+        self.path = path
+        self.size = size
+        self.object_key = None
+        self.attempts = 0
+        self.uploaded = False
+        self.data_source = None
+        self.error = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @override
+    def __repr__(self) -> str:
+        outcome = f"error={self.error!r}" if self.error is not None else f"object_key={self.object_key!r}"
+        return f"FileUploadResult(path={str(self.path)!r}, {outcome})"
+
+
+class FileUploadReport:
+    """Progress and throughput of a bulk upload, updated as files complete."""
+
+    results: List[FileUploadResult]
+    """The results of the files that completed so far, in completion order."""
+
+    bytes_uploaded: int
+    started_at: float
+
+    def __init__(self) -> None:
+        self.results = []
+        self.bytes_uploaded = 0
+        self.started_at = time.monotonic()
+        self._finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the upload started, or until it finished."""
+        return (self._finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Bytes uploaded per second."""
+        elapsed = self.elapsed
+        return self.bytes_uploaded / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def succeeded(self) -> List[FileUploadResult]:
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> List[FileUploadResult]:
+        return [result for result in self.results if not result.ok]
+
+    def _add(self, result: FileUploadResult) -> None:
+        self.results.append(result)
+        if result.uploaded:
+            self.bytes_uploaded += result.size
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"FileUploadReport(succeeded={len(self.succeeded)}, failed={len(self.failed)}, "
+            f"bytes_uploaded={self.bytes_uploaded}, throughput={self.throughput:.0f} B/s)"
+        )
+
+
+def _retry_delay(attempt: int) -> float:
+    return min(INITIAL_RETRY_DELAY * pow(2.0, attempt), MAX_RETRY_DELAY) * (1 - 0.25 * random.random())
+
+
+def _should_retry(client: Gradient | AsyncGradient, error: Exception) -> bool:
+    if isinstance(error, APIStatusError):
+        return client._should_retry(error.response)
+    return isinstance(error, (APIConnectionError, httpx.TransportError))
+
+
+def _raise_for_status(client: Gradient | AsyncGradient, response: httpx.Response) -> None:
+    if response.is_success:
+        return
+    raise client._make_status_error_from_response(response)
+
+
+def _iter_file(path: Path, chunk_size: int) -> Iterator[bytes]:
+    with path.open("rb") as file:
+        while chunk := file.read(chunk_size):
+            yield chunk
+
+
+async def _aiter_file(path: Path, chunk_size: int) -> AsyncIterator[bytes]:
+    async with await anyio.open_file(path, "rb") as file:
+        while chunk := await file.read(chunk_size):
+            yield chunk
+
+
+def _file_upload_data_source(result: FileUploadResult, upload: Upload) -> Dict[str, Any]:
+    return {
+        "file_upload_data_source": {
+            "original_file_name": upload.original_file_name or result.path.name,
+            "size_in_bytes": str(result.size),
+            "stored_object_key": upload.object_key,
+        }
+    }
+
+
+def _validate(concurrency: int, presign_batch_size: int, chunk_size: int) -> None:
+    if concurrency < 1:
+        raise ValueError(f"Expected `concurrency` to be at least 1 but received {concurrency}")
+    if presign_batch_size < 1:
+        raise ValueError(f"Expected `presign_batch_size` to be at least 1 but received {presign_batch_size}")
+    if chunk_size < 1:
+        raise ValueError(f"Expected `chunk_size` to be at least 1 but received {chunk_size}")
+
+
+def _prepare(
+    files: Iterable[FilePath],
+    report: FileUploadReport,
+    on_progress: Optional[Callable[[FileUploadReport], None]],
+) -> List[FileUploadResult]:
+    """Read the size of every file up front; files that cannot be read are reported as failed right away."""
+    results: List[FileUploadResult] = []
+    for file in files:
+        path = Path(file)
+        try:
+            size = path.stat().st_size
+        except OSError as exc:
+            _fail(report, [FileUploadResult(path, 0)], exc, on_progress)
+            continue
+        results.append(FileUploadResult(path, size))
+    return results
+
+
+def _batches(results: List[FileUploadResult], size: int) -> Iterator[List[FileUploadResult]]:
+    for start in range(0, len(results), size):
+        yield results[start : start + size]
+
+
+def _presign_params(batch: Sequence[FileUploadResult]) -> List[File]:
+    return [{"file_name": result.path.name, "file_size": str(result.size)} for result in batch]
+
+
+def _pair(batch: List[FileUploadResult], uploads: Optional[List[Upload]]) -> List[Dict[str, Any]]:
+    uploads = uploads or []
+    if len(uploads) != len(batch):
+        raise ValueError(f"Requested {len(batch)} presigned URLs but received {len(uploads)}")
+    items: List[Dict[str, Any]] = []
+    for result, upload in zip(batch, uploads):
+        result.object_key = upload.object_key
+        items.append({"result": result, "upload": upload})
+    return items
+
+
+def bulk_upload(
+    data_sources: DataSourcesResource,
+    knowledge_base_uuid: str,
+    files: Iterable[FilePath],
+    *,
+    concurrency: int,
+    presign_batch_size: int,
+    max_retries: int,
+    chunk_size: int,
+    create_data_sources: bool,
+    on_progress: Optional[Callable[[FileUploadReport], None]],
+) -> FileUploadReport:
+    _validate(concurrency, presign_batch_size, chunk_size)
+    client = data_sources._client
+    report = FileUploadReport()
+    prepared = _prepare(files, report, on_progress)
+
+    def requests() -> Iterator[Dict[str, Any]]:
+        # presigned URLs are requested lazily, one batch at a time, as uploads free up
+        for batch in _batches(prepared, presign_batch_size):
+            try:
+                response = data_sources.create_presigned_urls(files=_presign_params(batch))
+                items = _pair(batch, response.uploads)
+            except Exception as exc:
+                _fail(report, batch, exc, on_progress)
+                continue
+            yield from items
+
+    def upload(result: FileUploadResult, upload: Upload) -> FileUploadResult:
+        assert upload.presigned_url is not None
+        while True:
+            result.attempts += 1
+            try:
+                response = client._client.put(
+                    upload.presigned_url,
+                    content=_iter_file(result.path, chunk_size),
+                    headers={"Content-Length": str(result.size)},
+                )
+                _raise_for_status(client, response)
+                result.uploaded = True
+                break
+            except Exception as exc:
+                if result.attempts > max_retries or not _should_retry(client, exc):
+                    result.error = exc
+                    return result
+                data_sources._sleep(_retry_delay(result.attempts - 1))
+
+        if create_data_sources:
+            try:
+                result.data_source = data_sources.create(
+                    knowledge_base_uuid, extra_body=_file_upload_data_source(result, upload)
+                )
+            except Exception as exc:
+                result.error = exc
+        return result
+
+    for item in run_batch(upload, requests(), concurrency=concurrency, ordered=False, checkpoint=None):
+        _record(report, item, on_progress)
+
+    report._finished_at = time.monotonic()
+    return report
+
+
+async def async_bulk_upload(
+    data_sources: AsyncDataSourcesResource,
+    knowledge_base_uuid: str,
+    files: Iterable[FilePath],
+    *,
+    concurrency: int,
+    presign_batch_size: int,
+    max_retries: int,
+    chunk_size: int,
+    create_data_sources: bool,
+    on_progress: Optional[Callable[[FileUploadReport], None]],
+) -> FileUploadReport:
+    _validate(concurrency, presign_batch_size, chunk_size)
+    client = data_sources._client
+    report = FileUploadReport()
+    prepared = _prepare(files, report, on_progress)
+
+    async def requests() -> AsyncIterator[Dict[str, Any]]:
+        for batch in _batches(prepared, presign_batch_size):
+            try:
+                response = await data_sources.create_presigned_urls(files=_presign_params(batch))
+                items = _pair(batch, response.uploads)
+            except Exception as exc:
+                _fail(report, batch, exc, on_progress)
+                continue
+            for item in items:
+                yield item
+
+    async def upload(result: FileUploadResult, upload: Upload) -> FileUploadResult:
+        assert upload.presigned_url is not None
+        while True:
+            result.attempts += 1
+            try:
+                response = await client._client.put(
+                    upload.presigned_url,
+                    content=_aiter_file(result.path, chunk_size),
+                    headers={"Content-Length": str(result.size)},
+                )
+                _raise_for_status(client, response)
+                result.uploaded = True
+                break
+            except Exception as exc:
+                if result.attempts > max_retries or not _should_retry(client, exc):
+                    result.error = exc
+                    return result
+                await data_sources._sleep(_retry_delay(result.attempts - 1))
+
+        if create_data_sources:
+            try:
+                result.data_source = await data_sources.create(
+                    knowledge_base_uuid, extra_body=_file_upload_data_source(result, upload)
+                )
+            except Exception as exc:
+                result.error = exc
+        return result
+
+    async with AsyncBatch(upload, requests(), concurrency=concurrency, ordered=False, checkpoint=None) as results:
+        async for item in results:
+            _record(report, item, on_progress)
+
+    report._finished_at = time.monotonic()
+    return report
+
+
+def _record(
+    report: FileUploadReport,
+    item: BatchResult[FileUploadResult],
+    on_progress: Optional[Callable[[FileUploadReport], None]],
+) -> None:
+    if item.error is not None:
+        # only unexpected errors, e.g. the file becoming unreadable, end up here
+        result: FileUploadResult = item.request["result"]
+        result.error = item.error
+    else:
+        assert item.response is not None
+        result = item.response
+    report._add(result)
+    if on_progress is not None:
+        on_progress(report)
+
+
+def _fail(
+    report: FileUploadReport,
+    results: List[FileUploadResult],
+    error: Exception,
+    on_progress: Optional[Callable[[FileUploadReport], None]],
+) -> None:
+    for result in results:
+        result.error = error
+        report._add(result)
+        if on_progress is not None:
+            on_progress(report)
@@ -0,0 +1,237 @@
+"""Collect the usage of many agents over many time windows.
+
+Used by `agents.aggregate_usage()`. `retrieve_usage()` is called once per agent
+and window through `run_batch()`, with up to `concurrency` requests in flight.
+Each response is unpacked into `UsageColumns` as soon as it arrives and dropped,
+so a report over thousands of calls holds a few compact arrays instead of
+thousands of response objects.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Iterable,
+    Optional,
+    Sequence,
+)
+from datetime import date, datetime, timezone, timedelta
+from typing_extensions import Literal, override
+
+from .batch import AsyncBatch, run_batch
+from ..types.agent_retrieve_usage_response import AgentRetrieveUsageResponse
+
+if TYPE_CHECKING:
+    from ..resources.agents.agents import AgentsResource, AsyncAgentsResource
+
+__all__ = ["UsageColumns", "daily_windows"]
+
+UsageKey = Literal["agent", "window", "usage_type", "source"]
+
+UsageSource = Literal["usage", "log_insights"]
+
+Timestamp = Union[str, date, datetime]
+
+_SOURCES: Tuple[UsageSource, UsageSource] = ("usage", "log_insights")
+
+
+def _timestamp(value: Timestamp) -> str:
+    # `datetime` is a subclass of `date`, so both are covered by `isoformat()`
+    return value if isinstance(value, str) else value.isoformat()
+
+
+def daily_windows(start: date, stop: date) -> List[Tuple[datetime, datetime]]:
+    """One window per UTC day from `start` up to, but not including, `stop`."""
+    if stop < start:
+        raise ValueError(f"Expected `stop` to be on or after `start` but received {stop} before {start}")
+    midnight = datetime(start.year, start.month, start.day, tzinfo=timezone.utc)
+    return [(midnight + timedelta(days=day), midnight + timedelta(days=day + 1)) for day in range((stop - start).days)]
+
+
+class UsageColumns:
+    """Token usage as one array per column, with one row per measurement.
+
+    The `agent`, `window`, `usage_type` and `source` columns hold small integer codes
+    that index into `agent_uuids`, `windows`, `usage_types` and `("usage",
+    "log_insights")`; `tokens` holds the token counts. Row `i` of every array
+    belongs to the same measurement.
+    """
+
+    agent_uuids: List[str]
+    """The agents, in the order they were requested."""
+
+    windows: List[Tuple[str, str]]
+    """The `(start, stop)` of every window, as sent to `retrieve_usage()`."""
+
+    usage_types: List[str]
+    """Every usage type seen, in the order they were first seen."""
+
+    agent: array[int]
+
+    window: array[int]
+
+    usage_type: array[int]
+
+    source: array[int]
+    """`0` for the agent's `usage`, `1` for its `log_insights_usage`."""
+
+    tokens: array[int]
+
+    failed: List[Tuple[str, Tuple[str, str], Exception]]
+    """The `(agent_uuid, window, error)` of every call that failed; its usage is missing from the columns."""
+
+    def __init__(self, agent_uuids: Sequence[str], windows: Sequence[Tuple[str, str]]) -> None:
+        self.agent_uuids = list(agent_uuids)
+        self.windows = list(windows)
+        self.usage_types = []
+        self.agent = array("I")
+        self.window = array("I")
+        self.usage_type = array("I")
+        self.source = array("B")
+        self.tokens = array("q")
+        self.failed = []
+        self._usage_type_codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def total(self) -> int:
+        return sum(self.tokens)
+
+    def totals(self, *by: UsageKey) -> Dict[Tuple[Any, ...], int]:
+        """The number of tokens per distinct combination of the `by` columns.
+
+        ```py
+        usage.totals("agent", "usage_type")
+        # {("agent-uuid", "input"): 1200, ("agent-uuid", "output"): 300, ...}
+        ```
+
+        Keys hold the agent's id, the window's `(start, stop)`, the usage type or the
+        source name rather than their codes.
+        """
+        columns = [self._column(key) for key in by]
+        sums: Dict[Tuple[int, ...], int] = {}
+        for row, tokens in enumerate(self.tokens):
+            codes = tuple(column[row] for column in columns)
+            sums[codes] = sums.get(codes, 0) + tokens
+
+        labels = [self._labels(key) for key in by]
+        return {tuple(names[code] for names, code in zip(labels, codes)): tokens for codes, tokens in sums.items()}
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """Every column as a NumPy array sharing memory with the underlying `array`, which requires `numpy`."""
+        try:
+            import numpy as np  # type: ignore[import-not-found]
+        except ImportError as exc:
+            raise RuntimeError("`UsageColumns.to_numpy()` requires `numpy` to be installed") from exc
+
+        # the array typecodes used here are valid NumPy dtype codes of the same width
+        columns = self._columns().items()
+        return {name: np.frombuffer(column, dtype=column.typecode) for name, column in columns}  # pyright: ignore[reportUnknownMemberType]
+
+    def _columns(self) -> Dict[str, array[int]]:
+        return {
+            "agent": self.agent,
+            "window": self.window,
+            "usage_type": self.usage_type,
+            "source": self.source,
+            "tokens": self.tokens,
+        }
+
+    def _column(self, key: UsageKey) -> array[int]:
+        if key not in ("agent", "window", "usage_type", "source"):
+            raise ValueError(f"Expected a column of `agent`, `window`, `usage_type` or `source` but received {key!r}")
+        return self._columns()[key]
+
+    def _labels(self, key: UsageKey) -> Sequence[Any]:
+        if key == "agent":
+            return self.agent_uuids
+        if key == "window":
+            return self.windows
+        if key == "usage_type":
+            return self.usage_types
+        return _SOURCES
+
+    def _append(self, agent: int, window: int, response: AgentRetrieveUsageResponse) -> None:
+        for source, usage in enumerate((response.usage, response.log_insights_usage)):
+            for measurement in (usage.measurements if usage is not None else None) or []:
+                usage_type = measurement.usage_type or ""
+                code = self._usage_type_codes.get(usage_type)
+                if code is None:
+                    code = self._usage_type_codes[usage_type] = len(self.usage_types)
+                    self.usage_types.append(usage_type)
+                self.agent.append(agent)
+                self.window.append(window)
+                self.usage_type.append(code)
+                self.source.append(source)
+                self.tokens.append(measurement.tokens or 0)
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"UsageColumns(rows={len(self)}, agents={len(self.agent_uuids)}, windows={len(self.windows)}, "
+            f"usage_types={self.usage_types!r}, failed={len(self.failed)})"
+        )
+
+
+def _prepare(
+    agent_uuids: Iterable[str], windows: Iterable[Tuple[Timestamp, Timestamp]], concurrency: int
+) -> Tuple[UsageColumns, List[Dict[str, Any]]]:
+    if concurrency < 1:
+        raise ValueError(f"Expected `concurrency` to be at least 1 but received {concurrency}")
+    uuids = list(agent_uuids)
+    for uuid in uuids:
+        if not uuid:
+            raise ValueError(f"Expected every agent id to be non-empty but received {uuid!r}")
+    spans = [(_timestamp(start), _timestamp(stop)) for start, stop in windows]
+
+    columns = UsageColumns(uuids, spans)
+    requests = [{"uuid": uuid, "start": start, "stop": stop} for uuid in uuids for start, stop in spans]
+    return columns, requests
+
+
+def _collect(columns: UsageColumns, index: int, response: Optional[AgentRetrieveUsageResponse], error: Any) -> None:
+    agent, window = divmod(index, len(columns.windows))
+    if error is not None:
+        columns.failed.append((columns.agent_uuids[agent], columns.windows[window], error))
+    elif response is not None:
+        columns._append(agent, window, response)
+
+
+def aggregate_usage(
+    agents: AgentsResource,
+    agent_uuids: Iterable[str],
+    windows: Iterable[Tuple[Timestamp, Timestamp]],
+    *,
+    concurrency: int,
+) -> UsageColumns:
+    columns, requests = _prepare(agent_uuids, windows, concurrency)
+    for result in run_batch(agents.retrieve_usage, requests, concurrency=concurrency, ordered=False, checkpoint=None):
+        _collect(columns, result.index, result.response, result.error)
+    return columns
+
+
+async def async_aggregate_usage(
+    agents: AsyncAgentsResource,
+    agent_uuids: Iterable[str],
+    windows: Iterable[Tuple[Timestamp, Timestamp]],
+    *,
+    concurrency: int,
+) -> UsageColumns:
+    columns, requests = _prepare(agent_uuids, windows, concurrency)
+    async with AsyncBatch(
+        agents.retrieve_usage, requests, concurrency=concurrency, ordered=False, checkpoint=None
+    ) as results:
+        async for result in results:
+            _collect(columns, result.index, result.response, result.error)
+    return columns
@@ -1,7 +1,9 @@
 # File generated from our OpenAPI spec by Stainless. See CONTRIBUTING.md for details.
 from __future__ import annotations
 
-import time
+import threading
+from typing import Tuple, Iterable, Optional
+from functools import partial
 
 import httpx
 
@@ -64,7 +66,11 @@ from ..._response import (
     async_to_raw_response_wrapper,
     async_to_streamed_response_wrapper,
 )
+from ...lib.usage import Timestamp, UsageColumns, aggregate_usage, async_aggregate_usage
+from ..._exceptions import AgentDeploymentError, AgentDeploymentTimeoutError
+from ...lib.polling import PollPolicy, poll_until, async_poll_until
 from ..._base_client import make_request_options
+from ...lib.reconcile import AgentConfig, ReconcilePlan, reconcile, async_reconcile
 from .evaluation_runs import (
     EvaluationRunsResource,
     AsyncEvaluationRunsResource,
@@ -81,6 +87,7 @@ from .knowledge_bases import (
     KnowledgeBasesResourceWithStreamingResponse,
     AsyncKnowledgeBasesResourceWithStreamingResponse,
 )
+from ...lib.deployment import AgentSpec, FleetDeployment, deploy_fleet, async_deploy_fleet
 from .evaluation_datasets import (
     EvaluationDatasetsResource,
     AsyncEvaluationDatasetsResource,
@@ -118,6 +125,35 @@ from .evaluation_metrics.evaluation_metrics import (
 __all__ = ["AgentsResource", "AsyncAgentsResource"]
 
 
+def _is_agent_ready(agent_response: AgentRetrieveResponse) -> bool:
+    if agent_response.agent and agent_response.agent.deployment:
+        status = agent_response.agent.deployment.status
+
+        # Success case
+        if status == "STATUS_RUNNING":
+            return True
+
+        # Failure cases
+        if status in ("STATUS_FAILED", "STATUS_UNDEPLOYMENT_FAILED", "STATUS_DELETED"):
+            raise AgentDeploymentError(
+                f"Agent deployment failed with status: {status}",
+                status=status,
+            )
+    return False
+
+
+def _agent_timeout_error(uuid: str, timeout: float, agent_response: Optional[AgentRetrieveResponse]) -> Exception:
+    current_status = (
+        agent_response.agent.deployment.status
+        if agent_response and agent_response.agent and agent_response.agent.deployment
+        else "UNKNOWN"
+    )
+    return AgentDeploymentTimeoutError(
+        f"Agent did not reach STATUS_RUNNING within {timeout} seconds. Current status: {current_status}",
+        agent_id=uuid,
+    )
+
+
 class AgentsResource(SyncAPIResource):
     @cached_property
     def api_keys(self) -> APIKeysResource:
@@ -639,6 +675,7 @@ class AgentsResource(SyncAPIResource):
         extra_headers: Headers | None = None,
         extra_query: Query | None = None,
         extra_body: Body | None = None,
+        cancel_event: Optional[threading.Event] = None,
     ) -> AgentRetrieveResponse:
         """Wait for an agent to be ready (deployment status is STATUS_RUNNING).
 
@@ -650,7 +687,8 @@ class AgentsResource(SyncAPIResource):
 
           timeout: Maximum time to wait in seconds (default: 300 seconds / 5 minutes)
 
-          poll_interval: Time to wait between status checks in seconds (default: 5 seconds)
+          poll_interval: The longest time to wait between status checks in seconds (default: 5
+              seconds). Checks start out more frequent and back off with jitter up to this interval.
 
           extra_headers: Send extra headers
 
@@ -658,6 +696,8 @@ class AgentsResource(SyncAPIResource):
 
           extra_body: Add additional JSON properties to the request
 
+          cancel_event: Stops waiting with a `PollingCancelledError` when set, e.g. from another thread
+
         Returns:
           AgentRetrieveResponse: The agent response when it reaches STATUS_RUNNING
 
@@ -668,51 +708,139 @@ class AgentsResource(SyncAPIResource):
               within the timeout period
           ValueError: If uuid is empty
         """
-        from ..._exceptions import AgentDeploymentError, AgentDeploymentTimeoutError
-
         if not uuid:
             raise ValueError(f"Expected a non-empty value for `uuid` but received {uuid!r}")
 
-        start_time = time.time()
-
-        while True:
-            agent_response = self.retrieve(
+        return poll_until(
+            lambda: self.retrieve(
                 uuid,
                 extra_headers=extra_headers,
                 extra_query=extra_query,
                 extra_body=extra_body,
-            )
+            ),
+            _is_agent_ready,
+            client=self._client,
+            policy=PollPolicy.up_to(poll_interval),
+            timeout=timeout,
+            on_timeout=partial(_agent_timeout_error, uuid, timeout),
+            sleep=self._sleep,
+            cancel_event=cancel_event,
+        )
+
+    def deploy_fleet(
+        self,
+        specs: Iterable[AgentSpec],
+        *,
+        concurrency: int = 8,
+        max_requests_per_second: Optional[float] = 5.0,
+        max_retries: int = 3,
+        adopt_existing: bool = True,
+        wait: bool = True,
+        poll_interval: float = 5.0,
+        timeout: float = 300.0,
+    ) -> FleetDeployment:
+        """Create and configure many agents, running independent steps concurrently.
+
+        Every agent is created, then its knowledge bases are attached and its functions,
+        API keys and routes are added side by side, then its visibility is set and the
+        deployment is awaited. Steps of different agents run in parallel, and a route
+        starts as soon as both of its agents exist. A step that fails does not stop the
+        others; only the steps that depend on it are skipped.
+
+        Transient errors are retried, and a step that creates something first checks
+        whether the failed attempt took effect, so nothing is created twice.
+
+        Args:
+          specs: One spec per agent. `name` identifies the agent and is sent to `create()`
+              with the other create parameters; `routes` refer to other agents by `name`.
+
+          concurrency: The maximum number of steps in flight at once.
+
+          max_requests_per_second: The maximum rate at which steps start across the fleet, `None` for no limit.
+
+          max_retries: The maximum number of retries of a step that fails with a transient error.
+
+          adopt_existing: Reuse agents that already exist under the names in `specs`, adding only
+              what they are missing, so that an interrupted deployment can be run again.
 
-            # Check if agent and deployment exist
-            if agent_response.agent and agent_response.agent.deployment:
-                status = agent_response.agent.deployment.status
-
-                # Success case
-                if status == "STATUS_RUNNING":
-                    return agent_response
-
-                # Failure cases
-                if status in ("STATUS_FAILED", "STATUS_UNDEPLOYMENT_FAILED", "STATUS_DELETED"):
-                    raise AgentDeploymentError(
-                        f"Agent deployment failed with status: {status}",
-                        status=status,
-                    )
-
-            # Check timeout
-            elapsed_time = time.time() - start_time
-            if elapsed_time >= timeout:
-                current_status = (
-                    agent_response.agent.deployment.status
-                    if agent_response.agent and agent_response.agent.deployment
-                    else "UNKNOWN"
-                )
-                raise AgentDeploymentTimeoutError(
-                    f"Agent did not reach STATUS_RUNNING within {timeout} seconds. Current status: {current_status}",
-                    agent_id=uuid,
-                )
-
-            # Wait before polling again
-            time.sleep(poll_interval)
+          wait: Wait for every agent to reach `STATUS_RUNNING`, like `wait_until_ready()`.
+
+          poll_interval: The longest time between two status checks of an agent in seconds.
+
+          timeout: The maximum time to wait for each agent to be ready in seconds.
+
+        Returns:
+          A report with the id of every agent and the outcome and duration of every step.
+        """
+        return deploy_fleet(
+            self,
+            specs,
+            adopt_existing=adopt_existing,
+            concurrency=concurrency,
+            max_requests_per_second=max_requests_per_second,
+            max_retries=max_retries,
+            wait=wait,
+            poll_interval=poll_interval,
+            timeout=timeout,
+        )
+
+    def reconcile(
+        self,
+        uuid: str,
+        config: AgentConfig,
+        *,
+        prune: bool = True,
+        dry_run: bool = False,
+        concurrency: int = 4,
+    ) -> ReconcilePlan:
+        """Bring an agent in line with `config`, sending only the requests that change something.
+
+        The agent and, if `config` has `routes`, its routes are fetched concurrently and
+        compared with `config` locally. Only the fields of `update()` that differ are sent,
+        and only the functions, routes and knowledge bases that are missing, different or
+        no longer wanted get a request; re-applying an unchanged config makes no changes.
+        Keys left out of `config` are not managed.
+
+        Args:
+          config: The desired agent fields, `knowledge_bases`, `functions`, `routes` and `visibility`.
+
+          prune: Remove the knowledge bases, functions and routes that `config` does not list.
+
+          dry_run: Only work out the changes; `str()` of the returned plan lists them.
+
+          concurrency: The maximum number of change requests in flight at once.
+
+        Returns:
+          The planned changes, each with its response or error once applied.
+        """
+        return reconcile(self, uuid, config, prune=prune, dry_run=dry_run, concurrency=concurrency)
+
+    def aggregate_usage(
+        self,
+        agent_uuids: Iterable[str],
+        windows: Iterable[Tuple[Timestamp, Timestamp]],
+        *,
+        concurrency: int = 8,
+    ) -> UsageColumns:
+        """Retrieve the usage of every agent in every window, collected into column arrays.
+
+        `retrieve_usage()` is called once per agent and window with up to `concurrency`
+        requests in flight, and every measurement becomes a row of compact `array`
+        columns rather than a response object. Use `UsageColumns.totals()` to group the
+        tokens, or `UsageColumns.to_numpy()` if NumPy is installed.
+
+        Args:
+          agent_uuids: The agents to retrieve the usage of.
+
+          windows: `(start, stop)` pairs of dates, datetimes or timestamps, e.g. from
+              `gradient.lib.daily_windows()`.
+
+          concurrency: The maximum number of `retrieve_usage()` requests in flight at once.
+
+        Returns:
+          The usage columns; calls that failed are listed in `UsageColumns.failed`.
+        """
+        return aggregate_usage(self, agent_uuids, windows, concurrency=concurrency)
 
 
 class AsyncAgentsResource(AsyncAPIResource):
@@ -1247,7 +1375,8 @@ class AsyncAgentsResource(AsyncAPIResource):
 
           timeout: Maximum time to wait in seconds (default: 300 seconds / 5 minutes)
 
-          poll_interval: Time to wait between status checks in seconds (default: 5 seconds)
+          poll_interval: The longest time to wait between status checks in seconds (default: 5
+              seconds). Checks start out more frequent and back off with jitter up to this interval.
 
           extra_headers: Send extra headers
 
@@ -1265,53 +1394,138 @@ class AsyncAgentsResource(AsyncAPIResource):
               within the timeout period
           ValueError: If uuid is empty
         """
-        import asyncio
-
-        from ..._exceptions import AgentDeploymentError, AgentDeploymentTimeoutError
-
         if not uuid:
             raise ValueError(f"Expected a non-empty value for `uuid` but received {uuid!r}")
 
-        start_time = time.time()
-
-        while True:
-            agent_response = await self.retrieve(
+        return await async_poll_until(
+            lambda: self.retrieve(
                 uuid,
                 extra_headers=extra_headers,
                 extra_query=extra_query,
                 extra_body=extra_body,
-            )
+            ),
+            _is_agent_ready,
+            client=self._client,
+            policy=PollPolicy.up_to(poll_interval),
+            timeout=timeout,
+            on_timeout=partial(_agent_timeout_error, uuid, timeout),
+            sleep=self._sleep,
+        )
+
+    async def deploy_fleet(
+        self,
+        specs: Iterable[AgentSpec],
+        *,
+        concurrency: int = 8,
+        max_requests_per_second: Optional[float] = 5.0,
+        max_retries: int = 3,
+        adopt_existing: bool = True,
+        wait: bool = True,
+        poll_interval: float = 5.0,
+        timeout: float = 300.0,
+    ) -> FleetDeployment:
+        """Create and configure many agents, running independent steps concurrently.
+
+        Every agent is created, then its knowledge bases are attached and its functions,
+        API keys and routes are added side by side, then its visibility is set and the
+        deployment is awaited. Steps of different agents run in parallel, and a route
+        starts as soon as both of its agents exist. A step that fails does not stop the
+        others; only the steps that depend on it are skipped.
+
+        Transient errors are retried, and a step that creates something first checks
+        whether the failed attempt took effect, so nothing is created twice.
+
+        Args:
+          specs: One spec per agent. `name` identifies the agent and is sent to `create()`
+              with the other create parameters; `routes` refer to other agents by `name`.
+
+          concurrency: The maximum number of steps in flight at once.
+
+          max_requests_per_second: The maximum rate at which steps start across the fleet, `None` for no limit.
 
-            # Check if agent and deployment exist
-            if agent_response.agent and agent_response.agent.deployment:
-                status = agent_response.agent.deployment.status
-
-                # Success case
-                if status == "STATUS_RUNNING":
-                    return agent_response
-
-                # Failure cases
-                if status in ("STATUS_FAILED", "STATUS_UNDEPLOYMENT_FAILED", "STATUS_DELETED"):
-                    raise AgentDeploymentError(
-                        f"Agent deployment failed with status: {status}",
-                        status=status,
-                    )
-
-            # Check timeout
-            elapsed_time = time.time() - start_time
-            if elapsed_time >= timeout:
-                current_status = (
-                    agent_response.agent.deployment.status
-                    if agent_response.agent and agent_response.agent.deployment
-                    else "UNKNOWN"
-                )
-                raise AgentDeploymentTimeoutError(
-                    f"Agent did not reach STATUS_RUNNING within {timeout} seconds. Current status: {current_status}",
-                    agent_id=uuid,
-                )
-
-            # Wait before polling again
-            await asyncio.sleep(poll_interval)
+          max_retries: The maximum number of retries of a step that fails with a transient error.
+
+          adopt_existing: Reuse agents that already exist under the names in `specs`, adding only
+              what they are missing, so that an interrupted deployment can be run again.
+
+          wait: Wait for every agent to reach `STATUS_RUNNING`, like `wait_until_ready()`.
+
+          poll_interval: The longest time between two status checks of an agent in seconds.
+
+          timeout: The maximum time to wait for each agent to be ready in seconds.
+
+        Returns:
+          A report with the id of every agent and the outcome and duration of every step.
+        """
+        return await async_deploy_fleet(
+            self,
+            specs,
+            adopt_existing=adopt_existing,
+            concurrency=concurrency,
+            max_requests_per_second=max_requests_per_second,
+            max_retries=max_retries,
+            wait=wait,
+            poll_interval=poll_interval,
+            timeout=timeout,
+        )
+
+    async def reconcile(
+        self,
+        uuid: str,
+        config: AgentConfig,
+        *,
+        prune: bool = True,
+        dry_run: bool = False,
+        concurrency: int = 4,
+    ) -> ReconcilePlan:
+        """Bring an agent in line with `config`, sending only the requests that change something.
+
+        The agent and, if `config` has `routes`, its routes are fetched concurrently and
+        compared with `config` locally. Only the fields of `update()` that differ are sent,
+        and only the functions, routes and knowledge bases that are missing, different or
+        no longer wanted get a request; re-applying an unchanged config makes no changes.
+        Keys left out of `config` are not managed.
+
+        Args:
+          config: The desired agent fields, `knowledge_bases`, `functions`, `routes` and `visibility`.
+
+          prune: Remove the knowledge bases, functions and routes that `config` does not list.
+
+          dry_run: Only work out the changes; `str()` of the returned plan lists them.
+
+          concurrency: The maximum number of change requests in flight at once.
+
+        Returns:
+          The planned changes, each with its response or error once applied.
+        """
+        return await async_reconcile(self, uuid, config, prune=prune, dry_run=dry_run, concurrency=concurrency)
+
+    async def aggregate_usage(
+        self,
+        agent_uuids: Iterable[str],
+        windows: Iterable[Tuple[Timestamp, Timestamp]],
+        *,
+        concurrency: int = 8,
+    ) -> UsageColumns:
+        """Retrieve the usage of every agent in every window, collected into column arrays.
+
+        `retrieve_usage()` is called once per agent and window with up to `concurrency`
+        requests in flight, and every measurement becomes a row of compact `array`
+        columns rather than a response object. Use `UsageColumns.totals()` to group the
+        tokens, or `UsageColumns.to_numpy()` if NumPy is installed.
+
+        Args:
+          agent_uuids: The agents to retrieve the usage of.
+
+          windows: `(start, stop)` pairs of dates, datetimes or timestamps, e.g. from
+              `gradient.lib.daily_windows()`.
+
+          concurrency: The maximum number of `retrieve_usage()` requests in flight at once.
+
+        Returns:
+          The usage columns; calls that failed are listed in `UsageColumns.failed`.
+        """
+        return await async_aggregate_usage(self, agent_uuids, windows, concurrency=concurrency)
 
 
 class AgentsResourceWithRawResponse:
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Dict, Union, Iterable, Optional
+from typing import Any, Dict, Union, Mapping, Iterable, Optional
 from typing_extensions import Literal, overload
 
 import httpx
@@ -17,6 +17,7 @@ from ...._response import (
     async_to_raw_response_wrapper,
     async_to_streamed_response_wrapper,
 )
+from ....lib.tools import ToolTimeout, ToolFunction, ToolRunResult, run_tool_loop, async_run_tool_loop
 from ...._streaming import Stream, AsyncStream
 from ...._base_client import make_request_options
 from ....types.agents.chat import completion_create_params
@@ -514,6 +515,35 @@ class CompletionsResource(SyncAPIResource):
             stream_cls=Stream[ChatCompletionChunk],
         )
 
+    def run_tools(
+        self,
+        *,
+        messages: Iterable[completion_create_params.Message],
+        model: str,
+        functions: Mapping[str, ToolFunction],
+        tool_timeout: ToolTimeout = None,
+        max_steps: int = 10,
+        max_concurrency: Optional[int] = None,
+        **params: Any,
+    ) -> ToolRunResult[CompletionCreateResponse]:
+        """
+        Call `create()` on the agent endpoint and run the tools the model asks for until it stops asking.
+
+        Takes the same arguments as `chat.completions.run_tools()`.
+        """
+        if params.get("stream"):
+            raise TypeError("`run_tools()` does not support streaming responses")
+
+        return run_tool_loop(
+            self.create,
+            messages=messages,
+            functions=functions,
+            tool_timeout=tool_timeout,
+            max_steps=max_steps,
+            max_concurrency=max_concurrency,
+            params={"model": model, **params},
+        )
+
 
 class AsyncCompletionsResource(AsyncAPIResource):
     @cached_property
@@ -1000,6 +1030,34 @@ class AsyncCompletionsResource(AsyncAPIResource):
             stream_cls=AsyncStream[ChatCompletionChunk],
         )
 
+    async def run_tools(
+        self,
+        *,
+        messages: Iterable[completion_create_params.Message],
+        model: str,
+        functions: Mapping[str, ToolFunction],
+        tool_timeout: ToolTimeout = None,
+        max_steps: int = 10,
+        max_concurrency: Optional[int] = None,
+        **params: Any,
+    ) -> ToolRunResult[CompletionCreateResponse]:
+        """The async version of `CompletionsResource.run_tools()`.
+
+        Async tools run on the event loop and sync tools in worker threads.
+        """
+        if params.get("stream"):
+            raise TypeError("`run_tools()` does not support streaming responses")
+
+        return await async_run_tool_loop(
+            self.create,
+            messages=messages,
+            functions=functions,
+            tool_timeout=tool_timeout,
+            max_steps=max_steps,
+            max_concurrency=max_concurrency,
+            params={"model": model, **params},
+        )
+
 
 class CompletionsResourceWithRawResponse:
     def __init__(self, completions: CompletionsResource) -> None:
@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from typing import Iterable
+import os
+from typing import Callable, Iterable, Optional
 
 import httpx
 
@@ -21,6 +22,7 @@ from ...types.agents import (
     evaluation_dataset_create_params,
     evaluation_dataset_create_file_upload_presigned_urls_params,
 )
+from ...lib.dataset_upload import DEFAULT_CHUNK_SIZE, upload_dataset, async_upload_dataset
 from ...types.agents.evaluation_dataset_create_response import EvaluationDatasetCreateResponse
 from ...types.knowledge_bases.api_file_upload_data_source_param import APIFileUploadDataSourceParam
 from ...types.agents.evaluation_dataset_create_file_upload_presigned_urls_response import (
@@ -136,6 +138,48 @@ class EvaluationDatasetsResource(SyncAPIResource):
             cast_to=EvaluationDatasetCreateFileUploadPresignedURLsResponse,
         )
 
+    def upload(
+        self,
+        file: str | os.PathLike[str],
+        *,
+        name: str | Omit = omit,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_mmap: bool = False,
+        max_retries: int = 3,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> EvaluationDatasetCreateResponse:
+        """
+        Upload a local CSV or JSONL file and create an evaluation dataset from it.
+
+        Requests a presigned URL with `create_file_upload_presigned_urls()`, streams the
+        file to it in `chunk_size` pieces and calls `create()` once the file is stored.
+        Memory use is bounded by `chunk_size` however large the file is.
+
+        Args:
+          file: The path of the dataset file.
+
+          name: The name of the agent evaluation dataset.
+
+          chunk_size: The number of bytes read from disk and sent at a time.
+
+          use_mmap: Read the file through a read-only memory map instead of regular reads.
+
+          max_retries: How many times to restart the transfer after a transient error. The
+              presigned URL takes the whole file in one request, so every attempt starts
+              from the beginning of the file.
+
+          on_progress: Called with the number of bytes sent and the file size after every chunk.
+        """
+        return upload_dataset(
+            self,
+            file,
+            name=name,
+            chunk_size=chunk_size,
+            use_mmap=use_mmap,
+            max_retries=max_retries,
+            on_progress=on_progress,
+        )
+
 
 class AsyncEvaluationDatasetsResource(AsyncAPIResource):
     @cached_property
@@ -243,6 +287,48 @@ class AsyncEvaluationDatasetsResource(AsyncAPIResource):
             cast_to=EvaluationDatasetCreateFileUploadPresignedURLsResponse,
         )
 
+    async def upload(
+        self,
+        file: str | os.PathLike[str],
+        *,
+        name: str | Omit = omit,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_mmap: bool = False,
+        max_retries: int = 3,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> EvaluationDatasetCreateResponse:
+        """
+        Upload a local CSV or JSONL file and create an evaluation dataset from it.
+
+        Requests a presigned URL with `create_file_upload_presigned_urls()`, streams the
+        file to it in `chunk_size` pieces and calls `create()` once the file is stored.
+        Memory use is bounded by `chunk_size` however large the file is.
+
+        Args:
+          file: The path of the dataset file.
+
+          name: The name of the agent evaluation dataset.
+
+          chunk_size: The number of bytes read from disk and sent at a time.
+
+          use_mmap: Read the file through a read-only memory map instead of regular reads.
+
+          max_retries: How many times to restart the transfer after a transient error. The
+              presigned URL takes the whole file in one request, so every attempt starts
+              from the beginning of the file.
+
+          on_progress: Called with the number of bytes sent and the file size after every chunk.
+        """
+        return await async_upload_dataset(
+            self,
+            file,
+            name=name,
+            chunk_size=chunk_size,
+            use_mmap=use_mmap,
+            max_retries=max_retries,
+            on_progress=on_progress,
+        )
+
 
 class EvaluationDatasetsResourceWithRawResponse:
     def __init__(self, evaluation_datasets: EvaluationDatasetsResource) -> None:
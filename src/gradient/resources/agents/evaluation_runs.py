@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+import os
+from typing import Optional, Sequence
+
 import httpx
 
 from ..._types import Body, Omit, Query, Headers, NotGiven, SequenceNotStr, omit, not_given
@@ -16,6 +19,14 @@ from ..._response import (
 )
 from ..._base_client import make_request_options
 from ...types.agents import evaluation_run_create_params, evaluation_run_list_results_params
+from ...lib.evaluation_export import (
+    ExportFormat,
+    EvaluationColumns,
+    export_results,
+    results_columns,
+    async_export_results,
+    async_results_columns,
+)
 from ...types.agents.evaluation_run_create_response import EvaluationRunCreateResponse
 from ...types.agents.evaluation_run_retrieve_response import EvaluationRunRetrieveResponse
 from ...types.agents.evaluation_run_list_results_response import EvaluationRunListResultsResponse
@@ -225,6 +236,99 @@ class EvaluationRunsResource(SyncAPIResource):
             cast_to=EvaluationRunRetrieveResultsResponse,
         )
 
+    def export_results(
+        self,
+        evaluation_run_uuid: str,
+        destination: str | os.PathLike[str],
+        *,
+        format: ExportFormat = "auto",
+        metrics: Optional[Sequence[str]] = None,
+        page_size: int = 100,
+        prefetch: int = 4,
+        detailed: bool = False,
+        concurrency: int = 8,
+    ) -> int:
+        """
+        Write every prompt of an evaluation run to a JSON Lines or CSV file.
+
+        Pages are fetched ahead concurrently and written in order as they arrive, so
+        only a few pages are held in memory however large the run is.
+
+        Args:
+          destination: The file to write; its `.jsonl` or `.csv` suffix picks the format unless
+              `format` is given.
+
+          format: `"jsonl"` writes every prompt as JSON; `"csv"` writes one row per prompt with
+              one column per metric.
+
+          metrics: The metric columns of a CSV export. Defaults to the metrics of the first prompt.
+
+          page_size: The number of prompts to request per `list_results()` page.
+
+          prefetch: The number of pages to fetch ahead while earlier pages are processed.
+
+          detailed: Fetch every prompt again through `retrieve_results()`, e.g. when the pages
+              do not include the full prompt level results.
+
+          concurrency: The maximum number of `retrieve_results()` requests in flight when `detailed` is set.
+
+        Returns:
+          The number of prompts written.
+        """
+        if not evaluation_run_uuid:
+            raise ValueError(
+                f"Expected a non-empty value for `evaluation_run_uuid` but received {evaluation_run_uuid!r}"
+            )
+        return export_results(
+            self,
+            evaluation_run_uuid,
+            destination,
+            format=format,
+            metrics=metrics,
+            page_size=page_size,
+            prefetch=prefetch,
+            detailed=detailed,
+            concurrency=concurrency,
+        )
+
+    def results_columns(
+        self,
+        evaluation_run_uuid: str,
+        *,
+        page_size: int = 100,
+        prefetch: int = 4,
+        detailed: bool = False,
+        concurrency: int = 8,
+    ) -> EvaluationColumns:
+        """
+        Collect the token counts and numeric metric values of every prompt of an evaluation run.
+
+        Values are stored in compact `array.array` columns as the pages arrive, rather
+        than keeping the prompt models around.
+
+        Args:
+          page_size: The number of prompts to request per `list_results()` page.
+
+          prefetch: The number of pages to fetch ahead while earlier pages are processed.
+
+          detailed: Fetch every prompt again through `retrieve_results()`, e.g. when the pages
+              do not include the full prompt level results.
+
+          concurrency: The maximum number of `retrieve_results()` requests in flight when `detailed` is set.
+        """
+        if not evaluation_run_uuid:
+            raise ValueError(
+                f"Expected a non-empty value for `evaluation_run_uuid` but received {evaluation_run_uuid!r}"
+            )
+        return results_columns(
+            self,
+            evaluation_run_uuid,
+            page_size=page_size,
+            prefetch=prefetch,
+            detailed=detailed,
+            concurrency=concurrency,
+        )
+
 
 class AsyncEvaluationRunsResource(AsyncAPIResource):
     @cached_property
@@ -427,6 +531,99 @@ class AsyncEvaluationRunsResource(AsyncAPIResource):
             cast_to=EvaluationRunRetrieveResultsResponse,
         )
 
+    async def export_results(
+        self,
+        evaluation_run_uuid: str,
+        destination: str | os.PathLike[str],
+        *,
+        format: ExportFormat = "auto",
+        metrics: Optional[Sequence[str]] = None,
+        page_size: int = 100,
+        prefetch: int = 4,
+        detailed: bool = False,
+        concurrency: int = 8,
+    ) -> int:
+        """
+        Write every prompt of an evaluation run to a JSON Lines or CSV file.
+
+        Pages are fetched ahead concurrently and written in order as they arrive, so
+        only a few pages are held in memory however large the run is.
+
+        Args:
+          destination: The file to write; its `.jsonl` or `.csv` suffix picks the format unless
+              `format` is given.
+
+          format: `"jsonl"` writes every prompt as JSON; `"csv"` writes one row per prompt with
+              one column per metric.
+
+          metrics: The metric columns of a CSV export. Defaults to the metrics of the first prompt.
+
+          page_size: The number of prompts to request per `list_results()` page.
+
+          prefetch: The number of pages to fetch ahead while earlier pages are processed.
+
+          detailed: Fetch every prompt again through `retrieve_results()`, e.g. when the pages
+              do not include the full prompt level results.
+
+          concurrency: The maximum number of `retrieve_results()` requests in flight when `detailed` is set.
+
+        Returns:
+          The number of prompts written.
+        """
+        if not evaluation_run_uuid:
+            raise ValueError(
+                f"Expected a non-empty value for `evaluation_run_uuid` but received {evaluation_run_uuid!r}"
+            )
+        return await async_export_results(
+            self,
+            evaluation_run_uuid,
+            destination,
+            format=format,
+            metrics=metrics,
+            page_size=page_size,
+            prefetch=prefetch,
+            detailed=detailed,
+            concurrency=concurrency,
+        )
+
+    async def results_columns(
+        self,
+        evaluation_run_uuid: str,
+        *,
+        page_size: int = 100,
+        prefetch: int = 4,
+        detailed: bool = False,
+        concurrency: int = 8,
+    ) -> EvaluationColumns:
+        """
+        Collect the token counts and numeric metric values of every prompt of an evaluation run.
+
+        Values are stored in compact `array.array` columns as the pages arrive, rather
+        than keeping the prompt models around.
+
+        Args:
+          page_size: The number of prompts to request per `list_results()` page.
+
+          prefetch: The number of pages to fetch ahead while earlier pages are processed.
+
+          detailed: Fetch every prompt again through `retrieve_results()`, e.g. when the pages
+              do not include the full prompt level results.
+
+          concurrency: The maximum number of `retrieve_results()` requests in flight when `detailed` is set.
+        """
+        if not evaluation_run_uuid:
+            raise ValueError(
+                f"Expected a non-empty value for `evaluation_run_uuid` but received {evaluation_run_uuid!r}"
+            )
+        return await async_results_columns(
+            self,
+            evaluation_run_uuid,
+            page_size=page_size,
+            prefetch=prefetch,
+            detailed=detailed,
+            concurrency=concurrency,
+        )
+
 
 class EvaluationRunsResourceWithRawResponse:
     def __init__(self, evaluation_runs: EvaluationRunsResource) -> None:
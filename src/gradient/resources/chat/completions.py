@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from typing import Dict, Union, Iterable, Optional
+import os
+from typing import Any, Dict, Union, Mapping, Iterable, Iterator, Optional, AsyncIterable, cast
 from typing_extensions import Literal, overload
 
 import httpx
@@ -17,10 +18,17 @@ from ..._response import (
     async_to_raw_response_wrapper,
     async_to_streamed_response_wrapper,
 )
+from ...lib.batch import AsyncBatch, BatchResult, run_batch
+from ...lib.tools import ToolTimeout, ToolFunction, ToolRunResult, run_tool_loop, async_run_tool_loop
 from ..._streaming import Stream, AsyncStream
+from ...lib.racing import race_completions
 from ...types.chat import completion_create_params
+from ...lib.routing import ModelRouter, RoutedCompletions, AsyncRoutedCompletions
 from ..._base_client import make_request_options
+from ...lib.conversation import Conversation, AsyncConversation
+from ...lib.completion_cache import CompletionCache, CachedCompletions, AsyncCachedCompletions
 from ...types.shared.chat_completion_chunk import ChatCompletionChunk
+from ...types.chat.completion_create_params import Message
 from ...types.chat.completion_create_response import CompletionCreateResponse
 
 __all__ = ["CompletionsResource", "AsyncCompletionsResource"]
@@ -515,6 +523,143 @@ class CompletionsResource(SyncAPIResource):
             stream_cls=Stream[ChatCompletionChunk],
         )
 
+    def run_tools(
+        self,
+        *,
+        messages: Iterable[completion_create_params.Message],
+        model: str,
+        functions: Mapping[str, ToolFunction],
+        tool_timeout: ToolTimeout = None,
+        max_steps: int = 10,
+        max_concurrency: Optional[int] = None,
+        **params: Any,
+    ) -> ToolRunResult[CompletionCreateResponse]:
+        """
+        Call `create()` and run the tools the model asks for until it stops asking.
+
+        Whenever the model finishes with `finish_reason="tool_calls"`, all of the
+        requested tools are run concurrently, their results are appended as `tool`
+        messages and the conversation is sent again.
+
+        Args:
+          messages: The conversation to start from. It is not modified; the full conversation
+              is returned as `ToolRunResult.messages`.
+
+          model: The model to use for every request of the loop.
+
+          functions: The Python callables implementing the tools given in `tools`, by name.
+              They can be sync or async and are called with the parsed arguments as keyword
+              arguments. Return values that are not strings are JSON-encoded. Errors raised by
+              a tool, unknown tools and timeouts are reported back to the model.
+
+          tool_timeout: A timeout in seconds for every tool, or a mapping of tool names to
+              timeouts. Time spent waiting for a free slot under `max_concurrency` is not counted
+              by the async client.
+
+          max_steps: The maximum number of completion requests to make.
+
+          max_concurrency: The maximum number of tools to run at the same time. By default every
+              tool call of a step is started at once; sync tools called through the async client
+              still share the event loop's worker threads.
+
+          params: Any other arguments accepted by `create()`, except `stream`.
+
+        The returned `ToolRunResult` holds the final completion, the full conversation and
+        the latency of every request and tool call.
+        """
+        if params.get("stream"):
+            raise TypeError("`run_tools()` does not support streaming responses")
+
+        return run_tool_loop(
+            self.create,
+            messages=messages,
+            functions=functions,
+            tool_timeout=tool_timeout,
+            max_steps=max_steps,
+            max_concurrency=max_concurrency,
+            params={"model": model, **params},
+        )
+
+    def conversation(self, *, model: str, messages: Iterable[Message] = (), **params: Any) -> Conversation:
+        """Start a multi-turn conversation that only encodes each message once.
+
+        `params` are sent with every request of the conversation, see `Conversation`.
+        """
+        return Conversation(self, model=model, messages=messages, **params)
+
+    def with_router(self, router: ModelRouter) -> RoutedCompletions:
+        """Return a view of this resource whose `create()` sends each request to the fastest healthy model.
+
+        Instead of retrying a model that fails with a server error, timeout or
+        connection error, the next candidate is tried. `router.stats()` exposes the
+        latency and error rate tracked for every model.
+
+        ```py
+        router = ModelRouter(["llama3.3-70b-instruct", "llama3-8b-instruct"])
+        completion = client.chat.completions.with_router(router).create(messages=messages)
+        ```
+        """
+        return RoutedCompletions(self, router)
+
+    def with_cache(self, cache: CompletionCache) -> CachedCompletions:
+        """Return a view of this resource whose `create()` answers repeated requests from `cache`.
+
+        By default only requests made with `temperature=0` are cached. Hits are
+        served without any network I/O; streaming hits replay the cached events
+        through a regular `Stream`.
+
+        ```py
+        cache = CompletionCache(SqliteCacheBackend("completions.db"), ttl=86400)
+        completion = client.chat.completions.with_cache(cache).create(
+            model="llama3-8b-instruct", messages=messages, temperature=0
+        )
+        ```
+        """
+        return CachedCompletions(self, cache)
+
+    def batch_create(
+        self,
+        requests: Iterable[Mapping[str, Any]],
+        *,
+        concurrency: int = 8,
+        ordered: bool = False,
+        checkpoint: Union[str, "os.PathLike[str]", None] = None,
+    ) -> Iterator[BatchResult[CompletionCreateResponse]]:
+        """Create a chat completion for every set of parameters in `requests`.
+
+        Each request is a dict of keyword arguments for `create()`; `requests` may be a
+        lazy generator and is only consumed as capacity frees up. Requests run on a
+        thread pool with at most `concurrency` in flight, each going through the
+        client's usual retry policy; use `client.with_options(max_retries=...)` to
+        change it for the batch.
+
+        A request that still fails after all retries does not abort the batch, its
+        exception is returned in `BatchResult.error` instead.
+
+        Args:
+          requests: The parameters for each chat completion. Streaming is not supported.
+
+          concurrency: The maximum number of requests in flight at once.
+
+          ordered: Yield results in input order rather than in completion order.
+
+          checkpoint: Path to a JSONL file recording every successful response. When
+              the file already exists, requests recorded in it are skipped, so an
+              interrupted batch can be resumed by running it again with the same inputs.
+        """
+        return run_batch(
+            self._create_batch_item,
+            requests,
+            concurrency=concurrency,
+            ordered=ordered,
+            checkpoint=checkpoint,
+        )
+
+    def _create_batch_item(self, **params: Any) -> CompletionCreateResponse:
+        if params.get("stream"):
+            raise ValueError("Streaming chat completions cannot be created in a batch")
+        return cast(CompletionCreateResponse, self.create(**params))
+
 
 class AsyncCompletionsResource(AsyncAPIResource):
     @cached_property
@@ -1005,6 +1150,181 @@ class AsyncCompletionsResource(AsyncAPIResource):
             stream_cls=AsyncStream[ChatCompletionChunk],
         )
 
+    async def run_tools(
+        self,
+        *,
+        messages: Iterable[completion_create_params.Message],
+        model: str,
+        functions: Mapping[str, ToolFunction],
+        tool_timeout: ToolTimeout = None,
+        max_steps: int = 10,
+        max_concurrency: Optional[int] = None,
+        **params: Any,
+    ) -> ToolRunResult[CompletionCreateResponse]:
+        """The async version of `CompletionsResource.run_tools()`.
+
+        Async tools run on the event loop and sync tools in worker threads.
+        """
+        if params.get("stream"):
+            raise TypeError("`run_tools()` does not support streaming responses")
+
+        return await async_run_tool_loop(
+            self.create,
+            messages=messages,
+            functions=functions,
+            tool_timeout=tool_timeout,
+            max_steps=max_steps,
+            max_concurrency=max_concurrency,
+            params={"model": model, **params},
+        )
+
+    def conversation(self, *, model: str, messages: Iterable[Message] = (), **params: Any) -> AsyncConversation:
+        """Start a multi-turn conversation that only encodes each message once.
+
+        `params` are sent with every request of the conversation, see `AsyncConversation`.
+        """
+        return AsyncConversation(self, model=model, messages=messages, **params)
+
+    @overload
+    async def race(
+        self,
+        *,
+        messages: Iterable[completion_create_params.Message],
+        model: str,
+        hedge_model: Optional[str] = None,
+        hedge_delay: float = 0.5,
+        stream: Literal[False] = False,
+        **params: Any,
+    ) -> CompletionCreateResponse: ...
+
+    @overload
+    async def race(
+        self,
+        *,
+        messages: Iterable[completion_create_params.Message],
+        model: str,
+        hedge_model: Optional[str] = None,
+        hedge_delay: float = 0.5,
+        stream: Literal[True],
+        **params: Any,
+    ) -> AsyncStream[ChatCompletionChunk]: ...
+
+    async def race(
+        self,
+        *,
+        messages: Iterable[completion_create_params.Message],
+        model: str,
+        hedge_model: Optional[str] = None,
+        hedge_delay: float = 0.5,
+        stream: bool = False,
+        **params: Any,
+    ) -> CompletionCreateResponse | AsyncStream[ChatCompletionChunk]:
+        """
+        Send the request to `model` and, unless it has succeeded within `hedge_delay`
+        seconds, to `hedge_model` as well, returning whichever succeeds first.
+
+        The losing request is cancelled as soon as there is a winner and its response
+        is closed. If the primary request fails before `hedge_delay` has passed, the
+        hedge request is sent right away. If both fail, the primary request's error is raised.
+
+        Args:
+          hedge_model: The model to send the hedge request to, `model` by default.
+
+          hedge_delay: Seconds to wait for the primary request before sending the hedge request.
+
+          stream: With `stream=True` the first stream to deliver a chunk wins, which
+              minimizes the time to the first token.
+
+          params: Any other arguments accepted by `create()`.
+        """
+        return await race_completions(
+            self,
+            model=model,
+            hedge_model=hedge_model or model,
+            hedge_delay=hedge_delay,
+            stream=stream,
+            params={"messages": list(messages), **params},
+        )
+
+    def with_router(self, router: ModelRouter) -> AsyncRoutedCompletions:
+        """Return a view of this resource whose `create()` sends each request to the fastest healthy model.
+
+        Instead of retrying a model that fails with a server error, timeout or
+        connection error, the next candidate is tried. `router.stats()` exposes the
+        latency and error rate tracked for every model.
+
+        ```py
+        router = ModelRouter(["llama3.3-70b-instruct", "llama3-8b-instruct"])
+        completion = await client.chat.completions.with_router(router).create(messages=messages)
+        ```
+        """
+        return AsyncRoutedCompletions(self, router)
+
+    def with_cache(self, cache: CompletionCache) -> AsyncCachedCompletions:
+        """Return a view of this resource whose `create()` answers repeated requests from `cache`.
+
+        By default only requests made with `temperature=0` are cached. Hits are
+        served without any network I/O; streaming hits replay the cached events
+        through a regular `AsyncStream`.
+
+        ```py
+        cache = CompletionCache(SqliteCacheBackend("completions.db"), ttl=86400)
+        completion = await client.chat.completions.with_cache(cache).create(
+            model="llama3-8b-instruct", messages=messages, temperature=0
+        )
+        ```
+        """
+        return AsyncCachedCompletions(self, cache)
+
+    def batch_create(
+        self,
+        requests: Union[Iterable[Mapping[str, Any]], AsyncIterable[Mapping[str, Any]]],
+        *,
+        concurrency: int = 8,
+        ordered: bool = False,
+        checkpoint: Union[str, "os.PathLike[str]", None] = None,
+    ) -> AsyncBatch[CompletionCreateResponse]:
+        """Create a chat completion for every set of parameters in `requests`.
+
+        Each request is a dict of keyword arguments for `create()`; `requests` may be a
+        lazy (async) generator and is only consumed as capacity frees up. At most
+        `concurrency` requests are in flight at once, each going through the client's
+        usual retry policy; use `client.with_options(max_retries=...)` to change it
+        for the batch.
+
+        A request that still fails after all retries does not abort the batch, its
+        exception is returned in `BatchResult.error` instead.
+
+        ```py
+        async with client.chat.completions.batch_create(requests, concurrency=32) as results:
+            async for result in results:
+                ...
+        ```
+
+        Args:
+          requests: The parameters for each chat completion. Streaming is not supported.
+
+          concurrency: The maximum number of requests in flight at once.
+
+          ordered: Yield results in input order rather than in completion order.
+
+          checkpoint: Path to a JSONL file recording every successful response. When
+              the file already exists, requests recorded in it are skipped, so an
+              interrupted batch can be resumed by running it again with the same inputs.
+        """
+        return AsyncBatch(
+            self._create_batch_item,
+            requests,
+            concurrency=concurrency,
+            ordered=ordered,
+            checkpoint=checkpoint,
+        )
+
+    async def _create_batch_item(self, **params: Any) -> CompletionCreateResponse:
+        if params.get("stream"):
+            raise ValueError("Streaming chat completions cannot be created in a batch")
+        return cast(CompletionCreateResponse, await self.create(**params))
+
 
 class CompletionsResourceWithRawResponse:
     def __init__(self, completions: CompletionsResource) -> None:
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any, Union, Optional, cast
+from typing import Any, Union, Iterable, Optional, cast
 from typing_extensions import Literal, overload
 
 import httpx
@@ -74,6 +74,7 @@ from .images.images import (
     AsyncImagesResourceWithStreamingResponse,
 )
 from ..._base_client import make_request_options
+from ...lib.droplets import BulkCreateResult, bulk_create, async_bulk_create
 from .account.account import (
     AccountResource,
     AsyncAccountResource,
@@ -904,6 +905,92 @@ class GPUDropletsResource(SyncAPIResource):
             cast_to=GPUDropletListSnapshotsResponse,
         )
 
+    def bulk_create(
+        self,
+        names: Iterable[str],
+        *,
+        image: Union[str, int],
+        size: str,
+        backup_policy: DropletBackupPolicyParam | Omit = omit,
+        backups: bool | Omit = omit,
+        ipv6: bool | Omit = omit,
+        monitoring: bool | Omit = omit,
+        private_networking: bool | Omit = omit,
+        region: str | Omit = omit,
+        ssh_keys: SequenceNotStr[Union[str, int]] | Omit = omit,
+        tags: Optional[SequenceNotStr[str]] | Omit = omit,
+        user_data: str | Omit = omit,
+        volumes: SequenceNotStr[str] | Omit = omit,
+        vpc_uuid: str | Omit = omit,
+        with_droplet_agent: bool | Omit = omit,
+        chunk_size: int = 10,
+        concurrency: int = 4,
+        max_requests_per_second: Optional[float] = 5.0,
+        max_retries: int = 3,
+        wait: bool = True,
+        poll_interval: float = 5.0,
+        timeout: Optional[float] = 600.0,
+    ) -> BulkCreateResult:
+        """Create a Droplet for every name, however many there are.
+
+        The names are split into chunks of up to `chunk_size`, the most a single
+        `create()` request accepts, and the chunks are created concurrently. A chunk
+        that fails with a transient error is retried on its own: the Droplets its failed
+        request created anyway are looked up by name first and only the remaining names
+        are sent again, so a retry does not create duplicates. With `wait`, the create
+        actions of every chunk are then polled together until they complete.
+
+        The Droplet parameters are those of `create()` and apply to every Droplet.
+
+        Args:
+          names: The names of the Droplets to create, one Droplet per name.
+
+          chunk_size: The number of names per `create()` request, at most 10.
+
+          concurrency: The maximum number of requests in flight at once.
+
+          max_requests_per_second: The maximum rate at which requests are started, `None` for no limit.
+
+          max_retries: The maximum number of retries of a chunk after a transient error.
+
+          wait: Whether to wait for the create actions to complete.
+
+          poll_interval: The longest time between two polls of the same action.
+
+          timeout: The maximum time to wait for each action, `None` to wait indefinitely.
+
+        Returns:
+          The Droplets of every chunk, the chunks that failed and the outcome of every
+          create action.
+        """
+        return bulk_create(
+            self,
+            names,
+            {
+                "image": image,
+                "size": size,
+                "backup_policy": backup_policy,
+                "backups": backups,
+                "ipv6": ipv6,
+                "monitoring": monitoring,
+                "private_networking": private_networking,
+                "region": region,
+                "ssh_keys": ssh_keys,
+                "tags": tags,
+                "user_data": user_data,
+                "volumes": volumes,
+                "vpc_uuid": vpc_uuid,
+                "with_droplet_agent": with_droplet_agent,
+            },
+            chunk_size=chunk_size,
+            concurrency=concurrency,
+            max_requests_per_second=max_requests_per_second,
+            max_retries=max_retries,
+            wait=wait,
+            poll_interval=poll_interval,
+            timeout=timeout,
+        )
+
 
 class AsyncGPUDropletsResource(AsyncAPIResource):
     @cached_property
@@ -1675,6 +1762,92 @@ class AsyncGPUDropletsResource(AsyncAPIResource):
             cast_to=GPUDropletListSnapshotsResponse,
         )
 
+    async def bulk_create(
+        self,
+        names: Iterable[str],
+        *,
+        image: Union[str, int],
+        size: str,
+        backup_policy: DropletBackupPolicyParam | Omit = omit,
+        backups: bool | Omit = omit,
+        ipv6: bool | Omit = omit,
+        monitoring: bool | Omit = omit,
+        private_networking: bool | Omit = omit,
+        region: str | Omit = omit,
+        ssh_keys: SequenceNotStr[Union[str, int]] | Omit = omit,
+        tags: Optional[SequenceNotStr[str]] | Omit = omit,
+        user_data: str | Omit = omit,
+        volumes: SequenceNotStr[str] | Omit = omit,
+        vpc_uuid: str | Omit = omit,
+        with_droplet_agent: bool | Omit = omit,
+        chunk_size: int = 10,
+        concurrency: int = 4,
+        max_requests_per_second: Optional[float] = 5.0,
+        max_retries: int = 3,
+        wait: bool = True,
+        poll_interval: float = 5.0,
+        timeout: Optional[float] = 600.0,
+    ) -> BulkCreateResult:
+        """Create a Droplet for every name, however many there are.
+
+        The names are split into chunks of up to `chunk_size`, the most a single
+        `create()` request accepts, and the chunks are created concurrently. A chunk
+        that fails with a transient error is retried on its own: the Droplets its failed
+        request created anyway are looked up by name first and only the remaining names
+        are sent again, so a retry does not create duplicates. With `wait`, the create
+        actions of every chunk are then polled together until they complete.
+
+        The Droplet parameters are those of `create()` and apply to every Droplet.
+
+        Args:
+          names: The names of the Droplets to create, one Droplet per name.
+
+          chunk_size: The number of names per `create()` request, at most 10.
+
+          concurrency: The maximum number of requests in flight at once.
+
+          max_requests_per_second: The maximum rate at which requests are started, `None` for no limit.
+
+          max_retries: The maximum number of retries of a chunk after a transient error.
+
+          wait: Whether to wait for the create actions to complete.
+
+          poll_interval: The longest time between two polls of the same action.
+
+          timeout: The maximum time to wait for each action, `None` to wait indefinitely.
+
+        Returns:
+          The Droplets of every chunk, the chunks that failed and the outcome of every
+          create action.
+        """
+        return await async_bulk_create(
+            self,
+            names,
+            {
+                "image": image,
+                "size": size,
+                "backup_policy": backup_policy,
+                "backups": backups,
+                "ipv6": ipv6,
+                "monitoring": monitoring,
+                "private_networking": private_networking,
+                "region": region,
+                "ssh_keys": ssh_keys,
+                "tags": tags,
+                "user_data": user_data,
+                "volumes": volumes,
+                "vpc_uuid": vpc_uuid,
+                "with_droplet_agent": with_droplet_agent,
+            },
+            chunk_size=chunk_size,
+            concurrency=concurrency,
+            max_requests_per_second=max_requests_per_second,
+            max_retries=max_retries,
+            wait=wait,
+            poll_interval=poll_interval,
+            timeout=timeout,
+        )
+
 
 class GPUDropletsResourceWithRawResponse:
     def __init__(self, gpu_droplets: GPUDropletsResource) -> None:
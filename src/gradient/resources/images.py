@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, Iterator, Optional, AsyncIterator, cast
 from typing_extensions import Literal, overload
 
 import httpx
@@ -13,12 +13,23 @@ from .._utils import required_args, maybe_transform, async_maybe_transform
 from .._compat import cached_property
 from .._resource import SyncAPIResource, AsyncAPIResource
 from .._response import (
+    APIResponse,
+    AsyncAPIResponse,
+    ResponseContextManager,
+    AsyncResponseContextManager,
     to_raw_response_wrapper,
     to_streamed_response_wrapper,
     async_to_raw_response_wrapper,
     async_to_streamed_response_wrapper,
 )
 from .._streaming import Stream, AsyncStream
+from ..lib.images import (
+    ImageSink,
+    iter_image_events,
+    write_image_response,
+    async_iter_image_events,
+    async_write_image_response,
+)
 from .._base_client import make_request_options
 from ..types.image_generate_response import ImageGenerateResponse
 from ..types.shared.image_gen_stream_event import ImageGenStreamEvent
@@ -347,6 +358,132 @@ class ImagesResource(SyncAPIResource):
             stream_cls=Stream[ImageGenStreamEvent],
         )
 
+    @overload
+    def generate_to_sink(
+        self,
+        sink: ImageSink,
+        *,
+        prompt: str,
+        background: Optional[str] | Omit = omit,
+        model: str | Omit = omit,
+        moderation: Optional[str] | Omit = omit,
+        n: Optional[int] | Omit = omit,
+        output_compression: Optional[int] | Omit = omit,
+        output_format: Optional[str] | Omit = omit,
+        partial_images: Optional[int] | Omit = omit,
+        quality: Optional[str] | Omit = omit,
+        size: Optional[str] | Omit = omit,
+        stream: Optional[Literal[False]] | Omit = omit,
+        user: Optional[str] | Omit = omit,
+        chunk_size: Optional[int] = None,
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        timeout: float | httpx.Timeout | None | NotGiven = not_given,
+    ) -> ImageGenerateResponse: ...
+
+    @overload
+    def generate_to_sink(
+        self,
+        sink: ImageSink,
+        *,
+        prompt: str,
+        stream: Literal[True],
+        background: Optional[str] | Omit = omit,
+        model: str | Omit = omit,
+        moderation: Optional[str] | Omit = omit,
+        n: Optional[int] | Omit = omit,
+        output_compression: Optional[int] | Omit = omit,
+        output_format: Optional[str] | Omit = omit,
+        partial_images: Optional[int] | Omit = omit,
+        quality: Optional[str] | Omit = omit,
+        size: Optional[str] | Omit = omit,
+        user: Optional[str] | Omit = omit,
+        chunk_size: Optional[int] = None,
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        timeout: float | httpx.Timeout | None | NotGiven = not_given,
+    ) -> Iterator[ImageGenStreamEvent]: ...
+
+    def generate_to_sink(
+        self,
+        sink: ImageSink,
+        *,
+        prompt: str,
+        background: Optional[str] | Omit = omit,
+        model: str | Omit = omit,
+        moderation: Optional[str] | Omit = omit,
+        n: Optional[int] | Omit = omit,
+        output_compression: Optional[int] | Omit = omit,
+        output_format: Optional[str] | Omit = omit,
+        partial_images: Optional[int] | Omit = omit,
+        quality: Optional[str] | Omit = omit,
+        size: Optional[str] | Omit = omit,
+        stream: Optional[Literal[False]] | Literal[True] | Omit = omit,
+        user: Optional[str] | Omit = omit,
+        chunk_size: Optional[int] = None,
+        # Use the following arguments if you need to pass additional parameters to the API that aren't available via kwargs.
+        # The extra values given here take precedence over values defined on the client or passed to this method.
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        timeout: float | httpx.Timeout | None | NotGiven = not_given,
+    ) -> ImageGenerateResponse | Iterator[ImageGenStreamEvent]:
+        """Generate images and decode them straight into `sink`.
+
+        Unlike `generate()`, the base64 image data is never held as a string: it is
+        decoded incrementally while the response body is read, so peak memory is
+        bounded by `chunk_size` rather than by the size of the images. Use
+        `ImageFileSink` to write images to disk or `ImageBufferSink` to keep the
+        decoded bytes in memory.
+
+        The returned response, or each streamed event, has `b64_json` set to an empty
+        string. When `stream` is true, the request is sent once iteration starts and
+        every image is committed to the sink before its event is yielded.
+
+        Args:
+          sink: Where to write the decoded images.
+
+          chunk_size: The size of the chunks the response body is read in.
+
+        All other arguments are the same as for `generate()`.
+        """
+        response = self.with_streaming_response.generate(
+            prompt=prompt,
+            background=background,
+            model=model,
+            moderation=moderation,
+            n=n,
+            output_compression=output_compression,
+            output_format=output_format,
+            partial_images=partial_images,
+            quality=quality,
+            size=size,
+            # passed through as given, so that an omitted `stream` is not sent either
+            stream=cast(bool, stream),
+            user=user,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout,
+        )
+        if stream is True:
+            return self._iter_to_sink(sink, response, chunk_size=chunk_size)
+
+        with response as http_response:
+            return write_image_response(sink, http_response, self._client, chunk_size=chunk_size)
+
+    def _iter_to_sink(
+        self,
+        sink: ImageSink,
+        response: ResponseContextManager[APIResponse[Any]],
+        *,
+        chunk_size: Optional[int],
+    ) -> Iterator[ImageGenStreamEvent]:
+        with response as http_response:
+            yield from iter_image_events(sink, http_response, self._client, chunk_size=chunk_size)
+
 
 class AsyncImagesResource(AsyncAPIResource):
     @cached_property
@@ -668,6 +805,133 @@ class AsyncImagesResource(AsyncAPIResource):
             stream_cls=AsyncStream[ImageGenStreamEvent],
         )
 
+    @overload
+    async def generate_to_sink(
+        self,
+        sink: ImageSink,
+        *,
+        prompt: str,
+        background: Optional[str] | Omit = omit,
+        model: str | Omit = omit,
+        moderation: Optional[str] | Omit = omit,
+        n: Optional[int] | Omit = omit,
+        output_compression: Optional[int] | Omit = omit,
+        output_format: Optional[str] | Omit = omit,
+        partial_images: Optional[int] | Omit = omit,
+        quality: Optional[str] | Omit = omit,
+        size: Optional[str] | Omit = omit,
+        stream: Optional[Literal[False]] | Omit = omit,
+        user: Optional[str] | Omit = omit,
+        chunk_size: Optional[int] = None,
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        timeout: float | httpx.Timeout | None | NotGiven = not_given,
+    ) -> ImageGenerateResponse: ...
+
+    @overload
+    async def generate_to_sink(
+        self,
+        sink: ImageSink,
+        *,
+        prompt: str,
+        stream: Literal[True],
+        background: Optional[str] | Omit = omit,
+        model: str | Omit = omit,
+        moderation: Optional[str] | Omit = omit,
+        n: Optional[int] | Omit = omit,
+        output_compression: Optional[int] | Omit = omit,
+        output_format: Optional[str] | Omit = omit,
+        partial_images: Optional[int] | Omit = omit,
+        quality: Optional[str] | Omit = omit,
+        size: Optional[str] | Omit = omit,
+        user: Optional[str] | Omit = omit,
+        chunk_size: Optional[int] = None,
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        timeout: float | httpx.Timeout | None | NotGiven = not_given,
+    ) -> AsyncIterator[ImageGenStreamEvent]: ...
+
+    async def generate_to_sink(
+        self,
+        sink: ImageSink,
+        *,
+        prompt: str,
+        background: Optional[str] | Omit = omit,
+        model: str | Omit = omit,
+        moderation: Optional[str] | Omit = omit,
+        n: Optional[int] | Omit = omit,
+        output_compression: Optional[int] | Omit = omit,
+        output_format: Optional[str] | Omit = omit,
+        partial_images: Optional[int] | Omit = omit,
+        quality: Optional[str] | Omit = omit,
+        size: Optional[str] | Omit = omit,
+        stream: Optional[Literal[False]] | Literal[True] | Omit = omit,
+        user: Optional[str] | Omit = omit,
+        chunk_size: Optional[int] = None,
+        # Use the following arguments if you need to pass additional parameters to the API that aren't available via kwargs.
+        # The extra values given here take precedence over values defined on the client or passed to this method.
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        timeout: float | httpx.Timeout | None | NotGiven = not_given,
+    ) -> ImageGenerateResponse | AsyncIterator[ImageGenStreamEvent]:
+        """Generate images and decode them straight into `sink`.
+
+        Unlike `generate()`, the base64 image data is never held as a string: it is
+        decoded incrementally while the response body is read, so peak memory is
+        bounded by `chunk_size` rather than by the size of the images. Use
+        `ImageFileSink` to write images to disk or `ImageBufferSink` to keep the
+        decoded bytes in memory.
+
+        The returned response, or each streamed event, has `b64_json` set to an empty
+        string. When `stream` is true, the request is sent once iteration starts and
+        every image is committed to the sink before its event is yielded.
+
+        Args:
+          sink: Where to write the decoded images.
+
+          chunk_size: The size of the chunks the response body is read in.
+
+        All other arguments are the same as for `generate()`.
+        """
+        response = self.with_streaming_response.generate(
+            prompt=prompt,
+            background=background,
+            model=model,
+            moderation=moderation,
+            n=n,
+            output_compression=output_compression,
+            output_format=output_format,
+            partial_images=partial_images,
+            quality=quality,
+            size=size,
+            # passed through as given, so that an omitted `stream` is not sent either
+            stream=cast(bool, stream),
+            user=user,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=timeout,
+        )
+        if stream is True:
+            return self._iter_to_sink(sink, response, chunk_size=chunk_size)
+
+        async with response as http_response:
+            return await async_write_image_response(sink, http_response, self._client, chunk_size=chunk_size)
+
+    async def _iter_to_sink(
+        self,
+        sink: ImageSink,
+        response: AsyncResponseContextManager[AsyncAPIResponse[Any]],
+        *,
+        chunk_size: Optional[int],
+    ) -> AsyncIterator[ImageGenStreamEvent]:
+        async with response as http_response:
+            async for event in async_iter_image_events(sink, http_response, self._client, chunk_size=chunk_size):
+                yield event
+
 
 class ImagesResourceWithRawResponse:
     def __init__(self, images: ImagesResource) -> None:
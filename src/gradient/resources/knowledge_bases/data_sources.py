@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Callable, Iterable, Optional
 
 import httpx
 
@@ -16,6 +16,13 @@ from ..._response import (
     async_to_raw_response_wrapper,
     async_to_streamed_response_wrapper,
 )
+from ...lib.uploads import (
+    DEFAULT_CHUNK_SIZE,
+    FilePath,
+    FileUploadReport,
+    bulk_upload,
+    async_bulk_upload,
+)
 from ..._base_client import make_request_options
 from ...types.knowledge_bases import (
     data_source_list_params,
@@ -246,6 +253,58 @@ class DataSourcesResource(SyncAPIResource):
             cast_to=DataSourceCreatePresignedURLsResponse,
         )
 
+    def upload_files(
+        self,
+        knowledge_base_uuid: str,
+        files: Iterable[FilePath],
+        *,
+        concurrency: int = 8,
+        presign_batch_size: int = 100,
+        max_retries: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        create_data_sources: bool = True,
+        on_progress: Optional[Callable[[FileUploadReport], None]] = None,
+    ) -> FileUploadReport:
+        """
+        Upload local files to a knowledge base through presigned URLs and add a
+        `file_upload_data_source` for each of them.
+
+        Presigned URLs are requested in batches as the uploads progress. Files are
+        streamed from disk, at most `concurrency` at a time, and each file is
+        retried on its own. A file that still fails is reported in the result
+        instead of stopping the other uploads.
+
+        Args:
+          files: Paths of the files to upload.
+
+          concurrency: The maximum number of files uploaded at the same time.
+
+          presign_batch_size: The number of files to request presigned URLs for at once.
+
+          max_retries: How often to retry a failed upload, the client's `max_retries` by default.
+
+          chunk_size: The number of bytes read from disk at a time for each upload.
+
+          create_data_sources: Whether to create a data source for each uploaded file.
+
+          on_progress: Called with the report every time a file completes.
+        """
+        if not knowledge_base_uuid:
+            raise ValueError(
+                f"Expected a non-empty value for `knowledge_base_uuid` but received {knowledge_base_uuid!r}"
+            )
+        return bulk_upload(
+            self,
+            knowledge_base_uuid,
+            files,
+            concurrency=concurrency,
+            presign_batch_size=presign_batch_size,
+            max_retries=self._client.max_retries if max_retries is None else max_retries,
+            chunk_size=chunk_size,
+            create_data_sources=create_data_sources,
+            on_progress=on_progress,
+        )
+
 
 class AsyncDataSourcesResource(AsyncAPIResource):
     @cached_property
@@ -460,6 +519,58 @@ class AsyncDataSourcesResource(AsyncAPIResource):
             cast_to=DataSourceCreatePresignedURLsResponse,
         )
 
+    async def upload_files(
+        self,
+        knowledge_base_uuid: str,
+        files: Iterable[FilePath],
+        *,
+        concurrency: int = 8,
+        presign_batch_size: int = 100,
+        max_retries: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        create_data_sources: bool = True,
+        on_progress: Optional[Callable[[FileUploadReport], None]] = None,
+    ) -> FileUploadReport:
+        """
+        Upload local files to a knowledge base through presigned URLs and add a
+        `file_upload_data_source` for each of them.
+
+        Presigned URLs are requested in batches as the uploads progress. Files are
+        streamed from disk, at most `concurrency` at a time, and each file is
+        retried on its own. A file that still fails is reported in the result
+        instead of stopping the other uploads.
+
+        Args:
+          files: Paths of the files to upload.
+
+          concurrency: The maximum number of files uploaded at the same time.
+
+          presign_batch_size: The number of files to request presigned URLs for at once.
+
+          max_retries: How often to retry a failed upload, the client's `max_retries` by default.
+
+          chunk_size: The number of bytes read from disk at a time for each upload.
+
+          create_data_sources: Whether to create a data source for each uploaded file.
+
+          on_progress: Called with the report every time a file completes.
+        """
+        if not knowledge_base_uuid:
+            raise ValueError(
+                f"Expected a non-empty value for `knowledge_base_uuid` but received {knowledge_base_uuid!r}"
+            )
+        return await async_bulk_upload(
+            self,
+            knowledge_base_uuid,
+            files,
+            concurrency=concurrency,
+            presign_batch_size=presign_batch_size,
+            max_retries=self._client.max_retries if max_retries is None else max_retries,
+            chunk_size=chunk_size,
+            create_data_sources=create_data_sources,
+            on_progress=on_progress,
+        )
+
 
 class DataSourcesResourceWithRawResponse:
     def __init__(self, data_sources: DataSourcesResource) -> None:
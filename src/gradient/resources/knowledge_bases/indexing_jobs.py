@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
-import time
-import asyncio
+import os
+import threading
+from typing import Any, Dict, Callable, Iterator, Optional, AsyncIterator
+from functools import partial
 
 import httpx
 
@@ -18,7 +20,11 @@ from ..._response import (
     async_to_streamed_response_wrapper,
 )
 from ..._exceptions import IndexingJobError, IndexingJobTimeoutError
+from ...lib.polling import PollPolicy, poll_until, async_poll_until
 from ..._base_client import make_request_options
+from ...lib.retrieval_cache import observe_indexing_job
+from ...lib.indexing_reports import DEFAULT_CHUNK_SIZE, ReportFormat, iter_report, async_iter_report
+from ...lib.indexing_progress import IndexingJobProgress, watch_progress, async_watch_progress
 from ...types.knowledge_bases import (
     indexing_job_list_params,
     indexing_job_create_params,
@@ -34,6 +40,43 @@ from ...types.knowledge_bases.indexing_job_retrieve_data_sources_response import
 __all__ = ["IndexingJobsResource", "AsyncIndexingJobsResource"]
 
 
+def _is_job_complete(uuid: str, response: IndexingJobRetrieveResponse) -> bool:
+    if not response.job or not response.job.phase:
+        return False
+
+    phase = response.job.phase
+
+    # Success state
+    if phase == "BATCH_JOB_PHASE_SUCCEEDED":
+        return True
+
+    # Failure states
+    if phase == "BATCH_JOB_PHASE_FAILED":
+        raise IndexingJobError(f"Indexing job {uuid} failed. ", uuid=uuid, phase=phase)
+
+    if phase == "BATCH_JOB_PHASE_ERROR":
+        raise IndexingJobError(f"Indexing job {uuid} encountered an error", uuid=uuid, phase=phase)
+
+    if phase == "BATCH_JOB_PHASE_CANCELLED":
+        raise IndexingJobError(f"Indexing job {uuid} was cancelled", uuid=uuid, phase=phase)
+
+    # Still in progress (UNKNOWN, PENDING, or RUNNING)
+    return False
+
+
+def _job_timeout_error(
+    uuid: str, timeout: Optional[float], response: Optional[IndexingJobRetrieveResponse]
+) -> Exception:
+    assert timeout is not None
+    phase = response.job.phase if response and response.job and response.job.phase else "UNKNOWN"
+    return IndexingJobTimeoutError(
+        f"Indexing job {uuid} did not complete within {timeout} seconds. Current phase: {phase}",
+        uuid=uuid,
+        phase=phase,
+        timeout=timeout,
+    )
+
+
 class IndexingJobsResource(SyncAPIResource):
     @cached_property
     def with_raw_response(self) -> IndexingJobsResourceWithRawResponse:
@@ -127,7 +170,7 @@ class IndexingJobsResource(SyncAPIResource):
         """
         if not uuid:
             raise ValueError(f"Expected a non-empty value for `uuid` but received {uuid!r}")
-        return self._get(
+        response = self._get(
             f"/v2/gen-ai/indexing_jobs/{uuid}"
             if self._client._base_url_overridden
             else f"https://api.digitalocean.com/v2/gen-ai/indexing_jobs/{uuid}",
@@ -136,6 +179,11 @@ class IndexingJobsResource(SyncAPIResource):
             ),
             cast_to=IndexingJobRetrieveResponse,
         )
+        # `with_raw_response` and `with_streaming_response` make `_get()` return the raw response
+        if isinstance(response, IndexingJobRetrieveResponse):  # pyright: ignore[reportUnnecessaryIsInstance]
+            # lets retrieval caches drop results from before the knowledge base was reindexed
+            observe_indexing_job(response.job)
+        return response
 
     def list(
         self,
@@ -312,6 +360,7 @@ class IndexingJobsResource(SyncAPIResource):
         extra_query: Query | None = None,
         extra_body: Body | None = None,
         request_timeout: float | httpx.Timeout | None | NotGiven = not_given,
+        cancel_event: Optional[threading.Event] = None,
     ) -> IndexingJobRetrieveResponse:
         """
         Wait for an indexing job to complete by polling its status.
@@ -323,7 +372,8 @@ class IndexingJobsResource(SyncAPIResource):
         Args:
           uuid: The UUID of the indexing job to wait for.
 
-          poll_interval: Time in seconds between status checks (default: 5 seconds).
+          poll_interval: The longest time in seconds between status checks (default: 5 seconds).
+              Checks start out more frequent and back off with jitter up to this interval.
 
           timeout: Maximum time in seconds to wait for completion. If None, waits indefinitely.
 
@@ -335,6 +385,8 @@ class IndexingJobsResource(SyncAPIResource):
 
           request_timeout: Override the client-level default timeout for this request, in seconds
 
+          cancel_event: Stops waiting with a `PollingCancelledError` when set, e.g. from another thread
+
         Returns:
           The final IndexingJobRetrieveResponse when the job completes successfully.
 
@@ -345,61 +397,143 @@ class IndexingJobsResource(SyncAPIResource):
         if not uuid:
             raise ValueError(f"Expected a non-empty value for `uuid` but received {uuid!r}")
 
-        start_time = time.time()
-
-        while True:
-            response = self.retrieve(
+        # a bare `partial` would make mypy infer `Any` for the response
+        is_done: Callable[[IndexingJobRetrieveResponse], bool] = partial(_is_job_complete, uuid)
+        return poll_until(
+            lambda: self.retrieve(
                 uuid,
                 extra_headers=extra_headers,
                 extra_query=extra_query,
                 extra_body=extra_body,
                 timeout=request_timeout,
-            )
-
-            # Check if job is in a terminal state
-            if response.job and response.job.phase:
-                phase = response.job.phase
-
-                # Success state
-                if phase == "BATCH_JOB_PHASE_SUCCEEDED":
-                    return response
-
-                # Failure states
-                if phase == "BATCH_JOB_PHASE_FAILED":
-                    raise IndexingJobError(
-                        f"Indexing job {uuid} failed. ",
-                        uuid=uuid,
-                        phase=phase,
-                    )
-
-                if phase == "BATCH_JOB_PHASE_ERROR":
-                    raise IndexingJobError(
-                        f"Indexing job {uuid} encountered an error",
-                        uuid=uuid,
-                        phase=phase,
-                    )
-
-                if phase == "BATCH_JOB_PHASE_CANCELLED":
-                    raise IndexingJobError(
-                        f"Indexing job {uuid} was cancelled",
-                        uuid=uuid,
-                        phase=phase,
-                    )
-
-                # Still in progress (UNKNOWN, PENDING, or RUNNING)
-                # Check timeout
-                if timeout is not None:
-                    elapsed = time.time() - start_time
-                    if elapsed >= timeout:
-                        raise IndexingJobTimeoutError(
-                            f"Indexing job {uuid} did not complete within {timeout} seconds. Current phase: {phase}",
-                            uuid=uuid,
-                            phase=phase,
-                            timeout=timeout,
-                        )
-
-            # Wait before next poll
-            time.sleep(poll_interval)
+            ),
+            is_done,
+            client=self._client,
+            policy=PollPolicy.up_to(poll_interval),
+            timeout=timeout,
+            on_timeout=partial(_job_timeout_error, uuid, timeout),
+            sleep=self._sleep,
+            cancel_event=cancel_event,
+        )
+
+    def watch_progress(
+        self,
+        uuid: str,
+        *,
+        poll_interval: float = 5,
+        timeout: float | None = None,
+        # Use the following arguments if you need to pass additional parameters to the API that aren't available via kwargs.
+        # The extra values given here take precedence over values defined on the client or passed to this method.
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        request_timeout: float | httpx.Timeout | None | NotGiven = not_given,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Iterator[IndexingJobProgress]:
+        """
+        Follow an indexing job, yielding a snapshot every time its progress changes.
+
+        Each snapshot carries the job phase, the status of every data source (from
+        `retrieve_data_sources()`, which is only called again when the job reports a
+        change) and the token and file counters. Polling backs off like
+        `wait_for_completion()` while nothing changes and starts over from the
+        shortest interval after every change. The iterator stops after the snapshot
+        with a terminal phase; a failed, errored or cancelled job is reported through
+        that snapshot rather than raised.
+
+        Args:
+          uuid: The UUID of the indexing job to follow.
+
+          poll_interval: The longest time in seconds between status checks (default: 5 seconds).
+
+          timeout: Maximum time in seconds to follow the job. If None, follows it until it finishes.
+
+          extra_headers: Send extra headers
+
+          extra_query: Add additional query parameters to the request
+
+          extra_body: Add additional JSON properties to the request
+
+          request_timeout: Override the client-level default timeout for this request, in seconds
+
+          cancel_event: Stops following the job with a `PollingCancelledError` when set
+
+        Raises:
+          IndexingJobTimeoutError: If the job doesn't finish within the specified timeout.
+        """
+        if not uuid:
+            raise ValueError(f"Expected a non-empty value for `uuid` but received {uuid!r}")
+
+        return watch_progress(
+            self,
+            uuid,
+            policy=PollPolicy.up_to(poll_interval),
+            timeout=timeout,
+            on_timeout=partial(_job_timeout_error, uuid, timeout),
+            request_options={
+                "extra_headers": extra_headers,
+                "extra_query": extra_query,
+                "extra_body": extra_body,
+                "timeout": request_timeout,
+            },
+            sleep=self._sleep,
+            cancel_event=cancel_event,
+        )
+
+    def iter_report(
+        self,
+        uuid: str,
+        *,
+        format: ReportFormat = "auto",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        spool_to: str | os.PathLike[str] | None = None,
+        # Use the following arguments if you need to pass additional parameters to the API that aren't available via kwargs.
+        # The extra values given here take precedence over values defined on the client or passed to this method.
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        request_timeout: float | httpx.Timeout | None | NotGiven = not_given,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Download the details report of an indexing job and parse it record by record.
+
+        The report behind `retrieve_signed_url()` is streamed in chunks and parsed as it
+        arrives, so memory use stays bounded however large the report is. Each JSON Lines
+        record is yielded as a dict; CSV rows are yielded as dicts keyed by the header row.
+
+        Args:
+          uuid: The UUID of the indexing job.
+
+          format: `"jsonl"`, `"csv"` or `"auto"` to detect the format from the URL or the content.
+              Gzip compressed reports are decompressed on the fly.
+
+          chunk_size: The number of bytes to read at a time.
+
+          spool_to: A path to also write the downloaded report to, as it is parsed.
+
+          extra_headers: Send extra headers
+
+          extra_query: Add additional query parameters to the request
+
+          extra_body: Add additional JSON properties to the request
+
+          request_timeout: Override the client-level default timeout for the signed URL request, in seconds
+        """
+        if not uuid:
+            raise ValueError(f"Expected a non-empty value for `uuid` but received {uuid!r}")
+        if chunk_size < 1:
+            raise ValueError(f"Expected `chunk_size` to be at least 1 but received {chunk_size}")
+
+        response = self.retrieve_signed_url(
+            uuid,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=request_timeout,
+        )
+        return iter_report(
+            self._client, uuid, response.signed_url, format=format, chunk_size=chunk_size, spool_to=spool_to
+        )
 
 
 class AsyncIndexingJobsResource(AsyncAPIResource):
@@ -495,7 +629,7 @@ class AsyncIndexingJobsResource(AsyncAPIResource):
         """
         if not uuid:
             raise ValueError(f"Expected a non-empty value for `uuid` but received {uuid!r}")
-        return await self._get(
+        response = await self._get(
             f"/v2/gen-ai/indexing_jobs/{uuid}"
             if self._client._base_url_overridden
             else f"https://api.digitalocean.com/v2/gen-ai/indexing_jobs/{uuid}",
@@ -504,6 +638,11 @@ class AsyncIndexingJobsResource(AsyncAPIResource):
             ),
             cast_to=IndexingJobRetrieveResponse,
         )
+        # `with_raw_response` and `with_streaming_response` make `_get()` return the raw response
+        if isinstance(response, IndexingJobRetrieveResponse):  # pyright: ignore[reportUnnecessaryIsInstance]
+            # lets retrieval caches drop results from before the knowledge base was reindexed
+            observe_indexing_job(response.job)
+        return response
 
     async def list(
         self,
@@ -691,7 +830,8 @@ class AsyncIndexingJobsResource(AsyncAPIResource):
         Args:
           uuid: The UUID of the indexing job to wait for.
 
-          poll_interval: Time in seconds between status checks (default: 5 seconds).
+          poll_interval: The longest time in seconds between status checks (default: 5 seconds).
+              Checks start out more frequent and back off with jitter up to this interval.
 
           timeout: Maximum time in seconds to wait for completion. If None, waits indefinitely.
 
@@ -713,61 +853,138 @@ class AsyncIndexingJobsResource(AsyncAPIResource):
         if not uuid:
             raise ValueError(f"Expected a non-empty value for `uuid` but received {uuid!r}")
 
-        start_time = time.time()
-
-        while True:
-            response = await self.retrieve(
+        # a bare `partial` would make mypy infer `Any` for the response
+        is_done: Callable[[IndexingJobRetrieveResponse], bool] = partial(_is_job_complete, uuid)
+        return await async_poll_until(
+            lambda: self.retrieve(
                 uuid,
                 extra_headers=extra_headers,
                 extra_query=extra_query,
                 extra_body=extra_body,
                 timeout=request_timeout,
-            )
-
-            # Check if job is in a terminal state
-            if response.job and response.job.phase:
-                phase = response.job.phase
-
-                # Success state
-                if phase == "BATCH_JOB_PHASE_SUCCEEDED":
-                    return response
-
-                # Failure states
-                if phase == "BATCH_JOB_PHASE_FAILED":
-                    raise IndexingJobError(
-                        f"Indexing job {uuid} failed. ",
-                        uuid=uuid,
-                        phase=phase,
-                    )
-
-                if phase == "BATCH_JOB_PHASE_ERROR":
-                    raise IndexingJobError(
-                        f"Indexing job {uuid} encountered an error",
-                        uuid=uuid,
-                        phase=phase,
-                    )
-
-                if phase == "BATCH_JOB_PHASE_CANCELLED":
-                    raise IndexingJobError(
-                        f"Indexing job {uuid} was cancelled",
-                        uuid=uuid,
-                        phase=phase,
-                    )
-
-                # Still in progress (UNKNOWN, PENDING, or RUNNING)
-                # Check timeout
-                if timeout is not None:
-                    elapsed = time.time() - start_time
-                    if elapsed >= timeout:
-                        raise IndexingJobTimeoutError(
-                            f"Indexing job {uuid} did not complete within {timeout} seconds. Current phase: {phase}",
-                            uuid=uuid,
-                            phase=phase,
-                            timeout=timeout,
-                        )
-
-            # Wait before next poll
-            await asyncio.sleep(poll_interval)
+            ),
+            is_done,
+            client=self._client,
+            policy=PollPolicy.up_to(poll_interval),
+            timeout=timeout,
+            on_timeout=partial(_job_timeout_error, uuid, timeout),
+            sleep=self._sleep,
+        )
+
+    def watch_progress(
+        self,
+        uuid: str,
+        *,
+        poll_interval: float = 5,
+        timeout: float | None = None,
+        # Use the following arguments if you need to pass additional parameters to the API that aren't available via kwargs.
+        # The extra values given here take precedence over values defined on the client or passed to this method.
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        request_timeout: float | httpx.Timeout | None | NotGiven = not_given,
+    ) -> AsyncIterator[IndexingJobProgress]:
+        """
+        Follow an indexing job, yielding a snapshot every time its progress changes.
+
+        Each snapshot carries the job phase, the status of every data source (from
+        `retrieve_data_sources()`, which is only called again when the job reports a
+        change) and the token and file counters. Polling backs off like
+        `wait_for_completion()` while nothing changes and starts over from the
+        shortest interval after every change. The iterator stops after the snapshot
+        with a terminal phase; a failed, errored or cancelled job is reported through
+        that snapshot rather than raised.
+
+        Args:
+          uuid: The UUID of the indexing job to follow.
+
+          poll_interval: The longest time in seconds between status checks (default: 5 seconds).
+
+          timeout: Maximum time in seconds to follow the job. If None, follows it until it finishes.
+
+          extra_headers: Send extra headers
+
+          extra_query: Add additional query parameters to the request
+
+          extra_body: Add additional JSON properties to the request
+
+          request_timeout: Override the client-level default timeout for this request, in seconds
+
+        Raises:
+          IndexingJobTimeoutError: If the job doesn't finish within the specified timeout.
+        """
+        if not uuid:
+            raise ValueError(f"Expected a non-empty value for `uuid` but received {uuid!r}")
+
+        return async_watch_progress(
+            self,
+            uuid,
+            policy=PollPolicy.up_to(poll_interval),
+            timeout=timeout,
+            on_timeout=partial(_job_timeout_error, uuid, timeout),
+            request_options={
+                "extra_headers": extra_headers,
+                "extra_query": extra_query,
+                "extra_body": extra_body,
+                "timeout": request_timeout,
+            },
+            sleep=self._sleep,
+        )
+
+    async def iter_report(
+        self,
+        uuid: str,
+        *,
+        format: ReportFormat = "auto",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        spool_to: str | os.PathLike[str] | None = None,
+        # Use the following arguments if you need to pass additional parameters to the API that aren't available via kwargs.
+        # The extra values given here take precedence over values defined on the client or passed to this method.
+        extra_headers: Headers | None = None,
+        extra_query: Query | None = None,
+        extra_body: Body | None = None,
+        request_timeout: float | httpx.Timeout | None | NotGiven = not_given,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Download the details report of an indexing job and parse it record by record.
+
+        The report behind `retrieve_signed_url()` is streamed in chunks and parsed as it
+        arrives, so memory use stays bounded however large the report is. Each JSON Lines
+        record is yielded as a dict; CSV rows are yielded as dicts keyed by the header row.
+
+        Args:
+          uuid: The UUID of the indexing job.
+
+          format: `"jsonl"`, `"csv"` or `"auto"` to detect the format from the URL or the content.
+              Gzip compressed reports are decompressed on the fly.
+
+          chunk_size: The number of bytes to read at a time.
+
+          spool_to: A path to also write the downloaded report to, as it is parsed.
+
+          extra_headers: Send extra headers
+
+          extra_query: Add additional query parameters to the request
+
+          extra_body: Add additional JSON properties to the request
+
+          request_timeout: Override the client-level default timeout for the signed URL request, in seconds
+        """
+        if not uuid:
+            raise ValueError(f"Expected a non-empty value for `uuid` but received {uuid!r}")
+        if chunk_size < 1:
+            raise ValueError(f"Expected `chunk_size` to be at least 1 but received {chunk_size}")
+
+        response = await self.retrieve_signed_url(
+            uuid,
+            extra_headers=extra_headers,
+            extra_query=extra_query,
+            extra_body=extra_body,
+            timeout=request_timeout,
+        )
+        return async_iter_report(
+            self._client, uuid, response.signed_url, format=format, chunk_size=chunk_size, spool_to=spool_to
+        )
 
 
 class IndexingJobsResourceWithRawResponse:
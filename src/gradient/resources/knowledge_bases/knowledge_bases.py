@@ -2,9 +2,9 @@
 
 from __future__ import annotations
 
-import time
-import asyncio
-from typing import Iterable
+import threading
+from typing import Iterable, Optional
+from functools import partial
 
 import httpx
 
@@ -40,6 +40,8 @@ from .data_sources import (
     DataSourcesResourceWithStreamingResponse,
     AsyncDataSourcesResourceWithStreamingResponse,
 )
+from ...lib.kb_sync import FilePath, DirectorySyncReport, sync_directory, async_sync_directory
+from ...lib.polling import PollPolicy, poll_until, async_poll_until
 from .indexing_jobs import (
     IndexingJobsResource,
     AsyncIndexingJobsResource,
@@ -78,6 +80,22 @@ class KnowledgeBaseTimeoutError(Exception):
     pass
 
 
+def _is_database_online(response: KnowledgeBaseRetrieveResponse) -> bool:
+    status = response.database_status
+    if status == "ONLINE":
+        return True
+    if status in {"DECOMMISSIONED", "UNHEALTHY"}:
+        raise KnowledgeBaseDatabaseError(f"Knowledge base database entered failed state: {status}")
+    return False
+
+
+def _database_timeout_error(timeout: float, _response: Optional[KnowledgeBaseRetrieveResponse]) -> Exception:
+    return KnowledgeBaseTimeoutError(
+        f"Timeout waiting for knowledge base database to become ready. "
+        f"Database did not reach ONLINE status within {timeout} seconds."
+    )
+
+
 class KnowledgeBasesResource(SyncAPIResource):
     @cached_property
     def data_sources(self) -> DataSourcesResource:
@@ -404,6 +422,7 @@ class KnowledgeBasesResource(SyncAPIResource):
         extra_headers: Headers | None = None,
         extra_query: Query | None = None,
         extra_body: Body | None = None,
+        cancel_event: Optional[threading.Event] = None,
     ) -> KnowledgeBaseRetrieveResponse:
         """
         Poll the knowledge base until the database status is ONLINE or a failed state is reached.
@@ -417,7 +436,8 @@ class KnowledgeBasesResource(SyncAPIResource):
 
           timeout: Maximum time to wait in seconds (default: 600 seconds / 10 minutes)
 
-          poll_interval: Time to wait between polls in seconds (default: 5 seconds)
+          poll_interval: The longest time to wait between polls in seconds (default: 5 seconds).
+              Polls start out more frequent and back off with jitter up to this interval.
 
           extra_headers: Send extra headers
 
@@ -425,6 +445,8 @@ class KnowledgeBasesResource(SyncAPIResource):
 
           extra_body: Add additional JSON properties to the request
 
+          cancel_event: Stops waiting with a `PollingCancelledError` when set, e.g. from another thread
+
         Returns:
           The final KnowledgeBaseRetrieveResponse when the database status is ONLINE
 
@@ -436,37 +458,80 @@ class KnowledgeBasesResource(SyncAPIResource):
         if not uuid:
             raise ValueError(f"Expected a non-empty value for `uuid` but received {uuid!r}")
 
-        start_time = time.time()
-        failed_states = {"DECOMMISSIONED", "UNHEALTHY"}
-
-        while True:
-            elapsed = time.time() - start_time
-            if elapsed >= timeout:
-                raise KnowledgeBaseTimeoutError(
-                    f"Timeout waiting for knowledge base database to become ready. "
-                    f"Database did not reach ONLINE status within {timeout} seconds."
-                )
-
-            response = self.retrieve(
+        return poll_until(
+            lambda: self.retrieve(
                 uuid,
                 extra_headers=extra_headers,
                 extra_query=extra_query,
                 extra_body=extra_body,
-            )
+            ),
+            _is_database_online,
+            client=self._client,
+            policy=PollPolicy.up_to(poll_interval),
+            timeout=timeout,
+            on_timeout=partial(_database_timeout_error, timeout),
+            sleep=self._sleep,
+            cancel_event=cancel_event,
+        )
 
-            status = response.database_status
+    def sync_directory(
+        self,
+        knowledge_base_uuid: str,
+        directory: FilePath,
+        *,
+        manifest_path: Optional[FilePath] = None,
+        pattern: str = "**/*",
+        hash_workers: Optional[int] = None,
+        concurrency: int = 8,
+        delete_removed: bool = True,
+        start_indexing_job: bool = True,
+    ) -> DirectorySyncReport:
+        """
+        Upload the files of a local directory to a knowledge base, skipping the ones
+        that are already there.
+
+        A manifest of the content hash, object key and data source of every synced
+        file is kept in the directory. Only files that are new or whose size or
+        modification time changed are hashed, on a process pool; files whose
+        content is not in the knowledge base yet are uploaded with
+        `data_sources.upload_files()`, data sources whose content is gone from the
+        directory are deleted and a single indexing job is started for the new
+        data sources. Files that fail to upload, data sources that fail to be
+        deleted and data sources no indexing job could be started for are kept in
+        the manifest and retried on the next sync.
+
+        Args:
+          directory: The directory to sync.
+
+          manifest_path: Where to keep the manifest, `.gradient-sync.json` in `directory` by default.
+
+          pattern: A glob pattern selecting the files to sync, relative to `directory`.
 
-            if status == "ONLINE":
-                return response
+          hash_workers: The number of processes used to hash files, the number of CPUs by default.
 
-            if status in failed_states:
-                raise KnowledgeBaseDatabaseError(f"Knowledge base database entered failed state: {status}")
+          concurrency: The maximum number of files uploaded or data sources deleted at the same time.
 
-            # Sleep before next poll, but don't exceed timeout
-            remaining_time = timeout - elapsed
-            sleep_time = min(poll_interval, remaining_time)
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+          delete_removed: Whether to delete the data sources of files that were removed;
+              if not, they are deleted by the next sync that does.
+
+          start_indexing_job: Whether to start an indexing job for the uploaded files;
+              if not, they are indexed by the next sync that does.
+        """
+        if not knowledge_base_uuid:
+            raise ValueError(
+                f"Expected a non-empty value for `knowledge_base_uuid` but received {knowledge_base_uuid!r}"
+            )
+        return sync_directory(
+            self,
+            knowledge_base_uuid,
+            directory,
+            manifest_path=manifest_path,
+            pattern=pattern,
+            hash_workers=hash_workers,
+            concurrency=concurrency,
+            delete_removed=delete_removed,
+            start_indexing_job=start_indexing_job,
+        )
 
     def list_indexing_jobs(
         self,
@@ -853,7 +918,8 @@ class AsyncKnowledgeBasesResource(AsyncAPIResource):
 
           timeout: Maximum time to wait in seconds (default: 600 seconds / 10 minutes)
 
-          poll_interval: Time to wait between polls in seconds (default: 5 seconds)
+          poll_interval: The longest time to wait between polls in seconds (default: 5 seconds).
+              Polls start out more frequent and back off with jitter up to this interval.
 
           extra_headers: Send extra headers
 
@@ -872,37 +938,79 @@ class AsyncKnowledgeBasesResource(AsyncAPIResource):
         if not uuid:
             raise ValueError(f"Expected a non-empty value for `uuid` but received {uuid!r}")
 
-        start_time = time.time()
-        failed_states = {"DECOMMISSIONED", "UNHEALTHY"}
-
-        while True:
-            elapsed = time.time() - start_time
-            if elapsed >= timeout:
-                raise KnowledgeBaseTimeoutError(
-                    f"Timeout waiting for knowledge base database to become ready. "
-                    f"Database did not reach ONLINE status within {timeout} seconds."
-                )
-
-            response = await self.retrieve(
+        return await async_poll_until(
+            lambda: self.retrieve(
                 uuid,
                 extra_headers=extra_headers,
                 extra_query=extra_query,
                 extra_body=extra_body,
-            )
+            ),
+            _is_database_online,
+            client=self._client,
+            policy=PollPolicy.up_to(poll_interval),
+            timeout=timeout,
+            on_timeout=partial(_database_timeout_error, timeout),
+            sleep=self._sleep,
+        )
+
+    async def sync_directory(
+        self,
+        knowledge_base_uuid: str,
+        directory: FilePath,
+        *,
+        manifest_path: Optional[FilePath] = None,
+        pattern: str = "**/*",
+        hash_workers: Optional[int] = None,
+        concurrency: int = 8,
+        delete_removed: bool = True,
+        start_indexing_job: bool = True,
+    ) -> DirectorySyncReport:
+        """
+        Upload the files of a local directory to a knowledge base, skipping the ones
+        that are already there.
+
+        A manifest of the content hash, object key and data source of every synced
+        file is kept in the directory. Only files that are new or whose size or
+        modification time changed are hashed, on a process pool; files whose
+        content is not in the knowledge base yet are uploaded with
+        `data_sources.upload_files()`, data sources whose content is gone from the
+        directory are deleted and a single indexing job is started for the new
+        data sources. Files that fail to upload, data sources that fail to be
+        deleted and data sources no indexing job could be started for are kept in
+        the manifest and retried on the next sync.
+
+        Args:
+          directory: The directory to sync.
 
-            status = response.database_status
+          manifest_path: Where to keep the manifest, `.gradient-sync.json` in `directory` by default.
 
-            if status == "ONLINE":
-                return response
+          pattern: A glob pattern selecting the files to sync, relative to `directory`.
 
-            if status in failed_states:
-                raise KnowledgeBaseDatabaseError(f"Knowledge base database entered failed state: {status}")
+          hash_workers: The number of processes used to hash files, the number of CPUs by default.
 
-            # Sleep before next poll, but don't exceed timeout
-            remaining_time = timeout - elapsed
-            sleep_time = min(poll_interval, remaining_time)
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
+          concurrency: The maximum number of files uploaded or data sources deleted at the same time.
+
+          delete_removed: Whether to delete the data sources of files that were removed;
+              if not, they are deleted by the next sync that does.
+
+          start_indexing_job: Whether to start an indexing job for the uploaded files;
+              if not, they are indexed by the next sync that does.
+        """
+        if not knowledge_base_uuid:
+            raise ValueError(
+                f"Expected a non-empty value for `knowledge_base_uuid` but received {knowledge_base_uuid!r}"
+            )
+        return await async_sync_directory(
+            self,
+            knowledge_base_uuid,
+            directory,
+            manifest_path=manifest_path,
+            pattern=pattern,
+            hash_workers=hash_workers,
+            concurrency=concurrency,
+            delete_removed=delete_removed,
+            start_indexing_job=start_indexing_job,
+        )
 
     async def list_indexing_jobs(
         self,
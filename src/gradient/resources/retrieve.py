@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import Any, Dict, List, Mapping, Iterable, Sequence
+
 import httpx
 
 from ..types import retrieve_documents_params
@@ -15,7 +17,16 @@ from .._response import (
     async_to_raw_response_wrapper,
     async_to_streamed_response_wrapper,
 )
+from ..lib.batch import BatchResult
 from .._base_client import make_request_options
+from ..lib.retrieval import (
+    FanoutResult,
+    documents_batch,
+    documents_fanout,
+    async_documents_batch,
+    async_documents_fanout,
+)
+from ..lib.retrieval_cache import CachedRetrieve, RetrievalCache, AsyncCachedRetrieve
 from ..types.retrieve_documents_response import RetrieveDocumentsResponse
 
 __all__ = ["RetrieveResource", "AsyncRetrieveResource"]
@@ -115,6 +126,70 @@ class RetrieveResource(SyncAPIResource):
             cast_to=RetrieveDocumentsResponse,
         )
 
+    def documents_batch(
+        self,
+        queries: Iterable[Mapping[str, Any]],
+        *,
+        concurrency: int = 8,
+    ) -> List[BatchResult[RetrieveDocumentsResponse]]:
+        """Retrieve documents for every set of parameters in `queries`.
+
+        Each query is a dict of keyword arguments for `documents()`, including
+        `knowledge_base_id`. Identical queries are only sent once and the distinct
+        ones run concurrently, at most `concurrency` at a time, each going through
+        the client's usual retry policy.
+
+        Returns one `BatchResult` per query, in the order of `queries`. A query that
+        still fails after all retries does not abort the batch, its exception is
+        returned in `BatchResult.error` instead.
+        """
+        return documents_batch(self, queries, concurrency=concurrency)
+
+    def documents_fanout(
+        self,
+        knowledge_base_ids: Sequence[str],
+        *,
+        num_results: int,
+        query: str,
+        alpha: float | Omit = omit,
+        filters: retrieve_documents_params.Filters | Omit = omit,
+        concurrency: int = 8,
+        score_key: str = "score",
+    ) -> FanoutResult:
+        """Send the same query to several knowledge bases and merge their results.
+
+        The knowledge bases are queried concurrently and the best `num_results`
+        chunks across all of them are returned, best first. Results are ordered by
+        the numeric score in `metadata[score_key]` when every result has one, and by
+        reciprocal rank fusion of their per-knowledge-base ranks otherwise.
+
+        Knowledge bases that fail after all retries are reported in
+        `FanoutResult.errors`; the error is only raised if every knowledge base
+        failed.
+        """
+        params: Dict[str, Any] = {"num_results": num_results, "query": query}
+        if not isinstance(alpha, Omit):
+            params["alpha"] = alpha
+        if not isinstance(filters, Omit):
+            params["filters"] = filters
+        return documents_fanout(self, knowledge_base_ids, params=params, concurrency=concurrency, score_key=score_key)
+
+    def with_cache(self, cache: RetrievalCache) -> CachedRetrieve:
+        """Return a view of this resource whose `documents()` answers repeated queries from `cache`.
+
+        Entries of a knowledge base are dropped as soon as this client sees a newly
+        succeeded indexing job for it, e.g. through
+        `knowledge_bases.indexing_jobs.wait_for_completion()`.
+
+        ```py
+        cache = RetrievalCache(max_entries=10_000, ttl=86400)
+        response = client.retrieve.with_cache(cache).documents(
+            "kb-uuid", query="How do I reset my password?", num_results=5
+        )
+        ```
+        """
+        return CachedRetrieve(self, cache)
+
 
 class AsyncRetrieveResource(AsyncAPIResource):
     @cached_property
@@ -210,6 +285,72 @@ class AsyncRetrieveResource(AsyncAPIResource):
             cast_to=RetrieveDocumentsResponse,
         )
 
+    async def documents_batch(
+        self,
+        queries: Iterable[Mapping[str, Any]],
+        *,
+        concurrency: int = 8,
+    ) -> List[BatchResult[RetrieveDocumentsResponse]]:
+        """Retrieve documents for every set of parameters in `queries`.
+
+        Each query is a dict of keyword arguments for `documents()`, including
+        `knowledge_base_id`. Identical queries are only sent once and the distinct
+        ones run concurrently, at most `concurrency` at a time, each going through
+        the client's usual retry policy.
+
+        Returns one `BatchResult` per query, in the order of `queries`. A query that
+        still fails after all retries does not abort the batch, its exception is
+        returned in `BatchResult.error` instead.
+        """
+        return await async_documents_batch(self, queries, concurrency=concurrency)
+
+    async def documents_fanout(
+        self,
+        knowledge_base_ids: Sequence[str],
+        *,
+        num_results: int,
+        query: str,
+        alpha: float | Omit = omit,
+        filters: retrieve_documents_params.Filters | Omit = omit,
+        concurrency: int = 8,
+        score_key: str = "score",
+    ) -> FanoutResult:
+        """Send the same query to several knowledge bases and merge their results.
+
+        The knowledge bases are queried concurrently and the best `num_results`
+        chunks across all of them are returned, best first. Results are ordered by
+        the numeric score in `metadata[score_key]` when every result has one, and by
+        reciprocal rank fusion of their per-knowledge-base ranks otherwise.
+
+        Knowledge bases that fail after all retries are reported in
+        `FanoutResult.errors`; the error is only raised if every knowledge base
+        failed.
+        """
+        params: Dict[str, Any] = {"num_results": num_results, "query": query}
+        if not isinstance(alpha, Omit):
+            params["alpha"] = alpha
+        if not isinstance(filters, Omit):
+            params["filters"] = filters
+        return await async_documents_fanout(
+            self, knowledge_base_ids, params=params, concurrency=concurrency, score_key=score_key
+        )
+
+    def with_cache(self, cache: RetrievalCache) -> AsyncCachedRetrieve:
+        """Return a view of this resource whose `documents()` answers repeated queries from `cache`.
+
+        Entries of a knowledge base are dropped as soon as this client sees a newly
+        succeeded indexing job for it, e.g. through
+        `knowledge_bases.indexing_jobs.wait_for_completion()`.
+
+        ```py
+        cache = RetrievalCache(max_entries=10_000, ttl=86400)
+        response = await client.retrieve.with_cache(cache).documents(
+            "kb-uuid", query="How do I reset my password?", num_results=5
+        )
+        ```
+        """
+        return AsyncCachedRetrieve(self, cache)
+
 
 class RetrieveResourceWithRawResponse:
     def __init__(self, retrieve: RetrieveResource) -> None:
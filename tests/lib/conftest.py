@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import pytest
+
+# the modules that back off with `uploads._retry_delay()` between retries
+_RETRYING_MODULES = ["uploads", "dataset_upload", "deployment", "droplets"]
+
+
+def no_delay(_attempt: int) -> float:
+    return 0.0
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    for module in _RETRYING_MODULES:
+        monkeypatch.setattr(f"gradient.lib.{module}._retry_delay", no_delay)
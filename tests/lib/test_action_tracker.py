@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict
+
+import anyio
+import httpx
+import pytest
+
+from gradient import Gradient, ActionError, AsyncGradient, ActionTimeoutError
+from gradient.lib import ActionTracker, AsyncActionTracker
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+FAST: Dict[str, Any] = {"max_requests_per_second": None, "poll_interval": 0.01, "timeout": 5.0}
+
+
+def action(action_id: int, status: str, type: str = "power_off") -> Dict[str, Any]:
+    return {"id": action_id, "status": status, "type": type}
+
+
+class Actions:
+    """`/v2/actions/{id}`: every action completes on its second poll, and action 9 errors."""
+
+    def __init__(self) -> None:
+        self.polls: Dict[int, int] = {}
+
+    def __call__(self, request: httpx.Request, action_id: str) -> httpx.Response:  # noqa: ARG002
+        polls = self.polls[int(action_id)] = self.polls.get(int(action_id), 0) + 1
+        status = "errored" if int(action_id) == 9 else "completed" if polls > 1 else "in-progress"
+        return httpx.Response(200, json={"action": action(int(action_id), status)})
+
+
+def mock_initiated(respx_mock: Any) -> Actions:
+    respx_mock.post("/v2/droplets/actions").mock(
+        return_value=httpx.Response(
+            200, json={"actions": [action(1, "in-progress"), action(2, "errored"), action(3, "completed")]}
+        )
+    )
+    respx_mock.post("/v2/volumes/vol-1/actions").mock(
+        return_value=httpx.Response(200, json={"action": action(4, "in-progress", "attach")})
+    )
+    respx_mock.post("/v2/floating_ips/1.2.3.4/actions").mock(
+        return_value=httpx.Response(200, json={"action": action(5, "completed", "assign")})
+    )
+    respx_mock.post("/v2/images/7/actions").mock(
+        return_value=httpx.Response(200, json=action(6, "in-progress", "convert"))
+    )
+    respx_mock.post("/v2/droplets").mock(
+        return_value=httpx.Response(
+            202, json={"droplets": [], "links": {"actions": [{"id": 7, "rel": "create", "href": ""}]}}
+        )
+    )
+    actions = Actions()
+    respx_mock.get(path__regex=r"^/v2/actions/(?P<action_id>\d+)$").mock(side_effect=actions)
+    return actions
+
+
+class TestActionTracker:
+    @pytest.mark.respx(base_url=base_url)
+    def test_tracks_a_mix_of_actions(self, client: Gradient, respx_mock: Any) -> None:
+        actions = mock_initiated(respx_mock)
+        gpu_droplets = client.gpu_droplets
+
+        tracker = ActionTracker(client, **FAST)
+        tracker.track(
+            gpu_droplets.actions.bulk_initiate(tag_name="web", type="power_off"),
+            gpu_droplets.volumes.actions.initiate_by_id("vol-1", droplet_id=1, type="attach"),
+            gpu_droplets.floating_ips.actions.create("1.2.3.4", droplet_id=1, type="assign"),
+            gpu_droplets.images.actions.create(7, type="convert"),
+            gpu_droplets.create(names=["web-1", "web-2"], image="ubuntu", size="s"),
+        )
+        tracker.track(1, 4)
+        assert len(tracker) == 7
+
+        results = list(tracker)
+
+        # actions that were already done are reported first, without a poll
+        assert [(result.id, result.polls) for result in results[:3]] == [("2", 0), ("3", 0), ("5", 0)]
+        error = results[0].error
+        assert isinstance(error, ActionError) and error.action_id == 2 and error.status == "errored"
+        assert sorted(result.id for result in results[3:]) == ["1", "4", "6", "7"]
+        assert all(result.ok and result.polls == 2 for result in results[3:])
+        assert actions.polls == {1: 2, 4: 2, 6: 2, 7: 2}
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_raise_on_error(self, client: Gradient, respx_mock: Any) -> None:
+        actions = Actions()
+        respx_mock.get(path__regex=r"^/v2/actions/(?P<action_id>\d+)$").mock(side_effect=actions)
+
+        tracker = ActionTracker(client, **FAST)
+        tracker.track(9)
+        with pytest.raises(ActionError, match="Action 9"):
+            for _ in tracker.as_completed(raise_on_error=True):
+                pass
+        assert actions.polls == {9: 1}
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_timeout(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.get("/v2/actions/1").mock(
+            return_value=httpx.Response(200, json={"action": action(1, "in-progress")})
+        )
+
+        tracker = ActionTracker(client, max_requests_per_second=None, poll_interval=0.01, timeout=0.05)
+        tracker.track(1)
+        (result,) = tracker.as_completed()
+
+        assert isinstance(result.error, ActionTimeoutError)
+        assert result.error.status == "in-progress" and result.polls > 1
+
+    def test_rejects_unknown_values(self, client: Gradient) -> None:
+        tracker = ActionTracker(client)
+        with pytest.raises(TypeError, match="response with actions"):
+            tracker.track("1")  # type: ignore[arg-type]
+        with pytest.raises(TypeError, match="action id"):
+            tracker.track(True)
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_async(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        actions = mock_initiated(respx_mock)
+        gpu_droplets = async_client.gpu_droplets
+
+        tracker = AsyncActionTracker(async_client, **FAST)
+        tracker.track(
+            await gpu_droplets.actions.bulk_initiate(tag_name="web", type="power_off"),
+            await gpu_droplets.volumes.actions.initiate_by_id("vol-1", droplet_id=1, type="attach"),
+            await gpu_droplets.floating_ips.actions.create("1.2.3.4", droplet_id=1, type="assign"),
+            await gpu_droplets.images.actions.create(7, type="convert"),
+            await gpu_droplets.create(names=["web-1", "web-2"], image="ubuntu", size="s"),
+        )
+        async with tracker.as_completed() as completed:
+            results = [result async for result in completed]
+
+        assert [result.id for result in results if not result.ok] == ["2"]
+        assert len(results) == 7
+        assert actions.polls == {1: 2, 4: 2, 6: 2, 7: 2}
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_async_raise_on_error(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        actions = Actions()
+        respx_mock.get(path__regex=r"^/v2/actions/(?P<action_id>\d+)$").mock(side_effect=actions)
+
+        tracker = AsyncActionTracker(async_client, **FAST)
+        tracker.track(9, 1, 4)
+        with pytest.raises(ActionError, match="Action 9"):
+            async with tracker.as_completed(raise_on_error=True) as completed:
+                async for _ in completed:
+                    pass
+
+        # the polls of the other actions are cancelled without cancelling the caller
+        await anyio.sleep(0.01)
+        assert actions.polls[9] == 1
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import os
+import json
+from typing import Any, Dict, List, Iterator, AsyncIterator
+from pathlib import Path
+
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient, BadRequestError
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+
+def completion(content: str) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-123",
+        "choices": [
+            {"finish_reason": "stop", "index": 0, "message": {"role": "assistant", "content": content}},
+        ],
+        "created": 1,
+        "model": "llama3-8b-instruct",
+        "object": "chat.completion",
+    }
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    prompt = json.loads(request.content)["messages"][0]["content"]
+    if prompt == "bad":
+        return httpx.Response(400, json={"message": "bad prompt"})
+    return httpx.Response(200, json=completion(prompt.upper()))
+
+
+def make_requests(*prompts: str) -> Iterator[Dict[str, Any]]:
+    for prompt in prompts:
+        yield {"model": "llama3-8b-instruct", "messages": [{"role": "user", "content": prompt}]}
+
+
+class TestBatchCreate:
+    @pytest.mark.respx(base_url=base_url)
+    def test_captures_errors_per_item(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.post("/chat/completions").mock(side_effect=handler)
+
+        results = list(client.chat.completions.batch_create(make_requests("a", "bad", "c"), concurrency=2))
+
+        assert sorted(result.index for result in results) == [0, 1, 2]
+        by_index = {result.index: result for result in results}
+        assert by_index[0].response is not None and by_index[0].response.choices[0].message.content == "A"
+        assert not by_index[1].ok
+        assert isinstance(by_index[1].error, BadRequestError)
+        assert by_index[2].ok
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_ordered(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.post("/chat/completions").mock(side_effect=handler)
+
+        prompts = [str(i) for i in range(20)]
+        results = client.chat.completions.batch_create(make_requests(*prompts), concurrency=4, ordered=True)
+
+        assert [result.index for result in results] == list(range(20))
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_checkpoint_resumes(self, client: Gradient, respx_mock: Any, tmp_path: Path) -> None:
+        route = respx_mock.post("/chat/completions").mock(side_effect=handler)
+        checkpoint = tmp_path / "batch.jsonl"
+
+        for result in client.chat.completions.batch_create(
+            make_requests("a", "b", "c", "d"), concurrency=1, ordered=True, checkpoint=checkpoint
+        ):
+            if result.index == 1:
+                break
+
+        assert len(checkpoint.read_text().splitlines()) == 2
+        sent = route.call_count
+
+        resumed = list(
+            client.chat.completions.batch_create(make_requests("a", "b", "c", "d", "bad"), checkpoint=checkpoint)
+        )
+
+        assert sorted(result.index for result in resumed) == [2, 3, 4]
+        assert route.call_count - sent == 3
+        records = [json.loads(line) for line in checkpoint.read_text().splitlines()]
+        assert sorted(record["index"] for record in records) == [0, 1, 2, 3]
+        assert records[0]["response"]["choices"][0]["message"]["content"] == "A"
+
+    def test_checkpoint_rejects_changed_inputs(self, client: Gradient, tmp_path: Path) -> None:
+        checkpoint = tmp_path / "batch.jsonl"
+        checkpoint.write_text(json.dumps({"index": 0, "request_hash": "stale", "response": {}}) + "\n")
+
+        with pytest.raises(ValueError, match="does not match"):
+            list(client.chat.completions.batch_create(make_requests("a"), checkpoint=checkpoint))
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_checkpoint_skips_records_without_the_expected_keys(
+        self, client: Gradient, respx_mock: Any, tmp_path: Path
+    ) -> None:
+        route = respx_mock.post("/chat/completions").mock(side_effect=handler)
+        checkpoint = tmp_path / "batch.jsonl"
+        checkpoint.write_text('{"index": 0}\n[1, 2]\n{"index": "0", "request_hash": "x"}\n')
+
+        (result,) = client.chat.completions.batch_create(make_requests("a"), checkpoint=checkpoint)
+
+        assert result.ok and route.call_count == 1
+
+    def test_rejects_streaming(self, client: Gradient) -> None:
+        requests: List[Dict[str, Any]] = [{"model": "m", "messages": [], "stream": True}]
+        (result,) = client.chat.completions.batch_create(requests)
+
+        assert isinstance(result.error, ValueError)
+
+
+class TestAsyncBatchCreate:
+    @pytest.mark.respx(base_url=base_url)
+    async def test_completion_order(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        respx_mock.post("/chat/completions").mock(side_effect=handler)
+
+        async with async_client.chat.completions.batch_create(make_requests("a", "bad", "c"), concurrency=2) as results:
+            collected = [result async for result in results]
+
+        assert sorted(result.index for result in collected) == [0, 1, 2]
+        assert sum(not result.ok for result in collected) == 1
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_ordered_with_async_generator(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        respx_mock.post("/chat/completions").mock(side_effect=handler)
+
+        async def requests() -> AsyncIterator[Dict[str, Any]]:
+            for request in make_requests(*(str(i) for i in range(20))):
+                yield request
+
+        async with async_client.chat.completions.batch_create(requests(), concurrency=3, ordered=True) as results:
+            indices = [result.index async for result in results]
+
+        assert indices == list(range(20))
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_checkpoint_resumes(self, async_client: AsyncGradient, respx_mock: Any, tmp_path: Path) -> None:
+        route = respx_mock.post("/chat/completions").mock(side_effect=handler)
+        checkpoint = tmp_path / "batch.jsonl"
+
+        async with async_client.chat.completions.batch_create(
+            make_requests("a", "b"), ordered=True, checkpoint=checkpoint
+        ) as results:
+            async for _ in results:
+                break
+
+        sent = route.call_count
+        async with async_client.chat.completions.batch_create(
+            make_requests("a", "b"), checkpoint=checkpoint
+        ) as results:
+            resumed = [result.index async for result in results]
+
+        assert resumed == [1]
+        assert route.call_count - sent == 1
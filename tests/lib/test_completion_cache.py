@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import os
+import json
+from typing import Any, Dict
+from pathlib import Path
+
+import httpx
+import pytest
+import time_machine
+
+from gradient import Gradient, AsyncGradient
+from gradient.lib import CompletionCache, SqliteCacheBackend, InMemoryCacheBackend
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+MESSAGES = [{"role": "user", "content": "What is the capital of France?"}]
+
+
+def completion(content: str) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-123",
+        "choices": [{"finish_reason": "stop", "index": 0, "message": {"role": "assistant", "content": content}}],
+        "created": 1,
+        "model": "llama3-8b-instruct",
+        "object": "chat.completion",
+    }
+
+
+def chunk(content: str) -> bytes:
+    data = {
+        "id": "chatcmpl-123",
+        "choices": [{"delta": {"content": content}, "finish_reason": None, "index": 0}],
+        "created": 1,
+        "model": "llama3-8b-instruct",
+        "object": "chat.completion.chunk",
+    }
+    return b"data: " + json.dumps(data).encode() + b"\n\n"
+
+
+STREAM_BODY = chunk("Par") + chunk("is") + b"data: [DONE]\n\n"
+
+
+class TestInMemoryCacheBackend:
+    def test_lru_eviction(self) -> None:
+        backend = InMemoryCacheBackend(max_entries=2)
+        backend.set("a", b"1", ttl=None)
+        backend.set("b", b"2", ttl=None)
+        assert backend.get("a") == b"1"
+
+        backend.set("c", b"3", ttl=None)
+
+        assert backend.get("b") is None
+        assert backend.get("a") == b"1"
+        assert len(backend) == 2
+
+    def test_max_bytes(self) -> None:
+        backend = InMemoryCacheBackend(max_bytes=4)
+        backend.set("a", b"12", ttl=None)
+        backend.set("b", b"34", ttl=None)
+        backend.set("c", b"5", ttl=None)
+        backend.set("d", b"too large", ttl=None)
+
+        assert backend.get("a") is None
+        assert backend.get("b") == b"34"
+        assert backend.get("d") is None
+
+    def test_ttl(self) -> None:
+        backend = InMemoryCacheBackend()
+        backend.set("a", b"1", ttl=-1)
+
+        assert backend.get("a") is None
+
+
+class TestSqliteCacheBackend:
+    def test_persists_and_evicts(self, tmp_path: Path) -> None:
+        backend = SqliteCacheBackend(tmp_path / "cache.db", max_entries=2)
+        with time_machine.travel(1000, tick=False):
+            backend.set("a", b"1", ttl=None)
+        with time_machine.travel(1001, tick=False):
+            backend.set("b", b"2", ttl=10)
+        with time_machine.travel(1002, tick=False):
+            backend.set("c", b"3", ttl=None)
+        backend.close()
+
+        reopened = SqliteCacheBackend(tmp_path / "cache.db")
+        with time_machine.travel(1005, tick=False):
+            assert reopened.get("a") is None
+            assert reopened.get("b") == b"2"
+            assert reopened.get("c") == b"3"
+        with time_machine.travel(1020, tick=False):
+            assert reopened.get("b") is None
+        reopened.close()
+
+
+class TestCachedCompletions:
+    @pytest.mark.respx(base_url=base_url)
+    def test_hit_skips_network(self, client: Gradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/chat/completions").mock(return_value=httpx.Response(200, json=completion("Paris")))
+        cache = CompletionCache()
+        completions = client.chat.completions.with_cache(cache)
+
+        first = completions.create(model="llama3-8b-instruct", messages=MESSAGES, temperature=0)
+        second = completions.create(model="llama3-8b-instruct", messages=MESSAGES, temperature=0)
+
+        assert route.call_count == 1
+        assert first == second
+        assert second.choices[0].message.content == "Paris"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_key_includes_params(self, client: Gradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/chat/completions").mock(return_value=httpx.Response(200, json=completion("Paris")))
+        completions = client.chat.completions.with_cache(CompletionCache())
+
+        completions.create(model="llama3-8b-instruct", messages=MESSAGES, temperature=0)
+        completions.create(model="llama3-8b-instruct", messages=MESSAGES, temperature=0, max_tokens=5)
+        completions.create(model="llama3-8b-instruct", messages=MESSAGES, temperature=0, extra_body={"seed": 1})
+
+        assert route.call_count == 3
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_non_deterministic_requests_bypass_cache(self, client: Gradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/chat/completions").mock(return_value=httpx.Response(200, json=completion("Paris")))
+        completions = client.chat.completions.with_cache(CompletionCache())
+
+        completions.create(model="llama3-8b-instruct", messages=MESSAGES)
+        completions.create(model="llama3-8b-instruct", messages=MESSAGES)
+
+        assert route.call_count == 2
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_stream_replay(self, client: Gradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/chat/completions").mock(return_value=httpx.Response(200, content=STREAM_BODY))
+        completions = client.chat.completions.with_cache(CompletionCache())
+
+        first = completions.create(model="llama3-8b-instruct", messages=MESSAGES, temperature=0, stream=True)
+        first_contents = [c.choices[0].delta.content for c in first]
+        second = completions.create(model="llama3-8b-instruct", messages=MESSAGES, temperature=0, stream=True)
+        second_contents = [c.choices[0].delta.content for c in second]
+
+        assert route.call_count == 1
+        assert first_contents == second_contents == ["Par", "is"]
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_partially_read_stream_is_not_cached(self, client: Gradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/chat/completions").mock(return_value=httpx.Response(200, content=STREAM_BODY))
+        completions = client.chat.completions.with_cache(CompletionCache())
+
+        with completions.create(model="llama3-8b-instruct", messages=MESSAGES, temperature=0, stream=True) as stream:
+            next(iter(stream))
+        list(completions.create(model="llama3-8b-instruct", messages=MESSAGES, temperature=0, stream=True))
+
+        assert route.call_count == 2
+
+
+class TestAsyncCachedCompletions:
+    @pytest.mark.respx(base_url=base_url)
+    async def test_hit_skips_network(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/chat/completions").mock(return_value=httpx.Response(200, json=completion("Paris")))
+        completions = async_client.chat.completions.with_cache(CompletionCache())
+
+        await completions.create(model="llama3-8b-instruct", messages=MESSAGES, temperature=0)
+        second = await completions.create(model="llama3-8b-instruct", messages=MESSAGES, temperature=0)
+
+        assert route.call_count == 1
+        assert second.choices[0].message.content == "Paris"
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_stream_replay(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/chat/completions").mock(return_value=httpx.Response(200, content=STREAM_BODY))
+        completions = async_client.chat.completions.with_cache(CompletionCache())
+
+        first = await completions.create(model="llama3-8b-instruct", messages=MESSAGES, temperature=0, stream=True)
+        first_contents = [c.choices[0].delta.content async for c in first]
+        second = await completions.create(model="llama3-8b-instruct", messages=MESSAGES, temperature=0, stream=True)
+        second_contents = [c.choices[0].delta.content async for c in second]
+
+        assert route.call_count == 1
+        assert first_contents == second_contents == ["Par", "is"]
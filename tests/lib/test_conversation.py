@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import os
+import json
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+
+def completion(message: Dict[str, Any], finish_reason: str = "stop") -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-123",
+        "choices": [{"finish_reason": finish_reason, "index": 0, "message": message}],
+        "created": 1,
+        "model": "llama3-8b-instruct",
+        "object": "chat.completion",
+    }
+
+
+STREAM_BODY = (
+    b"data: "
+    + json.dumps(
+        {
+            "id": "chatcmpl-123",
+            "choices": [{"delta": {"content": "Hi"}, "finish_reason": None, "index": 0}],
+            "created": 1,
+            "model": "llama3-8b-instruct",
+            "object": "chat.completion.chunk",
+        }
+    ).encode()
+    + b"\n\ndata: [DONE]\n\n"
+)
+
+
+def request_bodies(route: Any) -> List[Dict[str, Any]]:
+    return [json.loads(call.request.content) for call in route.calls]
+
+
+class TestConversation:
+    @pytest.mark.respx(base_url=base_url)
+    def test_body_matches_create(self, client: Gradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/chat/completions").mock(
+            return_value=httpx.Response(200, json=completion({"role": "assistant", "content": "Paris"}))
+        )
+        messages: List[Any] = [
+            {"role": "system", "content": "Be brief."},
+            {"role": "user", "content": "Capital of France? ü"},
+        ]
+
+        client.chat.completions.create(messages=messages, model="llama3-8b-instruct", temperature=0.2)
+        conversation = client.chat.completions.conversation(
+            model="llama3-8b-instruct", messages=messages, temperature=0.2
+        )
+        conversation.create()
+
+        expected, actual = request_bodies(route)
+        assert actual == expected
+        assert route.calls[1].request.headers["Authorization"] == route.calls[0].request.headers["Authorization"]
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_appends_replies(self, client: Gradient, respx_mock: Any) -> None:
+        tool_call = {"id": "call_1", "type": "function", "function": {"name": "lookup", "arguments": "{}"}}
+        route = respx_mock.post("/chat/completions").mock(
+            side_effect=[
+                httpx.Response(
+                    200,
+                    json=completion({"role": "assistant", "content": None, "tool_calls": [tool_call]}, "tool_calls"),
+                ),
+                httpx.Response(200, json=completion({"role": "assistant", "content": "Paris"})),
+            ]
+        )
+
+        conversation = client.chat.completions.conversation(model="llama3-8b-instruct")
+        conversation.append({"role": "user", "content": "Capital of France?"})
+        conversation.create()
+        conversation.append({"role": "tool", "tool_call_id": "call_1", "content": "Paris"})
+        completion_ = conversation.create(max_tokens=5)
+
+        assert completion_.choices[0].message.content == "Paris"
+        second = request_bodies(route)[1]
+        assert second["max_tokens"] == 5
+        assert second["messages"] == [
+            {"role": "user", "content": "Capital of France?"},
+            {"role": "assistant", "content": None, "tool_calls": [tool_call]},
+            {"role": "tool", "tool_call_id": "call_1", "content": "Paris"},
+        ]
+        assert conversation.messages[-1] == {"role": "assistant", "content": "Paris"}
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_streaming_and_extra_body(self, client: Gradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/chat/completions").mock(return_value=httpx.Response(200, content=STREAM_BODY))
+
+        conversation = client.chat.completions.conversation(
+            model="llama3-8b-instruct", messages=[{"role": "user", "content": "Hi"}]
+        )
+        chunks = list(conversation.create(stream=True, extra_body={"seed": 1}))
+
+        assert [c.choices[0].delta.content for c in chunks] == ["Hi"]
+        body = request_bodies(route)[0]
+        assert body["stream"] is True
+        assert body["seed"] == 1
+        assert len(conversation.messages) == 1
+
+    def test_rejects_messages(self, client: Gradient) -> None:
+        conversation = client.chat.completions.conversation(model="llama3-8b-instruct")
+        with pytest.raises(TypeError, match="append"):
+            conversation.create(messages=[])
+
+
+class TestAsyncConversation:
+    @pytest.mark.respx(base_url=base_url)
+    async def test_appends_replies(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/chat/completions").mock(
+            return_value=httpx.Response(200, json=completion({"role": "assistant", "content": "Paris"}))
+        )
+
+        conversation = async_client.chat.completions.conversation(
+            model="llama3-8b-instruct", messages=[{"role": "user", "content": "Capital of France?"}]
+        )
+        await conversation.create()
+        conversation.append({"role": "user", "content": "And Spain?"})
+        await conversation.create()
+
+        assert [m["content"] for m in request_bodies(route)[1]["messages"]] == [
+            "Capital of France?",
+            "Paris",
+            "And Spain?",
+        ]
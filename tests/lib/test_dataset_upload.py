@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import os
+import json
+from typing import Any, Dict, List, Tuple
+from pathlib import Path
+
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient, PermissionDeniedError
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+PRESIGN_PATH = "/v2/gen-ai/evaluation_datasets/file_upload_presigned_urls"
+DATASETS_PATH = "/v2/gen-ai/evaluation_datasets"
+UPLOAD_PATH = "/uploads/dataset.csv"
+
+
+@pytest.fixture
+def dataset(tmp_path: Path) -> Path:
+    path = tmp_path / "dataset.csv"
+    path.write_bytes(b"query,expected_response\n" + os.urandom(100_000))
+    return path
+
+
+def presign(request: httpx.Request) -> httpx.Response:
+    (file,) = json.loads(request.content)["files"]
+    upload = {
+        "original_file_name": file["file_name"],
+        "object_key": f"datasets/{file['file_name']}",
+        "presigned_url": f"{base_url}{UPLOAD_PATH}?signature=abc",
+    }
+    return httpx.Response(200, json={"uploads": [upload]})
+
+
+class Bucket:
+    def __init__(self, *failures: int) -> None:
+        self.failures = list(failures)
+        self.bodies: List[bytes] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = request.read()
+        self.bodies.append(body)
+        if self.failures:
+            return httpx.Response(self.failures.pop(0))
+        return httpx.Response(200)
+
+
+def mock_api(respx_mock: Any, bucket: Bucket) -> List[Dict[str, Any]]:
+    created: List[Dict[str, Any]] = []
+
+    def create(request: httpx.Request) -> httpx.Response:
+        created.append(json.loads(request.content))
+        return httpx.Response(200, json={"evaluation_dataset_uuid": "dataset-uuid"})
+
+    respx_mock.post(PRESIGN_PATH).mock(side_effect=presign)
+    respx_mock.put(UPLOAD_PATH).mock(side_effect=bucket)
+    respx_mock.post(DATASETS_PATH).mock(side_effect=create)
+    return created
+
+
+class TestDatasetUpload:
+    @pytest.mark.parametrize("use_mmap", [False, True])
+    @pytest.mark.respx(base_url=base_url)
+    def test_streams_in_chunks_and_creates_the_dataset(
+        self, client: Gradient, respx_mock: Any, dataset: Path, use_mmap: bool
+    ) -> None:
+        bucket = Bucket()
+        created = mock_api(respx_mock, bucket)
+        progress: List[Tuple[int, int]] = []
+
+        response = client.agents.evaluation_datasets.upload(
+            dataset,
+            name="regression",
+            chunk_size=16 * 1024,
+            use_mmap=use_mmap,
+            on_progress=lambda sent, total: progress.append((sent, total)),
+        )
+
+        size = dataset.stat().st_size
+        assert response.evaluation_dataset_uuid == "dataset-uuid"
+        assert bucket.bodies == [dataset.read_bytes()]
+        assert progress[0] == (0, size) and progress[-1] == (size, size)
+        assert len(progress) == 1 + -(-size // (16 * 1024))
+        assert created == [
+            {
+                "name": "regression",
+                "file_upload_dataset": {
+                    "original_file_name": "dataset.csv",
+                    "size_in_bytes": str(size),
+                    "stored_object_key": "datasets/dataset.csv",
+                },
+            }
+        ]
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_retries_the_transfer(self, client: Gradient, respx_mock: Any, dataset: Path) -> None:
+        bucket = Bucket(503, 500)
+        created = mock_api(respx_mock, bucket)
+
+        client.agents.evaluation_datasets.upload(dataset, use_mmap=True)
+
+        assert bucket.bodies == [dataset.read_bytes()] * 3
+        assert len(created) == 1
+
+    @pytest.mark.respx(base_url=base_url, assert_all_called=False)
+    def test_does_not_retry_client_errors(self, client: Gradient, respx_mock: Any, dataset: Path) -> None:
+        bucket = Bucket(403)
+        created = mock_api(respx_mock, bucket)
+
+        with pytest.raises(PermissionDeniedError):
+            client.agents.evaluation_datasets.upload(dataset)
+
+        assert len(bucket.bodies) == 1
+        assert created == []
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_rejects_a_missing_presigned_url(self, client: Gradient, respx_mock: Any, dataset: Path) -> None:
+        respx_mock.post(PRESIGN_PATH).mock(
+            return_value=httpx.Response(200, json={"uploads": [{"original_file_name": "dataset.csv"}]})
+        )
+
+        with pytest.raises(ValueError, match="Expected a presigned URL for 'dataset.csv'"):
+            client.agents.evaluation_datasets.upload(dataset)
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_async(self, async_client: AsyncGradient, respx_mock: Any, dataset: Path) -> None:
+        bucket = Bucket(502)
+        created = mock_api(respx_mock, bucket)
+        progress: List[int] = []
+
+        response = await async_client.agents.evaluation_datasets.upload(
+            dataset, chunk_size=32 * 1024, use_mmap=True, on_progress=lambda sent, _total: progress.append(sent)
+        )
+
+        assert response.evaluation_dataset_uuid == "dataset-uuid"
+        assert bucket.bodies[-1] == dataset.read_bytes()
+        assert progress[-1] == dataset.stat().st_size
+        assert created[0]["file_upload_dataset"]["stored_object_key"] == "datasets/dataset.csv"
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import os
+import json
+import threading
+from typing import Any, Dict, List, Tuple, Optional
+
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient, NotFoundError, AgentDeploymentError
+from gradient.lib import AgentSpec
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+
+class Platform:
+    """A stateful fake of the agent endpoints.
+
+    `lose` holds `(method, kind)` pairs whose next request is carried out but answered
+    with a 503, as if the response had been lost; `reject` holds pairs that fail with a 404.
+    """
+
+    def __init__(self, *, polls_until_running: int = 1) -> None:
+        self.agents: Dict[str, Dict[str, Any]] = {}
+        self.lose: List[Tuple[str, str]] = []
+        self.reject: List[Tuple[str, str]] = []
+        self.requests: List[Tuple[str, str]] = []
+        self.polls_until_running = polls_until_running
+        self._lock = threading.Lock()
+
+    def add(self, name: str, **state: Any) -> Dict[str, Any]:
+        agent: Dict[str, Any] = {
+            "uuid": f"uuid-{name}",
+            "name": name,
+            "knowledge_bases": [],
+            "functions": [],
+            "api_key_infos": [],
+            "child_agents": [],
+            "visibility": None,
+            "polls": 0,
+        }
+        agent.update(state)
+        self.agents[agent["uuid"]] = agent
+        return agent
+
+    def by_name(self, name: str) -> Dict[str, Any]:
+        return next(agent for agent in self.agents.values() if agent["name"] == name)
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            parts = request.url.path.split("/")[4:]
+            if len(parts) > 1:
+                kind = parts[1]
+            elif parts:
+                kind = "retrieve"
+            else:
+                kind = "list" if request.method == "GET" else "create"
+            self.requests.append((request.method, kind))
+            if (request.method, kind) in self.reject:
+                return httpx.Response(404, json={"message": "not found"})
+
+            response = self._handle(request, parts, kind)
+            if (request.method, kind) in self.lose:
+                self.lose.remove((request.method, kind))
+                return httpx.Response(503, json={})
+            return response
+
+    def _handle(self, request: httpx.Request, parts: List[str], kind: str) -> httpx.Response:
+        body: Dict[str, Any] = json.loads(request.content) if request.content else {}
+        if kind == "list":
+            return httpx.Response(200, json={"agents": [self._public(agent) for agent in self.agents.values()]})
+        if kind == "create":
+            agent = self.add(body["name"])
+            return httpx.Response(200, json={"agent": self._public(agent)})
+
+        agent = self.agents[parts[0]]
+        if kind == "retrieve":
+            agent["polls"] += 1
+            status = "STATUS_RUNNING" if agent["polls"] >= self.polls_until_running else "STATUS_DEPLOYING"
+            public = self._public(agent)
+            public["deployment"] = {"status": status, "visibility": agent["visibility"]}
+            return httpx.Response(200, json={"agent": public})
+        if kind == "knowledge_bases":
+            agent["knowledge_bases"].append({"uuid": parts[2]})
+        elif kind == "functions":
+            agent["functions"].append({"name": body["function_name"]})
+        elif kind == "api_keys":
+            agent["api_key_infos"].append({"name": body["name"], "secret_key": "secret"})
+            return httpx.Response(200, json={"api_key_info": {"name": body["name"], "secret_key": "secret"}})
+        elif kind == "child_agents":
+            agent["child_agents"].append({"uuid": parts[2]})
+        elif kind == "deployment_visibility":
+            agent["visibility"] = body["visibility"]
+        return httpx.Response(200, json={})
+
+    def _public(self, agent: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in agent.items() if key not in {"polls", "visibility"}}
+
+
+def fleet() -> List[AgentSpec]:
+    return [
+        {"name": "router", "instruction": "route", "routes": [{"child": "billing", "route_name": "billing"}]},
+        {
+            "name": "billing",
+            "model_uuid": "model",
+            "knowledge_bases": ["kb-1", "kb-2"],
+            "functions": [{"function_name": "lookup", "faas_name": "lookup", "faas_namespace": "ns"}],
+            "api_keys": ["prod"],
+            "visibility": "VISIBILITY_PRIVATE",
+        },
+        {"name": "support"},
+    ]
+
+
+@pytest.fixture
+def platform(respx_mock: Any) -> Platform:
+    platform = Platform(polls_until_running=2)
+    respx_mock.route(path__regex=r"^/v2/gen-ai/agents(/.*)?$").mock(side_effect=platform)
+    return platform
+
+
+class TestDeployFleet:
+    @pytest.mark.respx(base_url=base_url)
+    def test_deploys_every_step(self, client: Gradient, platform: Platform) -> None:
+        report = client.agents.deploy_fleet(fleet(), max_requests_per_second=None, poll_interval=0.01)
+
+        assert report.ok, report.failed
+        assert report.agents == {"router": "uuid-router", "billing": "uuid-billing", "support": "uuid-support"}
+        billing = platform.by_name("billing")
+        assert sorted(kb["uuid"] for kb in billing["knowledge_bases"]) == ["kb-1", "kb-2"]
+        assert billing["functions"] == [{"name": "lookup"}]
+        assert billing["visibility"] == "VISIBILITY_PRIVATE"
+        assert platform.by_name("router")["child_agents"] == [{"uuid": "uuid-billing"}]
+
+        steps = {(result.agent, result.step, result.target): result for result in report.steps}
+        assert steps[("billing", "create_api_key", "prod")].response.api_key_info.secret_key == "secret"
+        assert steps[("billing", "wait_until_ready", None)].attempts == 2
+        # the status is only set once the knowledge bases, function and key are in place
+        update = steps[("billing", "update_status", None)]
+        for target in ["kb-1", "kb-2"]:
+            attach = steps[("billing", "attach_knowledge_base", target)]
+            assert attach.started + attach.duration <= update.started
+        assert ("router", "update_status", None) not in steps
+
+        timings = report.timings()
+        assert timings["create"].count == 3
+        assert timings["attach_knowledge_base"].count == 2
+        assert timings["wait_until_ready"].max >= timings["wait_until_ready"].mean
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_retries_do_not_create_twice(self, client: Gradient, platform: Platform) -> None:
+        platform.lose = [("POST", "create"), ("POST", "functions"), ("POST", "api_keys")]
+
+        report = client.agents.deploy_fleet(fleet()[1:2], max_requests_per_second=None, wait=False)
+
+        assert report.ok, report.failed
+        assert len(platform.agents) == 1
+        billing = platform.by_name("billing")
+        assert billing["functions"] == [{"name": "lookup"}]
+        assert [key["name"] for key in billing["api_key_infos"]] == ["prod"]
+
+        create = report.steps[0]
+        assert (create.step, create.attempts, create.reused) == ("create", 2, True)
+        assert platform.requests.count(("POST", "create")) == 1
+        assert platform.requests.count(("POST", "functions")) == 1
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_failures_skip_dependent_steps(self, client: Gradient, platform: Platform) -> None:
+        platform.reject = [("POST", "knowledge_bases")]
+
+        report = client.agents.deploy_fleet(fleet(), max_requests_per_second=None, poll_interval=0.01, max_retries=1)
+
+        assert not report.ok
+        assert [(result.step, result.target) for result in report.failed] == [
+            ("attach_knowledge_base", "kb-1"),
+            ("attach_knowledge_base", "kb-2"),
+        ]
+        assert all(isinstance(result.error, NotFoundError) for result in report.failed)
+        skipped = [(result.agent, result.step) for result in report.steps if result.skipped]
+        assert skipped == [("billing", "update_status"), ("billing", "wait_until_ready")]
+        # the other agents are deployed regardless
+        ready = {result.agent for result in report.steps if result.step == "wait_until_ready" and result.ok}
+        assert ready == {"router", "support"}
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_reuses_existing_agents(self, client: Gradient, platform: Platform) -> None:
+        platform.add("billing", knowledge_bases=[{"uuid": "kb-1"}], api_key_infos=[{"name": "prod"}])
+
+        report = client.agents.deploy_fleet(fleet()[1:2], max_requests_per_second=None, wait=False)
+
+        assert report.ok, report.failed
+        assert ("POST", "create") not in platform.requests
+        assert platform.requests.count(("POST", "knowledge_bases")) == 1
+        reused = [(result.step, result.target) for result in report.steps if result.reused]
+        assert reused == [("create", None), ("attach_knowledge_base", "kb-1"), ("create_api_key", "prod")]
+
+    def test_invalid_specs(self, client: Gradient) -> None:
+        with pytest.raises(ValueError, match="unique"):
+            client.agents.deploy_fleet([{"name": "a"}, {"name": "a"}], adopt_existing=False)
+        with pytest.raises(ValueError, match="name agents in the fleet"):
+            client.agents.deploy_fleet([{"name": "a", "routes": [{"child": "b"}]}], adopt_existing=False)
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_async(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        platform = Platform(polls_until_running=3)
+        platform.lose = [("POST", "child_agents")]
+        respx_mock.route(path__regex=r"^/v2/gen-ai/agents(/.*)?$").mock(side_effect=platform)
+
+        report = await async_client.agents.deploy_fleet(
+            fleet(), concurrency=2, max_requests_per_second=None, poll_interval=0.01
+        )
+
+        assert report.ok, report.failed
+        assert platform.by_name("router")["child_agents"] == [{"uuid": "uuid-billing"}]
+        assert platform.requests.count(("POST", "child_agents")) == 1
+        assert {result.agent for result in report.steps if result.step == "wait_until_ready"} == set(report.agents)
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_async_failed_deployment(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        def respond(request: httpx.Request) -> Optional[httpx.Response]:
+            if request.method == "POST":
+                return httpx.Response(200, json={"agent": {"uuid": "uuid-a", "name": "a"}})
+            if request.url.path.endswith("/agents"):
+                return httpx.Response(200, json={"agents": []})
+            return httpx.Response(200, json={"agent": {"deployment": {"status": "STATUS_FAILED"}}})
+
+        respx_mock.route(path__regex=r"^/v2/gen-ai/agents(/.*)?$").mock(side_effect=respond)
+
+        report = await async_client.agents.deploy_fleet([{"name": "a"}], max_requests_per_second=None)
+
+        assert report.agents == {"a": "uuid-a"}
+        (failed,) = report.failed
+        assert failed.step == "wait_until_ready" and isinstance(failed.error, AgentDeploymentError)
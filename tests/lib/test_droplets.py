@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import os
+import json
+import itertools
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+from gradient import Gradient, ActionError, AsyncGradient, NotFoundError, InternalServerError
+from gradient.lib import FleetWaiter
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+FAST: Dict[str, Any] = {"max_requests_per_second": None, "poll_interval": 0.01, "timeout": 5.0}
+
+
+class Platform:
+    """An in-memory Droplets API: the first request with a name starting with `flaky` only
+    creates its first Droplet and then fails, and every action completes on its second poll."""
+
+    def __init__(self) -> None:
+        self.droplets: List[Dict[str, Any]] = []
+        self.polls: Dict[int, int] = {}
+        self.requests: List[List[str]] = []
+        self.ids = itertools.count(1)
+        self.failed = False
+
+    def mock(self, respx_mock: Any) -> None:
+        respx_mock.post("/v2/droplets").mock(side_effect=self.create)
+        respx_mock.get("/v2/droplets").mock(side_effect=self.list)
+        respx_mock.get(path__regex=r"^/v2/droplets/(?P<droplet_id>\d+)/actions$").mock(side_effect=self.actions)
+        respx_mock.get(path__regex=r"^/v2/actions/(?P<action_id>\d+)$").mock(side_effect=self.action)
+
+    def create(self, request: httpx.Request) -> httpx.Response:
+        names = json.loads(request.content)["names"]
+        self.requests.append(names)
+        fail = any(name.startswith("flaky") for name in names) and not self.failed
+        created: List[Dict[str, Any]] = []
+        for name in names[:1] if fail else names:
+            droplet = {"id": next(self.ids), "name": name, "created_at": "2100-01-01T00:00:00Z"}
+            self.droplets.append(droplet)
+            created.append(droplet)
+        if fail:
+            self.failed = True
+            return httpx.Response(503, json={})
+        links = [{"id": 1000 + droplet["id"], "rel": "create", "href": ""} for droplet in created]
+        return httpx.Response(202, json={"droplets": created, "links": {"actions": links}})
+
+    def list(self, request: httpx.Request) -> httpx.Response:
+        name = request.url.params["name"]
+        # an older Droplet of the same name must not be mistaken for one the failed request created
+        old = {"id": 999, "name": name, "created_at": "2000-01-01T00:00:00Z"}
+        return httpx.Response(200, json={"droplets": [old, *(d for d in self.droplets if d["name"] == name)]})
+
+    def actions(self, request: httpx.Request, droplet_id: str) -> httpx.Response:  # noqa: ARG002
+        return httpx.Response(200, json={"actions": [{"id": 1000 + int(droplet_id), "type": "create"}]})
+
+    def action(self, request: httpx.Request, action_id: str) -> httpx.Response:  # noqa: ARG002
+        polls = self.polls[int(action_id)] = self.polls.get(int(action_id), 0) + 1
+        if int(action_id) == 1000 + 999:
+            return httpx.Response(200, json={"action": {"id": int(action_id), "status": "errored", "type": "create"}})
+        status = "completed" if polls > 1 else "in-progress"
+        return httpx.Response(200, json={"action": {"id": int(action_id), "status": status, "type": "create"}})
+
+
+class TestBulkCreate:
+    @pytest.mark.respx(base_url=base_url, assert_all_called=False)
+    def test_chunks_and_waits_for_every_action(self, client: Gradient, respx_mock: Any) -> None:
+        platform = Platform()
+        platform.mock(respx_mock)
+        names = [f"web-{i}" for i in range(25)]
+
+        result = client.gpu_droplets.bulk_create(names, image="ubuntu", size="gpu-h100x1", concurrency=3, **FAST)
+
+        assert result.ok
+        assert sorted(len(chunk) for chunk in platform.requests) == [5, 10, 10]
+        assert [droplet.name for droplet in result.droplets] == names
+        assert sorted(result.droplet_ids) == list(range(1, 26))
+        assert len(result.actions) == 25 and all(result.ok for result in result.actions)
+        assert all(platform.polls[action_id] == 2 for action_id in result.action_ids)
+
+    @pytest.mark.respx(base_url=base_url, assert_all_called=False)
+    def test_failed_chunk_is_retried_without_duplicates(self, client: Gradient, respx_mock: Any) -> None:
+        platform = Platform()
+        platform.mock(respx_mock)
+        names = ["web-1", "web-2", "flaky-1", "flaky-2", "web-3"]
+
+        result = client.gpu_droplets.bulk_create(names, image="ubuntu", size="s", chunk_size=2, **FAST)
+
+        assert result.ok
+        # the failed request created `flaky-1`, so only `flaky-2` is sent again
+        assert sorted(platform.requests) == [["flaky-1", "flaky-2"], ["flaky-2"], ["web-1", "web-2"], ["web-3"]]
+        assert result.chunks[1].names == ["flaky-1", "flaky-2"] and result.chunks[1].attempts == 2
+        assert [droplet.name for droplet in result.chunks[1].droplets] == ["flaky-1", "flaky-2"]
+        assert 999 not in result.droplet_ids
+        assert len(result.droplet_ids) == len(set(result.droplet_ids)) == 5
+        # the create actions of the recovered Droplets are waited on too
+        assert sorted(result.action_ids) == [1001, 1002, 1003, 1004, 1005]
+
+    @pytest.mark.respx(base_url=base_url, assert_all_called=False)
+    def test_droplets_of_the_last_failed_attempt_are_reported(self, client: Gradient, respx_mock: Any) -> None:
+        platform = Platform()
+        platform.mock(respx_mock)
+
+        result = client.gpu_droplets.bulk_create(
+            ["flaky-1", "flaky-2"], image="ubuntu", size="s", max_retries=0, **FAST
+        )
+
+        assert platform.requests == [["flaky-1", "flaky-2"]]
+        (failed,) = result.failed
+        assert isinstance(failed.error, InternalServerError) and failed.attempts == 1
+        assert [droplet.name for droplet in result.droplets] == ["flaky-1"]
+        assert result.failed_names == ["flaky-2"]
+        assert result.action_ids == [1001] and result.actions[0].ok
+
+    @pytest.mark.respx(base_url=base_url, assert_all_called=False)
+    def test_polls_are_retried_by_the_client(self, client: Gradient, respx_mock: Any) -> None:
+        platform = Platform()
+        platform.mock(respx_mock)
+        dropped: List[int] = []
+
+        def action(request: httpx.Request, action_id: str) -> httpx.Response:
+            if not dropped:
+                dropped.append(int(action_id))
+                raise httpx.ConnectError("connection reset", request=request)
+            return platform.action(request, action_id)
+
+        respx_mock.get(path__regex=r"^/v2/actions/(?P<action_id>\d+)$").mock(side_effect=action)
+
+        result = client.with_options(max_retries=1).gpu_droplets.bulk_create(
+            ["web-1"], image="ubuntu", size="s", **FAST
+        )
+
+        assert dropped == [1001]
+        assert result.ok and result.actions[0].ok
+
+    @pytest.mark.respx(base_url=base_url, assert_all_called=False)
+    def test_non_transient_errors_fail_only_their_chunk(self, client: Gradient, respx_mock: Any) -> None:
+        def create(request: httpx.Request) -> httpx.Response:
+            names = json.loads(request.content)["names"]
+            if "bad" in names:
+                return httpx.Response(404, json={})
+            droplets = [{"id": i, "name": name, "created_at": "2100-01-01T00:00:00Z"} for i, name in enumerate(names)]
+            return httpx.Response(202, json={"droplets": droplets, "links": {"actions": []}})
+
+        route = respx_mock.post("/v2/droplets").mock(side_effect=create)
+
+        result = client.gpu_droplets.bulk_create(["a", "b", "bad", "c"], image="ubuntu", size="s", chunk_size=2)
+
+        assert route.call_count == 2
+        assert not result.ok
+        (failed,) = result.failed
+        assert isinstance(failed.error, NotFoundError) and failed.attempts == 1
+        assert result.failed_names == ["bad", "c"]
+        assert [droplet.name for droplet in result.droplets] == ["a", "b"]
+        assert result.actions == []
+
+    def test_validation(self, client: Gradient) -> None:
+        with pytest.raises(ValueError, match="between 1 and 10"):
+            client.gpu_droplets.bulk_create(["a"], image="ubuntu", size="s", chunk_size=11)
+        with pytest.raises(ValueError, match="non-empty"):
+            client.gpu_droplets.bulk_create(["a", ""], image="ubuntu", size="s")
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_fleet_waiter_reports_errored_actions(self, client: Gradient, respx_mock: Any) -> None:
+        platform = Platform()
+        respx_mock.get(path__regex=r"^/v2/actions/(?P<action_id>\d+)$").mock(side_effect=platform.action)
+
+        waiter = FleetWaiter(client, max_requests_per_second=None, poll_interval=0.01, timeout=5.0)
+        waiter.add_action(1001)
+        waiter.add_action(1999)
+        results = {result.id: result for result in waiter.as_completed()}
+
+        assert results["1001"].ok and results["1001"].kind == "action"
+        error = results["1999"].error
+        assert isinstance(error, ActionError) and error.action_id == 1999 and error.status == "errored"
+
+    @pytest.mark.respx(base_url=base_url, assert_all_called=False)
+    async def test_async(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        platform = Platform()
+        platform.mock(respx_mock)
+        names = [f"web-{i}" for i in range(12)] + ["flaky-1"]
+
+        result = await async_client.gpu_droplets.bulk_create(names, image="ubuntu", size="s", concurrency=2, **FAST)
+
+        assert result.ok
+        assert sorted(result.droplet_ids) == list(range(1, 14))
+        assert ["web-11", "flaky-1"] in platform.requests and len(platform.requests) == 3
+        assert len(result.actions) == 13
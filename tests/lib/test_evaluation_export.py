@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import os
+import csv
+import json
+import math
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient, NotFoundError
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+RESULTS_PATH = "/v2/gen-ai/evaluation_runs/run-uuid/results"
+
+
+def prompt(prompt_id: int, **metrics: Any) -> Dict[str, Any]:
+    return {
+        "prompt_id": prompt_id,
+        "input": f"question {prompt_id}",
+        "output": f"answer {prompt_id}",
+        "input_tokens": str(prompt_id * 10),
+        "output_tokens": "5",
+        "prompt_level_metric_results": [
+            {"metric_name": name, "number_value": value}
+            if isinstance(value, (int, float))
+            else {"metric_name": name, "string_value": value}
+            for name, value in metrics.items()
+        ],
+    }
+
+
+class Run:
+    """Serves `per_page` sized pages of a run with `total` prompts."""
+
+    def __init__(self, total: int, *, with_meta: bool = True) -> None:
+        self.total = total
+        self.with_meta = with_meta
+        self.pages: List[int] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        per_page = int(request.url.params["per_page"])
+        self.pages.append(page)
+        ids = range((page - 1) * per_page + 1, min(page * per_page, self.total) + 1)
+        body: Dict[str, Any] = {"prompts": [prompt(i, correctness=i / 100, tone="ok") for i in ids]}
+        if self.with_meta:
+            body["meta"] = {"page": page, "pages": -(-self.total // per_page), "total": self.total}
+        return httpx.Response(200, json=body)
+
+
+def read_jsonl(path: Path) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestEvaluationExport:
+    @pytest.mark.respx(base_url=base_url)
+    def test_jsonl_with_prefetched_pages(self, client: Gradient, respx_mock: Any, tmp_path: Path) -> None:
+        run = Run(23)
+        respx_mock.get(RESULTS_PATH).mock(side_effect=run)
+        destination = tmp_path / "results.jsonl"
+
+        count = client.agents.evaluation_runs.export_results("run-uuid", destination, page_size=5, prefetch=3)
+
+        assert count == 23
+        rows = read_jsonl(destination)
+        assert [row["prompt_id"] for row in rows] == list(range(1, 24))
+        assert rows[0]["prompt_level_metric_results"][0] == {"metric_name": "correctness", "number_value": 0.01}
+        assert sorted(run.pages) == [1, 2, 3, 4, 5]
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_csv_without_page_count(self, client: Gradient, respx_mock: Any, tmp_path: Path) -> None:
+        run = Run(10, with_meta=False)
+        respx_mock.get(RESULTS_PATH).mock(side_effect=run)
+        destination = tmp_path / "results.csv"
+
+        count = client.agents.evaluation_runs.export_results("run-uuid", destination, page_size=5)
+
+        assert count == 10
+        with destination.open(newline="") as file:
+            rows = list(csv.DictReader(file))
+        assert list(rows[0]) == [
+            "prompt_id",
+            "input",
+            "output",
+            "ground_truth",
+            "input_tokens",
+            "output_tokens",
+            "correctness",
+            "tone",
+        ]
+        assert (rows[9]["prompt_id"], rows[9]["correctness"], rows[9]["tone"]) == ("10", "0.1", "ok")
+        # the third page is empty and ends the export
+        assert run.pages == [1, 2, 3]
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_detailed_columns(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.get(RESULTS_PATH).mock(
+            return_value=httpx.Response(
+                200, json={"prompts": [{"prompt_id": 1}, {"prompt_id": 2}, {"prompt_id": 3}], "meta": {"pages": 1}}
+            )
+        )
+
+        def detail(request: httpx.Request) -> httpx.Response:
+            prompt_id = int(request.url.path.rsplit("/", 1)[1])
+            metrics: Dict[str, Optional[float]] = {"correctness": prompt_id / 10}
+            if prompt_id == 3:
+                metrics["recall"] = 0.5
+            return httpx.Response(200, json={"prompt": prompt(prompt_id, **metrics)})
+
+        detail_route = respx_mock.get(path__regex=rf"^{RESULTS_PATH}/\d+$").mock(side_effect=detail)
+
+        columns = client.agents.evaluation_runs.results_columns("run-uuid", detailed=True, concurrency=2)
+
+        assert detail_route.call_count == 3
+        assert list(columns.prompt_ids) == [1, 2, 3]
+        assert list(columns.input_tokens) == [10, 20, 30]
+        assert list(columns.metrics["correctness"]) == [0.1, 0.2, 0.3]
+        recall = columns.metrics["recall"]
+        assert math.isnan(recall[0]) and math.isnan(recall[1]) and recall[2] == 0.5
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_page_errors_are_raised(self, client: Gradient, respx_mock: Any, tmp_path: Path) -> None:
+        respx_mock.get(RESULTS_PATH, params={"page": "1"}).mock(
+            return_value=httpx.Response(200, json={"prompts": [prompt(1)], "meta": {"pages": 2}})
+        )
+        respx_mock.get(RESULTS_PATH, params={"page": "2"}).mock(return_value=httpx.Response(404, json={}))
+
+        with pytest.raises(NotFoundError):
+            client.agents.evaluation_runs.export_results("run-uuid", tmp_path / "results.jsonl")
+        with pytest.raises(ValueError, match="export format"):
+            client.agents.evaluation_runs.export_results("run-uuid", tmp_path / "results.txt")
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_async(self, async_client: AsyncGradient, respx_mock: Any, tmp_path: Path) -> None:
+        respx_mock.get(RESULTS_PATH).mock(side_effect=Run(12))
+        destination = tmp_path / "results.jsonl"
+
+        count = await async_client.agents.evaluation_runs.export_results("run-uuid", destination, page_size=4)
+        columns = await async_client.agents.evaluation_runs.results_columns("run-uuid", page_size=5, prefetch=2)
+
+        assert count == 12
+        assert [row["prompt_id"] for row in read_jsonl(destination)] == list(range(1, 13))
+        assert list(columns.prompt_ids) == list(range(1, 13))
+        assert "tone" not in columns.metrics
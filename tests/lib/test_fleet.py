@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Dict, List
+
+import anyio
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient, NotFoundError, AgentDeploymentError, IndexingJobTimeoutError
+from gradient.lib import FleetWaiter, AsyncFleetWaiter
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+
+def agent(status: str) -> httpx.Response:
+    return httpx.Response(200, json={"agent": {"deployment": {"status": status}}})
+
+
+def job(phase: str) -> httpx.Response:
+    return httpx.Response(200, json={"job": {"phase": phase}})
+
+
+class TestFleetWaiter:
+    @pytest.mark.respx(base_url=base_url)
+    def test_yields_as_completed(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.get("/v2/gen-ai/agents/slow").mock(
+            side_effect=[agent("STATUS_DEPLOYING"), agent("STATUS_DEPLOYING"), agent("STATUS_RUNNING")]
+        )
+        respx_mock.get("/v2/gen-ai/agents/fast").mock(return_value=agent("STATUS_RUNNING"))
+        respx_mock.get("/v2/gen-ai/agents/broken").mock(side_effect=[agent("STATUS_DEPLOYING"), agent("STATUS_FAILED")])
+        respx_mock.get("/v2/gen-ai/knowledge_bases/kb").mock(
+            return_value=httpx.Response(200, json={"database_status": "ONLINE"})
+        )
+        respx_mock.get("/v2/gen-ai/indexing_jobs/gone").mock(return_value=httpx.Response(404, json={}))
+
+        waiter = FleetWaiter(client.with_options(max_retries=0), max_requests_per_second=None, poll_interval=0.05)
+        for uuid in ["slow", "fast", "broken"]:
+            waiter.add_agent(uuid)
+        waiter.add_knowledge_base("kb")
+        waiter.add_indexing_job("gone")
+
+        results = list(waiter.as_completed())
+
+        # the resources that are done on their first poll come first, in the order their polls finish
+        assert {(result.kind, result.id) for result in results[:3]} == {
+            ("agent", "fast"),
+            ("knowledge_base", "kb"),
+            ("indexing_job", "gone"),
+        }
+        by_id = {result.id: result for result in results}
+        assert len(by_id) == 5
+        assert results[-1].id == "slow"
+        assert by_id["slow"].ok and by_id["slow"].polls == 3
+        assert by_id["fast"].response is not None and by_id["fast"].response.agent.deployment.status == "STATUS_RUNNING"
+        assert isinstance(by_id["broken"].error, AgentDeploymentError)
+        assert isinstance(by_id["gone"].error, NotFoundError)
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_shared_rate_limit(self, client: Gradient, respx_mock: Any) -> None:
+        started: List[float] = []
+
+        def respond(_request: httpx.Request) -> httpx.Response:
+            started.append(time.monotonic())
+            return job("BATCH_JOB_PHASE_SUCCEEDED")
+
+        respx_mock.get(path__regex=r"^/v2/gen-ai/indexing_jobs/[^/]+$").mock(side_effect=respond)
+        waiter = FleetWaiter(client, max_requests_per_second=20, concurrency=10)
+        for index in range(6):
+            waiter.add_indexing_job(f"job-{index}")
+
+        results = list(waiter)
+
+        assert all(result.ok for result in results)
+        assert len(started) == 6
+        # six requests at 20 per second take at least 5 intervals of 50ms
+        assert started[-1] - started[0] >= 0.2
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_transient_errors_and_timeouts(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.get("/v2/gen-ai/indexing_jobs/busy").mock(
+            side_effect=[httpx.Response(503, json={}), job("BATCH_JOB_PHASE_SUCCEEDED")]
+        )
+        respx_mock.get("/v2/gen-ai/indexing_jobs/stuck").mock(return_value=job("BATCH_JOB_PHASE_RUNNING"))
+
+        waiter = FleetWaiter(client.with_options(max_retries=0), poll_interval=0.05, timeout=0.5)
+        waiter.add_indexing_job("busy")
+        waiter.add_indexing_job("stuck")
+
+        results: Dict[str, Any] = {result.id: result for result in waiter.as_completed()}
+
+        assert results["busy"].ok and results["busy"].polls == 2
+        assert isinstance(results["stuck"].error, IndexingJobTimeoutError)
+        assert results["stuck"].response.job.phase == "BATCH_JOB_PHASE_RUNNING"
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_slow_poll_does_not_hold_up_the_others(self, client: Gradient, respx_mock: Any) -> None:
+        def slow(_request: httpx.Request) -> httpx.Response:
+            time.sleep(0.5)
+            return agent("STATUS_RUNNING")
+
+        respx_mock.get("/v2/gen-ai/agents/slow").mock(side_effect=slow)
+        respx_mock.get("/v2/gen-ai/indexing_jobs/quick").mock(
+            side_effect=[
+                job("BATCH_JOB_PHASE_RUNNING"),
+                job("BATCH_JOB_PHASE_RUNNING"),
+                job("BATCH_JOB_PHASE_SUCCEEDED"),
+            ]
+        )
+
+        waiter = FleetWaiter(client, max_requests_per_second=None, poll_interval=0.02)
+        waiter.add_agent("slow")
+        waiter.add_indexing_job("quick")
+
+        first, second = waiter.as_completed()
+
+        assert first.id == "quick" and first.polls == 3 and first.elapsed < 0.4
+        assert second.id == "slow" and second.ok
+
+    def test_validates_arguments(self, client: Gradient) -> None:
+        with pytest.raises(ValueError, match="concurrency"):
+            list(FleetWaiter(client, concurrency=0))
+        with pytest.raises(ValueError, match="uuid"):
+            FleetWaiter(client).add_agent("")
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_async(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        respx_mock.get("/v2/gen-ai/agents/slow").mock(side_effect=[agent("STATUS_DEPLOYING"), agent("STATUS_RUNNING")])
+        respx_mock.get("/v2/gen-ai/indexing_jobs/fast").mock(return_value=job("BATCH_JOB_PHASE_SUCCEEDED"))
+
+        waiter = AsyncFleetWaiter(async_client, max_requests_per_second=50, poll_interval=0.05)
+        waiter.add_agent("slow")
+        waiter.add_indexing_job("fast")
+
+        async with waiter.as_completed() as completed:
+            results = [result async for result in completed]
+
+        assert [(result.kind, result.id, result.ok) for result in results] == [
+            ("indexing_job", "fast", True),
+            ("agent", "slow", True),
+        ]
+
+    @pytest.mark.respx(base_url=base_url, assert_all_called=False)
+    async def test_async_break(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        respx_mock.get("/v2/gen-ai/agents/slow").mock(return_value=agent("STATUS_DEPLOYING"))
+        respx_mock.get("/v2/gen-ai/indexing_jobs/fast").mock(return_value=job("BATCH_JOB_PHASE_SUCCEEDED"))
+
+        waiter = AsyncFleetWaiter(async_client, max_requests_per_second=None, poll_interval=0.01)
+        waiter.add_agent("slow")
+        waiter.add_indexing_job("fast")
+
+        async with waiter.as_completed() as completed:
+            async for result in completed:
+                assert result.id == "fast"
+                break
+
+        # stopping early cancels the polls of the other resources, but not the caller
+        await anyio.sleep(0.01)
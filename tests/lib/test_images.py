@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import os
+import json
+import base64
+from typing import Any, List, Iterator
+from pathlib import Path
+
+import httpx
+import pytest
+
+from gradient import APIError, Gradient, AsyncGradient
+from gradient.lib import ImageFileSink, ImageBufferSink
+from gradient.lib.images import _B64JsonExtractor
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+IMAGE = bytes(range(256)) * 40
+PARTIAL_0 = b"partial-0" * 100
+PARTIAL_1 = b"partial-1" * 100
+
+
+def b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def chunked(data: bytes, size: int) -> Iterator[bytes]:
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def event(data: bytes, *, partial_index: int | None = None) -> bytes:
+    payload: dict[str, Any] = {
+        "b64_json": b64(data),
+        "background": "auto",
+        "created_at": 1,
+        "output_format": "png",
+        "quality": "auto",
+        "size": "1024x1024",
+    }
+    if partial_index is None:
+        payload["type"] = "image_generation.completed"
+        payload["usage"] = {
+            "input_tokens": 1,
+            "input_tokens_details": {"image_tokens": 0, "text_tokens": 1},
+            "output_tokens": 2,
+            "total_tokens": 3,
+        }
+    else:
+        payload["type"] = "image_generation.partial_image"
+        payload["partial_image_index"] = partial_index
+    return b"data: " + json.dumps(payload).encode() + b"\n\n"
+
+
+STREAM_BODY = event(PARTIAL_0, partial_index=0) + event(PARTIAL_1, partial_index=1) + event(IMAGE) + b"data: [DONE]\n\n"
+
+RESPONSE_BODY = json.dumps(
+    {
+        "created": 1,
+        "data": [{"b64_json": b64(IMAGE), "revised_prompt": "otter"}, {"b64_json": b64(PARTIAL_0)}],
+    }
+).encode()
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, 4096])
+def test_extractor_handles_any_chunk_boundary(size: int) -> None:
+    sink = ImageBufferSink()
+    # JSON encoders are allowed to escape `/`, which is part of the base64 alphabet
+    body = RESPONSE_BODY.replace(b"/", b"\\/")
+    extractor = _B64JsonExtractor(sink)
+
+    skeleton = b"".join(extractor.feed(chunk) for chunk in chunked(body, size)) + extractor.finish()
+
+    assert json.loads(skeleton) == {
+        "created": 1,
+        "data": [{"b64_json": "", "revised_prompt": "otter"}, {"b64_json": ""}],
+    }
+    for index, file in enumerate(extractor.completed):
+        sink.commit(file, index=index, partial=False)
+    assert sink.images == {0: IMAGE, 1: PARTIAL_0}
+
+
+def test_extractor_ignores_non_string_values() -> None:
+    extractor = _B64JsonExtractor(ImageBufferSink())
+    body = b'{"b64_json": null, "prompt": "b64_json"}'
+
+    assert extractor.feed(body) + extractor.finish() == b'{"b64_json":null, "prompt": "b64_json"}'
+    assert not extractor.completed
+
+
+class TestGenerateToSink:
+    @pytest.mark.respx(base_url=base_url)
+    def test_non_streaming_to_buffer(self, client: Gradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/images/generations").mock(
+            return_value=httpx.Response(200, content=chunked(RESPONSE_BODY, 100))
+        )
+
+        sink = ImageBufferSink()
+        response = client.images.generate_to_sink(sink, prompt="otter", n=2, chunk_size=128)
+
+        # an omitted `stream` is not sent
+        assert "stream" not in json.loads(route.calls[0].request.content)
+        assert sink.images == {0: IMAGE, 1: PARTIAL_0}
+        assert [image.b64_json for image in response.data] == ["", ""]
+        assert response.data[0].revised_prompt == "otter"
+
+    @pytest.mark.respx(base_url=base_url)
+    @pytest.mark.parametrize("client", [False], indirect=True)
+    def test_images_keep_their_index_after_a_null(self, client: Gradient, respx_mock: Any) -> None:
+        body = {"created": 1, "data": [{"b64_json": None}, {"b64_json": b64(IMAGE)}]}
+        respx_mock.post("/images/generations").mock(return_value=httpx.Response(200, json=body))
+
+        sink = ImageBufferSink()
+        client.images.generate_to_sink(sink, prompt="otter", n=2)
+
+        assert sink.images == {1: IMAGE}
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_streaming_to_file(self, client: Gradient, respx_mock: Any, tmp_path: Path) -> None:
+        respx_mock.post("/images/generations").mock(return_value=httpx.Response(200, content=chunked(STREAM_BODY, 50)))
+
+        path = tmp_path / "otter.png"
+        sink = ImageFileSink(path, partials="latest")
+        partial_contents: List[bytes] = []
+        types: List[str] = []
+        for item in client.images.generate_to_sink(sink, prompt="otter", stream=True, partial_images=2):
+            types.append(item.type)
+            if item.type == "image_generation.partial_image":
+                partial_contents.append(sink.partial_paths[0].read_bytes())
+            assert item.b64_json == ""
+
+        assert types == [
+            "image_generation.partial_image",
+            "image_generation.partial_image",
+            "image_generation.completed",
+        ]
+        assert partial_contents == [PARTIAL_0, PARTIAL_1]
+        assert path.read_bytes() == IMAGE
+        assert sink.paths == [path]
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["otter.partial.png", "otter.png"]
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_streaming_error_discards_pending_images(self, client: Gradient, respx_mock: Any, tmp_path: Path) -> None:
+        body = event(PARTIAL_0, partial_index=0) + b'data: {"error":{"message":"boom"}}\n\n'
+        respx_mock.post("/images/generations").mock(return_value=httpx.Response(200, content=body))
+
+        sink = ImageFileSink(tmp_path / "otter.png", partials="none")
+        with pytest.raises(APIError, match="boom"):
+            for _ in client.images.generate_to_sink(sink, prompt="otter", stream=True, partial_images=1):
+                pass
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestAsyncGenerateToSink:
+    @pytest.mark.respx(base_url=base_url)
+    async def test_non_streaming_to_buffer(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        respx_mock.post("/images/generations").mock(return_value=httpx.Response(200, content=RESPONSE_BODY))
+
+        sink = ImageBufferSink()
+        response = await async_client.images.generate_to_sink(sink, prompt="otter", n=2, chunk_size=128)
+
+        assert sink.images == {0: IMAGE, 1: PARTIAL_0}
+        assert response.data[1].b64_json == ""
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_streaming_keeps_all_partials(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        respx_mock.post("/images/generations").mock(return_value=httpx.Response(200, content=STREAM_BODY))
+
+        sink = ImageBufferSink(partials="all")
+        stream = await async_client.images.generate_to_sink(
+            sink, prompt="otter", stream=True, partial_images=2, chunk_size=64
+        )
+        events = [item async for item in stream]
+
+        assert len(events) == 3
+        assert sink.partial_images == {0: PARTIAL_0, 1: PARTIAL_1}
+        assert sink.latest_partial == PARTIAL_1
+        assert sink.images == {0: IMAGE}
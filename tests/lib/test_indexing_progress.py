@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient, IndexingJobTimeoutError
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+JOB_PATH = "/v2/gen-ai/indexing_jobs/job-uuid"
+DATA_SOURCES_PATH = "/v2/gen-ai/indexing_jobs/job-uuid/data_sources"
+
+
+def job(phase: str, *, completed: int = 0, tokens: str = "0", updated_at: Optional[str] = None) -> httpx.Response:
+    body: Dict[str, Any] = {
+        "uuid": "job-uuid",
+        "phase": phase,
+        "completed_datasources": completed,
+        "total_datasources": 2,
+        "total_tokens": tokens,
+    }
+    if updated_at is not None:
+        body["updated_at"] = updated_at
+    return httpx.Response(200, json={"job": body})
+
+
+def data_sources(*indexed: int) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            "indexed_data_sources": [
+                {
+                    "data_source_uuid": f"ds-{index}",
+                    "status": "DATA_SOURCE_STATUS_UPDATED" if count == 10 else "DATA_SOURCE_STATUS_IN_PROGRESS",
+                    "indexed_file_count": str(count),
+                    "total_file_count": "10",
+                }
+                for index, count in enumerate(indexed)
+            ]
+        },
+    )
+
+
+class TestIndexingJobProgress:
+    @pytest.mark.respx(base_url=base_url)
+    def test_yields_changed_snapshots(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.get(JOB_PATH).mock(
+            side_effect=[
+                job("BATCH_JOB_PHASE_PENDING"),
+                job("BATCH_JOB_PHASE_PENDING"),
+                job("BATCH_JOB_PHASE_RUNNING", tokens="100", updated_at="2025-01-01T00:00:01Z"),
+                job("BATCH_JOB_PHASE_RUNNING", tokens="100", updated_at="2025-01-01T00:00:01Z"),
+                job("BATCH_JOB_PHASE_SUCCEEDED", completed=2, tokens="250", updated_at="2025-01-01T00:00:02Z"),
+            ]
+        )
+        sources_route = respx_mock.get(DATA_SOURCES_PATH).mock(
+            side_effect=[data_sources(0, 0), data_sources(4, 0), data_sources(10, 10)]
+        )
+        jobs = client.with_options().knowledge_bases.indexing_jobs
+        sleeps: List[float] = []
+
+        def sleep(seconds: float, cancel_event: Optional[threading.Event] = None) -> None:  # noqa: ARG001
+            sleeps.append(seconds)
+
+        jobs._sleep = sleep  # type: ignore[method-assign]
+
+        snapshots = list(jobs.watch_progress("job-uuid"))
+
+        assert [(s.phase, s.indexed_files, s.total_tokens) for s in snapshots] == [
+            ("BATCH_JOB_PHASE_PENDING", 0, 0),
+            ("BATCH_JOB_PHASE_RUNNING", 4, 100),
+            ("BATCH_JOB_PHASE_SUCCEEDED", 20, 250),
+        ]
+        last = snapshots[-1]
+        assert last.done and last.succeeded
+        assert (last.completed_data_sources, last.total_data_sources, last.total_files) == (2, 2, 20)
+        assert [source.status for source in last.data_sources] == ["DATA_SOURCE_STATUS_UPDATED"] * 2
+        # unchanged jobs do not refetch their data sources
+        assert sources_route.call_count == 3
+        # the interval starts over after every change
+        assert sleeps[0] == 0.5 and sleeps[2] == 0.5
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_failed_jobs_end_the_iteration(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.get(JOB_PATH).mock(return_value=job("BATCH_JOB_PHASE_FAILED"))
+        respx_mock.get(DATA_SOURCES_PATH).mock(return_value=data_sources(3))
+
+        snapshots = list(client.knowledge_bases.indexing_jobs.watch_progress("job-uuid", poll_interval=0))
+
+        assert len(snapshots) == 1
+        assert snapshots[0].done and not snapshots[0].succeeded
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_timeout(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.get(JOB_PATH).mock(return_value=job("BATCH_JOB_PHASE_RUNNING"))
+        respx_mock.get(DATA_SOURCES_PATH).mock(return_value=data_sources(1))
+
+        snapshots: List[Any] = []
+        with pytest.raises(IndexingJobTimeoutError, match="Current phase: BATCH_JOB_PHASE_RUNNING"):
+            for snapshot in client.knowledge_bases.indexing_jobs.watch_progress(
+                "job-uuid", poll_interval=0.05, timeout=0.2
+            ):
+                snapshots.append(snapshot)
+
+        assert len(snapshots) == 1
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_async(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        respx_mock.get(JOB_PATH).mock(
+            side_effect=[job("BATCH_JOB_PHASE_RUNNING"), job("BATCH_JOB_PHASE_SUCCEEDED", completed=1)]
+        )
+        respx_mock.get(DATA_SOURCES_PATH).mock(side_effect=[data_sources(5), data_sources(10)])
+
+        snapshots = [
+            snapshot
+            async for snapshot in async_client.knowledge_bases.indexing_jobs.watch_progress("job-uuid", poll_interval=0)
+        ]
+
+        assert [(s.phase, s.indexed_files) for s in snapshots] == [
+            ("BATCH_JOB_PHASE_RUNNING", 5),
+            ("BATCH_JOB_PHASE_SUCCEEDED", 10),
+        ]
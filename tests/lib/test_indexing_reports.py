@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import os
+import gzip
+import json
+from typing import Any, List, Iterator
+from pathlib import Path
+
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient, NotFoundError
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+SIGNED_URL_PATH = "/v2/gen-ai/indexing_jobs/job-uuid/details_signed_url"
+
+
+def signed_url(url: str) -> httpx.Response:
+    return httpx.Response(200, json={"signed_url": url})
+
+
+def chunked(data: bytes, size: int) -> Iterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+class TestIndexingJobReports:
+    @pytest.mark.respx(base_url=base_url)
+    def test_jsonl_in_small_chunks(self, client: Gradient, respx_mock: Any, tmp_path: Path) -> None:
+        records = [{"file": f"doc-{index}.md", "status": "indexed", "note": "a b"} for index in range(50)]
+        body = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode()
+        respx_mock.get(SIGNED_URL_PATH).mock(return_value=signed_url("https://reports.example.com/job.jsonl?sig=1"))
+        respx_mock.get("https://reports.example.com/job.jsonl").mock(
+            return_value=httpx.Response(200, content=chunked(body, 7))
+        )
+        spool = tmp_path / "report.jsonl"
+
+        parsed = list(client.knowledge_bases.indexing_jobs.iter_report("job-uuid", chunk_size=7, spool_to=spool))
+
+        assert parsed == records
+        assert spool.read_bytes() == body
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_gzipped_csv_with_multiline_fields(self, client: Gradient, respx_mock: Any) -> None:
+        body = gzip.compress(
+            b'file,status,error\r\ndoc.md,indexed,\r\nbad.pdf,failed,"line one\r\nline ""two"""\r\n\r\nlast.txt,skipped,'
+        )
+        respx_mock.get(SIGNED_URL_PATH).mock(return_value=signed_url("https://reports.example.com/details"))
+        respx_mock.get("https://reports.example.com/details").mock(
+            return_value=httpx.Response(200, content=chunked(body, 5))
+        )
+
+        parsed = list(client.knowledge_bases.indexing_jobs.iter_report("job-uuid", format="csv", chunk_size=5))
+
+        assert parsed == [
+            {"file": "doc.md", "status": "indexed", "error": ""},
+            {"file": "bad.pdf", "status": "failed", "error": 'line one\r\nline "two"'},
+            {"file": "last.txt", "status": "skipped", "error": ""},
+        ]
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_errors(self, client: Gradient, respx_mock: Any) -> None:
+        route = respx_mock.get(SIGNED_URL_PATH).mock(return_value=httpx.Response(200, json={}))
+        with pytest.raises(ValueError, match="has no details report"):
+            list(client.knowledge_bases.indexing_jobs.iter_report("job-uuid"))
+
+        route.mock(return_value=signed_url("https://reports.example.com/expired.csv"))
+        respx_mock.get("https://reports.example.com/expired.csv").mock(return_value=httpx.Response(404, text="gone"))
+        with pytest.raises(NotFoundError):
+            list(client.knowledge_bases.indexing_jobs.iter_report("job-uuid"))
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_async(self, async_client: AsyncGradient, respx_mock: Any, tmp_path: Path) -> None:
+        body = b"name,count\nalpha,1\nbeta,2\n"
+        respx_mock.get(SIGNED_URL_PATH).mock(return_value=signed_url("https://reports.example.com/report.csv"))
+        respx_mock.get("https://reports.example.com/report.csv").mock(return_value=httpx.Response(200, content=body))
+        spool = tmp_path / "report.csv"
+
+        parsed: List[Any] = [
+            record
+            async for record in await async_client.knowledge_bases.indexing_jobs.iter_report(
+                "job-uuid", chunk_size=4, spool_to=spool
+            )
+        ]
+
+        assert parsed == [{"name": "alpha", "count": "1"}, {"name": "beta", "count": "2"}]
+        assert spool.read_bytes() == body
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import os
+import json
+from typing import Any, Dict, List
+from pathlib import Path
+
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient, InternalServerError
+from gradient.lib import DirectorySyncReport
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+PRESIGN_PATH = "/v2/gen-ai/knowledge_bases/data_sources/file_upload_presigned_urls"
+DATA_SOURCES_PATH = "/v2/gen-ai/knowledge_bases/kb-uuid/data_sources"
+INDEXING_JOBS_PATH = "/v2/gen-ai/indexing_jobs"
+
+
+class Backend:
+    """Fakes presigning, object storage, data sources and indexing jobs."""
+
+    def __init__(self) -> None:
+        self.presigned = 0
+        self.objects: Dict[str, bytes] = {}
+        self.data_sources: Dict[str, str] = {}
+        self.deleted: List[str] = []
+        self.fail_deletes = False
+        self.indexed: List[List[str]] = []
+
+    def presign(self, request: httpx.Request) -> httpx.Response:
+        uploads: List[Dict[str, str]] = []
+        for file in json.loads(request.content)["files"]:
+            self.presigned += 1
+            key = f"objects/{self.presigned}-{file['file_name']}"
+            uploads.append(
+                {
+                    "original_file_name": file["file_name"],
+                    "object_key": key,
+                    "presigned_url": f"{base_url}/uploads/{key}",
+                }
+            )
+        return httpx.Response(200, json={"uploads": uploads})
+
+    def put(self, request: httpx.Request) -> httpx.Response:
+        self.objects[request.url.path[len("/uploads/") :]] = request.read()
+        return httpx.Response(200)
+
+    def create(self, request: httpx.Request) -> httpx.Response:
+        key = json.loads(request.content)["file_upload_data_source"]["stored_object_key"]
+        uuid = f"ds-{len(self.data_sources) + 1}"
+        self.data_sources[uuid] = key
+        return httpx.Response(200, json={"knowledge_base_data_source": {"uuid": uuid}})
+
+    def delete(self, request: httpx.Request) -> httpx.Response:
+        uuid = request.url.path.rsplit("/", 1)[-1]
+        if self.fail_deletes:
+            return httpx.Response(500, json={})
+        self.deleted.append(uuid)
+        return httpx.Response(200, json={"data_source_uuid": uuid})
+
+    def index(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        assert body["knowledge_base_uuid"] == "kb-uuid"
+        self.indexed.append(body["data_source_uuids"])
+        return httpx.Response(200, json={"job": {"uuid": f"job-{len(self.indexed)}"}})
+
+    def mock(self, respx_mock: Any) -> None:
+        respx_mock.post(PRESIGN_PATH).mock(side_effect=self.presign)
+        respx_mock.put(path__startswith="/uploads/").mock(side_effect=self.put)
+        respx_mock.post(DATA_SOURCES_PATH).mock(side_effect=self.create)
+        respx_mock.delete(path__startswith=f"{DATA_SOURCES_PATH}/").mock(side_effect=self.delete)
+        respx_mock.post(INDEXING_JOBS_PATH).mock(side_effect=self.index)
+
+
+@pytest.fixture
+def docs(tmp_path: Path) -> Path:
+    root = tmp_path / "docs"
+    (root / "guides").mkdir(parents=True)
+    (root / "a.md").write_text("alpha")
+    (root / "b.md").write_text("bravo")
+    (root / "guides" / "copy-of-a.md").write_text("alpha")
+    return root
+
+
+def manifest(root: Path) -> Dict[str, Any]:
+    return json.loads((root / ".gradient-sync.json").read_text())
+
+
+class TestSyncDirectory:
+    @pytest.mark.respx(base_url=base_url)
+    def test_syncs_only_changes(self, client: Gradient, respx_mock: Any, docs: Path) -> None:
+        backend = Backend()
+        backend.mock(respx_mock)
+
+        report = client.knowledge_bases.sync_directory("kb-uuid", docs)
+
+        assert isinstance(report, DirectorySyncReport)
+        # identical content is uploaded once
+        assert len(backend.objects) == 2
+        assert sorted(report.uploaded) == ["a.md", "b.md", "guides/copy-of-a.md"]
+        assert report.hashed == 3
+        assert report.indexing_job is not None and report.indexing_job.job is not None
+        assert backend.indexed == [["ds-1", "ds-2"]]
+        files = manifest(docs)["files"]
+        assert files["a.md"]["data_source_uuid"] == files["guides/copy-of-a.md"]["data_source_uuid"]
+
+        report = client.knowledge_bases.sync_directory("kb-uuid", docs)
+
+        assert report.uploaded == []
+        assert sorted(report.unchanged) == ["a.md", "b.md", "guides/copy-of-a.md"]
+        assert report.hashed == 0
+        assert report.indexing_job is None
+        assert len(backend.indexed) == 1
+
+        (docs / "b.md").write_text("bravo, changed")
+        (docs / "guides" / "copy-of-a.md").unlink()
+        (docs / "c.md").write_text("charlie")
+
+        report = client.knowledge_bases.sync_directory("kb-uuid", docs)
+
+        assert sorted(report.uploaded) == ["b.md", "c.md"]
+        assert report.unchanged == ["a.md"]
+        assert report.removed == ["guides/copy-of-a.md"]
+        b_uuid = [uuid for uuid, key in backend.data_sources.items() if key.endswith("-b.md")][0]
+        assert report.deleted_data_sources == [b_uuid] == backend.deleted
+        assert backend.indexed[-1] == ["ds-3", "ds-4"]
+        assert sorted(manifest(docs)["files"]) == ["a.md", "b.md", "c.md"]
+
+    @pytest.mark.respx(base_url=base_url, assert_all_called=False)
+    def test_failed_uploads_keep_the_previous_content(self, client: Gradient, respx_mock: Any, docs: Path) -> None:
+        backend = Backend()
+        backend.mock(respx_mock)
+        client.knowledge_bases.sync_directory("kb-uuid", docs)
+        previous = manifest(docs)["files"]["b.md"]
+
+        (docs / "b.md").write_text("bravo, changed")
+        respx_mock.put(path__startswith="/uploads/").mock(return_value=httpx.Response(403))
+
+        report = client.knowledge_bases.sync_directory("kb-uuid", docs)
+
+        assert [result.path.name for result in report.failed] == ["b.md"]
+        assert report.deleted_data_sources == []
+        assert report.indexing_job is None
+        assert manifest(docs)["files"]["b.md"] == previous
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_failed_deletes_are_retried(self, client: Gradient, respx_mock: Any, docs: Path) -> None:
+        backend = Backend()
+        backend.mock(respx_mock)
+        client = client.with_options(max_retries=0)
+        client.knowledge_bases.sync_directory("kb-uuid", docs)
+        b_uuid = manifest(docs)["files"]["b.md"]["data_source_uuid"]
+
+        (docs / "b.md").write_text("bravo, changed")
+        backend.fail_deletes = True
+        report = client.knowledge_bases.sync_directory("kb-uuid", docs)
+
+        assert report.deleted_data_sources == []
+        assert list(report.failed_deletes) == [b_uuid]
+        # the new data source is still indexed
+        assert report.indexing_job is not None and backend.indexed[-1] == ["ds-3"]
+        assert manifest(docs)["pending_deletes"] == [b_uuid]
+
+        backend.fail_deletes = False
+        report = client.knowledge_bases.sync_directory("kb-uuid", docs)
+
+        assert report.deleted_data_sources == backend.deleted == [b_uuid]
+        assert report.failed_deletes == {}
+        assert manifest(docs)["pending_deletes"] == []
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_skipped_deletes_stay_pending(self, client: Gradient, respx_mock: Any, docs: Path) -> None:
+        backend = Backend()
+        backend.mock(respx_mock)
+        client.knowledge_bases.sync_directory("kb-uuid", docs)
+        b_uuid = manifest(docs)["files"]["b.md"]["data_source_uuid"]
+
+        (docs / "b.md").unlink()
+        report = client.knowledge_bases.sync_directory("kb-uuid", docs, delete_removed=False)
+
+        assert report.deleted_data_sources == backend.deleted == []
+        assert manifest(docs)["pending_deletes"] == [b_uuid]
+
+        report = client.knowledge_bases.sync_directory("kb-uuid", docs)
+
+        assert report.deleted_data_sources == backend.deleted == [b_uuid]
+        assert manifest(docs)["pending_deletes"] == []
+
+    @pytest.mark.respx(base_url=base_url, assert_all_called=False)
+    def test_failed_indexing_jobs_are_retried(self, client: Gradient, respx_mock: Any, docs: Path) -> None:
+        backend = Backend()
+        backend.mock(respx_mock)
+        client = client.with_options(max_retries=0)
+        respx_mock.post(INDEXING_JOBS_PATH).mock(return_value=httpx.Response(500, json={}))
+
+        with pytest.raises(InternalServerError):
+            client.knowledge_bases.sync_directory("kb-uuid", docs)
+
+        assert manifest(docs)["pending_indexing"] == ["ds-1", "ds-2"]
+
+        respx_mock.post(INDEXING_JOBS_PATH).mock(side_effect=backend.index)
+        report = client.knowledge_bases.sync_directory("kb-uuid", docs)
+
+        assert report.uploaded == []
+        assert report.indexing_job is not None
+        assert backend.indexed == [["ds-1", "ds-2"]]
+        assert manifest(docs)["pending_indexing"] == []
+
+    def test_rejects_manifest_of_another_knowledge_base(self, client: Gradient, docs: Path) -> None:
+        (docs / ".gradient-sync.json").write_text(json.dumps({"knowledge_base_uuid": "other", "files": {}}))
+
+        with pytest.raises(ValueError, match="belongs to knowledge base 'other'"):
+            client.knowledge_bases.sync_directory("kb-uuid", docs)
+
+
+class TestAsyncSyncDirectory:
+    @pytest.mark.respx(base_url=base_url)
+    async def test_hashes_on_a_process_pool(
+        self, async_client: AsyncGradient, respx_mock: Any, docs: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr("gradient.lib.kb_sync._MIN_FILES_FOR_POOL", 1)
+        backend = Backend()
+        backend.mock(respx_mock)
+
+        report = await async_client.knowledge_bases.sync_directory("kb-uuid", docs, hash_workers=2)
+
+        assert report.hashed == 3
+        assert len(backend.objects) == 2
+        assert sorted(backend.indexed[0]) == ["ds-1", "ds-2"]
+        a_uuid = manifest(docs)["files"]["a.md"]["data_source_uuid"]
+
+        (docs / "a.md").unlink()
+        (docs / "guides" / "copy-of-a.md").unlink()
+        report = await async_client.knowledge_bases.sync_directory("kb-uuid", docs)
+
+        assert report.deleted_data_sources == backend.deleted == [a_uuid]
+        assert report.indexing_job is None
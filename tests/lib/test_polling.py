@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import os
+import time
+import threading
+from typing import Any, List, Optional
+
+import anyio
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient, NotFoundError, PollingCancelledError, IndexingJobTimeoutError
+from gradient.lib.polling import PollPolicy
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+JOB_PATH = "/v2/gen-ai/indexing_jobs/job-uuid"
+
+
+def job(phase: str) -> httpx.Response:
+    return httpx.Response(200, json={"job": {"uuid": "job-uuid", "phase": phase}})
+
+
+class TestPollPolicy:
+    def test_backs_off_with_jitter_up_to_the_maximum(self) -> None:
+        policy = PollPolicy(initial_interval=0.5, max_interval=5.0)
+        intervals: List[float] = []
+        previous = None
+        for _ in range(200):
+            previous = policy.next_interval(previous)
+            intervals.append(previous)
+
+        assert intervals[0] == 0.5
+        assert all(0.5 <= interval <= 5.0 for interval in intervals)
+        assert all(b <= a * 3 for a, b in zip(intervals, intervals[1:]))
+        assert max(intervals) > 4
+        assert len(set(intervals)) > 20
+
+    def test_initial_interval_is_capped(self) -> None:
+        policy = PollPolicy.up_to(0.1)
+
+        assert policy.next_interval(None) == 0.1
+        assert policy.next_interval(0.1) == 0.1
+        assert PollPolicy.up_to(0).next_interval(None) == 0
+
+
+class TestPolling:
+    @pytest.mark.respx(base_url=base_url)
+    def test_honours_retry_after(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.get(JOB_PATH).mock(
+            side_effect=[
+                job("BATCH_JOB_PHASE_RUNNING"),
+                httpx.Response(429, headers={"retry-after": "3"}, json={}),
+                job("BATCH_JOB_PHASE_SUCCEEDED"),
+            ]
+        )
+        jobs = client.with_options(max_retries=0).knowledge_bases.indexing_jobs
+        sleeps: List[float] = []
+
+        def sleep(seconds: float, cancel_event: Optional[threading.Event] = None) -> None:  # noqa: ARG001
+            sleeps.append(seconds)
+
+        jobs._sleep = sleep  # type: ignore[method-assign]
+
+        response = jobs.wait_for_completion("job-uuid")
+
+        assert response.job is not None and response.job.phase == "BATCH_JOB_PHASE_SUCCEEDED"
+        assert len(sleeps) == 2
+        assert sleeps[0] == 0.5
+        assert sleeps[1] >= 3
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_does_not_sleep_past_the_deadline(self, client: Gradient, respx_mock: Any) -> None:
+        route = respx_mock.get(JOB_PATH).mock(return_value=job("BATCH_JOB_PHASE_RUNNING"))
+
+        started = time.monotonic()
+        with pytest.raises(IndexingJobTimeoutError, match="Current phase: BATCH_JOB_PHASE_RUNNING"):
+            client.knowledge_bases.indexing_jobs.wait_for_completion("job-uuid", poll_interval=10, timeout=0.3)
+
+        assert time.monotonic() - started < 2
+        # the initial interval is longer than the timeout, so the second poll happens at the deadline
+        assert route.call_count == 2
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_non_transient_errors_end_the_wait(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.get(JOB_PATH).mock(return_value=httpx.Response(404, json={}))
+
+        with pytest.raises(NotFoundError):
+            client.knowledge_bases.indexing_jobs.wait_for_completion("job-uuid", poll_interval=0)
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_cancel_event(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.get(path__regex=r"^/v2/gen-ai/agents/[^/]+$").mock(
+            return_value=httpx.Response(
+                200, json={"agent": {"deployment": {"status": "STATUS_WAITING_FOR_DEPLOYMENT"}}}
+            )
+        )
+        cancel = threading.Event()
+        timer = threading.Timer(0.2, cancel.set)
+        timer.start()
+
+        started = time.monotonic()
+        try:
+            with pytest.raises(PollingCancelledError):
+                client.agents.wait_until_ready("agent-uuid", poll_interval=30, cancel_event=cancel)
+        finally:
+            timer.cancel()
+        assert time.monotonic() - started < 2
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_cancel_event_is_passed_to_the_sleep_hook(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.get(JOB_PATH).mock(return_value=job("BATCH_JOB_PHASE_RUNNING"))
+        jobs = client.knowledge_bases.indexing_jobs
+        cancel = threading.Event()
+        waits: List[Optional[threading.Event]] = []
+
+        def sleep(seconds: float, cancel_event: Optional[threading.Event] = None) -> None:  # noqa: ARG001
+            waits.append(cancel_event)
+            cancel.set()
+
+        jobs._sleep = sleep  # type: ignore[method-assign]
+
+        with pytest.raises(PollingCancelledError):
+            jobs.wait_for_completion("job-uuid", cancel_event=cancel)
+
+        assert waits == [cancel]
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_async_cancellation(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        route = respx_mock.get(JOB_PATH).mock(return_value=job("BATCH_JOB_PHASE_PENDING"))
+
+        with anyio.move_on_after(0.2) as scope:
+            await async_client.knowledge_bases.indexing_jobs.wait_for_completion("job-uuid", poll_interval=30)
+
+        assert scope.cancelled_caught
+        assert route.call_count >= 1
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+from typing import Any, Dict, List, AsyncIterator
+
+import anyio
+import httpx
+import pytest
+
+from gradient import AsyncGradient, InternalServerError
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+MESSAGES: List[Any] = [{"role": "user", "content": "Hi!"}]
+
+
+def completion(model: str) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-123",
+        "choices": [{"finish_reason": "stop", "index": 0, "message": {"role": "assistant", "content": model}}],
+        "created": 1,
+        "model": model,
+        "object": "chat.completion",
+    }
+
+
+def chunk(model: str, content: str) -> bytes:
+    data = {
+        "id": "chatcmpl-123",
+        "choices": [{"delta": {"content": content}, "finish_reason": None, "index": 0}],
+        "created": 1,
+        "model": model,
+        "object": "chat.completion.chunk",
+    }
+    return b"data: " + json.dumps(data).encode() + b"\n\n"
+
+
+class Server:
+    """Answers every model after its configured delay and records what happened to each request.
+
+    The first non-streaming request to a model in `failures` fails with the given status code.
+    """
+
+    def __init__(self, delays: Dict[str, float], *, failures: Dict[str, int] | None = None) -> None:
+        self.delays = delays
+        self.failures = failures or {}
+        self.started: List[str] = []
+        self.cancelled: List[str] = []
+        self.closed: List[str] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        model = body["model"]
+        self.started.append(model)
+        if body.get("stream"):
+            return httpx.Response(200, content=self._stream(model), headers={"content-type": "text/event-stream"})
+        try:
+            await anyio.sleep(self.delays[model])
+        except anyio.get_cancelled_exc_class():
+            self.cancelled.append(model)
+            raise
+        if model in self.failures:
+            return httpx.Response(self.failures.pop(model), json={"message": "unavailable"})
+        return httpx.Response(200, json=completion(model))
+
+    async def _stream(self, model: str) -> AsyncIterator[bytes]:
+        try:
+            await anyio.sleep(self.delays[model])
+            yield chunk(model, "Hello")
+            yield chunk(model, " there")
+            yield b"data: [DONE]\n\n"
+        finally:
+            self.closed.append(model)
+
+
+class TestRace:
+    @pytest.mark.respx(base_url=base_url)
+    async def test_primary_wins_without_hedging(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        server = Server({"a": 0, "b": 0})
+        respx_mock.post("/chat/completions").mock(side_effect=server)
+
+        completion_ = await async_client.chat.completions.race(
+            messages=MESSAGES, model="a", hedge_model="b", hedge_delay=0.5
+        )
+
+        assert completion_.model == "a"
+        assert server.started == ["a"]
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_hedge_wins_and_primary_is_cancelled(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        server = Server({"a": 10, "b": 0})
+        respx_mock.post("/chat/completions").mock(side_effect=server)
+
+        started = time.monotonic()
+        completion_ = await async_client.chat.completions.race(
+            messages=MESSAGES, model="a", hedge_model="b", hedge_delay=0.05
+        )
+
+        assert completion_.model == "b"
+        assert time.monotonic() - started < 5
+        assert server.started == ["a", "b"]
+        assert server.cancelled == ["a"]
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_hedges_immediately_on_failure(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        server = Server({"a": 0, "b": 0}, failures={"a": 400})
+        respx_mock.post("/chat/completions").mock(side_effect=server)
+
+        completion_ = await async_client.chat.completions.race(messages=MESSAGES, model="a", hedge_delay=10)
+
+        assert completion_.model == "a"
+        assert server.started == ["a", "a"]
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_raises_when_both_fail(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        # the hedge fails first, but the primary request's error is raised
+        server = Server({"a": 0.05, "b": 0}, failures={"a": 500, "b": 503})
+        respx_mock.post("/chat/completions").mock(side_effect=server)
+
+        with pytest.raises(InternalServerError) as exc_info:
+            await async_client.with_options(max_retries=0).chat.completions.race(
+                messages=MESSAGES, model="a", hedge_model="b", hedge_delay=0
+            )
+
+        assert exc_info.value.status_code == 500
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_stream_loser_is_closed(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        server = Server({"a": 10, "b": 0})
+        respx_mock.post("/chat/completions").mock(side_effect=server)
+
+        stream = await async_client.chat.completions.race(
+            messages=MESSAGES, model="a", hedge_model="b", hedge_delay=0.05, stream=True
+        )
+
+        assert server.closed == ["a"]
+        contents = [c.choices[0].delta.content async for c in stream]
+        assert contents == ["Hello", " there"]
+        assert server.started == ["a", "b"]
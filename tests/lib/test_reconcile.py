@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import os
+import json
+from typing import Any, Dict
+
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient, NotFoundError
+from gradient.lib import AgentConfig
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+AGENT = "/v2/gen-ai/agents/agent-uuid"
+
+CURRENT = {
+    "uuid": "agent-uuid",
+    "instruction": "old",
+    "temperature": 0.5,
+    "tags": ["b", "a"],
+    "knowledge_bases": [{"uuid": "kb-1"}, {"uuid": "kb-3"}],
+    "functions": [
+        {"uuid": "fn-lookup", "name": "lookup", "description": "x", "faas_name": "lookup"},
+        {"uuid": "fn-stale", "name": "stale"},
+    ],
+    "deployment": {"visibility": "VISIBILITY_PRIVATE"},
+}
+
+CHILDREN = [
+    {"uuid": "child-1", "route_name": "billing", "if_case": "bills", "route_uuid": "route-1"},
+    {"uuid": "child-2", "route_name": "legacy"},
+]
+
+
+def config() -> AgentConfig:
+    return {
+        "instruction": "new",
+        "temperature": 0.5,
+        "tags": ["a", "b"],
+        "knowledge_bases": ["kb-1", "kb-2"],
+        "functions": [
+            {"function_name": "lookup", "description": "y", "faas_name": "lookup"},
+            {"function_name": "search", "faas_name": "search"},
+        ],
+        "routes": [
+            {"child_agent_uuid": "child-1", "route_name": "billing", "if_case": "invoices"},
+            {"child_agent_uuid": "child-3", "route_name": "support"},
+        ],
+        "visibility": "VISIBILITY_PRIVATE",
+    }
+
+
+def mock_state(respx_mock: Any) -> Dict[str, Any]:
+    return {
+        "retrieve": respx_mock.get(AGENT).mock(return_value=httpx.Response(200, json={"agent": CURRENT})),
+        "view": respx_mock.get(f"{AGENT}/child_agents").mock(
+            return_value=httpx.Response(200, json={"children": CHILDREN})
+        ),
+    }
+
+
+def mock_changes(respx_mock: Any) -> Dict[str, Any]:
+    ok = httpx.Response(200, json={})
+    return {
+        "update": respx_mock.put(AGENT).mock(return_value=ok),
+        "attach": respx_mock.post(f"{AGENT}/knowledge_bases/kb-2").mock(return_value=ok),
+        "detach": respx_mock.delete(f"{AGENT}/knowledge_bases/kb-3").mock(return_value=ok),
+        "update_function": respx_mock.put(f"{AGENT}/functions/fn-lookup").mock(return_value=ok),
+        "create_function": respx_mock.post(f"{AGENT}/functions").mock(return_value=ok),
+        "delete_function": respx_mock.delete(f"{AGENT}/functions/fn-stale").mock(return_value=ok),
+        "update_route": respx_mock.put(f"{AGENT}/child_agents/child-1").mock(return_value=ok),
+        "add_route": respx_mock.post(f"{AGENT}/child_agents/child-3").mock(return_value=ok),
+        "delete_route": respx_mock.delete(f"{AGENT}/child_agents/child-2").mock(return_value=ok),
+    }
+
+
+def body(route: Any) -> Dict[str, Any]:
+    return json.loads(route.calls.last.request.content)
+
+
+class TestReconcile:
+    @pytest.mark.respx(base_url=base_url)
+    def test_dry_run_plans_without_changing_anything(self, client: Gradient, respx_mock: Any) -> None:
+        state = mock_state(respx_mock)
+
+        plan = client.agents.reconcile("agent-uuid", config(), dry_run=True)
+
+        assert state["retrieve"].call_count == 1 and state["view"].call_count == 1
+        assert len(respx_mock.calls) == 2
+        assert not plan.applied
+        assert [(change.kind, change.action, change.target) for change in plan.changes] == [
+            ("agent", "update", None),
+            ("knowledge_base", "create", "kb-2"),
+            ("knowledge_base", "delete", "kb-3"),
+            ("function", "update", "lookup"),
+            ("function", "create", "search"),
+            ("function", "delete", "stale"),
+            ("route", "update", "child-1"),
+            ("route", "create", "child-3"),
+            ("route", "delete", "child-2"),
+        ]
+        # the unchanged temperature and the reordered tags are not part of the update
+        assert plan.changes[0].fields == {"instruction": ("old", "new")}
+        assert str(plan).splitlines()[1:3] == [
+            "  ~ agent: instruction 'old' -> 'new'",
+            "  + knowledge base kb-2",
+        ]
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_applies_only_the_changes(self, client: Gradient, respx_mock: Any) -> None:
+        mock_state(respx_mock)
+        changes = mock_changes(respx_mock)
+
+        plan = client.agents.reconcile("agent-uuid", config(), concurrency=3)
+
+        assert plan.applied and plan.ok
+        assert all(change.applied for change in plan.changes)
+        assert all(route.call_count == 1 for route in changes.values())
+        assert body(changes["update"]) == {"instruction": "new", "uuid": "agent-uuid"}
+        assert body(changes["update_function"])["description"] == "y"
+        assert body(changes["update_route"])["if_case"] == "invoices"
+        assert body(changes["update_route"])["uuid"] == "route-1"
+        assert body(changes["create_function"])["function_name"] == "search"
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_unchanged_config_sends_nothing(self, client: Gradient, respx_mock: Any) -> None:
+        mock_state(respx_mock)
+
+        plan = client.agents.reconcile(
+            "agent-uuid",
+            {
+                "instruction": "old",
+                "tags": ["a", "b"],
+                "knowledge_bases": ["kb-3", "kb-1"],
+                "functions": [{"function_name": "lookup", "description": "x"}],
+                "routes": [{"child_agent_uuid": "child-1", "route_name": "billing"}],
+            },
+            prune=False,
+        )
+
+        assert not plan and str(plan) == "agent agent-uuid: no changes"
+        assert len(respx_mock.calls) == 2
+
+    @pytest.mark.respx(base_url=base_url, assert_all_called=False)
+    def test_failed_changes_are_reported(self, client: Gradient, respx_mock: Any) -> None:
+        state = mock_state(respx_mock)
+        update = respx_mock.put(AGENT).mock(return_value=httpx.Response(200, json={}))
+        respx_mock.post(f"{AGENT}/knowledge_bases/kb-2").mock(return_value=httpx.Response(404, json={}))
+        detach = respx_mock.delete(path__regex=rf"^{AGENT}/knowledge_bases/kb-\d$").mock(
+            return_value=httpx.Response(200, json={})
+        )
+
+        plan = client.agents.reconcile("agent-uuid", {"knowledge_bases": ["kb-2"], "instruction": "new"})
+
+        assert not plan.ok
+        (failed,) = plan.failed
+        assert failed.target == "kb-2" and isinstance(failed.error, NotFoundError) and not failed.applied
+        assert detach.call_count == 2
+        assert update.call_count == 1
+        # routes are not part of the config, so they are neither fetched nor touched
+        assert state["view"].call_count == 0
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_async(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        state = mock_state(respx_mock)
+        changes = mock_changes(respx_mock)
+
+        plan = await async_client.agents.reconcile("agent-uuid", config())
+
+        assert plan.ok and len(plan) == 9
+        assert state["view"].call_count == 1
+        assert all(route.call_count == 1 for route in changes.values())
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+import json
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient, NotFoundError
+from gradient.lib import FanoutResult
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+
+class Index:
+    """Answers retrievals with `num_results` chunks named after the knowledge base and query."""
+
+    def __init__(self, scores: Dict[str, List[float]] | None = None, missing: tuple[str, ...] = ()) -> None:
+        self.scores = scores or {}
+        self.missing = missing
+        self.calls: List[tuple[str, Dict[str, Any]]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        knowledge_base_id = request.url.path.split("/")[1]
+        body = json.loads(request.content)
+        self.calls.append((knowledge_base_id, body))
+        if knowledge_base_id in self.missing:
+            return httpx.Response(404, json={"message": "not found"})
+
+        scores = self.scores.get(knowledge_base_id)
+        results: List[Dict[str, Any]] = []
+        for rank in range(body["num_results"]):
+            metadata: Dict[str, Any] = {"rank": rank}
+            if scores is not None:
+                metadata["score"] = scores[rank]
+            results.append({"text_content": f"{knowledge_base_id}:{body['query']}:{rank}", "metadata": metadata})
+        return httpx.Response(200, json={"results": results, "total_results": len(results)})
+
+
+class TestDocumentsBatch:
+    @pytest.mark.respx(base_url=base_url)
+    def test_dedupes_and_aligns(self, client: Gradient, respx_mock: Any) -> None:
+        index = Index(missing=("kb-missing",))
+        respx_mock.post(path__regex=r"^/[^/]+/retrieve$").mock(side_effect=index)
+        queries: List[Dict[str, Any]] = [
+            {"knowledge_base_id": "kb-1", "query": "pricing", "num_results": 2},
+            {"knowledge_base_id": "kb-1", "query": "refunds", "num_results": 1, "alpha": 0.5},
+            {"num_results": 2, "query": "pricing", "knowledge_base_id": "kb-1"},
+            {"knowledge_base_id": "kb-missing", "query": "pricing", "num_results": 1},
+            {"knowledge_base_id": "kb-1", "query": "refunds", "num_results": 1, "alpha": 0.7},
+        ]
+
+        results = client.retrieve.documents_batch(queries, concurrency=2)
+
+        assert len(index.calls) == 4
+        assert [result.index for result in results] == [0, 1, 2, 3, 4]
+        assert [result.request for result in results] == queries
+        assert results[0].response is results[2].response
+        assert results[0].response is not None
+        assert [r.text_content for r in results[0].response.results] == ["kb-1:pricing:0", "kb-1:pricing:1"]
+        assert isinstance(results[3].error, NotFoundError)
+        assert [result.ok for result in results] == [True, True, True, False, True]
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_async_dedupes_and_aligns(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        index = Index()
+        respx_mock.post(path__regex=r"^/[^/]+/retrieve$").mock(side_effect=index)
+        queries = [{"knowledge_base_id": f"kb-{i % 3}", "query": "q", "num_results": 1} for i in range(9)]
+
+        results = await async_client.retrieve.documents_batch(queries, concurrency=2)
+
+        assert len(index.calls) == 3
+        assert [r.response.results[0].text_content for r in results if r.response] == [
+            f"kb-{i % 3}:q:0" for i in range(9)
+        ]
+
+
+class TestDocumentsFanout:
+    @pytest.mark.respx(base_url=base_url)
+    def test_merges_by_score(self, client: Gradient, respx_mock: Any) -> None:
+        index = Index(scores={"kb-a": [0.9, 0.5, 0.1], "kb-b": [0.95, 0.6, 0.4]})
+        respx_mock.post(path__regex=r"^/[^/]+/retrieve$").mock(side_effect=index)
+
+        result = client.retrieve.documents_fanout(
+            ["kb-a", "kb-b", "kb-a"],
+            query="q",
+            num_results=3,
+            filters={"must": [{"field": "lang", "operator": "eq", "value": "en"}]},
+        )
+
+        assert isinstance(result, FanoutResult)
+        assert result.ok
+        assert sorted(knowledge_base_id for knowledge_base_id, _ in index.calls) == ["kb-a", "kb-b"]
+        assert all(body["filters"]["must"][0]["value"] == "en" for _, body in index.calls)
+        assert [(d.knowledge_base_id, d.rank, d.score) for d in result.documents] == [
+            ("kb-b", 0, 0.95),
+            ("kb-a", 0, 0.9),
+            ("kb-b", 1, 0.6),
+        ]
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_falls_back_to_rank_fusion_and_reports_errors(
+        self, async_client: AsyncGradient, respx_mock: Any
+    ) -> None:
+        index = Index(missing=("kb-c",))
+        respx_mock.post(path__regex=r"^/[^/]+/retrieve$").mock(side_effect=index)
+
+        result = await async_client.retrieve.documents_fanout(["kb-a", "kb-b", "kb-c"], query="q", num_results=3)
+
+        assert not result.ok
+        assert sorted(result.responses) == ["kb-a", "kb-b"]
+        assert isinstance(result.errors["kb-c"], NotFoundError)
+        assert [(d.knowledge_base_id, d.rank) for d in result.documents] == [("kb-a", 0), ("kb-b", 0), ("kb-a", 1)]
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_raises_when_every_knowledge_base_fails(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.post(path__regex=r"^/[^/]+/retrieve$").mock(side_effect=Index(missing=("kb-a", "kb-b")))
+
+        with pytest.raises(NotFoundError):
+            client.retrieve.documents_fanout(["kb-a", "kb-b"], query="q", num_results=3)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient
+from gradient.lib import RetrievalCache
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+
+class Index:
+    def __init__(self) -> None:
+        self.version = 1
+        self.calls: List[Dict[str, Any]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(json.loads(request.content))
+        text = f"{request.url.path.split('/')[1]} v{self.version}"
+        return httpx.Response(200, json={"results": [{"text_content": text, "metadata": {}}], "total_results": 1})
+
+
+def job(uuid: str, knowledge_base_uuid: str, phase: str = "BATCH_JOB_PHASE_SUCCEEDED") -> Dict[str, Any]:
+    return {"job": {"uuid": uuid, "knowledge_base_uuid": knowledge_base_uuid, "phase": phase}}
+
+
+class TestRetrievalCache:
+    @pytest.mark.respx(base_url=base_url)
+    def test_hits_with_normalized_filters(self, client: Gradient, respx_mock: Any) -> None:
+        index = Index()
+        respx_mock.post(path__regex=r"^/[^/]+/retrieve$").mock(side_effect=index)
+        cache = RetrievalCache()
+        retrieve = client.retrieve.with_cache(cache)
+
+        first = retrieve.documents(
+            "kb-1",
+            query="faq",
+            num_results=1,
+            filters={
+                "must": [
+                    {"field": "lang", "operator": "eq", "value": "en"},
+                    {"field": "tag", "operator": "in", "value": ["a", "b"]},
+                ]
+            },
+        )
+        second = retrieve.documents(
+            "kb-1",
+            query="faq",
+            num_results=1,
+            filters={
+                "must": [
+                    {"value": ["b", "a"], "operator": "in", "field": "tag"},
+                    {"field": "lang", "operator": "eq", "value": "en"},
+                ]
+            },
+        )
+        retrieve.documents("kb-1", query="faq", num_results=1, alpha=0.5)
+        retrieve.documents("kb-1", query="faq", num_results=2)
+
+        assert second is first
+        assert len(index.calls) == 3
+        assert (cache.hits, cache.misses) == (1, 3)
+        assert len(cache) == 3
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_invalidated_when_indexing_job_succeeds(self, client: Gradient, respx_mock: Any) -> None:
+        index = Index()
+        respx_mock.post(path__regex=r"^/[^/]+/retrieve$").mock(side_effect=index)
+        respx_mock.get("/v2/gen-ai/indexing_jobs/job-1").mock(
+            side_effect=[
+                httpx.Response(200, json=job("job-1", "kb-1", "BATCH_JOB_PHASE_RUNNING")),
+                httpx.Response(200, json=job("job-1", "kb-1")),
+                httpx.Response(200, json=job("job-1", "kb-1")),
+            ]
+        )
+        cache = RetrievalCache(ttl=None)
+        retrieve = client.retrieve.with_cache(cache)
+        retrieve.documents("kb-1", query="faq", num_results=1)
+        retrieve.documents("kb-2", query="faq", num_results=1)
+
+        client.knowledge_bases.indexing_jobs.retrieve("job-1")
+        assert len(cache) == 2
+
+        index.version = 2
+        client.knowledge_bases.indexing_jobs.wait_for_completion("job-1", poll_interval=0)
+
+        assert retrieve.documents("kb-1", query="faq", num_results=1).results[0].text_content == "kb-1 v2"
+        assert retrieve.documents("kb-2", query="faq", num_results=1).results[0].text_content == "kb-2 v1"
+
+        # polling the same job again does not invalidate the fresh entries
+        client.knowledge_bases.indexing_jobs.retrieve("job-1")
+        retrieve.documents("kb-1", query="faq", num_results=1)
+        assert len(index.calls) == 3
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_lru_and_ttl(self, client: Gradient, respx_mock: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+        index = Index()
+        respx_mock.post(path__regex=r"^/[^/]+/retrieve$").mock(side_effect=index)
+        cache = RetrievalCache(max_entries=2, ttl=10)
+        retrieve = client.retrieve.with_cache(cache)
+
+        for query in ["a", "b", "a", "c", "a"]:
+            retrieve.documents("kb-1", query=query, num_results=1)
+        assert [call["query"] for call in index.calls] == ["a", "b", "c"]
+
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+        retrieve.documents("kb-1", query="a", num_results=1)
+        assert len(index.calls) == 4
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_async(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        index = Index()
+        respx_mock.post(path__regex=r"^/[^/]+/retrieve$").mock(side_effect=index)
+        respx_mock.get("/v2/gen-ai/indexing_jobs/job-2").mock(
+            return_value=httpx.Response(200, json=job("job-2", "kb-1"))
+        )
+        cache = RetrievalCache()
+        retrieve = async_client.retrieve.with_cache(cache)
+
+        await retrieve.documents("kb-1", query="faq", num_results=1)
+        await retrieve.documents("kb-1", query="faq", num_results=1)
+        assert len(index.calls) == 1
+
+        await async_client.knowledge_bases.indexing_jobs.wait_for_completion("job-2", poll_interval=0)
+        await retrieve.documents("kb-1", query="faq", num_results=1)
+        assert len(index.calls) == 2
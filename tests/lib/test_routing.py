@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+import json
+from typing import Any, List
+
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient, BadRequestError, InternalServerError
+from gradient.lib import ModelRouter
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+MESSAGES: List[Any] = [{"role": "user", "content": "Hi!"}]
+
+
+def completion(model: str) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            "id": "chatcmpl-123",
+            "choices": [{"finish_reason": "stop", "index": 0, "message": {"role": "assistant", "content": "Hello"}}],
+            "created": 1,
+            "model": model,
+            "object": "chat.completion",
+        },
+    )
+
+
+def respond(status_codes: dict[str, int], models: List[str]) -> Any:
+    def handler(request: httpx.Request) -> httpx.Response:
+        model = json.loads(request.content)["model"]
+        models.append(model)
+        status_code = status_codes.get(model, 200)
+        if status_code != 200:
+            return httpx.Response(status_code, json={"message": "unavailable"})
+        return completion(model)
+
+    return handler
+
+
+class TestModelRouter:
+    def test_orders_by_latency_and_health(self) -> None:
+        router = ModelRouter(["a", "b", "c"], alpha=0.5, max_error_rate=0.5, cooldown=60)
+        assert router.candidates() == ["a", "b", "c"]
+
+        router.record_success("a", 0.3)
+        router.record_success("b", 0.1)
+        assert router.candidates() == ["c", "b", "a"]
+
+        router.record_success("c", 0.2)
+        router.record_failure("b")
+        assert router.candidates() == ["c", "a", "b"]
+
+        router.record_success("a", 0.1)
+        stats = {s.model: s for s in router.stats()}
+        assert stats["a"].latency == pytest.approx(0.2)  # type: ignore[misc]
+        assert stats["b"].error_rate == 0.5
+        assert not stats["b"].healthy
+        assert stats["b"].to_dict() == {
+            "model": "b",
+            "latency": 0.1,
+            "error_rate": 0.5,
+            "requests": 2,
+            "failures": 1,
+            "healthy": False,
+        }
+
+    def test_unhealthy_models_recover_after_cooldown(self) -> None:
+        router = ModelRouter(["a", "b"], alpha=1, cooldown=0)
+        router.record_success("a", 0.1)
+        router.record_success("b", 0.2)
+        router.record_failure("a")
+
+        assert router.candidates() == ["a", "b"]
+
+
+class TestRoutedCompletions:
+    @pytest.mark.respx(base_url=base_url)
+    def test_falls_back_without_retrying(self, client: Gradient, respx_mock: Any) -> None:
+        models: List[str] = []
+        respx_mock.post("/chat/completions").mock(side_effect=respond({"a": 503}, models))
+        router = ModelRouter(["a", "b"])
+
+        completion_ = client.chat.completions.with_router(router).create(messages=MESSAGES)
+
+        assert completion_.model == "b"
+        assert models == ["a", "b"]
+        stats = {s.model: s for s in router.stats()}
+        assert stats["a"].failures == 1
+        assert stats["b"].latency is not None
+        assert [s.model for s in router.stats()] == ["b", "a"]
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_client_errors_are_raised(self, client: Gradient, respx_mock: Any) -> None:
+        models: List[str] = []
+        respx_mock.post("/chat/completions").mock(side_effect=respond({"a": 400}, models))
+        router = ModelRouter(["a", "b"])
+
+        with pytest.raises(BadRequestError):
+            client.chat.completions.with_router(router).create(messages=MESSAGES)
+
+        assert models == ["a"]
+        assert router.stats()[0].failures == 0
+
+    def test_rejects_model(self, client: Gradient) -> None:
+        with pytest.raises(TypeError, match="router"):
+            client.chat.completions.with_router(ModelRouter(["a"])).create(messages=MESSAGES, model="a")
+
+
+class TestAsyncRoutedCompletions:
+    @pytest.mark.respx(base_url=base_url)
+    async def test_last_candidate_uses_client_retries(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        models: List[str] = []
+        respx_mock.post("/chat/completions").mock(side_effect=respond({"a": 500, "b": 500}, models))
+        router = ModelRouter(["a", "b"])
+        completions = async_client.with_options(max_retries=1).chat.completions.with_router(router)
+
+        with pytest.raises(InternalServerError):
+            await completions.create(messages=MESSAGES)
+
+        assert models == ["a", "b", "b"]
+        assert [s.failures for s in router.stats()] == [1, 1]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from typing import List, Tuple, AsyncIterator
+
+import anyio
+import httpx
+import pytest
+
+from gradient import APIError, AsyncGradient
+from gradient.lib import merge_streams
+from gradient._streaming import AsyncStream
+
+
+def make_stream(
+    async_client: AsyncGradient, *values: int, delay: float = 0.0, error: bool = False
+) -> AsyncStream[object]:
+    async def body() -> AsyncIterator[bytes]:
+        for value in values:
+            await anyio.sleep(delay)
+            yield f'data: {{"value":{value}}}\n\n'.encode()
+        if error:
+            yield b'data: {"error":{"message":"boom"}}\n\n'
+        yield b"data: [DONE]\n\n"
+
+    return AsyncStream(
+        cast_to=object,
+        client=async_client,
+        response=httpx.Response(
+            200, content=body(), request=httpx.Request("POST", "http://127.0.0.1:4010/chat/completions")
+        ),
+    )
+
+
+async def test_merges_chunks_tagged_with_source(async_client: AsyncGradient) -> None:
+    a = make_stream(async_client, 1, 2, 3)
+    b = make_stream(async_client, 10, 20)
+
+    received: List[Tuple[str, object]] = []
+    async with merge_streams({"a": a, "b": b}) as merged:
+        async for item in merged:
+            received.append((item.source, item.chunk))
+
+    assert [v for s, v in received if s == "a"] == [{"value": 1}, {"value": 2}, {"value": 3}]
+    assert [v for s, v in received if s == "b"] == [{"value": 10}, {"value": 20}]
+    assert sorted(merged.completed) == ["a", "b"]
+    assert a.response.is_closed
+    assert b.response.is_closed
+
+
+async def test_sequence_sources_are_indexed(async_client: AsyncGradient) -> None:
+    async with merge_streams([make_stream(async_client, 1), make_stream(async_client, 2)]) as merged:
+        sources = {item.source async for item in merged}
+
+    assert sources == {0, 1}
+
+
+async def test_cancel_others(async_client: AsyncGradient) -> None:
+    fast = make_stream(async_client, 1)
+    slow = make_stream(async_client, 1, 2, 3, 4, delay=0.05)
+
+    async with merge_streams({"fast": fast, "slow": slow}) as merged:
+        async for item in merged:
+            if item.source == "fast":
+                merged.cancel_others("fast")
+
+    assert merged.completed == ["fast"]
+    assert merged.cancelled == ["slow"]
+    assert slow.response.is_closed
+
+
+async def test_stop_after_first(async_client: AsyncGradient) -> None:
+    fast = make_stream(async_client, 1, 2)
+    slow = make_stream(async_client, 1, 2, 3, 4, delay=0.05)
+
+    async with merge_streams({"fast": fast, "slow": slow}, stop_after_first=True) as merged:
+        sources = [item.source async for item in merged]
+
+    assert sources.count("fast") == 2
+    assert merged.cancelled == ["slow"]
+    assert slow.response.is_closed
+
+
+async def test_break_closes_all_responses(async_client: AsyncGradient) -> None:
+    streams = [make_stream(async_client, 1, 2, 3, delay=0.01) for _ in range(3)]
+
+    async with merge_streams(streams) as merged:
+        async for _ in merged:
+            break
+
+    assert all(stream.response.is_closed for stream in streams)
+
+
+async def test_source_error_is_raised(async_client: AsyncGradient) -> None:
+    good = make_stream(async_client, 1, 2, 3, delay=0.05)
+    bad = make_stream(async_client, error=True)
+
+    with pytest.raises(APIError, match="boom"):
+        async with merge_streams({"good": good, "bad": bad}) as merged:
+            async for _ in merged:
+                pass
+
+    assert good.response.is_closed
+    assert bad.response.is_closed
+
+
+async def test_iterating_without_context_manager_raises(async_client: AsyncGradient) -> None:
+    merged = merge_streams([make_stream(async_client, 1)])
+
+    with pytest.raises(RuntimeError, match="async with"):
+        async for _ in merged:
+            pass
+
+    await merged.aclose()
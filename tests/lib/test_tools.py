@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, List
+
+import anyio
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+TOOLS: List[Any] = [
+    {"type": "function", "function": {"name": "weather", "parameters": {"type": "object"}}},
+    {"type": "function", "function": {"name": "time", "parameters": {"type": "object"}}},
+]
+
+
+def tool_call(id: str, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": id, "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+
+
+def completion(message: Dict[str, Any], finish_reason: str) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            "id": "chatcmpl-123",
+            "choices": [{"finish_reason": finish_reason, "index": 0, "message": {"role": "assistant", **message}}],
+            "created": 1,
+            "model": "llama3-8b-instruct",
+            "object": "chat.completion",
+        },
+    )
+
+
+TOOL_CALLS = completion(
+    {
+        "content": None,
+        "tool_calls": [
+            tool_call("call_1", "weather", {"city": "Paris"}),
+            tool_call("call_2", "time", {"city": "Paris"}),
+            tool_call("call_3", "missing", {}),
+        ],
+    },
+    "tool_calls",
+)
+ANSWER = completion({"content": "Sunny, 12:00"}, "stop")
+
+
+def sunny(**_: Any) -> str:
+    return "sunny"
+
+
+def noon(**_: Any) -> str:
+    return "12:00"
+
+
+def tool_messages(route: Any, call: int) -> Dict[str, str]:
+    messages = json.loads(route.calls[call].request.content)["messages"]
+    return {message["tool_call_id"]: message["content"] for message in messages if message["role"] == "tool"}
+
+
+class TestRunTools:
+    @pytest.mark.respx(base_url=base_url)
+    def test_runs_tools_concurrently(self, client: Gradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/chat/completions").mock(side_effect=[TOOL_CALLS, ANSWER])
+        barrier = threading.Barrier(2, timeout=5)
+
+        def weather(city: str) -> Dict[str, Any]:
+            barrier.wait()
+            return {"city": city, "sky": "sunny"}
+
+        async def time_(**_: Any) -> str:
+            barrier.wait()
+            return "12:00"
+
+        result = client.chat.completions.run_tools(
+            messages=[{"role": "user", "content": "Weather and time in Paris?"}],
+            model="llama3-8b-instruct",
+            tools=TOOLS,
+            functions={"weather": weather, "time": time_},
+        )
+
+        assert result.completion.choices[0].message.content == "Sunny, 12:00"
+        assert tool_messages(route, 1) == {
+            "call_1": '{"city": "Paris", "sky": "sunny"}',
+            "call_2": "12:00",
+            "call_3": "Error: Unknown tool 'missing'",
+        }
+        assert json.loads(route.calls[1].request.content)["tools"] == TOOLS
+        assert [m["role"] for m in result.messages] == ["user", "assistant", "tool", "tool", "tool", "assistant"]
+        assert len(result.steps) == 2
+        assert [r.ok for r in result.steps[0].tool_calls] == [True, True, False]
+        assert result.steps[1].tool_calls == []
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_tool_timeout_and_max_steps(self, client: Gradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/chat/completions").mock(return_value=TOOL_CALLS)
+
+        def weather(**_: Any) -> str:
+            time.sleep(1)
+            return "sunny"
+
+        result = client.chat.completions.run_tools(
+            messages=[{"role": "user", "content": "Weather?"}],
+            model="llama3-8b-instruct",
+            functions={"weather": weather, "time": noon},
+            tool_timeout={"weather": 0.05},
+            max_steps=1,
+        )
+
+        assert route.call_count == 1
+        assert result.completion.choices[0].finish_reason == "tool_calls"
+        weather_result = result.steps[0].tool_calls[0]
+        assert weather_result.content == "Error: tool 'weather' did not finish within 0.05 seconds"
+        assert weather_result.latency < 0.5
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_latency_is_measured_per_tool(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.post("/chat/completions").mock(side_effect=[TOOL_CALLS, ANSWER])
+
+        def weather(**_: Any) -> str:
+            time.sleep(0.5)
+            return "sunny"
+
+        result = client.chat.completions.run_tools(
+            messages=[{"role": "user", "content": "Weather?"}],
+            model="llama3-8b-instruct",
+            functions={"weather": weather, "time": noon},
+        )
+
+        # `time` is collected after the slow `weather`, but finished long before it
+        weather_result, time_result, _ = result.steps[0].tool_calls
+        assert weather_result.latency >= 0.5
+        assert time_result.latency < 0.25
+
+    def test_rejects_streaming(self, client: Gradient) -> None:
+        with pytest.raises(TypeError, match="streaming"):
+            client.chat.completions.run_tools(
+                messages=[], model="llama3-8b-instruct", functions={"f": print}, stream=True
+            )
+
+    def test_rejects_max_concurrency_below_one(self, client: Gradient) -> None:
+        with pytest.raises(ValueError, match="max_concurrency"):
+            client.chat.completions.run_tools(
+                messages=[], model="llama3-8b-instruct", functions={"f": print}, max_concurrency=0
+            )
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_agents(self, client: Gradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/chat/completions?agent=true").mock(side_effect=[TOOL_CALLS, ANSWER])
+
+        result = client.agents.chat.completions.run_tools(
+            messages=[{"role": "user", "content": "Weather?"}],
+            model="llama3-8b-instruct",
+            functions={"weather": sunny, "time": noon},
+        )
+
+        assert result.completion.choices[0].message.content == "Sunny, 12:00"
+        assert tool_messages(route, 1)["call_1"] == "sunny"
+        assert route.calls[0].request.headers["Authorization"] == "Bearer My Agent Access Key"
+
+
+class TestAsyncRunTools:
+    @pytest.mark.respx(base_url=base_url)
+    async def test_runs_tools_concurrently(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        route = respx_mock.post("/chat/completions").mock(side_effect=[TOOL_CALLS, ANSWER])
+        both_started = anyio.Event()
+        started: List[str] = []
+
+        async def weather(**_: Any) -> str:
+            started.append("weather")
+            if len(started) == 2:
+                both_started.set()
+            await both_started.wait()
+            return "sunny"
+
+        async def time_(**_: Any) -> str:
+            started.append("time")
+            if len(started) == 2:
+                both_started.set()
+            await both_started.wait()
+            return "12:00"
+
+        result = await async_client.chat.completions.run_tools(
+            messages=[{"role": "user", "content": "Weather and time?"}],
+            model="llama3-8b-instruct",
+            functions={"weather": weather, "time": time_},
+            tool_timeout=5,
+        )
+
+        assert result.completion.choices[0].message.content == "Sunny, 12:00"
+        assert tool_messages(route, 1) == {
+            "call_1": "sunny",
+            "call_2": "12:00",
+            "call_3": "Error: Unknown tool 'missing'",
+        }
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_tool_timeout(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        respx_mock.post("/chat/completions?agent=true").mock(side_effect=[TOOL_CALLS, ANSWER])
+
+        async def weather(**_: Any) -> str:
+            await anyio.sleep(5)
+            return "sunny"
+
+        def fails(**_: Any) -> str:
+            raise RuntimeError("no clock")
+
+        result = await async_client.agents.chat.completions.run_tools(
+            messages=[{"role": "user", "content": "Weather?"}],
+            model="llama3-8b-instruct",
+            functions={"weather": weather, "time": fails},
+            tool_timeout=0.05,
+        )
+
+        weather_result, time_result, _ = result.steps[0].tool_calls
+        assert weather_result.content == "Error: tool 'weather' did not finish within 0.05 seconds"
+        assert isinstance(weather_result.error, TimeoutError)
+        assert time_result.content == "Error: no clock"
+        assert result.steps[0].tools_latency < 1
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_timeout_does_not_include_waiting_for_a_slot(
+        self, async_client: AsyncGradient, respx_mock: Any
+    ) -> None:
+        respx_mock.post("/chat/completions?agent=true").mock(side_effect=[TOOL_CALLS, ANSWER])
+
+        async def weather(**_: Any) -> str:
+            await anyio.sleep(0.3)
+            return "sunny"
+
+        async def time_(**_: Any) -> str:
+            await anyio.sleep(0.3)
+            return "12:00"
+
+        result = await async_client.agents.chat.completions.run_tools(
+            messages=[{"role": "user", "content": "Weather?"}],
+            model="llama3-8b-instruct",
+            functions={"weather": weather, "time": time_},
+            tool_timeout=0.5,
+            max_concurrency=1,
+        )
+
+        weather_result, time_result, _ = result.steps[0].tool_calls
+        assert weather_result.ok and time_result.ok
+        assert weather_result.latency < 0.5 and time_result.latency < 0.5
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import os
+import json
+from typing import Any, Dict, List
+from pathlib import Path
+
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient
+from gradient.lib import FileUploadReport
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+PRESIGN_PATH = "/v2/gen-ai/knowledge_bases/data_sources/file_upload_presigned_urls"
+DATA_SOURCES_PATH = "/v2/gen-ai/knowledge_bases/kb-uuid/data_sources"
+
+
+@pytest.fixture
+def files(tmp_path: Path) -> List[Path]:
+    paths: List[Path] = []
+    for index in range(5):
+        path = tmp_path / f"doc-{index}.txt"
+        path.write_bytes(os.urandom(1000 + index))
+        paths.append(path)
+    return paths
+
+
+def presign(request: httpx.Request) -> httpx.Response:
+    files = json.loads(request.content)["files"]
+    uploads = [
+        {
+            "original_file_name": file["file_name"],
+            "object_key": f"objects/{file['file_name']}",
+            "presigned_url": f"{base_url}/uploads/{file['file_name']}?signature=abc",
+        }
+        for file in files
+    ]
+    return httpx.Response(200, json={"request_id": "req", "uploads": uploads})
+
+
+class Bucket:
+    def __init__(self, failures: Dict[str, List[int]] | None = None) -> None:
+        self.objects: Dict[str, bytes] = {}
+        self.failures = failures or {}
+        self.headers: List[httpx.Headers] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        name = request.url.path.rsplit("/", 1)[-1]
+        self.headers.append(request.headers)
+        failures = self.failures.get(name)
+        if failures:
+            return httpx.Response(failures.pop(0))
+        self.objects[name] = request.read()
+        return httpx.Response(200)
+
+
+def created_data_sources(route: Any) -> List[Dict[str, Any]]:
+    return [json.loads(call.request.content)["file_upload_data_source"] for call in route.calls]
+
+
+class TestUploadFiles:
+    @pytest.mark.respx(base_url=base_url)
+    def test_uploads_and_creates_data_sources(self, client: Gradient, respx_mock: Any, files: List[Path]) -> None:
+        presign_route = respx_mock.post(PRESIGN_PATH).mock(side_effect=presign)
+        bucket = Bucket(failures={"doc-1.txt": [503, 500]})
+        respx_mock.put(path__startswith="/uploads/").mock(side_effect=bucket)
+        create_route = respx_mock.post(DATA_SOURCES_PATH).mock(
+            return_value=httpx.Response(200, json={"knowledge_base_data_source": {}})
+        )
+        progress: List[int] = []
+
+        report = client.knowledge_bases.data_sources.upload_files(
+            "kb-uuid",
+            files,
+            concurrency=2,
+            presign_batch_size=2,
+            chunk_size=256,
+            on_progress=lambda r: progress.append(len(r.results)),
+        )
+
+        assert presign_route.call_count == 3
+        assert len(report.succeeded) == 5
+        assert report.bytes_uploaded == sum(path.stat().st_size for path in files)
+        assert report.throughput > 0
+        assert progress == [1, 2, 3, 4, 5]
+        assert bucket.objects == {path.name: path.read_bytes() for path in files}
+        assert {r.path.name: r.attempts for r in report.results}["doc-1.txt"] == 3
+        assert all("authorization" not in headers for headers in bucket.headers)
+        assert all("transfer-encoding" not in headers for headers in bucket.headers)
+        assert sorted(created_data_sources(create_route), key=lambda d: d["original_file_name"]) == [
+            {
+                "original_file_name": path.name,
+                "size_in_bytes": str(path.stat().st_size),
+                "stored_object_key": f"objects/{path.name}",
+            }
+            for path in files
+        ]
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_failed_files_are_reported(self, client: Gradient, respx_mock: Any, files: List[Path]) -> None:
+        respx_mock.post(PRESIGN_PATH).mock(side_effect=presign)
+        bucket = Bucket(failures={"doc-0.txt": [403], "doc-2.txt": [503, 503, 503]})
+        respx_mock.put(path__startswith="/uploads/").mock(side_effect=bucket)
+
+        report = client.knowledge_bases.data_sources.upload_files(
+            "kb-uuid", files, max_retries=2, create_data_sources=False
+        )
+
+        failed = {r.path.name: r for r in report.failed}
+        assert sorted(failed) == ["doc-0.txt", "doc-2.txt"]
+        assert failed["doc-0.txt"].attempts == 1
+        assert failed["doc-2.txt"].attempts == 3
+        assert not failed["doc-2.txt"].uploaded
+        assert len(report.succeeded) == 3
+        assert all(r.data_source is None for r in report.results)
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_files_that_cannot_be_presigned_are_reported(
+        self, client: Gradient, respx_mock: Any, files: List[Path]
+    ) -> None:
+        def flaky_presign(request: httpx.Request) -> httpx.Response:
+            if "doc-0.txt" in request.content.decode():
+                return httpx.Response(400, json={})
+            return presign(request)
+
+        respx_mock.post(PRESIGN_PATH).mock(side_effect=flaky_presign)
+        bucket = Bucket()
+        respx_mock.put(path__startswith="/uploads/").mock(side_effect=bucket)
+        missing = files[0].parent / "missing.txt"
+        progress: List[int] = []
+
+        report = client.knowledge_bases.data_sources.upload_files(
+            "kb-uuid",
+            [missing, *files],
+            presign_batch_size=2,
+            create_data_sources=False,
+            on_progress=lambda r: progress.append(len(r.results)),
+        )
+
+        failed = {r.path.name: r.error for r in report.failed}
+        assert sorted(failed) == ["doc-0.txt", "doc-1.txt", "missing.txt"]
+        assert isinstance(failed["missing.txt"], FileNotFoundError)
+        assert failed["doc-0.txt"] is failed["doc-1.txt"]
+        assert sorted(bucket.objects) == ["doc-2.txt", "doc-3.txt", "doc-4.txt"]
+        assert progress == [1, 2, 3, 4, 5, 6]
+
+
+class TestAsyncUploadFiles:
+    @pytest.mark.respx(base_url=base_url)
+    async def test_uploads_and_creates_data_sources(
+        self, async_client: AsyncGradient, respx_mock: Any, files: List[Path]
+    ) -> None:
+        respx_mock.post(PRESIGN_PATH).mock(side_effect=presign)
+        bucket = Bucket(failures={"doc-3.txt": [502]})
+        respx_mock.put(path__startswith="/uploads/").mock(side_effect=bucket)
+        create_route = respx_mock.post(DATA_SOURCES_PATH).mock(
+            return_value=httpx.Response(200, json={"knowledge_base_data_source": {}})
+        )
+
+        report = await async_client.knowledge_bases.data_sources.upload_files(
+            "kb-uuid", files, concurrency=3, presign_batch_size=4, chunk_size=100
+        )
+
+        assert isinstance(report, FileUploadReport)
+        assert len(report.succeeded) == 5
+        assert bucket.objects == {path.name: path.read_bytes() for path in files}
+        assert create_route.call_count == 5
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_files_that_cannot_be_presigned_are_reported(
+        self, async_client: AsyncGradient, respx_mock: Any, files: List[Path]
+    ) -> None:
+        respx_mock.post(PRESIGN_PATH).mock(return_value=httpx.Response(400, json={}))
+
+        report = await async_client.knowledge_bases.data_sources.upload_files(
+            "kb-uuid", files, presign_batch_size=2, create_data_sources=False
+        )
+
+        assert len(report.failed) == 5 and report.succeeded == []
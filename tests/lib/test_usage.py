@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List
+from datetime import date, datetime, timezone
+
+import httpx
+import pytest
+
+from gradient import Gradient, AsyncGradient, NotFoundError
+from gradient.lib import daily_windows
+
+base_url = os.environ.get("TEST_API_BASE_URL", "http://127.0.0.1:4010")
+
+USAGE_PATH = r"^/v2/gen-ai/agents/(?P<uuid>[^/]+)/usage$"
+
+
+def respond(request: httpx.Request, uuid: str) -> httpx.Response:
+    if uuid == "missing":
+        return httpx.Response(404, json={})
+    day = int(request.url.params["start"][8:10])
+    scale = 10 if uuid == "agent-a" else 100
+    measurements: List[Dict[str, Any]] = [
+        {"usage_type": "input", "tokens": scale * day},
+        {"usage_type": "output", "tokens": scale},
+    ]
+    return httpx.Response(
+        200,
+        json={
+            "usage": {"measurements": measurements},
+            "log_insights_usage": {"measurements": [{"usage_type": "insights", "tokens": 1}]},
+        },
+    )
+
+
+class TestAggregateUsage:
+    def test_daily_windows(self) -> None:
+        windows = daily_windows(date(2025, 1, 30), date(2025, 2, 2))
+
+        assert [start.day for start, _ in windows] == [30, 31, 1]
+        assert windows[-1][1] == datetime(2025, 2, 2, tzinfo=timezone.utc)
+        assert daily_windows(date(2025, 1, 1), date(2025, 1, 1)) == []
+        with pytest.raises(ValueError, match="on or after"):
+            daily_windows(date(2025, 1, 2), date(2025, 1, 1))
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_columns_and_totals(self, client: Gradient, respx_mock: Any) -> None:
+        route = respx_mock.get(path__regex=USAGE_PATH).mock(side_effect=respond)
+        windows = daily_windows(date(2025, 1, 1), date(2025, 1, 4))
+
+        usage = client.agents.aggregate_usage(["agent-a", "agent-b"], windows, concurrency=3)
+
+        assert route.call_count == 6
+        # the windows are requested concurrently, so only the set of requests is fixed
+        assert {call.request.url.params["stop"] for call in route.calls} == {
+            "2025-01-02T00:00:00+00:00",
+            "2025-01-03T00:00:00+00:00",
+            "2025-01-04T00:00:00+00:00",
+        }
+        assert usage.ok
+        assert len(usage) == 18
+        assert usage.tokens.typecode == "q" and usage.agent.typecode == "I"
+        assert sorted(usage.usage_types) == ["input", "insights", "output"]
+        assert usage.total() == (10 + 100) * (1 + 2 + 3) + (10 + 100) * 3 + 6
+
+        assert usage.totals("agent") == {("agent-a",): 60 + 30 + 3, ("agent-b",): 600 + 300 + 3}
+        by_type = usage.totals("usage_type", "source")
+        assert by_type[("input", "usage")] == 660
+        assert by_type[("insights", "log_insights")] == 6
+        by_day = usage.totals("window", "usage_type")
+        assert by_day[(usage.windows[2], "input")] == 330
+        assert usage.totals() == {(): usage.total()}
+
+        with pytest.raises(ValueError, match="Expected a column"):
+            usage.totals("tokens")  # type: ignore[arg-type]
+
+    @pytest.mark.respx(base_url=base_url)
+    def test_failed_calls_are_recorded(self, client: Gradient, respx_mock: Any) -> None:
+        respx_mock.get(path__regex=USAGE_PATH).mock(side_effect=respond)
+
+        usage = client.with_options(max_retries=0).agents.aggregate_usage(
+            ["agent-a", "missing"], [("2025-01-05", "2025-01-06")]
+        )
+
+        assert not usage.ok
+        ((uuid, window, error),) = usage.failed
+        assert (uuid, window) == ("missing", ("2025-01-05", "2025-01-06"))
+        assert isinstance(error, NotFoundError)
+        assert usage.totals("agent") == {("agent-a",): 50 + 10 + 1}
+
+    def test_to_numpy_requires_numpy(self, client: Gradient) -> None:
+        usage = client.agents.aggregate_usage([], [])
+        try:
+            import numpy  # noqa: F401  # pyright: ignore[reportMissingImports, reportUnusedImport]
+        except ImportError:
+            with pytest.raises(RuntimeError, match="numpy"):
+                usage.to_numpy()
+        else:
+            assert sorted(usage.to_numpy()) == ["agent", "source", "tokens", "usage_type", "window"]
+
+    @pytest.mark.respx(base_url=base_url)
+    async def test_async(self, async_client: AsyncGradient, respx_mock: Any) -> None:
+        respx_mock.get(path__regex=USAGE_PATH).mock(side_effect=respond)
+
+        usage = await async_client.agents.aggregate_usage(
+            ["agent-a", "agent-b"], [(date(2025, 1, 2), date(2025, 1, 3))], concurrency=2
+        )
+
+        assert usage.windows == [("2025-01-02", "2025-01-03")]
+        assert usage.totals("agent", "usage_type")[("agent-b", "input")] == 200
@@ -1,10 +1,11 @@
 from pathlib import Path
 
 import anyio
+import httpx
 import pytest
-from dirty_equals import IsDict, IsList, IsBytes, IsTuple
+from dirty_equals import IsDict, IsList, IsTuple, IsInstance
 
-from gradient._files import to_httpx_files, async_to_httpx_files
+from gradient._files import LazyFile, to_httpx_files, async_to_httpx_files
 
 readme_path = Path(__file__).parent.parent.joinpath("README.md")
 
@@ -12,34 +13,34 @@ readme_path = Path(__file__).parent.parent.joinpath("README.md")
 def test_pathlib_includes_file_name() -> None:
     result = to_httpx_files({"file": readme_path})
     print(result)  # noqa: T201
-    assert result == IsDict({"file": IsTuple("README.md", IsBytes())})
+    assert result == IsDict({"file": IsTuple("README.md", IsInstance(LazyFile))})
 
 
 def test_tuple_input() -> None:
     result = to_httpx_files([("file", readme_path)])
     print(result)  # noqa: T201
-    assert result == IsList(IsTuple("file", IsTuple("README.md", IsBytes())))
+    assert result == IsList(IsTuple("file", IsTuple("README.md", IsInstance(LazyFile))))
 
 
 @pytest.mark.asyncio
 async def test_async_pathlib_includes_file_name() -> None:
     result = await async_to_httpx_files({"file": readme_path})
     print(result)  # noqa: T201
-    assert result == IsDict({"file": IsTuple("README.md", IsBytes())})
+    assert result == IsDict({"file": IsTuple("README.md", IsInstance(LazyFile))})
 
 
 @pytest.mark.asyncio
 async def test_async_supports_anyio_path() -> None:
     result = await async_to_httpx_files({"file": anyio.Path(readme_path)})
     print(result)  # noqa: T201
-    assert result == IsDict({"file": IsTuple("README.md", IsBytes())})
+    assert result == IsDict({"file": IsTuple("README.md", IsInstance(LazyFile))})
 
 
 @pytest.mark.asyncio
 async def test_async_tuple_input() -> None:
     result = await async_to_httpx_files([("file", readme_path)])
     print(result)  # noqa: T201
-    assert result == IsList(IsTuple("file", IsTuple("README.md", IsBytes())))
+    assert result == IsList(IsTuple("file", IsTuple("README.md", IsInstance(LazyFile))))
 
 
 def test_string_not_allowed() -> None:
@@ -49,3 +50,34 @@ def test_string_not_allowed() -> None:
                 "file": "foo",  # type: ignore
             }
         )
+
+
+def test_path_is_streamed_lazily_and_rewindable(tmp_path: Path) -> None:
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"0123456789" * 1000)
+    result = to_httpx_files({"file": path})
+    file = result["file"][1]  # type: ignore[index]
+    assert isinstance(file, LazyFile)
+    assert file._file is None
+
+    assert file.read(5) == b"01234"
+    assert file.seek(0, 2) == 10000
+    file.seek(0)
+    assert file.read() == path.read_bytes()
+    # reaching the end closes the underlying file; rewinding reopens it
+    assert file._file is None
+    file.seek(9995)
+    assert file.read() == b"56789"
+    file.close()
+
+
+def test_multipart_request_is_not_buffered(tmp_path: Path) -> None:
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"x" * 200_000)
+    # httpx reads a `LazyFile` like any other file object, but its types only allow `IO[bytes]`
+    request = httpx.Request("POST", "https://example.com", files=to_httpx_files({"file": path}))  # type: ignore[arg-type]
+
+    assert int(request.headers["content-length"]) > 200_000
+    for _attempt in range(2):
+        body = b"".join(request.stream)  # type: ignore[arg-type]
+        assert body.count(b"x") == 200_000
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import time
+from typing import List
+
+import anyio
+import httpx
+import pytest
+
+from gradient import AsyncStream, HedgePolicy, AsyncGradient
+
+base_url = "http://127.0.0.1:4010"
+
+AGENT_PATH = "/v2/gen-ai/agents/00000000-0000-4000-8000-000000000000"
+OTHER_AGENT_PATH = "/v2/gen-ai/agents/11111111-1111-4111-8111-111111111111"
+
+
+class Server:
+    """Answers immediately unless the request's number is in `slow`."""
+
+    def __init__(self, slow: List[int]) -> None:
+        self.slow = slow
+        self.requests = 0
+        self.cancelled: List[int] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:  # noqa: ARG002
+        number = self.requests
+        self.requests += 1
+        if number in self.slow:
+            try:
+                await anyio.sleep(10)
+            except anyio.get_cancelled_exc_class():
+                self.cancelled.append(number)
+                raise
+        return httpx.Response(200, json={"request": number})
+
+
+def make_client(server: Server, policy: HedgePolicy) -> AsyncGradient:
+    return AsyncGradient(
+        base_url=base_url,
+        access_token="My Access Token",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(server)),
+        hedge_policy=policy,
+    )
+
+
+async def warm_up(client: AsyncGradient, count: int) -> None:
+    for _ in range(count):
+        await client.get(AGENT_PATH, cast_to=httpx.Response)
+
+
+class TestHedgePolicy:
+    def test_hedgeable_requests(self) -> None:
+        policy = HedgePolicy()
+
+        assert policy.is_hedgeable(httpx.Request("GET", base_url + AGENT_PATH))
+        assert policy.is_hedgeable(httpx.Request("POST", "https://kbaas.do-ai.run/v1/kb-id/retrieve"))
+        assert not policy.is_hedgeable(httpx.Request("POST", base_url + AGENT_PATH))
+        assert not policy.is_hedgeable(httpx.Request("DELETE", base_url + AGENT_PATH))
+
+    def test_delay_is_percentile_per_endpoint(self) -> None:
+        policy = HedgePolicy(percentile=0.9, min_samples=10)
+        request = httpx.Request("GET", base_url + AGENT_PATH)
+        for latency in range(1, 11):
+            assert policy.hedge_delay(request) is None
+            policy.record(request, latency / 10)
+
+        assert policy.hedge_delay(request) == pytest.approx(0.9)  # type: ignore[misc]
+        # resource IDs are not part of the endpoint
+        other = httpx.Request("GET", base_url + OTHER_AGENT_PATH)
+        assert policy.hedge_delay(other) == pytest.approx(0.9)  # type: ignore[misc]
+        assert policy.hedge_delay(httpx.Request("GET", base_url + "/v2/gen-ai/agents")) is None
+
+
+class TestHedgedRequests:
+    async def test_hedge_wins_and_slow_request_is_cancelled(self) -> None:
+        server = Server(slow=[5])
+        policy = HedgePolicy(min_samples=5, min_delay=0.01)
+        client = make_client(server, policy)
+        await warm_up(client, 5)
+        delay = policy.hedge_delay(httpx.Request("GET", base_url + OTHER_AGENT_PATH))
+        assert delay is not None
+
+        started = time.monotonic()
+        response = await client.get(OTHER_AGENT_PATH, cast_to=httpx.Response)
+
+        assert time.monotonic() - started < 5
+        assert response.json() == {"request": 6}
+        assert server.cancelled == [5]
+        assert (policy.hedges_sent, policy.hedges_won) == (1, 1)
+        # the cancelled original request is recorded, not the faster hedge
+        (latencies,) = policy._latencies.values()
+        assert len(latencies) == 6 and latencies[-1] >= delay
+
+    async def test_fast_requests_are_not_hedged(self) -> None:
+        server = Server(slow=[])
+        policy = HedgePolicy(min_samples=5, min_delay=1)
+        client = make_client(server, policy)
+        await warm_up(client, 10)
+
+        assert server.requests == 10
+        assert policy.hedges_sent == 0
+
+    async def test_budget_limits_hedges(self) -> None:
+        server = Server(slow=[5, 7])
+        policy = HedgePolicy(min_samples=5, min_delay=0.01, budget=0, max_burst=1)
+        client = make_client(server, policy)
+        await warm_up(client, 5)
+
+        await client.get(AGENT_PATH, cast_to=httpx.Response)
+        with anyio.move_on_after(0.5) as scope:
+            await client.get(AGENT_PATH, cast_to=httpx.Response)
+
+        assert scope.cancelled_caught
+        assert policy.hedges_sent == 1
+        assert server.requests == 8
+
+    async def test_streaming_requests_are_not_hedged(self) -> None:
+        server = Server(slow=[5])
+        policy = HedgePolicy(min_samples=5, min_delay=0.01)
+        client = make_client(server, policy)
+        await warm_up(client, 5)
+
+        with anyio.move_on_after(0.2):
+            await client.get(AGENT_PATH, cast_to=httpx.Response, stream=True, stream_cls=AsyncStream[httpx.Response])
+
+        assert policy.hedges_sent == 0
+
+    async def test_copy_can_turn_hedging_off(self) -> None:
+        policy = HedgePolicy()
+        client = make_client(Server(slow=[]), policy)
+
+        assert client.copy()._hedge_policy is policy
+        assert client.copy(hedge_policy=None)._hedge_policy is None